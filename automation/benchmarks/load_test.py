@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+"""
+Open-loop load generator for the Teamcenter web tier
+
+Replays a weighted mix of TeamcenterRESTClient operations at a fixed
+arrival rate from several worker processes, stepping through a list of
+target rates. Requests are scheduled on a timetable that does not wait for
+responses, and latency is measured from each request's intended start, so
+queueing behind a slow server shows up in the percentiles instead of being
+hidden (coordinated omission). Each stage reports achieved throughput,
+errors and corrected and uncorrected latency; the first stage that misses
+its rate, latency SLO or error budget is reported as the saturation point.
+A stage misses its rate when fewer of the requests scheduled in its
+measurement window complete within the window than --rate-tolerance
+allows; with Poisson arrivals the scheduled count itself varies around
+the target.
+
+Without --base-url a mock server loaded with a synthetic fleet is started
+in a separate process, which is enough to exercise the tool itself.
+
+Usage:
+    python benchmarks/load_test.py --rates 50 100 200 400 --duration 30
+    python benchmarks/load_test.py --base-url https://tc-test.epiroc.com/tc \\
+        --processes 8 --connections 64 --rates 100 200 400 800 --slo-ms 2000
+    python benchmarks/load_test.py --mix get_item=80 search_items=20
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.client.deadline import Deadline
+from src.client.rest_client import TeamcenterRESTClient
+from src.mock import FleetDataGenerator, MockDataStore, MockTeamcenterServer
+from src.utils.config import get_setting, load_settings
+from src.utils.metrics import LatencyHistogram
+
+DEFAULT_MIX = {'get_item': 60, 'search_items': 20, 'bom_expand': 10, 'update_item': 10}
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+# ==================== Operations ====================
+#
+# Each planner runs on the scheduling thread, draws its arguments from the
+# worker's seeded random stream and returns the call to make.
+
+def plan_get_item(fleet: FleetDataGenerator, rng: random.Random, n: int) -> Callable:
+    level = rng.randint(0, fleet.depth)
+    item_id = fleet.item_id(level, rng.randrange(fleet.level_sizes[level]))
+    return lambda client: client.get_item(item_id)
+
+
+def plan_search_items(fleet: FleetDataGenerator, rng: random.Random, n: int) -> Callable:
+    equipment_type = rng.choice(fleet.equipment_types)
+    query = {
+        'type': 'EPR_MiningEquipment',
+        'properties': {f'{fleet.prefix}equipment_type': equipment_type},
+        'maxResults': 50
+    }
+    return lambda client: client.search_items(query)
+
+
+def plan_bom_expand(fleet: FleetDataGenerator, rng: random.Random, n: int,
+                    levels: int = 2) -> Callable:
+    item_id = fleet.item_id(0, rng.randrange(fleet.equipment_count))
+    return lambda client: client.get_bom_structure(item_id, levels=levels)
+
+
+def plan_update_item(fleet: FleetDataGenerator, rng: random.Random, n: int) -> Callable:
+    level = rng.randint(1, fleet.depth) if fleet.depth else 0
+    item_id = fleet.item_id(level, rng.randrange(fleet.level_sizes[level]))
+    updates = {'properties': {f'{fleet.prefix}load_test_counter': str(n)}}
+    return lambda client: client.update_item(item_id, updates)
+
+
+def plan_create_item(fleet: FleetDataGenerator, rng: random.Random, n: int) -> Callable:
+    item = {
+        'itemId': f'LOAD-{os.getpid()}-{n:09d}',
+        'name': 'Load Test Item',
+        'type': 'EPR_Component',
+        'properties': {f'{fleet.prefix}part_class': rng.choice(('Seal', 'Hose', 'Valve'))}
+    }
+    return lambda client: client.create_item(item)
+
+
+OPERATIONS = {
+    'get_item': plan_get_item,
+    'search_items': plan_search_items,
+    'bom_expand': plan_bom_expand,
+    'update_item': plan_update_item,
+    'create_item': plan_create_item
+}
+
+
+def parse_mix(entries: List[str]) -> Dict[str, float]:
+    """Parse 'operation=weight' arguments into a weight mapping"""
+    mix = {}
+    for entry in entries:
+        name, _, weight = entry.partition('=')
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{name}' (choose from {', '.join(OPERATIONS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+# ==================== Worker Process ====================
+
+class StageRecorder:
+    """Thread-safe per-operation histograms for one worker and stage"""
+
+    def __init__(self, window_start: float, window_end: float):
+        self.window_start = window_start
+        self.window_end = window_end
+        self.response = {}
+        self.service = {}
+        self.errors = Counter()
+        self.scheduled_in_window = 0
+        self.completed_in_window = 0
+        self.lock = threading.Lock()
+
+    def in_window(self, intended: float) -> bool:
+        return self.window_start <= intended < self.window_end
+
+    def record(self, operation: str, intended: float, started: float, finished: float,
+               error: str = None):
+        if not self.in_window(intended):
+            return
+        with self.lock:
+            if finished <= self.window_end:
+                self.completed_in_window += 1
+            if error:
+                self.errors[f'{operation}:{error}'] += 1
+                return
+            if operation not in self.response:
+                self.response[operation] = LatencyHistogram()
+                self.service[operation] = LatencyHistogram()
+            self.response[operation].record(finished - intended)
+            self.service[operation].record(finished - started)
+
+
+def run_worker(spec: Dict) -> Dict:
+    """Drive one share of a stage's arrival rate; runs in a worker process"""
+    # Failures are counted per operation; per-request client logging would swamp the report
+    logging.basicConfig(level=logging.CRITICAL)
+    rng = random.Random(f"{spec['seed']}:{spec['stage']}:{spec['worker']}")
+    fleet = FleetDataGenerator(**spec['fleet'])
+    names = list(spec['mix'])
+    weights = [spec['mix'][name] for name in names]
+    bom_levels = spec['bom_levels']
+
+    client = TeamcenterRESTClient(spec['base_url'], spec['username'], spec['password'],
+                                  timeout=spec['timeout'], pool_size=spec['connections'])
+
+    # Align to the shared wall-clock start, then schedule on the monotonic clock
+    time.sleep(max(0.0, spec['start_at'] - time.time()))
+    origin = time.perf_counter()
+    recorder = StageRecorder(origin + spec['warmup'], origin + spec['duration'])
+    rate = spec['rate']
+    poisson = spec['arrival'] == 'poisson'
+    max_lag = 0.0
+
+    def execute(operation: str, call: Callable, intended: float):
+        started = time.perf_counter()
+        remaining = spec['timeout'] - (started - intended)
+        if remaining <= 0:
+            recorder.record(operation, intended, started, started, 'queue_timeout')
+            return
+        error = None
+        try:
+            with Deadline(remaining):
+                call(client)
+        except Exception as e:
+            error = type(e).__name__
+        recorder.record(operation, intended, started, time.perf_counter(), error)
+
+    executor = ThreadPoolExecutor(max_workers=spec['connections'],
+                                  thread_name_prefix='load')
+    # Stagger workers so their timetables interleave rather than coincide
+    intended = origin + spec['worker'] / (rate * spec['workers'])
+    end = origin + spec['duration']
+    sent = 0
+    while intended < end:
+        now = time.perf_counter()
+        if intended > now:
+            time.sleep(intended - now)
+        else:
+            max_lag = max(max_lag, now - intended)
+
+        operation = rng.choices(names, weights)[0]
+        if operation == 'bom_expand':
+            call = plan_bom_expand(fleet, rng, sent, bom_levels)
+        else:
+            call = OPERATIONS[operation](fleet, rng, sent)
+        executor.submit(execute, operation, call, intended)
+        sent += 1
+        if recorder.in_window(intended):
+            recorder.scheduled_in_window += 1
+        intended += rng.expovariate(rate) if poisson else 1.0 / rate
+
+    executor.shutdown(wait=True)
+    try:
+        client.logout()
+    except Exception:
+        pass
+
+    return {
+        'sent': sent,
+        'scheduled_in_window': recorder.scheduled_in_window,
+        'completed_in_window': recorder.completed_in_window,
+        'errors': dict(recorder.errors),
+        'scheduler_lag_ms': max_lag * 1000,
+        'response': {name: h.to_dict() for name, h in recorder.response.items()},
+        'service': {name: h.to_dict() for name, h in recorder.service.items()}
+    }
+
+
+# ==================== Mock Server Process ====================
+
+def serve_mock(fleet_config: Dict, settings_path: str, ready, stop):
+    """Run a mock server loaded with a synthetic fleet until stop is set"""
+    logging.basicConfig(level=logging.WARNING)
+    settings = load_settings(settings_path)
+    store = MockDataStore(property_prefix=fleet_config['property_prefix'])
+    FleetDataGenerator(**fleet_config).load_into(store)
+    server = MockTeamcenterServer.from_settings(settings, store=store, port=0)
+    server.start()
+    ready.put(server.base_url)
+    stop.wait()
+    server.stop()
+
+
+# ==================== Stages ====================
+
+def summarize(histograms: Dict[str, LatencyHistogram]) -> Dict:
+    """Percentile summary in milliseconds for each histogram"""
+    summary = {}
+    for name, histogram in histograms.items():
+        summary[name] = {'count': histogram.total,
+                         'mean_ms': histogram.mean * 1000,
+                         'max_ms': histogram.max * 1000}
+        for pct in PERCENTILES:
+            summary[name][f'p{pct:g}_ms'] = histogram.percentile(pct) * 1000
+    return summary
+
+
+def run_stage(pool, args, stage: int, rate: float, base_url: str,
+              fleet_config: Dict, mix: Dict[str, float]) -> Dict:
+    """Run one target rate across all worker processes and merge the results"""
+    specs = [{
+        'stage': stage,
+        'worker': worker,
+        'workers': args.processes,
+        'rate': rate / args.processes,
+        'duration': args.duration,
+        'warmup': args.warmup,
+        'start_at': time.time() + args.start_delay,
+        'arrival': args.arrival,
+        'connections': args.connections,
+        'timeout': args.timeout,
+        'seed': args.seed,
+        'mix': mix,
+        'bom_levels': args.bom_levels,
+        'fleet': fleet_config,
+        'base_url': base_url,
+        'username': args.username,
+        'password': args.password
+    } for worker in range(args.processes)]
+
+    results = pool.map(run_worker, specs)
+
+    response = {'all': LatencyHistogram()}
+    service = {'all': LatencyHistogram()}
+    errors = Counter()
+    for result in results:
+        errors.update(result['errors'])
+        for merged, key in ((response, 'response'), (service, 'service')):
+            for name, data in result[key].items():
+                histogram = LatencyHistogram.from_dict(data)
+                merged.setdefault(name, LatencyHistogram()).merge(histogram)
+                merged['all'].merge(histogram)
+
+    window = args.duration - args.warmup
+    scheduled = sum(result['scheduled_in_window'] for result in results)
+    completed = sum(result['completed_in_window'] for result in results)
+    attempted = response['all'].total + sum(errors.values())
+    return {
+        'target_rate': rate,
+        'offered_rate': scheduled / window,
+        'achieved_rate': completed / window,
+        'scheduled': scheduled,
+        'completed': completed,
+        'requests': attempted,
+        'errors': dict(errors),
+        'error_rate': sum(errors.values()) / attempted if attempted else 0.0,
+        'scheduler_lag_ms': max(result['scheduler_lag_ms'] for result in results),
+        'corrected': summarize(response) if response['all'].total else {},
+        'uncorrected': summarize(service) if service['all'].total else {}
+    }
+
+
+def saturation_reasons(result: Dict, args) -> List[str]:
+    """Reasons a stage counts as saturated (empty if the rate was sustained)"""
+    reasons = []
+    if result['completed'] < result['scheduled'] * (1 - args.rate_tolerance):
+        reasons.append(f"throughput {result['achieved_rate']:.1f}/s below offered "
+                       f"{result['offered_rate']:.1f}/s ({result['completed']} of "
+                       f"{result['scheduled']} scheduled requests completed in the window)")
+    p99 = result['corrected'].get('all', {}).get('p99_ms')
+    if p99 is None or p99 > args.slo_ms:
+        reasons.append(f"p99 {p99 or 0:.0f} ms above SLO {args.slo_ms:g} ms")
+    if result['error_rate'] > args.max_error_rate:
+        reasons.append(f"error rate {result['error_rate']:.1%} above "
+                       f"{args.max_error_rate:.1%}")
+    return reasons
+
+
+def print_stage(result: Dict):
+    """Print one stage's results as a table"""
+    print(
+        f"\nTarget {result['target_rate']:g}/s (offered {result['offered_rate']:.1f}/s) "
+        f"-> achieved {result['achieved_rate']:.1f}/s, "
+        f"{result['requests']} requests, {result['error_rate']:.2%} errors, "
+        f"scheduler lag {result['scheduler_lag_ms']:.1f} ms"
+    )
+    header = f"  {'operation':<14}{'count':>8}" + ''.join(f"{f'p{p:g}':>10}" for p in PERCENTILES)
+    print(header + f"{'max':>10}   (corrected ms / uncorrected ms)")
+    for name, corrected in result['corrected'].items():
+        uncorrected = result['uncorrected'][name]
+        cells = ''.join(
+            f"{corrected[f'p{p:g}_ms']:>10.1f}" for p in PERCENTILES
+        )
+        print(f"  {name:<14}{corrected['count']:>8}{cells}{corrected['max_ms']:>10.1f}")
+        cells = ''.join(
+            f"{uncorrected[f'p{p:g}_ms']:>10.1f}" for p in PERCENTILES
+        )
+        print(f"  {'':<14}{'':>8}{cells}{uncorrected['max_ms']:>10.1f}")
+    for error, count in sorted(result['errors'].items()):
+        print(f"  error {error}: {count}")
+
+
+def main():
+    settings = load_settings()
+    thresholds = get_setting(settings, 'monitoring.alerts.thresholds', {})
+
+    parser = argparse.ArgumentParser(description='Open-loop load test for the Teamcenter web tier')
+    parser.add_argument('--base-url', nargs='+',
+                        help='Teamcenter base URL(s); starts a mock server if omitted')
+    parser.add_argument('--username', default=os.getenv('TC_USERNAME', 'loadtest'))
+    parser.add_argument('--password', default=os.getenv('TC_PASSWORD', 'loadtest'))
+    parser.add_argument('--rates', type=float, nargs='+', default=[25, 50, 100, 200, 400],
+                        help='Target arrival rates in requests/second, one stage each')
+    parser.add_argument('--duration', type=float, default=30,
+                        help='Seconds per stage')
+    parser.add_argument('--warmup', type=float, default=5,
+                        help='Seconds at the start of each stage excluded from results')
+    parser.add_argument('--processes', type=int, default=min(4, os.cpu_count() or 1),
+                        help='Worker processes')
+    parser.add_argument('--connections', type=int, default=32,
+                        help='Concurrent requests (and pooled connections) per process')
+    parser.add_argument('--arrival', choices=('poisson', 'uniform'), default='poisson',
+                        help='Inter-arrival distribution')
+    parser.add_argument('--mix', nargs='+',
+                        default=[f'{name}={weight}' for name, weight in DEFAULT_MIX.items()],
+                        help='Operation weights as name=weight '
+                             f"(operations: {', '.join(OPERATIONS)})")
+    parser.add_argument('--bom-levels', type=int, default=2,
+                        help='Levels expanded by bom_expand')
+    parser.add_argument('--timeout', type=float, default=float(settings['teamcenter']['timeout']),
+                        help='Per-request time budget, including time queued')
+    parser.add_argument('--slo-ms', type=float,
+                        default=float(thresholds.get('api_response_time_ms', 5000)),
+                        help='p99 latency objective for a stage to count as sustained')
+    parser.add_argument('--max-error-rate', type=float,
+                        default=float(thresholds.get('error_rate_percent', 5)) / 100,
+                        help='Error fraction above which a stage is saturated')
+    parser.add_argument('--rate-tolerance', type=float, default=0.05,
+                        help='Allowed shortfall of completed vs scheduled requests '
+                             'in the measurement window')
+    parser.add_argument('--keep-going', action='store_true',
+                        help='Run every stage even after saturation')
+    parser.add_argument('--equipment', type=int, default=500,
+                        help='Equipment items in the synthetic fleet')
+    parser.add_argument('--depth', type=int, default=3, help='BOM depth of the fleet')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--start-delay', type=float, default=2.0,
+                        help='Seconds allowed for workers to connect before a stage starts')
+    parser.add_argument('--settings', help='Settings file for the mock server')
+    parser.add_argument('--output', type=Path, help='Write results as JSON')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    logging.getLogger('src').setLevel(logging.WARNING)
+    if args.warmup >= args.duration:
+        parser.error('--warmup must be shorter than --duration')
+    mix = parse_mix(args.mix)
+
+    fleet_config = FleetDataGenerator.from_settings(
+        settings, seed=args.seed, equipment_count=args.equipment, depth=args.depth
+    ).config()
+
+    context = multiprocessing.get_context('spawn')
+    mock = None
+    if args.base_url:
+        base_url = args.base_url if len(args.base_url) > 1 else args.base_url[0]
+    else:
+        ready, stop = context.Queue(), context.Event()
+        mock = context.Process(target=serve_mock, daemon=True,
+                               args=(fleet_config, args.settings, ready, stop))
+        mock.start()
+        base_url = ready.get(timeout=300)
+        print(f"Mock server with {args.equipment} equipment items at {base_url}")
+
+    stages = []
+    sustained = None
+    saturated = None
+    try:
+        with context.Pool(args.processes) as pool:
+            for stage, rate in enumerate(args.rates):
+                result = run_stage(pool, args, stage, rate, base_url, fleet_config, mix)
+                result['saturation'] = saturation_reasons(result, args)
+                stages.append(result)
+                print_stage(result)
+
+                if result['saturation']:
+                    saturated = saturated or result
+                    print(f"  SATURATED: {'; '.join(result['saturation'])}")
+                    if not args.keep_going:
+                        break
+                elif saturated is None:
+                    sustained = result
+    finally:
+        if mock is not None:
+            stop.set()
+            mock.join(timeout=10)
+
+    print()
+    if sustained:
+        print(f"Highest sustained rate: {sustained['target_rate']:g}/s "
+              f"(p99 {sustained['corrected']['all']['p99_ms']:.0f} ms)")
+    if saturated:
+        print(f"Saturation point: {saturated['target_rate']:g}/s "
+              f"({'; '.join(saturated['saturation'])})")
+    else:
+        print("No saturation within the tested rates")
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps({
+            'created': datetime.now().isoformat(),
+            'config': {key: value for key, value in vars(args).items()
+                       if key not in ('password', 'output', 'settings')},
+            'mix': mix,
+            'stages': stages,
+            'sustained_rate': sustained['target_rate'] if sustained else None,
+            'saturation_rate': saturated['target_rate'] if saturated else None
+        }, indent=2, default=str))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+Client throughput and latency benchmarks for the Teamcenter automation package
+
+Drives TeamcenterRESTClient against the local mock server and measures
+ops/sec and p50/p95/p99 latency per operation at several concurrency
+levels, JSON decode cost for a large BOM payload (through the client's
+codec, so with the JSON backend the client uses) and memory held per 100k
+decoded BOM lines. Results are compared with a JSON baseline and the run
+fails when a gated metric regresses beyond the threshold. When the
+baseline was recorded with different settings only the size-normalised
+metrics (decode MB/s, memory per 100k lines) are compared.
+
+The baseline is machine-specific and not versioned;
+baselines/example-baseline.json only shows the format and rough numbers.
+
+Usage:
+    python benchmarks/run_benchmarks.py --update-baseline  # record this machine's baseline
+    python benchmarks/run_benchmarks.py                    # compare with it
+    python benchmarks/run_benchmarks.py --quick --threshold 0.5
+"""
+
+import argparse
+import gc
+import json
+import logging
+import platform
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from itertools import count
+from pathlib import Path
+from typing import Callable, Dict, List
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.client.codec import available_json_backends
+from src.client.models import Item, bom_from_dict, models_from
+from src.client.rest_client import TeamcenterRESTClient
+from src.mock import MockDataStore, MockTeamcenterServer
+from src.utils.metrics import percentile
+
+DEFAULT_BASELINE = Path(__file__).parent / 'baselines' / 'baseline.json'
+
+ROOT_ID = 'BENCH-LOADER'
+BOM_ROOT_ID = 'BENCH-BOM-ROOT'
+ITEM_COUNT = 500
+FLEET_BOM_LINES = 50
+
+
+class BenchmarkContext:
+    """Shared fixtures for the operation benchmarks"""
+
+    def __init__(self, store: MockDataStore, client: TeamcenterRESTClient):
+        self.store = store
+        self.client = client
+        self.item_ids = [f'BENCH-PART-{i:05d}' for i in range(ITEM_COUNT)]
+        self.sequence = count()
+
+
+def build_store(bom_lines: int) -> MockDataStore:
+    """Populate a mock store with parts, a small equipment BOM and a large flat BOM"""
+    store = MockDataStore()
+    store.load_items({
+        'itemId': f'BENCH-PART-{i:05d}',
+        'name': f'Benchmark Part {i}',
+        'type': 'EPR_Component',
+        'properties': {
+            'epr_equipment_type': 'Underground Loader',
+            'epr_model': f'ST{1000 + i % 40}',
+            'epr_power_type': 'Battery Electric' if i % 2 else 'Diesel',
+            'epr_facility': 'Pitt Meadows'
+        }
+    } for i in range(ITEM_COUNT))
+
+    store.create_item({'itemId': ROOT_ID, 'name': 'Benchmark Loader', 'type': 'EPR_MiningEquipment'})
+    for i in range(FLEET_BOM_LINES):
+        store.add_bom_line(ROOT_ID, {
+            'childId': f'BENCH-PART-{i:05d}',
+            'quantity': 1 + i % 3,
+            'properties': {'epr_critical_component': str(i % 4 == 0),
+                           'epr_position_number': str(i + 1)}
+        })
+
+    store.create_item({'itemId': BOM_ROOT_ID, 'name': 'Large BOM Root', 'type': 'EPR_MiningEquipment'})
+    for i in range(bom_lines):
+        store.add_bom_line(BOM_ROOT_ID, {
+            'childId': f'BENCH-PART-{i % ITEM_COUNT:05d}',
+            'quantity': 1 + i % 5,
+            'findNumber': str((i + 1) * 10),
+            'properties': {'epr_critical_component': str(i % 7 == 0),
+                           'epr_position_number': str(i + 1)}
+        })
+
+    store.start_workflow({'processName': 'EPR_ECN_Process', 'targets': [ROOT_ID]}, 'bench')
+    return store
+
+
+def operations() -> Dict[str, Callable]:
+    """Client operations exercised by the throughput benchmark"""
+    def get_item(ctx, i):
+        ctx.client.get_item(ctx.item_ids[i % ITEM_COUNT])
+
+    def search_items(ctx, i):
+        ctx.client.search_items({'itemId': f'BENCH-PART-{i % ITEM_COUNT:05d}'})
+
+    def get_bom_structure(ctx, i):
+        ctx.client.get_bom_structure(ROOT_ID, levels=1)
+
+    def get_where_used(ctx, i):
+        ctx.client.get_where_used(ctx.item_ids[i % FLEET_BOM_LINES])
+
+    def execute_saved_query(ctx, i):
+        ctx.client.execute_saved_query('EPR_Equipment_By_Type',
+                                       {'Item ID': f'BENCH-PART-{i % ITEM_COUNT:05d}'})
+
+    def get_my_tasks(ctx, i):
+        ctx.client.get_my_tasks()
+
+    def create_item(ctx, i):
+        ctx.client.create_item({'itemId': f'BENCH-NEW-{next(ctx.sequence):08d}',
+                                'name': 'Benchmark Item', 'type': 'EPR_Component'})
+
+    def update_item(ctx, i):
+        ctx.client.update_item(ctx.item_ids[i % ITEM_COUNT],
+                               {'properties': {'epr_bench_counter': str(i)}})
+
+    return {
+        'get_item': get_item,
+        'search_items': search_items,
+        'get_bom_structure': get_bom_structure,
+        'get_where_used': get_where_used,
+        'execute_saved_query': execute_saved_query,
+        'get_my_tasks': get_my_tasks,
+        'create_item': create_item,
+        'update_item': update_item
+    }
+
+
+def run_operation(ctx: BenchmarkContext, operation: Callable, concurrency: int,
+                  total_requests: int) -> Dict:
+    """Run one operation at a fixed concurrency and summarise its latency"""
+    per_worker = max(1, total_requests // concurrency)
+
+    def worker(offset: int) -> List[float]:
+        samples = []
+        for i in range(per_worker):
+            started = time.perf_counter()
+            operation(ctx, offset * per_worker + i)
+            samples.append(time.perf_counter() - started)
+        return samples
+
+    # Warm up connections before timing
+    for i in range(min(concurrency, 8)):
+        operation(ctx, i)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(worker, range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    samples = [sample for result in results for sample in result]
+    return {
+        'ops_per_sec': len(samples) / elapsed,
+        'p50_ms': percentile(samples, 50) * 1000,
+        'p95_ms': percentile(samples, 95) * 1000,
+        'p99_ms': percentile(samples, 99) * 1000
+    }
+
+
+def run_decode_benchmark(client: TeamcenterRESTClient, bom_lines: int,
+                         repeats: int) -> Dict:
+    """Measure codec decode cost and decoded memory for the large BOM payload"""
+    response = client._request('GET', f'/restful/bom/{BOM_ROOT_ID}/structure',
+                               params={'levels': 1, 'includeProperties': True})
+    response.raise_for_status()
+    megabytes = len(response.content) / (1024 * 1024)
+
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        client.codec.decode(response)
+        timings.append(time.perf_counter() - started)
+    decode_seconds = min(timings)
+
+    gc.collect()
+    tracemalloc.start()
+    decoded = client.codec.decode(response)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    lines = len(decoded['lines'])
+    del decoded
+
+    return {
+        'payload_mb': megabytes,
+        'decode_ms': decode_seconds * 1000,
+        'decode_mb_per_sec': megabytes / decode_seconds,
+        'decode_lines_per_sec': lines / decode_seconds,
+        'memory_mb_per_100k_lines': current / (1024 * 1024) * 100000 / lines
+    }
+
+
+def _retained_bytes(build: Callable[[], object]) -> int:
+    """Bytes still allocated after build() returns, while its result is alive"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def run_model_memory_benchmark(client: TeamcenterRESTClient, bom_lines: int) -> Dict:
+    """Memory held by dict results compared with typed models"""
+    bom_response = client._request('GET', f'/restful/bom/{BOM_ROOT_ID}/structure',
+                                   params={'levels': 1, 'includeProperties': True})
+    bom_response.raise_for_status()
+    search_response = client._request('POST', '/restful/items/search',
+                                      json={'query': 'Benchmark', 'maxResults': ITEM_COUNT})
+    search_response.raise_for_status()
+    decode = client.codec.decode
+
+    # Repeat the search page to approximate a large result set
+    pages = max(1, bom_lines // ITEM_COUNT)
+    items = pages * len(decode(search_response)['results'])
+
+    def search_dicts():
+        return [decode(search_response)['results'] for _ in range(pages)]
+
+    def search_models():
+        return [models_from(Item, decode(search_response)['results']) for _ in range(pages)]
+
+    bom_dict = _retained_bytes(lambda: decode(bom_response))
+    bom_typed = _retained_bytes(lambda: bom_from_dict(decode(bom_response)))
+    item_dict = _retained_bytes(search_dicts)
+    item_typed = _retained_bytes(search_models)
+
+    megabytes = 1024 * 1024
+    return {
+        'dict_bom_mb_per_100k_lines': bom_dict / megabytes * 100000 / bom_lines,
+        'typed_bom_mb_per_100k_lines': bom_typed / megabytes * 100000 / bom_lines,
+        'dict_items_mb_per_100k': item_dict / megabytes * 100000 / items,
+        'typed_items_mb_per_100k': item_typed / megabytes * 100000 / items
+    }
+
+
+# Metrics gated for regressions, and whether higher values are better
+GATED_METRICS = {
+    'ops_per_sec': True,
+    'p50_ms': False,
+    'p95_ms': False,
+    'decode_mb_per_sec': True,
+    'memory_mb_per_100k_lines': False
+}
+
+# Gated metrics that do not depend on request counts, concurrency or BOM size
+NORMALISED_METRICS = {'decode_mb_per_sec', 'memory_mb_per_100k_lines'}
+
+
+def run_suite(args) -> Dict[str, float]:
+    """Run every benchmark and return a flat metric dictionary"""
+    store = build_store(args.bom_lines)
+    metrics = {}
+
+    with MockTeamcenterServer(store=store, seed=args.seed) as server:
+        client = TeamcenterRESTClient(server.base_url, 'bench', 'bench',
+                                      pool_size=max(args.concurrency))
+        ctx = BenchmarkContext(store, client)
+
+        selected = operations()
+        if args.operations:
+            selected = {name: selected[name] for name in args.operations}
+
+        for name, operation in selected.items():
+            for concurrency in args.concurrency:
+                result = run_operation(ctx, operation, concurrency, args.requests)
+                for metric, value in result.items():
+                    metrics[f'{name}.c{concurrency}.{metric}'] = value
+                print(
+                    f"{name:<22} c={concurrency:<3} {result['ops_per_sec']:9.1f} ops/s  "
+                    f"p50 {result['p50_ms']:7.2f} ms  p95 {result['p95_ms']:7.2f} ms  "
+                    f"p99 {result['p99_ms']:7.2f} ms"
+                )
+
+        decode = run_decode_benchmark(client, args.bom_lines, args.decode_repeats)
+        for metric, value in decode.items():
+            metrics[f'bom_decode.{metric}'] = value
+        print(
+            f"bom_decode             {decode['payload_mb']:.1f} MB in {decode['decode_ms']:.1f} ms "
+            f"({decode['decode_mb_per_sec']:.1f} MB/s), "
+            f"{decode['memory_mb_per_100k_lines']:.1f} MB per 100k lines"
+        )
+
+        memory = run_model_memory_benchmark(client, args.bom_lines)
+        for metric, value in memory.items():
+            metrics[f'model_memory.{metric}'] = value
+        print(
+            f"model_memory           BOM lines {memory['dict_bom_mb_per_100k_lines']:.1f} MB "
+            f"-> {memory['typed_bom_mb_per_100k_lines']:.1f} MB, items "
+            f"{memory['dict_items_mb_per_100k']:.1f} MB "
+            f"-> {memory['typed_items_mb_per_100k']:.1f} MB per 100k (dict -> typed)"
+        )
+
+        client.logout()
+
+    return metrics
+
+
+def compare(metrics: Dict[str, float], baseline: Dict, threshold: float,
+            normalised_only: bool = False) -> List[str]:
+    """
+    Return a description of every gated metric that regressed
+
+    Args:
+        metrics: Results of this run
+        baseline: Loaded baseline file
+        threshold: Allowed regression as a fraction
+        normalised_only: Only compare NORMALISED_METRICS, for baselines
+            recorded with a different configuration
+    """
+    regressions = []
+    for key, previous in baseline.get('metrics', {}).items():
+        suffix = key.rsplit('.', 1)[-1]
+        if suffix not in GATED_METRICS or key not in metrics or not previous:
+            continue
+        if normalised_only and suffix not in NORMALISED_METRICS:
+            continue
+
+        current = metrics[key]
+        if GATED_METRICS[suffix]:
+            change = (previous - current) / previous
+        else:
+            change = (current - previous) / previous
+
+        if change > threshold:
+            regressions.append(
+                f"{key}: {previous:.3f} -> {current:.3f} ({change:+.0%} worse)"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Teamcenter REST client')
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE,
+                        help='Baseline JSON file')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='Write the results as the new baseline')
+    parser.add_argument('--output', type=Path, help='Also write results to this file')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Allowed regression as a fraction (default: 0.25)')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16],
+                        help='Concurrency levels')
+    parser.add_argument('--requests', type=int, default=400,
+                        help='Requests per operation and concurrency level')
+    parser.add_argument('--bom-lines', type=int, default=100000,
+                        help='Lines in the large BOM used for decode benchmarks')
+    parser.add_argument('--decode-repeats', type=int, default=5)
+    parser.add_argument('--operations', nargs='+', help='Only run these operations')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--quick', action='store_true',
+                        help='Smaller run for local iteration')
+    args = parser.parse_args()
+
+    if args.quick:
+        args.requests = min(args.requests, 100)
+        args.bom_lines = min(args.bom_lines, 20000)
+        args.decode_repeats = min(args.decode_repeats, 3)
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    # Per-request client and mock server logging would swamp the report
+    logging.getLogger('src').setLevel(logging.WARNING)
+
+    metrics = run_suite(args)
+    result = {
+        'created': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {
+            'concurrency': args.concurrency,
+            'requests': args.requests,
+            'bom_lines': args.bom_lines,
+            'json_backend': available_json_backends()[0]
+        },
+        'metrics': metrics
+    }
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(result, indent=2))
+
+    if args.update_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(result, indent=2))
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --update-baseline first")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text())
+    normalised_only = baseline.get('config') != result['config']
+    if normalised_only:
+        print("Baseline was recorded with a different configuration; comparing only "
+              f"{', '.join(sorted(NORMALISED_METRICS))}")
+
+    regressions = compare(metrics, baseline, args.threshold, normalised_only)
+    if regressions:
+        print(f"{len(regressions)} metric(s) regressed beyond {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+
+    print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
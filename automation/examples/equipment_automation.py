@@ -8,11 +8,18 @@ import os
 import sys
 from datetime import datetime
 from pathlib import Path
+from typing import Optional
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.client.rest_client import TeamcenterRESTClient
+from src.client.bom_builder import BOMBuilder
+from src.client.deadline import Deadline
+from src.compliance import ComplianceEngine
+from src.mock import MockTeamcenterServer
+from src.reports import EquipmentReporter
+from src.utils.config import load_settings
 import logging
 
 # Configure logging
@@ -31,6 +38,14 @@ class EquipmentAutomation:
     def __init__(self, base_url: str, username: str, password: str):
         """Initialize automation client"""
         self.client = TeamcenterRESTClient(base_url, username, password)
+        self.deadline = None
+    
+    def cancel(self):
+        """
+        Cancel the demonstration currently in progress
+        """
+        if self.deadline is not None:
+            self.deadline.cancel()
     
     def create_scooptram_loader(self):
         """
@@ -71,12 +86,22 @@ class EquipmentAutomation:
         
         return loader
     
-    def build_loader_bom(self, loader_id: str):
+    def build_loader_bom(self, loader_id: str, deadline: Optional[Deadline] = None):
         """
         Example: Build BOM structure for loader
         """
         logger.info(f"Building BOM for loader {loader_id}...")
         
+        with deadline or Deadline():
+            result = self._add_loader_components(loader_id)
+        
+        logger.info("BOM structure complete")
+        return result
+    
+    def _add_loader_components(self, loader_id: str):
+        """
+        Create the loader components and attach them to its BOM
+        """
         # Define major components
         components = [
             {
@@ -123,38 +148,19 @@ class EquipmentAutomation:
             }
         ]
         
-        # Add each component to BOM
-        for component in components:
-            try:
-                # First create the component if it doesn't exist
-                comp_data = {
-                    'itemId': component['itemId'],
-                    'name': component['name'],
-                    'type': 'EPR_Component'
-                }
-                
-                try:
-                    self.client.create_item(comp_data)
-                    logger.info(f"  Created component: {component['itemId']}")
-                except:
-                    logger.info(f"  Component exists: {component['itemId']}")
-                
-                # Add to BOM
-                bom_line = self.client.add_bom_line(
-                    parent_id=loader_id,
-                    child_id=component['itemId'],
-                    quantity=component['quantity'],
-                    properties={
-                        'epr_critical_component': str(component['critical']),
-                        'epr_position_number': str(components.index(component) + 1)
-                    }
-                )
-                logger.info(f"  ✓ Added {component['name']} to BOM")
-                
-            except Exception as e:
-                logger.error(f"  ✗ Failed to add {component['itemId']}: {e}")
+        # Resolve existing components in bulk, create the missing ones and
+        # add every line concurrently
+        result = BOMBuilder(self.client).build(loader_id, components)
         
-        logger.info("BOM structure complete")
+        for line in result['lines']:
+            component = components[line['position'] - 1]
+            if line['status'] == 'added':
+                created = ' (new component)' if line['created'] else ''
+                logger.info(f"  ✓ Added {component['name']} to BOM{created}")
+            else:
+                logger.error(f"  ✗ Failed to add {line['itemId']}: {line['error']}")
+        
+        return result
     
     def check_equipment_compliance(self, equipment_id: str):
         """
@@ -162,41 +168,31 @@ class EquipmentAutomation:
         """
         logger.info(f"Checking compliance for {equipment_id}...")
         
-        # Define required compliance documents
-        required_docs = [
-            'MSHA_Certification',
-            'CE_Declaration',
-            'Electrical_Safety_Test',
-            'Battery_Safety_Report',
-            'ROPS_FOPS_Certificate'
-        ]
+        # Evaluate attached documents against the configured requirements
+        compliance = load_settings()['epiroc']['compliance']
+        engine = ComplianceEngine(self.client, compliance['required_documents'],
+                                  warning_days=compliance.get('warning_days', 30))
+        result = engine.check(equipment_id)
         
-        # In real implementation, would query for attached documents
-        # For demo, we'll simulate the check
         compliance_status = {
             'equipmentId': equipment_id,
-            'compliant': True,
-            'missing_documents': [],
-            'expired_documents': [],
-            'warnings': []
+            'compliant': result['compliant'],
+            'missing_documents': result['missing'],
+            'expired_documents': [doc['type'] for doc in result['expired']],
+            'warnings': [f"{doc['type']} expires on {doc['expires_on']}"
+                         for doc in result['expiring']]
         }
         
-        # Simulate checking each required document
-        for doc_type in required_docs:
-            # In real implementation, would check if document exists and is valid
-            logger.info(f"  Checking {doc_type}...")
-            
-            # Simulate some missing docs for demo
-            if doc_type in ['Electrical_Safety_Test', 'Battery_Safety_Report']:
-                compliance_status['missing_documents'].append(doc_type)
-                compliance_status['compliant'] = False
-        
         # Generate compliance report
         if compliance_status['compliant']:
             logger.info("✓ Equipment is COMPLIANT")
         else:
             logger.warning("✗ Equipment is NON-COMPLIANT")
             logger.warning(f"  Missing: {compliance_status['missing_documents']}")
+            if compliance_status['expired_documents']:
+                logger.warning(f"  Expired: {compliance_status['expired_documents']}")
+        for warning in compliance_status['warnings']:
+            logger.warning(f"  {warning}")
         
         return compliance_status
     
@@ -239,43 +235,17 @@ class EquipmentAutomation:
             logger.error(f"✗ Failed to start workflow: {e}")
             return None
     
-    def generate_equipment_report(self, equipment_id: str):
+    def generate_equipment_report(self, equipment_id: str,
+                                  deadline: Optional[Deadline] = None):
         """
         Example: Generate comprehensive equipment report
         """
         logger.info(f"Generating report for {equipment_id}...")
         
         try:
-            # Get equipment details
-            equipment = self.client.get_item(equipment_id)
-            
-            # Get BOM structure
-            bom = self.client.get_bom_structure(equipment_id, levels=2)
-            
-            # Get where-used information
-            where_used = self.client.get_where_used(equipment_id)
-            
-            # Generate report
-            report = {
-                'timestamp': datetime.now().isoformat(),
-                'equipment': {
-                    'id': equipment_id,
-                    'name': equipment.get('name'),
-                    'type': equipment.get('properties', {}).get('epr_equipment_type'),
-                    'model': equipment.get('properties', {}).get('epr_model'),
-                    'power_type': equipment.get('properties', {}).get('epr_power_type'),
-                    'facility': equipment.get('properties', {}).get('epr_facility')
-                },
-                'bom_summary': {
-                    'total_components': len(bom.get('lines', [])),
-                    'critical_components': sum(1 for line in bom.get('lines', []) 
-                                              if line.get('properties', {}).get('epr_critical_component') == 'True')
-                },
-                'usage': {
-                    'used_in_count': len(where_used),
-                    'parent_assemblies': [parent.get('itemId') for parent in where_used]
-                }
-            }
+            # Item, BOM and where-used are fetched concurrently
+            with deadline or Deadline():
+                report = EquipmentReporter(self.client).report(equipment_id)
             
             logger.info("✓ Report generated successfully")
             logger.info(f"  Equipment: {report['equipment']['name']}")
@@ -288,51 +258,57 @@ class EquipmentAutomation:
             logger.error(f"✗ Failed to generate report: {e}")
             return None
     
-    def run_full_demo(self):
+    def run_full_demo(self, timeout: Optional[float] = None):
         """
         Run complete demonstration of equipment automation
+        
+        Args:
+            timeout: Overall time budget in seconds (None for no limit)
         """
+        self.deadline = Deadline(timeout)
+        
         logger.info("=" * 60)
         logger.info("TEAMCENTER EQUIPMENT AUTOMATION DEMONSTRATION")
         logger.info("Epiroc - Pitt Meadows Facility")
         logger.info("=" * 60)
         
         try:
-            # Step 1: Create new equipment
-            logger.info("\n1. CREATING NEW EQUIPMENT")
-            logger.info("-" * 40)
-            loader = self.create_scooptram_loader()
-            loader_id = loader['itemId']
-            
-            # Step 2: Build BOM structure
-            logger.info("\n2. BUILDING BOM STRUCTURE")
-            logger.info("-" * 40)
-            self.build_loader_bom(loader_id)
-            
-            # Step 3: Check compliance
-            logger.info("\n3. CHECKING COMPLIANCE")
-            logger.info("-" * 40)
-            compliance = self.check_equipment_compliance(loader_id)
-            
-            # Step 4: Start ECN if non-compliant
-            if not compliance['compliant']:
-                logger.info("\n4. STARTING ECN WORKFLOW")
+            with self.deadline:
+                # Step 1: Create new equipment
+                logger.info("\n1. CREATING NEW EQUIPMENT")
                 logger.info("-" * 40)
-                self.start_ecn_workflow(
-                    loader_id,
-                    "Update compliance documentation and battery safety certification"
-                )
-            
-            # Step 5: Generate report
-            logger.info("\n5. GENERATING EQUIPMENT REPORT")
-            logger.info("-" * 40)
-            report = self.generate_equipment_report(loader_id)
-            
-            logger.info("\n" + "=" * 60)
-            logger.info("DEMONSTRATION COMPLETE")
-            logger.info(f"Created equipment: {loader_id}")
-            logger.info("=" * 60)
-            
+                loader = self.create_scooptram_loader()
+                loader_id = loader['itemId']
+                
+                # Step 2: Build BOM structure
+                logger.info("\n2. BUILDING BOM STRUCTURE")
+                logger.info("-" * 40)
+                self.build_loader_bom(loader_id)
+                
+                # Step 3: Check compliance
+                logger.info("\n3. CHECKING COMPLIANCE")
+                logger.info("-" * 40)
+                compliance = self.check_equipment_compliance(loader_id)
+                
+                # Step 4: Start ECN if non-compliant
+                if not compliance['compliant']:
+                    logger.info("\n4. STARTING ECN WORKFLOW")
+                    logger.info("-" * 40)
+                    self.start_ecn_workflow(
+                        loader_id,
+                        "Update compliance documentation and battery safety certification"
+                    )
+                
+                # Step 5: Generate report
+                logger.info("\n5. GENERATING EQUIPMENT REPORT")
+                logger.info("-" * 40)
+                report = self.generate_equipment_report(loader_id)
+                
+                logger.info("\n" + "=" * 60)
+                logger.info("DEMONSTRATION COMPLETE")
+                logger.info(f"Created equipment: {loader_id}")
+                logger.info("=" * 60)
+                
         except Exception as e:
             logger.error(f"Demo failed: {e}")
         
@@ -353,6 +329,13 @@ def main():
     # Note: In production, use proper credential management
     logger.warning("Using demo credentials. Set environment variables for real connection.")
     
+    # Run against a local mock server when development.mock_api is enabled
+    settings = load_settings()
+    mock_server = None
+    if settings['development'].get('mock_api') or os.getenv('MOCK_API', '').lower() == 'true':
+        mock_server = MockTeamcenterServer.from_settings(settings).start()
+        BASE_URL = mock_server.base_url
+    
     try:
         # Create automation instance
         automation = EquipmentAutomation(BASE_URL, USERNAME, PASSWORD)
@@ -364,6 +347,10 @@ def main():
         logger.error(f"Automation failed: {e}")
         return 1
     
+    finally:
+        if mock_server is not None:
+            mock_server.stop()
+    
     return 0
 
 
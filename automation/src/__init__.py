@@ -9,8 +9,10 @@ __email__ = "murr2k@gmail.com"
 
 from .client.rest_client import TeamcenterRESTClient
 from .client.auth import AuthenticationManager
+from .client.soa import SOAClient
 
 __all__ = [
     'TeamcenterRESTClient',
-    'AuthenticationManager'
-]
\ No newline at end of file
+    'AuthenticationManager',
+    'SOAClient'
+]
@@ -0,0 +1,10 @@
+"""
+Durable, resumable batch processing
+"""
+
+from .queue import WorkQueue, list_runs
+
+__all__ = [
+    'WorkQueue',
+    'list_runs'
+]
@@ -0,0 +1,518 @@
+"""
+Durable work queue for long batch runs, backed by SQLite
+"""
+
+import argparse
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from ..client.deadline import Deadline, DeadlineExceeded, OperationCancelled, current_deadline
+
+logger = logging.getLogger(__name__)
+
+# Work item states
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS work_runs (
+    run_id TEXT PRIMARY KEY,
+    created REAL NOT NULL,
+    description TEXT
+);
+CREATE TABLE IF NOT EXISTS work_items (
+    run_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    payload TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    result TEXT,
+    error TEXT,
+    updated REAL,
+    PRIMARY KEY (run_id, key)
+);
+CREATE INDEX IF NOT EXISTS work_items_status ON work_items (run_id, status, lease_expires);
+"""
+
+
+class WorkQueue:
+    """
+    Durable, resumable queue of work items for one named run
+
+    Every unit of work is a row keyed by a stable ID (such as the item ID
+    being imported). Workers lease items in batches and commit their
+    outcomes in batches, so a run that crashes resumes from where it
+    stopped: enqueueing the same keys again is a no-op, finished items are
+    never handed out again, and leases held by a dead worker return to the
+    queue. Lease owners carry the host name and process ID, so leases of a
+    process on this host that no longer exists are reclaimed at once;
+    others return when they expire. Only a batch still in flight when the
+    process died is redone, so the work function should tolerate repeats
+    (for example treat 409 on create as success). An item whose lease was
+    lost max_attempts times is marked failed.
+
+    Several processes can work on the same run; SQLite's write lock keeps
+    leases exclusive.
+
+    Example:
+        queue = WorkQueue.from_settings(settings, 'equipment-import-2025-06')
+        queue.enqueue((row['itemId'], row) for row in rows)
+        summary = queue.process(client.create_item, max_workers=8)
+        print(queue.progress())
+    """
+
+    def __init__(self, path: str, run_id: str, description: str = '',
+                 max_attempts: int = 3, max_workers: int = 4, batch_size: int = 50,
+                 lease_seconds: float = 300):
+        """
+        Initialize work queue
+
+        Args:
+            path: SQLite database file
+            run_id: Name of the run; reuse it to resume
+            description: Free text stored with a new run
+            max_attempts: Attempts before an item is marked failed
+            max_workers: Default concurrent workers of process()
+            batch_size: Default items leased and committed together by process()
+            lease_seconds: Default lease duration of process()
+        """
+        self.path = Path(path)
+        self.run_id = run_id
+        self.max_attempts = max_attempts
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None,
+                                     check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+        self._conn.execute('INSERT OR IGNORE INTO work_runs (run_id, created, description) '
+                           'VALUES (?, ?, ?)', (run_id, time.time(), description))
+        self._started = time.time()
+        self._done_at_start = self.counts().get(DONE, 0)
+
+    @classmethod
+    def from_settings(cls, settings: Dict, run_id: str, **kwargs) -> 'WorkQueue':
+        """Open a run in the database at database.sqlite.path, tuned by automation.batch"""
+        database = settings.get('database') or {}
+        path = (database.get('sqlite') or {}).get('path', './data/automation.db')
+        batch = (settings.get('automation') or {}).get('batch') or {}
+        options = {
+            'max_workers': batch.get('parallel_workers', 4),
+            'batch_size': batch.get('size', 50),
+            'lease_seconds': batch.get('lease_seconds', 300)
+        }
+        options.update(kwargs)
+        return cls(path, run_id, **options)
+
+    def _transaction(self, statements: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Run statements in one write transaction"""
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                result = statements(self._conn)
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+            self._conn.execute('COMMIT')
+            return result
+
+    # ==================== Items ====================
+
+    def enqueue(self, items: Iterable[Tuple[str, Any]], batch_size: int = 5000) -> int:
+        """
+        Add work items; keys already in the run are left untouched
+
+        Args:
+            items: (key, payload) pairs; payloads must be JSON-serializable
+            batch_size: Rows inserted per transaction
+
+        Returns:
+            Number of new items
+        """
+        def insert(rows):
+            before = self._conn.total_changes
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO work_items (run_id, key, payload, updated) '
+                'VALUES (?, ?, ?, ?)', rows)
+            return self._conn.total_changes - before
+
+        added, batch = 0, []
+        now = time.time()
+        for key, payload in items:
+            batch.append((self.run_id, str(key), json.dumps(payload, default=str), now))
+            if len(batch) >= batch_size:
+                added += self._transaction(lambda conn: insert(batch))
+                batch = []
+        if batch:
+            added += self._transaction(lambda conn: insert(batch))
+        logger.info("Run %s: %d items queued", self.run_id, added)
+        return added
+
+    def lease(self, owner: str, limit: int = 50,
+              lease_seconds: float = 300) -> List[Tuple[str, Any]]:
+        """
+        Lease up to limit items that are pending or whose lease expired
+
+        Expired leases of items that already had max_attempts attempts are
+        marked failed instead.
+
+        Returns:
+            (key, payload) pairs now leased to owner
+        """
+        def take(conn):
+            now = time.time()
+            conn.execute(
+                'UPDATE work_items SET status = ?, error = ?, lease_owner = NULL, '
+                'lease_expires = NULL, updated = ? WHERE run_id = ? AND status = ? '
+                'AND lease_expires < ? AND attempts >= ?',
+                (FAILED, 'lease expired', now, self.run_id, LEASED, now, self.max_attempts))
+            rows = conn.execute(
+                'SELECT key, payload FROM work_items WHERE run_id = ? AND '
+                '(status = ? OR (status = ? AND lease_expires < ?)) LIMIT ?',
+                (self.run_id, PENDING, LEASED, now, limit)
+            ).fetchall()
+            conn.executemany(
+                'UPDATE work_items SET status = ?, lease_owner = ?, lease_expires = ?, '
+                'attempts = attempts + 1, updated = ? WHERE run_id = ? AND key = ?',
+                [(LEASED, owner, now + lease_seconds, now, self.run_id, key) for key, _ in rows]
+            )
+            return rows
+
+        return [(key, json.loads(payload)) for key, payload in self._transaction(take)]
+
+    def commit(self, done: Iterable[Tuple[str, Any]] = (),
+               failed: Iterable[Tuple[str, str]] = ()):
+        """
+        Record the outcomes of leased items in one transaction
+
+        Failed items return to the queue until they reach max_attempts.
+
+        Args:
+            done: (key, result) pairs; results are stored as JSON
+            failed: (key, error message) pairs
+        """
+        now = time.time()
+        done_rows = [(DONE, json.dumps(result, default=str), now, self.run_id, key)
+                     for key, result in done]
+        failed_rows = [(self.max_attempts, FAILED, PENDING, error, now, self.run_id, key)
+                       for key, error in failed]
+
+        def record(conn):
+            conn.executemany(
+                'UPDATE work_items SET status = ?, result = ?, error = NULL, lease_owner = NULL, '
+                'lease_expires = NULL, updated = ? WHERE run_id = ? AND key = ?', done_rows)
+            conn.executemany(
+                'UPDATE work_items SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, '
+                'error = ?, lease_owner = NULL, lease_expires = NULL, updated = ? '
+                'WHERE run_id = ? AND key = ?', failed_rows)
+
+        if done_rows or failed_rows:
+            self._transaction(record)
+
+    def release(self, keys: Iterable[str]):
+        """Return leased items to the queue without counting the attempt"""
+        rows = [(PENDING, time.time(), self.run_id, key, LEASED) for key in keys]
+        self._transaction(lambda conn: conn.executemany(
+            'UPDATE work_items SET status = ?, attempts = MAX(attempts - 1, 0), '
+            'lease_owner = NULL, lease_expires = NULL, updated = ? '
+            'WHERE run_id = ? AND key = ? AND status = ?', rows))
+
+    def reclaim_orphaned(self) -> int:
+        """
+        Return items leased by processes on this host that no longer run
+
+        Items that reached max_attempts are marked failed, so an item that
+        keeps crashing its worker does not stall the run.
+
+        Returns:
+            Number of leases reclaimed
+        """
+        with self._lock:
+            owners = [owner for (owner,) in self._conn.execute(
+                'SELECT DISTINCT lease_owner FROM work_items WHERE run_id = ? AND status = ?',
+                (self.run_id, LEASED)).fetchall()]
+        dead = [owner for owner in owners if owner and _owner_dead(owner)]
+        if not dead:
+            return 0
+
+        def reclaim(conn):
+            now, reclaimed = time.time(), 0
+            for owner in dead:
+                reclaimed += conn.execute(
+                    'UPDATE work_items SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, '
+                    'error = ?, lease_owner = NULL, lease_expires = NULL, updated = ? '
+                    'WHERE run_id = ? AND status = ? AND lease_owner = ?',
+                    (self.max_attempts, FAILED, PENDING, f"worker {owner} died", now,
+                     self.run_id, LEASED, owner)).rowcount
+            return reclaimed
+
+        reclaimed = self._transaction(reclaim)
+        if reclaimed:
+            logger.warning("Run %s: reclaimed %d items leased by dead workers",
+                           self.run_id, reclaimed)
+        return reclaimed
+
+    def retry_failed(self) -> int:
+        """Put failed items back in the queue with fresh attempts"""
+        def reset(conn):
+            return conn.execute(
+                'UPDATE work_items SET status = ?, attempts = 0, updated = ? '
+                'WHERE run_id = ? AND status = ?',
+                (PENDING, time.time(), self.run_id, FAILED)).rowcount
+        return self._transaction(reset)
+
+    def results(self, status: str = DONE) -> Iterable[Tuple[str, Any, Optional[str]]]:
+        """(key, result, error) of the items in a state"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT key, result, error FROM work_items WHERE run_id = ? AND status = ? '
+                'ORDER BY key', (self.run_id, status)).fetchall()
+        return [(key, json.loads(result) if result else None, error)
+                for key, result, error in rows]
+
+    # ==================== Progress ====================
+
+    def counts(self) -> Dict[str, int]:
+        """Number of items in each state"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT status, COUNT(*) FROM work_items WHERE run_id = ? GROUP BY status',
+                (self.run_id,)).fetchall()
+        return dict(rows)
+
+    def progress(self) -> Dict:
+        """
+        Counts, completion ratio, throughput of this session and ETA
+
+        The ETA covers items still to be handed out (pending items and
+        expired leases); items under a live lease are already being worked.
+        """
+        counts = self.counts()
+        with self._lock:
+            (expired,) = self._conn.execute(
+                'SELECT COUNT(*) FROM work_items WHERE run_id = ? AND status = ? '
+                'AND lease_expires < ?', (self.run_id, LEASED, time.time())).fetchone()
+        total = sum(counts.values())
+        finished = counts.get(DONE, 0) + counts.get(FAILED, 0)
+        elapsed = time.time() - self._started
+        rate = (counts.get(DONE, 0) - self._done_at_start) / elapsed if elapsed > 0 else 0.0
+        remaining = counts.get(PENDING, 0) + expired
+        return {
+            'run_id': self.run_id,
+            'total': total,
+            'done': counts.get(DONE, 0),
+            'failed': counts.get(FAILED, 0),
+            'pending': counts.get(PENDING, 0),
+            'leased': counts.get(LEASED, 0),
+            'expired_leases': expired,
+            'percent': 100.0 * finished / total if total else 100.0,
+            'throughput': rate,
+            'eta_seconds': remaining / rate if rate > 0 else None
+        }
+
+    # ==================== Processing ====================
+
+    def process(self, func: Callable[[Any], Any], max_workers: Optional[int] = None,
+                batch_size: Optional[int] = None, lease_seconds: Optional[float] = None,
+                progress_interval: float = 10.0,
+                deadline: Optional[Deadline] = None) -> Dict:
+        """
+        Work through the queue until nothing is left to lease
+
+        Each worker leases batch_size items, calls func(payload) for each
+        and commits the batch's outcomes in one transaction. Exceptions
+        from func mark the item failed (retried up to max_attempts).
+        Leases of dead processes are reclaimed first; while other live
+        processes still hold leases, workers wait and lease what they
+        give back or leave to expire.
+
+        Args:
+            func: Work function; its return value is stored as the result
+            max_workers: Concurrent workers (defaults to the queue's)
+            batch_size: Items leased and committed together (defaults to the queue's)
+            lease_seconds: Lease duration; must exceed a batch's run time
+                (defaults to the queue's)
+            progress_interval: Seconds between progress log lines
+            deadline: Time budget (defaults to the ambient deadline); on
+                expiry unfinished leases are released for the next run
+
+        Returns:
+            progress() at the end of the run
+        """
+        deadline = deadline or current_deadline()
+        max_workers = max_workers or self.max_workers
+        batch_size = batch_size or self.batch_size
+        lease_seconds = lease_seconds or self.lease_seconds
+        owner_prefix = f"{socket.gethostname()}:{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        stop = threading.Event()
+        self.reclaim_orphaned()
+        last_report = [time.monotonic()]
+        report_lock = threading.Lock()
+
+        def report():
+            with report_lock:
+                if time.monotonic() - last_report[0] < progress_interval:
+                    return
+                last_report[0] = time.monotonic()
+            p = self.progress()
+            eta = f", ETA {p['eta_seconds']:.0f}s" if p['eta_seconds'] is not None else ''
+            logger.info("Run %s: %d/%d done, %d failed (%.1f%%), %.1f items/s%s",
+                        self.run_id, p['done'], p['total'], p['failed'], p['percent'],
+                        p['throughput'], eta)
+
+        def worker(index: int):
+            owner = f"{owner_prefix}-{index}"
+            while not stop.is_set():
+                leased = self.lease(owner, batch_size, lease_seconds)
+                if not leased:
+                    wait = self._foreign_lease_wait(owner_prefix)
+                    if wait is None:
+                        return
+                    if deadline is not None:
+                        deadline.check()
+                    stop.wait(wait)
+                    continue
+                done, failed, position = [], [], 0
+                try:
+                    for position, (key, payload) in enumerate(leased):
+                        if deadline is not None:
+                            deadline.check()
+                        try:
+                            done.append((key, func(payload)))
+                        except (DeadlineExceeded, OperationCancelled):
+                            raise
+                        except Exception as e:
+                            failed.append((key, str(e)))
+                except BaseException:
+                    stop.set()
+                    self.release(key for key, _ in leased[position:])
+                    raise
+                finally:
+                    self.commit(done, failed)
+                report()
+
+        with ThreadPoolExecutor(max_workers=max_workers,
+                                thread_name_prefix='tc-work-queue') as executor:
+            futures = [executor.submit(worker, index) for index in range(max_workers)]
+            try:
+                for future in futures:
+                    future.result()
+            except BaseException:
+                stop.set()
+                raise
+
+        summary = self.progress()
+        logger.info("Run %s: %d/%d done, %d failed",
+                    self.run_id, summary['done'], summary['total'], summary['failed'])
+        return summary
+
+    def _foreign_lease_wait(self, owner_prefix: str,
+                            poll_seconds: float = 1.0) -> Optional[float]:
+        """Seconds to wait for leases held by other processes, None if there are none"""
+        self.reclaim_orphaned()
+        with self._lock:
+            (count, earliest) = self._conn.execute(
+                'SELECT COUNT(*), MIN(lease_expires) FROM work_items WHERE run_id = ? '
+                'AND status = ? AND lease_owner NOT LIKE ?',
+                (self.run_id, LEASED, owner_prefix + '-%')).fetchone()
+        if not count:
+            return None
+        return max(0.0, min(poll_seconds, earliest - time.time()))
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> 'WorkQueue':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _owner_dead(owner: str) -> bool:
+    """Whether a lease owner ('host:pid-...') is a process on this host that has exited"""
+    host, _, rest = owner.rpartition(':')
+    pid = rest.split('-', 1)[0]
+    if host != socket.gethostname() or not pid.isdigit() or os.name == 'nt':
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        return False
+    return False
+
+
+def list_runs(path: str) -> List[Dict]:
+    """Runs stored in a queue database with their item counts"""
+    conn = sqlite3.connect(path)
+    try:
+        rows = conn.execute(
+            'SELECT r.run_id, r.created, r.description, i.status, COUNT(i.key) '
+            'FROM work_runs r LEFT JOIN work_items i ON i.run_id = r.run_id '
+            'GROUP BY r.run_id, i.status ORDER BY r.created').fetchall()
+    finally:
+        conn.close()
+    runs = {}
+    for run_id, created, description, status, count in rows:
+        run = runs.setdefault(run_id, {'run_id': run_id, 'created': created,
+                                       'description': description, 'counts': {}})
+        if status:
+            run['counts'][status] = count
+    return list(runs.values())
+
+
+def main():
+    """Inspect and manage work queue runs"""
+    from ..utils.config import load_settings
+
+    parser = argparse.ArgumentParser(description='Inspect durable work queue runs')
+    parser.add_argument('command', choices=['list', 'status', 'failed', 'retry-failed'])
+    parser.add_argument('run_id', nargs='?', help='Run to inspect')
+    parser.add_argument('--settings', help='Path to settings.yaml')
+    parser.add_argument('--environment', help='Settings environment override to apply')
+    args = parser.parse_args()
+
+    settings = load_settings(args.settings, args.environment)
+    path = ((settings.get('database') or {}).get('sqlite') or {}).get('path', './data/automation.db')
+
+    if args.command == 'list':
+        for run in list_runs(path):
+            print(f"{run['run_id']:<40} {json.dumps(run['counts'])}")
+        return
+    if not args.run_id:
+        parser.error(f"{args.command} needs a run ID")
+
+    with WorkQueue(path, args.run_id) as queue:
+        if args.command == 'status':
+            print(json.dumps(queue.progress(), indent=2))
+        elif args.command == 'failed':
+            for key, _, error in queue.results(FAILED):
+                print(f"{key}\t{error}")
+        else:
+            print(f"{queue.retry_failed()} items requeued")
+
+
+if __name__ == '__main__':
+    main()
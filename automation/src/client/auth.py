@@ -0,0 +1,105 @@
+"""
+Session management for long-lived Teamcenter clients
+"""
+
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from .deadline import Deadline
+
+logger = logging.getLogger(__name__)
+
+# Lifetime the REST client assumes for a session token
+TOKEN_LIFETIME = timedelta(hours=1)
+
+
+class AuthenticationManager:
+    """
+    Keeps clients logged in with one set of credentials
+
+    Tokens are renewed refresh_margin before they expire, so a request
+    never starts with a token that is about to lapse. The REST client and
+    an SOAClient built on it share the session, so refreshing the REST
+    client covers both.
+
+    Example:
+        auth = AuthenticationManager.from_settings(settings)
+        client = TeamcenterRESTClient(base_url)
+        auth.login(client)
+        ...
+        auth.ensure(client)  # before each unit of work
+    """
+
+    def __init__(self, username: str, password: str,
+                 refresh_margin: timedelta = timedelta(minutes=5)):
+        """
+        Initialize the manager
+
+        Args:
+            username: Teamcenter username
+            password: Teamcenter password
+            refresh_margin: How long before expiry a token is renewed
+        """
+        if not username or not password:
+            raise ValueError("Username and password are required")
+        self.username = username
+        self._password = password
+        self.refresh_margin = refresh_margin
+        self.refreshes = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, refresh_margin: timedelta = timedelta(minutes=5)
+                 ) -> 'AuthenticationManager':
+        """Credentials from TC_USERNAME and TC_PASSWORD"""
+        return cls(os.getenv('TC_USERNAME'), os.getenv('TC_PASSWORD'), refresh_margin)
+
+    @classmethod
+    def from_settings(cls, settings: Dict, username: Optional[str] = None,
+                      password: Optional[str] = None) -> 'AuthenticationManager':
+        """
+        Manager renewing tokens after teamcenter.auth.token_refresh_minutes
+
+        Credentials default to TC_USERNAME and TC_PASSWORD.
+        """
+        auth = (settings.get('teamcenter') or {}).get('auth') or {}
+        refresh_after = timedelta(minutes=auth.get('token_refresh_minutes', 55))
+        margin = max(TOKEN_LIFETIME - refresh_after, timedelta(0))
+        return cls(username or os.getenv('TC_USERNAME'),
+                   password or os.getenv('TC_PASSWORD'), margin)
+
+    def needs_refresh(self, client) -> bool:
+        """Whether the client has no token or one expiring within the margin"""
+        if not client.token:
+            return True
+        expiry = client.token_expiry
+        return expiry is not None and datetime.now() >= expiry - self.refresh_margin
+
+    def login(self, client, deadline: Optional[Deadline] = None) -> Dict:
+        """Authenticate the client with the managed credentials"""
+        with self._lock:
+            return client.authenticate(self.username, self._password, deadline=deadline)
+
+    def ensure(self, client, deadline: Optional[Deadline] = None) -> bool:
+        """
+        Renew the client's token if it is missing or about to expire
+
+        Returns:
+            True if the client was (re-)authenticated
+        """
+        if not self.needs_refresh(client):
+            return False
+        with self._lock:
+            # Another thread may have refreshed while we waited
+            if not self.needs_refresh(client):
+                return False
+            logger.info("Refreshing session for %s", self.username)
+            client.authenticate(self.username, self._password, deadline=deadline)
+            self.refreshes += 1
+            return True
+
+    def __repr__(self) -> str:
+        return f"AuthenticationManager(username={self.username!r})"
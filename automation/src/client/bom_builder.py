@@ -0,0 +1,263 @@
+"""
+Bulk BOM construction on top of the Teamcenter REST client
+"""
+
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import requests
+
+from .deadline import Deadline, DeadlineExceeded, OperationCancelled, current_deadline
+from .rest_client import TeamcenterRESTClient
+
+logger = logging.getLogger(__name__)
+
+# Line outcomes
+ADDED = 'added'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    response = getattr(error, 'response', None)
+    return response.status_code if response is not None else None
+
+
+def resolve_items(client: TeamcenterRESTClient, item_ids: Iterable[str],
+                  batch_size: int = 500, max_workers: int = 4,
+                  deadline: Optional[Deadline] = None,
+                  properties: Optional[Sequence[str]] = None) -> Dict[str, Dict]:
+    """
+    Look up which items exist using batched searches
+
+    Args:
+        client: Authenticated REST client
+        item_ids: Item IDs to resolve (duplicates are ignored)
+        batch_size: IDs per search request
+        max_workers: Concurrent search requests
+        deadline: Time budget (defaults to the ambient deadline)
+        properties: Custom properties to return with each item (None returns all)
+
+    Returns:
+        Mapping of item ID to item for the items that exist
+    """
+    deadline = deadline or current_deadline()
+    unique = list(dict.fromkeys(item_ids))
+    batches = [unique[i:i + batch_size] for i in range(0, len(unique), batch_size)]
+
+    def search(batch: List[str]) -> List[Dict]:
+        return client.search_items({'itemIds': batch, 'maxResults': len(batch)},
+                                   deadline=deadline, properties=properties)
+
+    found = {}
+    if not batches:
+        return found
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(batches)),
+                            thread_name_prefix='tc-resolve') as executor:
+        for results in executor.map(search, batches):
+            for item in results:
+                found[item['itemId']] = item
+
+    # Guard against servers that ignore 'itemIds' and return loose matches
+    wanted = set(unique)
+    return {item_id: item for item_id, item in found.items() if item_id in wanted}
+
+
+class BOMBuilder:
+    """
+    Builds a BOM from a full component list with as few round trips as possible
+
+    Existing components are resolved with batched searches, only missing
+    items are created, and BOM lines are added concurrently, each with the
+    position number of its place in the component list. Lines whose child
+    already exists are sent while the missing items are still being
+    created, and lines of a new item follow as soon as its create returns.
+    Every component gets an outcome, so one failure does not abort the
+    build.
+
+    Example:
+        builder = BOMBuilder(client, max_workers=16)
+        result = builder.build('SERVICE-KIT-2000', components)
+        for line in result['lines']:
+            if line['status'] != 'added':
+                print(line['position'], line['itemId'], line['error'])
+    """
+
+    def __init__(self, client: TeamcenterRESTClient, max_workers: int = 8,
+                 search_batch_size: int = 500, item_type: str = 'EPR_Component'):
+        """
+        Initialize BOM builder
+
+        Args:
+            client: Authenticated REST client
+            max_workers: Concurrent create and add-line requests
+            search_batch_size: Item IDs per existence search
+            item_type: Type used when creating missing components
+        """
+        self.client = client
+        self.max_workers = max_workers
+        self.search_batch_size = search_batch_size
+        self.item_type = item_type
+
+    def _item_data(self, component: Dict) -> Dict:
+        """Create payload for a missing component"""
+        data = {
+            'itemId': component['itemId'],
+            'name': component.get('name', component['itemId']),
+            'type': component.get('type', self.item_type)
+        }
+        for key in ('description', 'revisionId', 'properties'):
+            if key in component:
+                data[key] = component[key]
+        return data
+
+    @staticmethod
+    def _line_properties(component: Dict, position: int) -> Dict:
+        properties = dict(component.get('line_properties') or {})
+        if 'critical' in component:
+            properties['epr_critical_component'] = str(component['critical'])
+        properties['epr_position_number'] = str(position)
+        return properties
+
+    def build(self, parent_id: str, components: Sequence[Dict],
+              create_missing: bool = True,
+              deadline: Optional[Deadline] = None) -> Dict:
+        """
+        Add every component to a parent's BOM
+
+        Args:
+            parent_id: Parent item ID
+            components: Dicts with 'itemId' and optionally 'name', 'type',
+                'description', 'properties' (for creation), 'quantity',
+                'critical' and 'line_properties' (for the BOM line)
+            create_missing: Create components that do not exist yet
+            deadline: Time budget (defaults to the ambient deadline)
+
+        Returns:
+            Summary with 'lines' (one outcome per component, in order),
+            'created', 'existing' and 'failed' item IDs, counts and timing
+        """
+        deadline = deadline or current_deadline()
+        started = time.perf_counter()
+
+        lines = [{
+            'position': position,
+            'itemId': component['itemId'],
+            'status': None,
+            'created': False,
+            'lineId': None,
+            'error': None
+        } for position, component in enumerate(components, 1)]
+
+        # Positions are fixed up front; group them by child for deferred lines
+        positions_by_item: Dict[str, List[int]] = {}
+        first_component: Dict[str, Dict] = {}
+        for position, component in enumerate(components, 1):
+            positions_by_item.setdefault(component['itemId'], []).append(position)
+            first_component.setdefault(component['itemId'], component)
+
+        # Only existence matters here, so no custom properties are fetched
+        existing = resolve_items(self.client, positions_by_item, self.search_batch_size,
+                                 deadline=deadline, properties=[])
+        missing = [item_id for item_id in positions_by_item if item_id not in existing]
+        created, failed_items = [], []
+        logger.info("BOM %s: %d lines, %d existing and %d missing components",
+                    parent_id, len(components), len(existing), len(missing))
+
+        def check():
+            if deadline is not None:
+                deadline.check()
+
+        def create(item_id: str) -> Dict:
+            check()
+            try:
+                return self.client.create_item(self._item_data(first_component[item_id]),
+                                               deadline=deadline)
+            except requests.exceptions.HTTPError as e:
+                # Created concurrently by someone else since the search
+                if _status_code(e) == 409:
+                    return {'itemId': item_id, 'existing': True}
+                raise
+
+        def add_line(position: int) -> Dict:
+            check()
+            component = components[position - 1]
+            return self.client.add_bom_line(
+                parent_id=parent_id,
+                child_id=component['itemId'],
+                quantity=component.get('quantity', 1),
+                properties=self._line_properties(component, position),
+                deadline=deadline
+            )
+
+        def fail(position: int, status: str, error: str):
+            lines[position - 1]['status'] = status
+            lines[position - 1]['error'] = error
+
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix='tc-bom') as executor:
+            pending = {}
+
+            def submit_lines(item_id: str):
+                for position in positions_by_item[item_id]:
+                    pending[executor.submit(add_line, position)] = ('line', position)
+
+            try:
+                for item_id in existing:
+                    submit_lines(item_id)
+                for item_id in missing:
+                    if create_missing:
+                        pending[executor.submit(create, item_id)] = ('create', item_id)
+                    else:
+                        failed_items.append(item_id)
+                        for position in positions_by_item[item_id]:
+                            fail(position, SKIPPED, 'Component does not exist')
+
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        kind, key = pending.pop(future)
+                        try:
+                            result = future.result()
+                        except (DeadlineExceeded, OperationCancelled):
+                            raise
+                        except Exception as e:
+                            if kind == 'create':
+                                failed_items.append(key)
+                                for position in positions_by_item[key]:
+                                    fail(position, SKIPPED, f"Create failed: {e}")
+                            else:
+                                fail(key, FAILED, str(e))
+                            continue
+
+                        if kind == 'create':
+                            if not result.get('existing'):
+                                created.append(key)
+                                for position in positions_by_item[key]:
+                                    lines[position - 1]['created'] = True
+                            submit_lines(key)
+                        else:
+                            lines[key - 1]['status'] = ADDED
+                            lines[key - 1]['lineId'] = result.get('lineId')
+            except BaseException:
+                for future in pending:
+                    future.cancel()
+                raise
+
+        added = sum(1 for line in lines if line['status'] == ADDED)
+        elapsed = time.perf_counter() - started
+        logger.info("BOM %s: %d/%d lines added, %d components created in %.1fs",
+                    parent_id, added, len(lines), len(created), elapsed)
+        return {
+            'parentId': parent_id,
+            'lines': lines,
+            'created': created,
+            'existing': list(existing),
+            'failed': failed_items,
+            'added': added,
+            'errors': len(lines) - added,
+            'elapsed': elapsed
+        }
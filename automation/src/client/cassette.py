@@ -0,0 +1,333 @@
+"""
+Record and replay of Teamcenter HTTP traffic
+
+A cassette captures every request/response pair a client exchanges with the
+server into a single zip archive: a JSON index of the exchanges plus one
+deflated member per distinct response body, so repeated payloads are stored
+once. Credentials are redacted before anything is written. In replay mode
+the same client is served from the archive instead of the network, which
+makes client-side costs (JSON decoding, dict handling, logging) measurable
+against exact production traffic without a server.
+
+Example:
+    # Record a production run
+    cassette = Cassette.record('runs/fleet-report.tcz')
+    client = TeamcenterRESTClient(base_url, username, password, cassette=cassette)
+    ...
+    client.logout()  # also closes the cassette
+
+    # Replay it locally, ten times faster than recorded
+    cassette = Cassette.replay('runs/fleet-report.tcz', speed=10)
+    client = TeamcenterRESTClient(base_url, username, password, cassette=cassette)
+"""
+
+import hashlib
+import io
+import json
+import threading
+import time
+import zipfile
+import zlib
+from collections import defaultdict, deque
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+RECORD = 'record'
+REPLAY = 'replay'
+
+FORMAT_VERSION = 1
+
+REDACTED = '[REDACTED]'
+
+# Header and field names (lower case) whose values are never written
+SENSITIVE_HEADERS = {'authorization', 'cookie', 'set-cookie', 'proxy-authorization',
+                     'x-auth-token', 'x-api-key'}
+SENSITIVE_FIELDS = {'password', 'passwd', 'token', 'access_token', 'refresh_token',
+                    'secret', 'client_secret', 'api_key', 'apikey', 'authorization'}
+
+# Response headers that describe the wire encoding rather than the stored body
+TRANSPORT_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection'}
+
+
+class CassetteMiss(requests.exceptions.ConnectionError):
+    """Raised in replay mode when a request has no recorded response"""
+
+
+def redact(value):
+    """Recursively replace sensitive fields in a decoded JSON value"""
+    if isinstance(value, dict):
+        return {key: REDACTED if str(key).lower() in SENSITIVE_FIELDS else redact(item)
+                for key, item in value.items()}
+    if isinstance(value, list):
+        return [redact(item) for item in value]
+    return value
+
+
+def _redact_headers(headers) -> Dict[str, str]:
+    return {key: REDACTED if key.lower() in SENSITIVE_HEADERS else value
+            for key, value in headers.items()}
+
+
+def _redact_target(url: str) -> str:
+    """Path and query of a URL with sensitive query parameters redacted"""
+    parts = urlsplit(url)
+    target = parts.path
+    if parts.query:
+        query = [(key, REDACTED if key.lower() in SENSITIVE_FIELDS else value)
+                 for key, value in parse_qsl(parts.query, keep_blank_values=True)]
+        target += '?' + urlencode(query)
+    return target
+
+
+def _redact_body(body: Optional[bytes], content_type: str) -> Optional[bytes]:
+    """Redacted JSON body; other bodies (uploads, forms) are not stored"""
+    if not body or 'json' not in (content_type or '').lower():
+        return None
+    try:
+        decoded = json.loads(body)
+    except ValueError:
+        return None
+    return json.dumps(redact(decoded), sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+
+def _request_body(request: requests.PreparedRequest) -> Optional[bytes]:
+    """Request body as bytes, undoing any request compression"""
+    body = request.body.encode('utf-8') if isinstance(request.body, str) else request.body
+    if body and request.headers.get('Content-Encoding') in ('gzip', 'deflate'):
+        # wbits=47 accepts both zlib and gzip framing
+        body = zlib.decompress(body, 47)
+    return body
+
+
+def _digest(data: Optional[bytes]) -> str:
+    return hashlib.sha1(data or b'').hexdigest()
+
+
+class Cassette:
+    """
+    Archive of recorded HTTP exchanges, opened for recording or replay
+
+    Replay matches requests on method, path, query and (redacted) JSON body,
+    falling back to method and path alone; repeated identical requests are
+    served their recorded responses in order, the last one repeating.
+    """
+
+    def __init__(self, path: str, mode: str, speed: Optional[float] = 1.0):
+        """
+        Open a cassette; use Cassette.record() or Cassette.replay()
+
+        Args:
+            path: Archive file
+            mode: 'record' or 'replay'
+            speed: Replay speed-up applied to recorded response times
+                (1.0 is recorded timing, None or 0 serves without delay)
+        """
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+
+        self.path = str(path)
+        self.mode = mode
+        self.speed = speed
+        self.entries: List[Dict] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+        if mode == RECORD:
+            self._archive = zipfile.ZipFile(self.path, 'w', zipfile.ZIP_DEFLATED)
+            self._bodies = set()
+            self._started = time.monotonic()
+            self._created = datetime.now().isoformat()
+        else:
+            self._archive = zipfile.ZipFile(self.path, 'r')
+            index = json.loads(self._archive.read('index.json'))
+            if index.get('version') != FORMAT_VERSION:
+                raise ValueError(f"Unsupported cassette version: {index.get('version')}")
+            self.metadata = {key: value for key, value in index.items() if key != 'entries'}
+            self.entries = index['entries']
+            self._exact = defaultdict(deque)
+            self._loose = defaultdict(deque)
+            for entry in self.entries:
+                self._exact[self._key(entry, True)].append(entry)
+                self._loose[self._key(entry, False)].append(entry)
+            self._body_cache: Dict[str, bytes] = {}
+
+    @classmethod
+    def record(cls, path: str) -> 'Cassette':
+        """Open a new archive for recording"""
+        return cls(path, RECORD)
+
+    @classmethod
+    def replay(cls, path: str, speed: Optional[float] = 1.0) -> 'Cassette':
+        """Open a recorded archive for replay at the given speed-up"""
+        return cls(path, REPLAY, speed)
+
+    @staticmethod
+    def _key(entry: Dict, exact: bool) -> tuple:
+        if exact:
+            return entry['method'], entry['target'], entry['request_digest']
+        return entry['method'], urlsplit(entry['target']).path
+
+    def adapter(self, transport: BaseAdapter) -> BaseAdapter:
+        """Adapter to mount on the client session in place of transport"""
+        if self.mode == RECORD:
+            return RecordingAdapter(self, transport)
+        return ReplayAdapter(self)
+
+    # ==================== Recording ====================
+
+    def add(self, request: requests.PreparedRequest, response: requests.Response,
+            started: float, elapsed: float):
+        """Store one exchange; response.content must already be read"""
+        content_type = request.headers.get('Content-Type', '')
+        request_body = _request_body(request)
+        redacted_request = _redact_body(request_body, content_type)
+
+        body = response.content or b''
+        response_type = response.headers.get('Content-Type', '')
+        if 'json' in response_type.lower():
+            body = _redact_body(body, response_type) or body
+        body_digest = _digest(body)
+
+        entry = {
+            'offset': round(started - self._started, 6),
+            'elapsed': round(elapsed, 6),
+            'method': request.method,
+            'target': _redact_target(request.url),
+            'request_digest': _digest(redacted_request),
+            'request_size': len(request_body or b''),
+            'request_headers': _redact_headers(request.headers),
+            'request_body': redacted_request.decode('utf-8') if redacted_request else None,
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': {key: value for key, value in _redact_headers(response.headers).items()
+                        if key.lower() not in TRANSPORT_HEADERS},
+            'body': body_digest,
+            'size': len(body)
+        }
+
+        with self._lock:
+            if self._closed:
+                return
+            if body_digest not in self._bodies:
+                self._archive.writestr(f'bodies/{body_digest}', body)
+                self._bodies.add(body_digest)
+            self.entries.append(entry)
+
+    # ==================== Replay ====================
+
+    def lookup(self, request: requests.PreparedRequest) -> Dict:
+        """Find the recorded exchange for a request"""
+        request_body = _request_body(request)
+        probe = {
+            'method': request.method,
+            'target': _redact_target(request.url),
+            'request_digest': _digest(_redact_body(request_body,
+                                                   request.headers.get('Content-Type', '')))
+        }
+        with self._lock:
+            for index, exact in ((self._exact, True), (self._loose, False)):
+                queue = index.get(self._key(probe, exact))
+                if queue:
+                    return queue.popleft() if len(queue) > 1 else queue[0]
+        raise CassetteMiss(f"No recorded response for {request.method} {probe['target']}")
+
+    def body(self, digest: str) -> bytes:
+        """Return a stored response body"""
+        with self._lock:
+            body = self._body_cache.get(digest)
+            if body is None:
+                body = self._archive.read(f'bodies/{digest}')
+                self._body_cache[digest] = body
+            return body
+
+    # ==================== Lifecycle ====================
+
+    def close(self):
+        """Finish the archive (writing its index when recording)"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self.mode == RECORD:
+                index = {
+                    'version': FORMAT_VERSION,
+                    'created': self._created,
+                    'duration': round(time.monotonic() - self._started, 6),
+                    'exchanges': len(self.entries),
+                    'bodies': len(self._bodies),
+                    'entries': self.entries
+                }
+                self._archive.writestr('index.json', json.dumps(index, separators=(',', ':')))
+            self._archive.close()
+
+    def __enter__(self) -> 'Cassette':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class RecordingAdapter(BaseAdapter):
+    """Transport adapter that records every exchange of the wrapped adapter"""
+
+    def __init__(self, cassette: Cassette, transport: BaseAdapter):
+        super().__init__()
+        self.cassette = cassette
+        self.transport = transport
+
+    def send(self, request, **kwargs):
+        started = time.monotonic()
+        response = self.transport.send(request, **kwargs)
+        # Reading the body here keeps streamed downloads usable via response.content
+        response.content
+        self.cassette.add(request, response, started, time.monotonic() - started)
+        return response
+
+    def close(self):
+        self.transport.close()
+
+
+class ReplayAdapter(BaseAdapter):
+    """Transport adapter that serves responses from a cassette"""
+
+    def __init__(self, cassette: Cassette):
+        super().__init__()
+        self.cassette = cassette
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        entry = self.cassette.lookup(request)
+        body = self.cassette.body(entry['body'])
+
+        speed = self.cassette.speed
+        if speed:
+            delay = entry['elapsed'] / speed
+            if isinstance(timeout, (int, float)) and delay > timeout:
+                time.sleep(timeout)
+                raise requests.exceptions.ReadTimeout(
+                    f"Replayed response exceeded timeout of {timeout}s", request=request
+                )
+            time.sleep(delay)
+
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.reason = entry['reason']
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.headers['Content-Length'] = str(len(body))
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = io.BytesIO(body)
+        response._content = body
+        response._content_consumed = True
+        response.url = request.url
+        response.request = request
+        response.elapsed = timedelta(seconds=entry['elapsed'])
+        response.connection = self
+        return response
+
+    def close(self):
+        pass
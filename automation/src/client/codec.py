@@ -0,0 +1,305 @@
+"""
+Wire codecs for Teamcenter REST payloads: JSON backends and content encodings
+"""
+
+import gzip
+import json
+import logging
+import threading
+import time
+import zlib
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import requests
+
+from ..utils.metrics import LatencyWindow
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    from urllib3.util.request import ACCEPT_ENCODING as _URLLIB3_ENCODINGS
+except ImportError:  # pragma: no cover - very old urllib3
+    _URLLIB3_ENCODINGS = 'gzip,deflate'
+
+# Response encodings urllib3 can decode here; br and zstd appear only when
+# brotli / zstandard are installed
+SUPPORTED_ENCODINGS = [name.strip() for name in _URLLIB3_ENCODINGS.split(',') if name.strip()]
+
+# Order of preference when the server offers several encodings
+ENCODING_PREFERENCE = ['zstd', 'br', 'gzip', 'deflate']
+
+# Encodings the client can apply to request bodies
+REQUEST_ENCODINGS = {
+    'gzip': lambda data, level: gzip.compress(data, compresslevel=level, mtime=0),
+    'deflate': lambda data, level: zlib.compress(data, level)
+}
+
+
+def _mapping_default(value: Any) -> Any:
+    # Typed models and PropertyMaps are read-only Mappings, not dicts
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _stdlib_dumps(payload: Any) -> bytes:
+    return json.dumps(payload, separators=(',', ':'), ensure_ascii=False,
+                      default=_mapping_default).encode('utf-8')
+
+
+def _orjson_dumps(payload: Any) -> bytes:
+    # Non-string keys (e.g. integer line numbers) are allowed by json.dumps
+    return orjson.dumps(payload, default=_mapping_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+JSON_BACKENDS: Dict[str, Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]] = {
+    'json': (_stdlib_dumps, json.loads)
+}
+if orjson is not None:
+    JSON_BACKENDS['orjson'] = (_orjson_dumps, orjson.loads)
+
+
+def _projector(names: Iterable[str]) -> Callable[[Dict], Dict]:
+    """Function limiting a record's 'properties' dict to names"""
+    keep = tuple(dict.fromkeys(names))
+
+    def project_record(record: Dict) -> Dict:
+        properties = record.get('properties')
+        if isinstance(properties, dict):
+            record['properties'] = {name: properties[name] for name in keep if name in properties}
+        return record
+
+    return project_record
+
+
+def project(value: Any, names: Iterable[str]) -> Any:
+    """
+    Limit every nested 'properties' dict of a decoded payload to names
+
+    Items, search results and BOM lines (at any depth) are projected in
+    place; other fields are left untouched.
+    """
+    project_record = _projector(names)
+    stack = [value]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            project_record(current)
+            stack.extend(child for key, child in current.items()
+                         if key != 'properties' and isinstance(child, (dict, list)))
+        elif isinstance(current, list):
+            stack.extend(child for child in current if isinstance(child, (dict, list)))
+    return value
+
+
+def available_json_backends() -> List[str]:
+    """JSON backends that can be used in this environment, fastest first"""
+    return [name for name in ('orjson', 'json') if name in JSON_BACKENDS]
+
+
+class _Timings:
+    """Call count, totals and recent latencies for one codec direction"""
+
+    def __init__(self, window_size: int):
+        self.calls = 0
+        self.seconds = 0.0
+        self.bytes = 0
+        self.wire_bytes = 0
+        self.window = LatencyWindow(window_size)
+
+    def record(self, seconds: float, size: int, wire_size: int):
+        self.calls += 1
+        self.seconds += seconds
+        self.bytes += size
+        self.wire_bytes += wire_size
+        self.window.record(seconds)
+
+    def to_dict(self) -> Dict:
+        p50 = self.window.percentile(50)
+        p95 = self.window.percentile(95)
+        return {
+            'calls': self.calls,
+            'seconds': round(self.seconds, 6),
+            'p50_ms': round(p50 * 1000, 3) if p50 is not None else None,
+            'p95_ms': round(p95 * 1000, 3) if p95 is not None else None,
+            'bytes': self.bytes,
+            'wire_bytes': self.wire_bytes,
+            'ratio': round(self.wire_bytes / self.bytes, 3) if self.bytes else None
+        }
+
+
+class Codec:
+    """
+    Encodes request bodies and decodes JSON responses for the REST client
+
+    Uses the fastest available JSON backend (orjson, falling back to the
+    standard library), advertises every response encoding urllib3 can
+    decode (gzip and deflate, plus br / zstd when brotli / zstandard are
+    installed) and can gzip request bodies above a size threshold for
+    servers that accept compressed uploads. Encode and decode times are
+    recorded per call.
+
+    Decompression of responses happens while urllib3 reads the body, so it
+    is part of the request time; decode times cover JSON parsing only.
+
+    Example:
+        codec = Codec(compress_requests=True)
+        client = TeamcenterRESTClient(base_url, codec=codec)
+        ...
+        print(codec.stats())
+    """
+
+    def __init__(self, json_backend: str = 'auto',
+                 accept_encoding: Optional[Sequence[str]] = None,
+                 compress_requests: bool = False, request_encoding: str = 'gzip',
+                 compress_min_bytes: int = 16384, compression_level: int = 6,
+                 window_size: int = 1000):
+        """
+        Initialize the codec
+
+        Args:
+            json_backend: 'auto', 'orjson' or 'json'
+            accept_encoding: Response encodings to request, in preference
+                order (defaults to every encoding supported here)
+            compress_requests: Compress request bodies of compress_min_bytes or more
+            request_encoding: Content-Encoding for compressed bodies ('gzip' or 'deflate')
+            compress_min_bytes: Smallest body worth compressing
+            compression_level: zlib compression level (1-9)
+            window_size: Number of recent timings kept for percentiles
+        """
+        if json_backend == 'auto':
+            json_backend = available_json_backends()[0]
+        elif json_backend not in JSON_BACKENDS:
+            logger.warning("JSON backend '%s' is not available, using json", json_backend)
+            json_backend = 'json'
+        if request_encoding not in REQUEST_ENCODINGS:
+            raise ValueError(f"Unsupported request encoding: {request_encoding}")
+
+        if accept_encoding is None:
+            accept_encoding = sorted(SUPPORTED_ENCODINGS, key=lambda name: (
+                ENCODING_PREFERENCE.index(name) if name in ENCODING_PREFERENCE
+                else len(ENCODING_PREFERENCE)))
+        unsupported = [name for name in accept_encoding
+                       if name not in SUPPORTED_ENCODINGS and name != 'identity']
+        if unsupported:
+            logger.warning("Cannot decode %s responses here; not requesting them",
+                           ', '.join(unsupported))
+        self.accept_encoding = [name for name in accept_encoding if name not in unsupported]
+
+        self.json_backend = json_backend
+        self._dumps, self._loads = JSON_BACKENDS[json_backend]
+        self.compress_requests = compress_requests
+        self.request_encoding = request_encoding
+        self.compress_min_bytes = compress_min_bytes
+        self.compression_level = compression_level
+
+        self._encode = _Timings(window_size)
+        self._decode = _Timings(window_size)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings: Dict, **overrides) -> 'Codec':
+        """Build a codec from the teamcenter.codec settings section"""
+        config = (settings.get('teamcenter') or {}).get('codec') or {}
+        kwargs = {
+            'json_backend': config.get('json_backend', 'auto'),
+            'accept_encoding': config.get('accept_encoding'),
+            'compress_requests': config.get('compress_requests', False),
+            'request_encoding': config.get('request_encoding', 'gzip'),
+            'compress_min_bytes': config.get('compress_min_bytes', 16384),
+            'compression_level': config.get('compression_level', 6)
+        }
+        kwargs.update(overrides)
+        return cls(**kwargs)
+
+    @property
+    def accept_encoding_header(self) -> str:
+        """Value for the Accept-Encoding request header"""
+        return ', '.join(self.accept_encoding) or 'identity'
+
+    def encode(self, payload: Any) -> Tuple[bytes, Dict[str, str]]:
+        """
+        Serialize a request body
+
+        Args:
+            payload: JSON-serializable value
+
+        Returns:
+            Tuple of (body bytes, headers to send with it)
+        """
+        started = time.perf_counter()
+        data = self._dumps(payload)
+        size = len(data)
+        headers = {'Content-Type': 'application/json'}
+        if self.compress_requests and size >= self.compress_min_bytes:
+            data = REQUEST_ENCODINGS[self.request_encoding](data, self.compression_level)
+            headers['Content-Encoding'] = self.request_encoding
+        elapsed = time.perf_counter() - started
+
+        with self._lock:
+            self._encode.record(elapsed, size, len(data))
+        logger.debug("Encoded %d bytes (%d on the wire) in %.2fms",
+                     size, len(data), elapsed * 1000)
+        return data, headers
+
+    def decode(self, response: requests.Response,
+               properties: Optional[Iterable[str]] = None) -> Any:
+        """
+        Parse a JSON response body
+
+        Args:
+            response: Response with a JSON body
+            properties: Property names to keep in every 'properties' dict
+                (None keeps all)
+
+        Raises:
+            requests.exceptions.JSONDecodeError: If the body is not valid JSON
+        """
+        body = response.content
+        started = time.perf_counter()
+        try:
+            if properties is None:
+                value = self._loads(body)
+            elif self.json_backend == 'json':
+                # Projected while parsing, so dropped properties are freed at once
+                value = json.loads(body, object_hook=_projector(properties))
+            else:
+                value = project(self._loads(body), properties)
+        except ValueError as e:
+            raise requests.exceptions.JSONDecodeError(
+                str(e), body.decode('utf-8', errors='replace'), 0
+            ) from e
+        elapsed = time.perf_counter() - started
+
+        size = len(body)
+        wire_size = size
+        if response.headers.get('Content-Encoding'):
+            try:
+                wire_size = int(response.headers.get('Content-Length'))
+            except (TypeError, ValueError):
+                pass
+
+        with self._lock:
+            self._decode.record(elapsed, size, wire_size)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Decoded %d bytes (%d on the wire) from %s %s in %.2fms",
+                         size, wire_size, response.request.method if response.request else '',
+                         response.url, elapsed * 1000)
+        return value
+
+    def stats(self) -> Dict:
+        """Backend, negotiated encodings and encode / decode timings"""
+        with self._lock:
+            return {
+                'json_backend': self.json_backend,
+                'accept_encoding': list(self.accept_encoding),
+                'request_encoding': self.request_encoding if self.compress_requests else None,
+                'encode': self._encode.to_dict(),
+                'decode': self._decode.to_dict()
+            }
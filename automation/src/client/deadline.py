@@ -0,0 +1,163 @@
+"""
+Deadline propagation and cancellation for Teamcenter client calls
+"""
+
+import contextvars
+import threading
+import time
+import weakref
+from typing import Optional
+
+import requests
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """Raised when the time budget of an operation has been used up"""
+
+
+class OperationCancelled(Exception):
+    """Raised when an operation has been cancelled by its owner"""
+
+
+_current_deadline: contextvars.ContextVar = contextvars.ContextVar(
+    'teamcenter_deadline', default=None
+)
+
+
+def current_deadline() -> Optional['Deadline']:
+    """Return the deadline active in the current context, if any"""
+    return _current_deadline.get()
+
+
+class Deadline:
+    """
+    Overall time budget for one or more client calls
+
+    A deadline can be passed explicitly to client methods or activated
+    ambiently with a ``with`` block, in which case every client call made
+    inside the block derives its HTTP timeout from the remaining budget.
+    Deadlines nest: a deadline created while another one is active never
+    outlives it and is cancelled together with it.
+
+    Example:
+        with Deadline(10.0) as deadline:
+            item = client.get_item('BUCKET-10T')
+            bom = client.get_bom_structure('BUCKET-10T')
+    """
+
+    def __init__(self, timeout: Optional[float] = None,
+                 parent: Optional['Deadline'] = None):
+        """
+        Create a deadline
+
+        Args:
+            timeout: Budget in seconds (None for no time limit)
+            parent: Enclosing deadline (defaults to the ambient deadline)
+        """
+        self.parent = parent if parent is not None else current_deadline()
+        self.expires_at = time.monotonic() + timeout if timeout is not None else None
+        self._cancelled = threading.Event()
+        self._tokens = []
+        self._children = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+        if self.parent is not None:
+            if self.parent.expires_at is not None:
+                if self.expires_at is None or self.parent.expires_at < self.expires_at:
+                    self.expires_at = self.parent.expires_at
+            self.parent._adopt(self)
+
+    def _adopt(self, child: 'Deadline'):
+        # Children are cancelled with their parent, so their waits wake up too
+        with self._lock:
+            self._children.add(child)
+        if self.cancelled:
+            child.cancel()
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left in the budget, or None if unbounded"""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        """True once the budget has been used up"""
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    @property
+    def cancelled(self) -> bool:
+        """True if this deadline or any enclosing deadline was cancelled"""
+        if self._cancelled.is_set():
+            return True
+        return self.parent is not None and self.parent.cancelled
+
+    def cancel(self):
+        """Cancel the operation and every nested deadline; pending and future calls fail fast"""
+        self._cancelled.set()
+        with self._lock:
+            children = list(self._children)
+        for child in children:
+            if not child._cancelled.is_set():
+                child.cancel()
+
+    def check(self):
+        """
+        Raise if the operation may not continue
+
+        Raises:
+            OperationCancelled: If the deadline was cancelled
+            DeadlineExceeded: If the budget has been used up
+        """
+        if self.cancelled:
+            raise OperationCancelled("Operation was cancelled")
+        if self.expired:
+            raise DeadlineExceeded("Deadline exceeded")
+
+    def request_timeout(self, default: Optional[float] = None) -> Optional[float]:
+        """
+        Derive the timeout for the next HTTP call from the remaining budget
+
+        Args:
+            default: Per-call timeout used when it is shorter than the budget
+
+        Returns:
+            Timeout in seconds for the next call
+        """
+        self.check()
+        remaining = self.remaining()
+        if remaining is None:
+            return default
+        if default is None:
+            return remaining
+        return min(default, remaining)
+
+    def wait(self, seconds: float) -> bool:
+        """
+        Sleep without overrunning the budget, waking early on cancellation
+
+        Args:
+            seconds: Desired sleep time
+
+        Returns:
+            True if the full sleep elapsed, False if cut short
+        """
+        remaining = self.remaining()
+        if remaining is not None and remaining < seconds:
+            self._cancelled.wait(remaining)
+            return False
+        return not self._cancelled.wait(seconds) and not self.cancelled
+
+    def __enter__(self) -> 'Deadline':
+        self._tokens.append(_current_deadline.set(self))
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_deadline.reset(self._tokens.pop())
+        return False
+
+    def __repr__(self) -> str:
+        remaining = self.remaining()
+        budget = 'unbounded' if remaining is None else f'{remaining:.3f}s left'
+        state = ' cancelled' if self.cancelled else ''
+        return f"<Deadline {budget}{state}>"
@@ -0,0 +1,295 @@
+"""
+Load balancing across multiple Teamcenter web tier nodes
+"""
+
+import itertools
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Union
+from urllib.parse import urljoin
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+LEAST_OUTSTANDING = 'least_outstanding'
+WEIGHTED_ROUND_ROBIN = 'weighted_round_robin'
+
+
+class NoHealthyEndpoint(requests.exceptions.ConnectionError):
+    """Raised when no endpoint in the pool can take a request"""
+
+
+class Endpoint:
+    """
+    One Teamcenter web tier node and its load and health state
+    """
+
+    def __init__(self, url: str, weight: int = 1):
+        """
+        Initialize endpoint
+
+        Args:
+            url: Base URL of the node
+            weight: Relative capacity of the node
+        """
+        if weight < 1:
+            raise ValueError("Endpoint weight must be at least 1")
+
+        self.url = url.rstrip('/')
+        self.weight = weight
+        self.outstanding = 0
+        self.healthy = True
+        self.consecutive_failures = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+        self.requests = 0
+        self.failures = 0
+        self.current_weight = 0
+
+    @property
+    def available(self) -> bool:
+        """True if the node may receive requests"""
+        return self.healthy or time.monotonic() >= self.ejected_until
+
+    def __repr__(self) -> str:
+        state = 'healthy' if self.healthy else 'ejected'
+        return f"<Endpoint {self.url} {state} outstanding={self.outstanding}>"
+
+
+class EndpointPool:
+    """
+    Pool of Teamcenter base URLs with health tracking and load balancing
+
+    Nodes that fail ``failure_threshold`` requests in a row (connection
+    errors, timeouts or 5xx responses) are ejected for ``ejection_seconds``,
+    doubling with each repeated ejection up to ``max_ejection_seconds``.
+    An ejected node is readmitted when a health check succeeds, or tried
+    again once its ejection period has passed.
+
+    Example:
+        pool = EndpointPool(
+            ['https://tc-web1.epiroc.com/tc', 'https://tc-web2.epiroc.com/tc'],
+            strategy='least_outstanding',
+            health_check_interval=15
+        )
+        client = TeamcenterRESTClient(pool, username, password)
+    """
+
+    def __init__(self, endpoints: Union[Sequence[str], Dict[str, int]],
+                 strategy: str = LEAST_OUTSTANDING, failure_threshold: int = 3,
+                 ejection_seconds: float = 30.0, max_ejection_seconds: float = 300.0,
+                 health_check_path: str = '/restful/info',
+                 health_check_interval: Optional[float] = None,
+                 health_check_timeout: float = 5.0):
+        """
+        Initialize endpoint pool
+
+        Args:
+            endpoints: Base URLs, or a mapping of base URL to weight
+            strategy: 'least_outstanding' or 'weighted_round_robin'
+            failure_threshold: Consecutive failures before a node is ejected
+            ejection_seconds: Initial ejection period
+            max_ejection_seconds: Upper bound for the ejection period
+            health_check_path: Path probed by health checks
+            health_check_interval: Seconds between background health checks
+                (None disables them)
+            health_check_timeout: Timeout for a single health probe
+        """
+        if strategy not in (LEAST_OUTSTANDING, WEIGHTED_ROUND_ROBIN):
+            raise ValueError(f"Unknown load balancing strategy: {strategy}")
+
+        if isinstance(endpoints, dict):
+            self.endpoints = [Endpoint(url, weight) for url, weight in endpoints.items()]
+        else:
+            self.endpoints = [Endpoint(url) for url in endpoints]
+
+        if not self.endpoints:
+            raise ValueError("EndpointPool requires at least one base URL")
+
+        self.strategy = strategy
+        self.failure_threshold = failure_threshold
+        self.ejection_seconds = ejection_seconds
+        self.max_ejection_seconds = max_ejection_seconds
+        self.health_check_path = health_check_path
+        self.health_check_interval = health_check_interval
+        self.health_check_timeout = health_check_timeout
+
+        self._by_url = {endpoint.url: endpoint for endpoint in self.endpoints}
+        self._rotation = itertools.count()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._health_thread = None
+
+    def get(self, url: str) -> Optional[Endpoint]:
+        """Return the endpoint for a base URL, if it belongs to the pool"""
+        return self._by_url.get(url.rstrip('/'))
+
+    def select(self, candidates: Optional[Iterable[str]] = None,
+               exclude: Iterable[str] = ()) -> Endpoint:
+        """
+        Choose the endpoint for the next request
+
+        Args:
+            candidates: Restrict selection to these base URLs (optional)
+            exclude: Base URLs to avoid, e.g. the node a hedge is racing
+
+        Returns:
+            Selected endpoint
+        """
+        with self._lock:
+            pool = self.endpoints
+            if candidates is not None:
+                allowed = set(url.rstrip('/') for url in candidates)
+                pool = [endpoint for endpoint in pool if endpoint.url in allowed]
+            if not pool:
+                raise NoHealthyEndpoint("No endpoint is eligible for this request")
+
+            available = [endpoint for endpoint in pool if endpoint.available]
+            if not available:
+                # Every node is ejected: fail open to the node due back first
+                available = [min(pool, key=lambda endpoint: endpoint.ejected_until)]
+
+            excluded = set(url.rstrip('/') for url in exclude)
+            choices = [e for e in available if e.url not in excluded] or available
+
+            if self.strategy == WEIGHTED_ROUND_ROBIN:
+                return self._select_weighted(choices)
+
+            # Least outstanding requests per unit of weight, rotating ties
+            offset = next(self._rotation)
+            count = len(choices)
+            index = min(
+                range(count),
+                key=lambda i: (choices[i].outstanding / choices[i].weight, (i - offset) % count)
+            )
+            return choices[index]
+
+    def _select_weighted(self, choices: List[Endpoint]) -> Endpoint:
+        """Smooth weighted round-robin; the caller holds the lock"""
+        total = 0
+        best = None
+        for endpoint in choices:
+            endpoint.current_weight += endpoint.weight
+            total += endpoint.weight
+            if best is None or endpoint.current_weight > best.current_weight:
+                best = endpoint
+        best.current_weight -= total
+        return best
+
+    def dispatch(self, endpoint: Endpoint,
+                 send: Callable[[str], requests.Response]) -> requests.Response:
+        """
+        Send a request to an endpoint while tracking load and health
+
+        Args:
+            endpoint: Endpoint to use
+            send: Callable that sends the request to the given base URL
+
+        Returns:
+            HTTP response
+        """
+        with self._lock:
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+
+        try:
+            response = send(endpoint.url)
+        except requests.exceptions.RequestException:
+            self.record_failure(endpoint)
+            raise
+        finally:
+            with self._lock:
+                endpoint.outstanding -= 1
+
+        if response.status_code >= 500:
+            self.record_failure(endpoint)
+        else:
+            self.record_success(endpoint)
+        return response
+
+    def record_success(self, endpoint: Endpoint):
+        """Mark a successful exchange with an endpoint"""
+        with self._lock:
+            endpoint.consecutive_failures = 0
+            if not endpoint.healthy:
+                endpoint.healthy = True
+                endpoint.ejections = 0
+                logger.info("Endpoint %s readmitted to pool", endpoint.url)
+
+    def record_failure(self, endpoint: Endpoint):
+        """Mark a failed exchange and eject the endpoint past the threshold"""
+        with self._lock:
+            endpoint.failures += 1
+            endpoint.consecutive_failures += 1
+            if not endpoint.healthy and time.monotonic() < endpoint.ejected_until:
+                return
+            if endpoint.consecutive_failures >= self.failure_threshold or not endpoint.healthy:
+                period = min(self.max_ejection_seconds,
+                             self.ejection_seconds * (2 ** endpoint.ejections))
+                endpoint.healthy = False
+                endpoint.ejections += 1
+                endpoint.ejected_until = time.monotonic() + period
+                logger.warning("Endpoint %s ejected for %.1fs", endpoint.url, period)
+
+    # ==================== Health Checks ====================
+
+    def check_health(self, session: requests.Session):
+        """
+        Probe every endpoint once and update its health
+
+        Args:
+            session: HTTP session used for the probes
+        """
+        for endpoint in self.endpoints:
+            url = urljoin(endpoint.url, self.health_check_path)
+            try:
+                response = session.get(url, timeout=self.health_check_timeout)
+                healthy = response.status_code < 500
+                response.close()
+            except requests.exceptions.RequestException:
+                healthy = False
+
+            if healthy:
+                self.record_success(endpoint)
+            else:
+                self.record_failure(endpoint)
+
+    def start_health_checks(self, session: requests.Session):
+        """Start periodic background health checks if an interval is configured"""
+        if not self.health_check_interval or self._health_thread is not None:
+            return
+
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(self.health_check_interval):
+                self.check_health(session)
+
+        self._health_thread = threading.Thread(
+            target=run, name='tc-endpoint-health', daemon=True
+        )
+        self._health_thread.start()
+
+    def stop_health_checks(self):
+        """Stop background health checks"""
+        self._stop.set()
+        if self._health_thread is not None:
+            self._health_thread.join(timeout=self.health_check_timeout)
+            self._health_thread = None
+
+    def stats(self) -> List[Dict]:
+        """Return per-endpoint load and health counters"""
+        with self._lock:
+            return [
+                {
+                    'url': endpoint.url,
+                    'weight': endpoint.weight,
+                    'healthy': endpoint.healthy,
+                    'outstanding': endpoint.outstanding,
+                    'requests': endpoint.requests,
+                    'failures': endpoint.failures
+                }
+                for endpoint in self.endpoints
+            ]
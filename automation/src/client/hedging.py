@@ -0,0 +1,209 @@
+"""
+Hedged requests for idempotent Teamcenter reads
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Optional
+
+import requests
+
+from ..utils.metrics import LatencyWindow
+from .deadline import Deadline, DeadlineExceeded
+
+logger = logging.getLogger(__name__)
+
+
+class HedgingPolicy:
+    """
+    Opt-in policy that duplicates slow idempotent reads
+
+    When a read has not completed after the configured percentile of recent
+    latency, a second identical request is sent (optionally to an alternate
+    base URL) and whichever response arrives first is used. Hedges are paid
+    for from a token budget that earns ``budget_ratio`` tokens per request,
+    so hedging can never add more than that fraction of extra load.
+
+    Hedged reads run on the policy's worker threads; the hedge delay is
+    measured from when the primary request actually starts, so time spent
+    waiting for a free worker neither triggers hedges nor skews the
+    latency percentile. Size max_workers to the client's concurrency.
+
+    Example:
+        policy = HedgingPolicy(percentile=95, budget_ratio=0.1)
+        client = TeamcenterRESTClient(base_url, hedging=policy)
+    """
+
+    def __init__(self, percentile: float = 95.0, initial_delay: float = 0.5,
+                 min_delay: float = 0.01, max_delay: Optional[float] = None,
+                 budget_ratio: float = 0.1, max_tokens: float = 10.0,
+                 min_samples: int = 20, window_size: int = 1000,
+                 alternate_base_url: Optional[str] = None, max_workers: int = 16):
+        """
+        Initialize the hedging policy
+
+        Args:
+            percentile: Latency percentile after which a hedge is sent
+            initial_delay: Hedge delay used until enough samples are recorded
+            min_delay: Lower bound for the hedge delay in seconds
+            max_delay: Upper bound for the hedge delay in seconds (optional)
+            budget_ratio: Hedge tokens earned per request (0 < ratio <= 1)
+            max_tokens: Maximum number of hedge tokens that can be saved up
+            min_samples: Samples needed before the percentile is trusted
+            window_size: Number of recent latencies tracked
+            alternate_base_url: Base URL that hedged requests are sent to
+            max_workers: Worker threads for in-flight hedged reads (primary
+                and hedge); at least the number of concurrent reads
+        """
+        if not 0 < budget_ratio <= 1:
+            raise ValueError("budget_ratio must be in (0, 1]")
+
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.budget_ratio = budget_ratio
+        self.max_tokens = max_tokens
+        self.min_samples = min_samples
+        self.alternate_base_url = alternate_base_url.rstrip('/') if alternate_base_url else None
+        self.max_workers = max_workers
+
+        self.latencies = LatencyWindow(window_size)
+        self.requests_sent = 0
+        self.hedges_sent = 0
+        self.hedges_won = 0
+
+        self._tokens = 0.0
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait for the primary request before hedging"""
+        if len(self.latencies) < self.min_samples:
+            delay = self.initial_delay
+        else:
+            delay = self.latencies.percentile(self.percentile)
+
+        delay = max(self.min_delay, delay)
+        if self.max_delay is not None:
+            delay = min(self.max_delay, delay)
+        return delay
+
+    def _earn_token(self):
+        with self._lock:
+            self.requests_sent += 1
+            self._tokens = min(self.max_tokens, self._tokens + self.budget_ratio)
+
+    def _spend_token(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            self.hedges_sent += 1
+            return True
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix='tc-hedge'
+                )
+            return self._executor
+
+    def _timed(self, send: Callable[[str], requests.Response], base_url: str,
+               started_event: Optional[threading.Event] = None
+               ) -> Callable[[], requests.Response]:
+        def call():
+            if started_event is not None:
+                started_event.set()
+            started = time.monotonic()
+            response = send(base_url)
+            self.latencies.record(time.monotonic() - started)
+            return response
+        return call
+
+    def execute(self, send: Callable[[str], requests.Response], base_url: str,
+                choose_alternate: Optional[Callable[[], str]] = None,
+                deadline: Optional[Deadline] = None) -> requests.Response:
+        """
+        Run a read with hedging
+
+        The callable is expected to enforce its own per-call timeout, so
+        every submitted request eventually completes.
+
+        Args:
+            send: Callable that sends the request to the given base URL
+            base_url: Base URL for the primary request
+            choose_alternate: Picks the hedge's base URL when no fixed
+                alternate is configured (e.g. another load-balanced node)
+            deadline: Bounds the wait for a free worker
+
+        Returns:
+            The first response to arrive
+
+        Raises:
+            DeadlineExceeded: If the deadline ran out before a worker was free
+        """
+        executor = self._get_executor()
+        self._earn_token()
+
+        primary_started = threading.Event()
+        primary = executor.submit(self._timed(send, base_url, primary_started))
+        # Queue time behind busy workers is not the server being slow
+        if not primary_started.wait(deadline.remaining() if deadline is not None else None):
+            if primary.cancel():
+                raise DeadlineExceeded("Deadline exceeded waiting for a hedging worker")
+            primary_started.wait()
+        done, _ = wait([primary], timeout=self.hedge_delay())
+        if done or not self._spend_token():
+            return primary.result()
+
+        hedge_url = self.alternate_base_url
+        if hedge_url is None:
+            hedge_url = choose_alternate() if choose_alternate else base_url
+        logger.debug("Hedging slow read to %s", hedge_url)
+        hedge = executor.submit(self._timed(send, hedge_url))
+
+        pending = {primary, hedge}
+        errors = []
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    errors.append(future.exception())
+                    continue
+
+                if future is hedge:
+                    with self._lock:
+                        self.hedges_won += 1
+                for loser in (pending | done) - {future}:
+                    loser.add_done_callback(_close_response)
+                return future.result()
+
+        raise errors[0]
+
+    def stats(self) -> dict:
+        """Return counters describing hedging activity"""
+        with self._lock:
+            return {
+                'requests': self.requests_sent,
+                'hedges_sent': self.hedges_sent,
+                'hedges_won': self.hedges_won,
+                'hedge_delay': self.hedge_delay()
+            }
+
+    def shutdown(self):
+        """Stop the worker threads used for hedged requests"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+
+def _close_response(future):
+    """Release the connection held by a losing hedged request"""
+    if future.exception() is None:
+        future.result().close()
@@ -0,0 +1,285 @@
+"""
+Compact typed models for Teamcenter REST results
+
+With ``TeamcenterRESTClient(..., typed_models=True)`` reads return Item,
+BOMLine, Task and Dataset objects instead of nested dicts. The models use
+__slots__, intern repeated strings (property names, types, statuses and
+short property values) and share one key layout between property maps
+with the same keys. Fields without an attribute are kept as one encoded
+blob and only decoded when ``raw`` or ``to_dict()`` is used.
+
+Every model is a read-only Mapping keyed by the REST field names
+(``model['itemId']``, ``model.items()``, ``dict(model)``), so code written
+against the dicts keeps working. The standard json module cannot encode
+non-dict mappings; pass ``default=json_default`` or use ``to_dict()``.
+"""
+
+import sys
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .codec import JSON_BACKENDS, available_json_backends
+
+_dumps, _loads = JSON_BACKENDS[available_json_backends()[0]]
+
+# Longer string values are rarely repeated and are not interned
+INTERN_MAX_LENGTH = 64
+
+# Distinct property key layouts shared between PropertyMaps
+MAX_SCHEMAS = 4096
+
+
+def _intern(value: Any) -> Any:
+    if type(value) is str and len(value) <= INTERN_MAX_LENGTH:
+        return sys.intern(value)
+    return value
+
+
+class _Schema:
+    """Property names shared by every PropertyMap with the same keys"""
+
+    __slots__ = ('keys', 'index')
+
+    def __init__(self, keys: Tuple[str, ...]):
+        self.keys = keys
+        self.index = {key: position for position, key in enumerate(keys)}
+
+
+_schemas: Dict[Tuple[str, ...], _Schema] = {}
+
+
+def _schema_for(keys: Tuple[str, ...]) -> _Schema:
+    schema = _schemas.get(keys)
+    if schema is None:
+        schema = _Schema(keys)
+        if len(_schemas) < MAX_SCHEMAS:
+            _schemas[keys] = schema
+    return schema
+
+
+class PropertyMap(Mapping):
+    """Read-only property mapping stored as a shared key layout plus a value tuple"""
+
+    __slots__ = ('_schema', '_values')
+
+    def __init__(self, properties: Optional[Dict] = None):
+        properties = properties or {}
+        self._schema = _schema_for(tuple(sys.intern(str(key)) for key in properties))
+        self._values = tuple(_intern(value) for value in properties.values())
+
+    def __getitem__(self, key: str) -> Any:
+        return self._values[self._schema.index[key]]
+
+    def __contains__(self, key) -> bool:
+        return key in self._schema.index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._schema.keys)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def to_dict(self) -> Dict:
+        return dict(zip(self._schema.keys, self._values))
+
+    def __repr__(self) -> str:
+        return f"PropertyMap({self.to_dict()!r})"
+
+
+class Model(Mapping):
+    """
+    Base class for typed results
+
+    Subclasses list their attributes and the REST field each one is read
+    from in FIELDS; everything else in the payload goes to the lazily
+    decoded extra blob. As a Mapping the keys are the FIELDS names,
+    'properties' and the extra fields.
+    """
+
+    __slots__ = ('properties', '_extra')
+
+    FIELDS: Tuple[Tuple[str, str], ...] = ()
+    _ATTRIBUTES: Dict[str, str] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._ATTRIBUTES = {key: attribute for attribute, key in cls.FIELDS}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Model':
+        """Build the model from a decoded REST record"""
+        model = cls.__new__(cls)
+        attributes = cls._ATTRIBUTES
+        for attribute, key in cls.FIELDS:
+            setattr(model, attribute, _intern(data.get(key)))
+        model.properties = PropertyMap(data.get('properties'))
+        extra = {key: value for key, value in data.items()
+                 if key not in attributes and key != 'properties'
+                 and not cls._is_nested(key)}
+        model._extra = _dumps(extra) if extra else None
+        return model
+
+    @classmethod
+    def _is_nested(cls, key: str) -> bool:
+        return False
+
+    @property
+    def raw(self) -> Dict:
+        """Fields without an attribute, decoded on each access"""
+        return _loads(self._extra) if self._extra else {}
+
+    def to_dict(self) -> Dict:
+        """The record as the REST API returned it"""
+        data = {key: getattr(self, attribute) for attribute, key in self.FIELDS}
+        data['properties'] = self.properties.to_dict()
+        data.update(self.raw)
+        return data
+
+    def __getitem__(self, key: str) -> Any:
+        attribute = self._ATTRIBUTES.get(key)
+        if attribute is not None:
+            return getattr(self, attribute)
+        if key == 'properties':
+            return self.properties
+        return self.raw[key]
+
+    def __iter__(self) -> Iterator[str]:
+        for _, key in self.FIELDS:
+            yield key
+        yield 'properties'
+        yield from self.raw
+
+    def __len__(self) -> int:
+        return len(self.FIELDS) + 1 + len(self.raw)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Like dict.get, but a field present with None also returns default"""
+        try:
+            value = self[key]
+        except KeyError:
+            return default
+        return default if value is None else value
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Model):
+            return type(other) is type(self) and self.to_dict() == other.to_dict()
+        if isinstance(other, Mapping):
+            return self.to_dict() == json_default(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        first_attribute, first_key = self.FIELDS[0]
+        return f"{type(self).__name__}({first_key}={getattr(self, first_attribute)!r})"
+
+
+class Item(Model):
+    """Teamcenter item"""
+
+    __slots__ = ('item_id', 'uid', 'revision_id', 'name', 'description', 'type',
+                 'status', 'created', 'modified')
+
+    FIELDS = (('item_id', 'itemId'), ('uid', 'uid'), ('revision_id', 'revisionId'),
+              ('name', 'name'), ('description', 'description'), ('type', 'type'),
+              ('status', 'status'), ('created', 'created'), ('modified', 'modified'))
+
+
+class BOMLine(Model):
+    """BOM line of an expanded structure; children are BOMLines as well"""
+
+    __slots__ = ('line_id', 'level', 'parent_id', 'child_id', 'child_name', 'quantity',
+                 'uom', 'find_number', 'children')
+
+    FIELDS = (('line_id', 'lineId'), ('level', 'level'), ('parent_id', 'parentId'),
+              ('child_id', 'childId'), ('child_name', 'childName'), ('quantity', 'quantity'),
+              ('uom', 'uom'), ('find_number', 'findNumber'))
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'BOMLine':
+        line = super().from_dict(data)
+        children = data.get('children')
+        line.children = [cls.from_dict(child) for child in children] if children else None
+        return line
+
+    @classmethod
+    def _is_nested(cls, key: str) -> bool:
+        return key == 'children'
+
+    def __getitem__(self, key: str) -> Any:
+        if key == 'children':
+            if self.children is None:
+                raise KeyError(key)
+            return self.children
+        return super().__getitem__(key)
+
+    def to_dict(self) -> Dict:
+        data = super().to_dict()
+        if self.children:
+            data['children'] = [child.to_dict() for child in self.children]
+        return data
+
+    def __iter__(self) -> Iterator[str]:
+        yield from super().__iter__()
+        if self.children:
+            yield 'children'
+
+    def __len__(self) -> int:
+        return super().__len__() + (1 if self.children else 0)
+
+    def walk(self) -> Iterator['BOMLine']:
+        """This line and every line below it, depth-first"""
+        stack = [self]
+        while stack:
+            line = stack.pop()
+            yield line
+            if line.children:
+                stack.extend(reversed(line.children))
+
+
+class Task(Model):
+    """Workflow task"""
+
+    __slots__ = ('task_id', 'workflow_id', 'name', 'description', 'priority', 'status',
+                 'assigned_to', 'created')
+
+    FIELDS = (('task_id', 'taskId'), ('workflow_id', 'workflowId'), ('name', 'name'),
+              ('description', 'description'), ('priority', 'priority'),
+              ('status', 'status'), ('assigned_to', 'assignedTo'), ('created', 'created'))
+
+
+class Dataset(Model):
+    """Dataset attached to an item"""
+
+    __slots__ = ('dataset_id', 'item_id', 'name', 'type', 'file_name', 'file_size',
+                 'relation_type', 'created')
+
+    FIELDS = (('dataset_id', 'datasetId'), ('item_id', 'itemId'), ('name', 'name'),
+              ('type', 'type'), ('file_name', 'fileName'), ('file_size', 'fileSize'),
+              ('relation_type', 'relationType'), ('created', 'created'))
+
+
+def json_default(value: Any) -> Any:
+    """
+    ``default`` hook for json.dumps turning models and PropertyMaps into dicts
+
+    Example:
+        json.dumps(client.get_bom_structure('EQ-000001'), default=json_default)
+    """
+    if isinstance(value, Model):
+        return value.to_dict()
+    if isinstance(value, Mapping):
+        return {key: json_default(item) if isinstance(item, Mapping) else item
+                for key, item in value.items()}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def bom_from_dict(structure: Dict) -> Dict:
+    """get_bom_structure() result with its lines converted to BOMLines"""
+    return dict(structure, lines=[BOMLine.from_dict(line)
+                                  for line in structure.get('lines') or []])
+
+
+def models_from(cls: type, records: List[Dict]) -> List[Model]:
+    """Convert a list of REST records"""
+    return [cls.from_dict(record) for record in records]
@@ -3,70 +3,152 @@ Teamcenter REST API Client Implementation
 """
 
 import requests
-import json
+import copy
 import logging
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Sequence, Tuple, Union
 from datetime import datetime, timedelta
-from urllib.parse import urljoin
+from urllib.parse import quote, urljoin
 import time
 
+from .cassette import Cassette
+from .codec import Codec
+from .deadline import Deadline, DeadlineExceeded, current_deadline
+from .endpoints import EndpointPool
+from .hedging import HedgingPolicy
+from .models import Dataset, Item, Task, bom_from_dict, models_from
+
 logger = logging.getLogger(__name__)
 
 
+def _projection_params(properties: Optional[Sequence[str]]) -> Optional[Dict]:
+    """Query parameters asking the server for only the named properties"""
+    if properties is None:
+        return None
+    return {'properties': ','.join(properties)}
+
+
+def connection_pool_size(settings: Dict, workers: int = 0) -> int:
+    """Connections per host: teamcenter.connection.pool_size, raised to cover workers"""
+    configured = ((settings.get('teamcenter') or {}).get('connection') or {}).get('pool_size', 10)
+    return max(int(configured), workers)
+
+
+def _segment(value: str) -> str:
+    """Percent-encode an ID for use as one URL path segment (IDs may contain '/')"""
+    return quote(str(value), safe='')
+
+
 class TeamcenterRESTClient:
     """
     REST API Client for Teamcenter PLM System
     Optimized for mining equipment operations at Epiroc
     """
     
-    def __init__(self, base_url: str, username: str = None, password: str = None):
+    def __init__(self, base_url: Union[str, Sequence[str], EndpointPool],
+                 username: str = None, password: str = None,
+                 timeout: float = 30, hedging: Optional[HedgingPolicy] = None,
+                 sticky_sessions: bool = False, pool_size: int = 10,
+                 cassette: Optional[Cassette] = None, codec: Optional[Codec] = None,
+                 typed_models: bool = False):
         """
         Initialize Teamcenter REST client
         
         Args:
-            base_url: Base URL for Teamcenter instance
+            base_url: Base URL for Teamcenter instance, or a list of web tier
+                base URLs / an EndpointPool to balance requests across
             username: Username for authentication
             password: Password for authentication
-        """
-        self.base_url = base_url.rstrip('/')
+            timeout: Default per-call timeout in seconds
+            hedging: Hedging policy for idempotent reads (optional)
+            sticky_sessions: Log in on every pool node and send each request
+                with the token issued by the node it is routed to
+            pool_size: Connections kept per host for concurrent callers
+            cassette: Record traffic to, or replay it from, a cassette archive
+            codec: JSON backend and content encodings (defaults to Codec())
+            typed_models: Return compact Item, BOMLine, Task and Dataset
+                objects from reads instead of dicts
+        """
+        if isinstance(base_url, EndpointPool):
+            self.pool = base_url
+        elif isinstance(base_url, str):
+            self.pool = None
+        else:
+            self.pool = EndpointPool(base_url)
+        
+        self.base_url = self.pool.endpoints[0].url if self.pool else base_url.rstrip('/')
+        self.timeout = timeout
+        self.hedging = hedging
+        self.sticky_sessions = sticky_sessions and self.pool is not None
         self.session = requests.Session()
         self.token = None
         self.token_expiry = None
+        self.endpoint_tokens = {}
+        self.cassette = cassette
+        self.codec = codec or Codec()
+        self.typed_models = typed_models
+        self.shares_connections = False
         
         # Configure session
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size,
+                                                pool_maxsize=pool_size)
+        if cassette is not None:
+            adapter = cassette.adapter(adapter)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
         self.session.headers.update({
             'Content-Type': 'application/json',
-            'Accept': 'application/json'
+            'Accept': 'application/json',
+            'Accept-Encoding': self.codec.accept_encoding_header
         })
         
+        if self.pool is not None:
+            self.pool.start_health_checks(self.session)
+        
         if username and password:
             self.authenticate(username, password)
     
-    def authenticate(self, username: str, password: str) -> Dict:
+    def authenticate(self, username: str, password: str,
+                     deadline: Optional[Deadline] = None) -> Dict:
         """
         Authenticate with Teamcenter and obtain session token
         
         Args:
             username: Teamcenter username
             password: Teamcenter password
+            deadline: Time budget for the call (defaults to the ambient deadline)
             
         Returns:
             Authentication response with token
         """
-        auth_url = urljoin(self.base_url, '/restful/auth/login')
+        path = '/restful/auth/login'
+        
+        # With sticky sessions every node issues its own token
+        targets = [e.url for e in self.pool.endpoints] if self.sticky_sessions else [None]
         
         try:
-            response = self.session.post(
-                auth_url,
-                json={
-                    'username': username,
-                    'password': password
-                },
-                timeout=30
-            )
-            response.raise_for_status()
+            auth_data = None
+            for target in targets:
+                try:
+                    response = self._request('POST', path,
+                        json={
+                            'username': username,
+                            'password': password
+                        },
+                        deadline=deadline,
+                        endpoint=target
+                    )
+                    response.raise_for_status()
+                except requests.exceptions.RequestException as e:
+                    if target is None or (auth_data is None and target == targets[-1]):
+                        raise
+                    logger.warning("Authentication on %s failed: %s", target, e)
+                    continue
+                
+                node_auth = self.codec.decode(response)
+                if target is not None:
+                    self.endpoint_tokens[target] = node_auth.get('token')
+                auth_data = auth_data or node_auth
             
-            auth_data = response.json()
             self.token = auth_data.get('token')
             
             # Calculate token expiry (usually 1 hour)
@@ -77,13 +159,43 @@ class TeamcenterRESTClient:
                 'Authorization': f'Bearer {self.token}'
             })
             
-            logger.info(f"Successfully authenticated as {username}")
+            logger.info("Successfully authenticated as %s", username)
             return auth_data
             
         except requests.exceptions.RequestException as e:
-            logger.error(f"Authentication failed: {str(e)}")
+            logger.error("Authentication failed: %s", e)
             raise
     
+    def for_user(self, username: str, password: str,
+                 deadline: Optional[Deadline] = None) -> 'TeamcenterRESTClient':
+        """
+        Client for another user that shares this client's connections
+        
+        The returned client has its own token but sends requests through
+        this client's connection pool, endpoint pool and hedging policy.
+        Logging it out leaves those open for this client.
+        
+        Args:
+            username: Teamcenter username
+            password: Teamcenter password
+            deadline: Time budget for the login (defaults to the ambient deadline)
+            
+        Returns:
+            Authenticated client for the user
+        """
+        client = copy.copy(self)
+        client.session = requests.Session()
+        client.session.headers.update({key: value for key, value in self.session.headers.items()
+                                       if key != 'Authorization'})
+        for prefix, adapter in self.session.adapters.items():
+            client.session.mount(prefix, adapter)
+        client.token = None
+        client.token_expiry = None
+        client.endpoint_tokens = {}
+        client.shares_connections = True
+        client.authenticate(username, password, deadline=deadline)
+        return client
+    
     def ensure_authenticated(self):
         """Ensure the client is authenticated and token is valid"""
         if not self.token:
@@ -95,142 +207,230 @@ class TeamcenterRESTClient:
             # In real implementation, would refresh token
             raise Exception("Token expired. Re-authenticate required.")
     
+    def _select_base_url(self, exclude: Sequence[str] = ()) -> str:
+        """Choose the base URL for the next request"""
+        if self.pool is None:
+            return self.base_url
+        
+        candidates = list(self.endpoint_tokens) if self.sticky_sessions else None
+        return self.pool.select(candidates, exclude).url
+    
+    def _request(self, method: str, path: str, deadline: Optional[Deadline] = None,
+                 hedge: bool = False, endpoint: Optional[str] = None,
+                 **kwargs) -> requests.Response:
+        """
+        Send a request, deriving its timeout from the active deadline
+        
+        Args:
+            method: HTTP method
+            path: Path relative to the server root
+            deadline: Explicit deadline (defaults to the ambient deadline)
+            hedge: Whether the request is an idempotent read that may be hedged
+            endpoint: Base URL to use instead of load-balanced selection
+            **kwargs: Extra arguments for requests.Session.request
+            
+        Returns:
+            HTTP response
+        """
+        deadline = deadline or current_deadline()
+        default_timeout = kwargs.pop('timeout', self.timeout)
+        if deadline is not None:
+            deadline.check()
+        
+        if 'json' in kwargs:
+            kwargs['data'], body_headers = self.codec.encode(kwargs.pop('json'))
+            kwargs['headers'] = dict(kwargs.get('headers') or {}, **body_headers)
+        
+        def send(base_url: str) -> requests.Response:
+            # Derived when the request starts, so time spent queued for a
+            # hedging worker is charged to the budget
+            timeout = (deadline.request_timeout(default_timeout) if deadline is not None
+                       else default_timeout)
+            request_kwargs = kwargs
+            token = self.endpoint_tokens.get(base_url)
+            if token:
+                headers = dict(kwargs.get('headers') or {})
+                headers['Authorization'] = f'Bearer {token}'
+                request_kwargs = dict(kwargs, headers=headers)
+            return self.session.request(method, urljoin(base_url, path),
+                                        timeout=timeout, **request_kwargs)
+        
+        def dispatch(base_url: str) -> requests.Response:
+            target = self.pool.get(base_url) if self.pool is not None else None
+            if target is None:
+                return send(base_url)
+            return self.pool.dispatch(target, send)
+        
+        primary = endpoint or self._select_base_url()
+        
+        try:
+            if hedge and self.hedging is not None:
+                alternate = None
+                if self.pool is not None and endpoint is None:
+                    alternate = lambda: self._select_base_url(exclude=[primary])
+                return self.hedging.execute(dispatch, primary, alternate, deadline=deadline)
+            return dispatch(primary)
+        except requests.exceptions.Timeout as e:
+            if deadline is not None and deadline.expired:
+                raise DeadlineExceeded(f"Deadline exceeded during {method} {path}") from e
+            raise
+    
     # ==================== Item Operations ====================
     
-    def create_item(self, item_data: Dict) -> Dict:
+    def create_item(self, item_data: Dict, deadline: Optional[Deadline] = None) -> Dict:
         """
         Create a new item in Teamcenter
         
         Args:
             item_data: Dictionary containing item properties
+            deadline: Time budget for the call (defaults to the ambient deadline)
             
         Returns:
             Created item data
         """
         self.ensure_authenticated()
         
-        url = urljoin(self.base_url, '/restful/items')
+        path = '/restful/items'
         
         # Add default properties if not provided
         item_data.setdefault('type', 'Item')
         item_data.setdefault('revisionId', 'A')
         
         try:
-            response = self.session.post(url, json=item_data)
+            response = self._request('POST', path, json=item_data, deadline=deadline)
             response.raise_for_status()
             
-            created_item = response.json()
-            logger.info(f"Created item: {created_item.get('itemId')}")
+            created_item = self.codec.decode(response)
+            logger.info("Created item: %s", created_item.get('itemId'))
             return created_item
             
         except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to create item: {str(e)}")
+            logger.error("Failed to create item: %s", e)
             raise
     
-    def get_item(self, item_id: str) -> Dict:
+    def get_item(self, item_id: str, deadline: Optional[Deadline] = None,
+                 properties: Optional[Sequence[str]] = None) -> Dict:
         """
         Get item details by ID
         
         Args:
             item_id: Item identifier
+            deadline: Time budget for the call (defaults to the ambient deadline)
+            properties: Custom properties to return (None returns all)
             
         Returns:
             Item data
         """
         self.ensure_authenticated()
         
-        url = urljoin(self.base_url, f'/restful/items/{item_id}')
+        path = f'/restful/items/{_segment(item_id)}'
+        params = _projection_params(properties)
         
         try:
-            response = self.session.get(url)
+            response = self._request('GET', path, params=params, deadline=deadline, hedge=True)
             response.raise_for_status()
-            return response.json()
+            item = self.codec.decode(response, properties)
+            return Item.from_dict(item) if self.typed_models else item
             
         except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to get item {item_id}: {str(e)}")
+            logger.error("Failed to get item %s: %s", item_id, e)
             raise
     
-    def update_item(self, item_id: str, updates: Dict) -> Dict:
+    def update_item(self, item_id: str, updates: Dict,
+                    deadline: Optional[Deadline] = None) -> Dict:
         """
         Update item properties
         
         Args:
             item_id: Item identifier
             updates: Dictionary of properties to update
+            deadline: Time budget for the call (defaults to the ambient deadline)
             
         Returns:
             Updated item data
         """
         self.ensure_authenticated()
         
-        url = urljoin(self.base_url, f'/restful/items/{item_id}')
+        path = f'/restful/items/{_segment(item_id)}'
         
         try:
-            response = self.session.put(url, json=updates)
+            response = self._request('PUT', path, json=updates, deadline=deadline)
             response.raise_for_status()
             
-            logger.info(f"Updated item: {item_id}")
-            return response.json()
+            logger.info("Updated item: %s", item_id)
+            return self.codec.decode(response)
             
         except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to update item {item_id}: {str(e)}")
+            logger.error("Failed to update item %s: %s", item_id, e)
             raise
     
-    def delete_item(self, item_id: str) -> bool:
+    def delete_item(self, item_id: str, deadline: Optional[Deadline] = None) -> bool:
         """
         Delete an item
         
         Args:
             item_id: Item identifier
+            deadline: Time budget for the call (defaults to the ambient deadline)
             
         Returns:
             True if successful
         """
         self.ensure_authenticated()
         
-        url = urljoin(self.base_url, f'/restful/items/{item_id}')
+        path = f'/restful/items/{_segment(item_id)}'
         
         try:
-            response = self.session.delete(url)
+            response = self._request('DELETE', path, deadline=deadline)
             response.raise_for_status()
             
-            logger.info(f"Deleted item: {item_id}")
+            logger.info("Deleted item: %s", item_id)
             return True
             
         except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to delete item {item_id}: {str(e)}")
+            logger.error("Failed to delete item %s: %s", item_id, e)
             raise
     
-    def search_items(self, query: Dict) -> List[Dict]:
+    def search_items(self, query: Dict,
+                     deadline: Optional[Deadline] = None,
+                     properties: Optional[Sequence[str]] = None) -> List[Dict]:
         """
         Search for items using query criteria
         
         Args:
             query: Search query parameters
+            deadline: Time budget for the call (defaults to the ambient deadline)
+            properties: Custom properties to return with each item (None returns all)
             
         Returns:
             List of matching items
         """
         self.ensure_authenticated()
         
-        url = urljoin(self.base_url, '/restful/items/search')
+        path = '/restful/items/search'
+        
+        if properties is not None:
+            query = dict(query, returnProperties=list(properties))
         
         try:
-            response = self.session.post(url, json=query)
+            response = self._request('POST', path, json=query, deadline=deadline)
             response.raise_for_status()
             
-            results = response.json().get('results', [])
-            logger.info(f"Search returned {len(results)} items")
+            results = self.codec.decode(response, properties).get('results', [])
+            if self.typed_models:
+                results = models_from(Item, results)
+            logger.info("Search returned %s items", len(results))
             return results
             
         except requests.exceptions.RequestException as e:
-            logger.error(f"Search failed: {str(e)}")
+            logger.error("Search failed: %s", e)
             raise
     
     # ==================== BOM Operations ====================
     
     def get_bom_structure(self, item_id: str, revision_id: str = None, 
-                         levels: int = -1) -> Dict:
+                         levels: int = -1,
+                         deadline: Optional[Deadline] = None,
+                         properties: Optional[Sequence[str]] = None) -> Dict:
         """
         Get BOM structure for an item
         
@@ -238,36 +438,44 @@ class TeamcenterRESTClient:
             item_id: Parent item ID
             revision_id: Specific revision (optional)
             levels: Number of levels to expand (-1 for all)
+            deadline: Time budget for the call (defaults to the ambient deadline)
+            properties: Line properties to return (None returns all, an
+                empty list none)
             
         Returns:
             BOM structure data
         """
         self.ensure_authenticated()
         
-        url = urljoin(self.base_url, f'/restful/bom/{item_id}/structure')
+        path = f'/restful/bom/{_segment(item_id)}/structure'
         
         params = {
             'levels': levels,
-            'includeProperties': True
+            'includeProperties': properties is None or len(properties) > 0
         }
+        params.update(_projection_params(properties) or {})
         
         if revision_id:
             params['revisionId'] = revision_id
         
         try:
-            response = self.session.get(url, params=params)
+            response = self._request('GET', path, params=params, deadline=deadline,
+                                     hedge=True)
             response.raise_for_status()
             
-            bom_data = response.json()
-            logger.info(f"Retrieved BOM structure for {item_id}")
+            bom_data = self.codec.decode(response, properties)
+            if self.typed_models:
+                bom_data = bom_from_dict(bom_data)
+            logger.info("Retrieved BOM structure for %s", item_id)
             return bom_data
             
         except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to get BOM structure: {str(e)}")
+            logger.error("Failed to get BOM structure: %s", e)
             raise
     
     def add_bom_line(self, parent_id: str, child_id: str, 
-                     quantity: float = 1.0, properties: Dict = None) -> Dict:
+                     quantity: float = 1.0, properties: Dict = None,
+                     deadline: Optional[Deadline] = None) -> Dict:
         """
         Add a component to BOM
         
@@ -276,13 +484,14 @@ class TeamcenterRESTClient:
             child_id: Child item ID
             quantity: Quantity of child item
             properties: Additional BOM line properties
+            deadline: Time budget for the call (defaults to the ambient deadline)
             
         Returns:
             Created BOM line data
         """
         self.ensure_authenticated()
         
-        url = urljoin(self.base_url, f'/restful/bom/{parent_id}/lines')
+        path = f'/restful/bom/{_segment(parent_id)}/lines'
         
         bom_line_data = {
             'childId': child_id,
@@ -291,18 +500,19 @@ class TeamcenterRESTClient:
         }
         
         try:
-            response = self.session.post(url, json=bom_line_data)
+            response = self._request('POST', path, json=bom_line_data, deadline=deadline)
             response.raise_for_status()
             
-            logger.info(f"Added {child_id} to BOM of {parent_id}")
-            return response.json()
+            logger.info("Added %s to BOM of %s", child_id, parent_id)
+            return self.codec.decode(response)
             
         except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to add BOM line: {str(e)}")
+            logger.error("Failed to add BOM line: %s", e)
             raise
     
     def update_bom_line(self, parent_id: str, line_id: str, 
-                       updates: Dict) -> Dict:
+                       updates: Dict,
+                       deadline: Optional[Deadline] = None) -> Dict:
         """
         Update BOM line properties
         
@@ -310,81 +520,87 @@ class TeamcenterRESTClient:
             parent_id: Parent item ID
             line_id: BOM line ID
             updates: Properties to update
+            deadline: Time budget for the call (defaults to the ambient deadline)
             
         Returns:
             Updated BOM line data
         """
         self.ensure_authenticated()
         
-        url = urljoin(self.base_url, f'/restful/bom/{parent_id}/lines/{line_id}')
+        path = f'/restful/bom/{_segment(parent_id)}/lines/{_segment(line_id)}'
         
         try:
-            response = self.session.put(url, json=updates)
+            response = self._request('PUT', path, json=updates, deadline=deadline)
             response.raise_for_status()
             
-            logger.info(f"Updated BOM line {line_id}")
-            return response.json()
+            logger.info("Updated BOM line %s", line_id)
+            return self.codec.decode(response)
             
         except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to update BOM line: {str(e)}")
+            logger.error("Failed to update BOM line: %s", e)
             raise
     
-    def remove_bom_line(self, parent_id: str, line_id: str) -> bool:
+    def remove_bom_line(self, parent_id: str, line_id: str,
+                        deadline: Optional[Deadline] = None) -> bool:
         """
         Remove a BOM line
         
         Args:
             parent_id: Parent item ID
             line_id: BOM line ID
+            deadline: Time budget for the call (defaults to the ambient deadline)
             
         Returns:
             True if successful
         """
         self.ensure_authenticated()
         
-        url = urljoin(self.base_url, f'/restful/bom/{parent_id}/lines/{line_id}')
+        path = f'/restful/bom/{_segment(parent_id)}/lines/{_segment(line_id)}'
         
         try:
-            response = self.session.delete(url)
+            response = self._request('DELETE', path, deadline=deadline)
             response.raise_for_status()
             
-            logger.info(f"Removed BOM line {line_id}")
+            logger.info("Removed BOM line %s", line_id)
             return True
             
         except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to remove BOM line: {str(e)}")
+            logger.error("Failed to remove BOM line: %s", e)
             raise
     
-    def get_where_used(self, item_id: str) -> List[Dict]:
+    def get_where_used(self, item_id: str,
+                       deadline: Optional[Deadline] = None) -> List[Dict]:
         """
         Get where-used information for an item
         
         Args:
             item_id: Item ID to check
+            deadline: Time budget for the call (defaults to the ambient deadline)
             
         Returns:
             List of parent items using this component
         """
         self.ensure_authenticated()
         
-        url = urljoin(self.base_url, f'/restful/bom/{item_id}/where-used')
+        path = f'/restful/bom/{_segment(item_id)}/where-used'
         
         try:
-            response = self.session.get(url)
+            response = self._request('GET', path, deadline=deadline, hedge=True)
             response.raise_for_status()
             
-            where_used = response.json().get('parents', [])
-            logger.info(f"Found {len(where_used)} parents for {item_id}")
+            where_used = self.codec.decode(response).get('parents', [])
+            logger.info("Found %s parents for %s", len(where_used), item_id)
             return where_used
             
         except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to get where-used: {str(e)}")
+            logger.error("Failed to get where-used: %s", e)
             raise
     
     # ==================== Workflow Operations ====================
     
     def start_workflow(self, process_name: str, targets: List[str], 
-                      properties: Dict = None) -> Dict:
+                      properties: Dict = None,
+                      deadline: Optional[Deadline] = None) -> Dict:
         """
         Start a workflow process
         
@@ -392,13 +608,14 @@ class TeamcenterRESTClient:
             process_name: Name of the workflow process
             targets: List of target item IDs
             properties: Workflow properties
+            deadline: Time budget for the call (defaults to the ambient deadline)
             
         Returns:
             Started workflow data
         """
         self.ensure_authenticated()
         
-        url = urljoin(self.base_url, '/restful/workflows/start')
+        path = '/restful/workflows/start'
         
         workflow_data = {
             'processName': process_name,
@@ -407,42 +624,85 @@ class TeamcenterRESTClient:
         }
         
         try:
-            response = self.session.post(url, json=workflow_data)
+            response = self._request('POST', path, json=workflow_data, deadline=deadline)
             response.raise_for_status()
             
-            workflow = response.json()
-            logger.info(f"Started workflow: {workflow.get('workflowId')}")
+            workflow = self.codec.decode(response)
+            logger.info("Started workflow: %s", workflow.get('workflowId'))
             return workflow
             
         except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to start workflow: {str(e)}")
+            logger.error("Failed to start workflow: %s", e)
             raise
     
-    def get_my_tasks(self) -> List[Dict]:
+    def get_my_tasks(self, deadline: Optional[Deadline] = None) -> List[Dict]:
         """
         Get current user's workflow tasks
         
+        Args:
+            deadline: Time budget for the call (defaults to the ambient deadline)
+            
         Returns:
             List of pending tasks
         """
         self.ensure_authenticated()
         
-        url = urljoin(self.base_url, '/restful/workflows/my-tasks')
+        path = '/restful/workflows/my-tasks'
         
         try:
-            response = self.session.get(url)
+            response = self._request('GET', path, deadline=deadline)
             response.raise_for_status()
             
-            tasks = response.json().get('tasks', [])
-            logger.info(f"Found {len(tasks)} pending tasks")
+            tasks = self.codec.decode(response).get('tasks', [])
+            if self.typed_models:
+                tasks = models_from(Task, tasks)
+            logger.info("Found %s pending tasks", len(tasks))
             return tasks
             
         except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to get tasks: {str(e)}")
+            logger.error("Failed to get tasks: %s", e)
+            raise
+    
+    def get_my_tasks_if_changed(self, etag: Optional[str] = None,
+                                deadline: Optional[Deadline] = None
+                                ) -> Tuple[Optional[List[Dict]], Optional[str]]:
+        """
+        Get current user's workflow tasks unless they are unchanged
+        
+        Sends a conditional request with the ETag of the previous response,
+        so an unchanged task list costs a 304 without a body.
+        
+        Args:
+            etag: ETag returned by the previous call (optional)
+            deadline: Time budget for the call (defaults to the ambient deadline)
+            
+        Returns:
+            Tuple of (tasks, or None if unchanged since etag, new ETag)
+        """
+        self.ensure_authenticated()
+        
+        path = '/restful/workflows/my-tasks'
+        headers = {'If-None-Match': etag} if etag else None
+        
+        try:
+            response = self._request('GET', path, deadline=deadline, headers=headers)
+            if response.status_code == 304:
+                return None, etag
+            response.raise_for_status()
+            
+            tasks = self.codec.decode(response).get('tasks', [])
+            if self.typed_models:
+                tasks = models_from(Task, tasks)
+            logger.debug("Found %s pending tasks", len(tasks))
+            return tasks, response.headers.get('ETag')
+            
+        except requests.exceptions.RequestException as e:
+            logger.error("Failed to get tasks: %s", e)
             raise
     
     def complete_task(self, task_id: str, decision: str, 
-                     comments: str = "") -> Dict:
+                     comments: str = "",
+                     deadline: Optional[Deadline] = None) -> Dict:
         """
         Complete a workflow task
         
@@ -450,13 +710,14 @@ class TeamcenterRESTClient:
             task_id: Task identifier
             decision: Task decision (approve/reject/etc)
             comments: Optional comments
+            deadline: Time budget for the call (defaults to the ambient deadline)
             
         Returns:
             Task completion result
         """
         self.ensure_authenticated()
         
-        url = urljoin(self.base_url, f'/restful/workflows/tasks/{task_id}/complete')
+        path = f'/restful/workflows/tasks/{_segment(task_id)}/complete'
         
         completion_data = {
             'decision': decision,
@@ -464,20 +725,51 @@ class TeamcenterRESTClient:
         }
         
         try:
-            response = self.session.post(url, json=completion_data)
+            response = self._request('POST', path, json=completion_data, deadline=deadline)
             response.raise_for_status()
             
-            logger.info(f"Completed task {task_id} with decision: {decision}")
-            return response.json()
+            logger.info("Completed task %s with decision: %s", task_id, decision)
+            return self.codec.decode(response)
             
         except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to complete task: {str(e)}")
+            logger.error("Failed to complete task: %s", e)
             raise
     
     # ==================== Document Operations ====================
     
+    def get_item_datasets(self, item_id: str,
+                          deadline: Optional[Deadline] = None) -> List[Dict]:
+        """
+        Get datasets attached to an item
+        
+        Args:
+            item_id: Item identifier
+            deadline: Time budget for the call (defaults to the ambient deadline)
+            
+        Returns:
+            List of dataset metadata
+        """
+        self.ensure_authenticated()
+        
+        path = f'/restful/items/{_segment(item_id)}/datasets'
+        
+        try:
+            response = self._request('GET', path, deadline=deadline, hedge=True)
+            response.raise_for_status()
+            
+            datasets = self.codec.decode(response).get('datasets', [])
+            if self.typed_models:
+                datasets = models_from(Dataset, datasets)
+            logger.info("Found %s datasets for %s", len(datasets), item_id)
+            return datasets
+            
+        except requests.exceptions.RequestException as e:
+            logger.error("Failed to get datasets for %s: %s", item_id, e)
+            raise
+    
     def upload_file(self, item_id: str, file_path: str, 
-                   dataset_type: str = "Text", relation_type: str = "IMAN_specification") -> Dict:
+                   dataset_type: str = "Text", relation_type: str = "IMAN_specification",
+                   deadline: Optional[Deadline] = None) -> Dict:
         """
         Upload a file and attach to item
         
@@ -486,13 +778,14 @@ class TeamcenterRESTClient:
             file_path: Path to file
             dataset_type: Type of dataset
             relation_type: Relation type for attachment
+            deadline: Time budget for the call (defaults to the ambient deadline)
             
         Returns:
             Created dataset information
         """
         self.ensure_authenticated()
         
-        url = urljoin(self.base_url, '/restful/documents/upload')
+        path = '/restful/documents/upload'
         
         with open(file_path, 'rb') as f:
             files = {'file': f}
@@ -502,124 +795,161 @@ class TeamcenterRESTClient:
                 'relationType': relation_type
             }
             
-            # Remove Content-Type for multipart
-            headers = self.session.headers.copy()
-            del headers['Content-Type']
+            # Drop the session's JSON Content-Type so requests sets the
+            # multipart boundary itself
+            headers = {'Content-Type': None}
             
             try:
-                response = self.session.post(
-                    url, 
+                response = self._request('POST', path, 
                     files=files, 
                     data=data,
-                    headers=headers
+                    headers=headers,
+                    deadline=deadline
                 )
                 response.raise_for_status()
                 
-                dataset = response.json()
-                logger.info(f"Uploaded file to dataset: {dataset.get('datasetId')}")
+                dataset = self.codec.decode(response)
+                logger.info("Uploaded file to dataset: %s", dataset.get('datasetId'))
                 return dataset
                 
             except requests.exceptions.RequestException as e:
-                logger.error(f"Failed to upload file: {str(e)}")
+                logger.error("Failed to upload file: %s", e)
                 raise
     
-    def download_file(self, dataset_id: str, output_path: str) -> str:
+    def download_file(self, dataset_id: str, output_path: str,
+                      deadline: Optional[Deadline] = None) -> str:
         """
         Download a file from dataset
         
         Args:
             dataset_id: Dataset identifier
             output_path: Path to save file
+            deadline: Time budget for the call (defaults to the ambient deadline)
             
         Returns:
             Path to downloaded file
         """
         self.ensure_authenticated()
         
-        url = urljoin(self.base_url, f'/restful/documents/{dataset_id}/download')
+        path = f'/restful/documents/{_segment(dataset_id)}/download'
         
         try:
-            response = self.session.get(url, stream=True)
+            response = self._request('GET', path, stream=True, deadline=deadline)
             response.raise_for_status()
             
             with open(output_path, 'wb') as f:
                 for chunk in response.iter_content(chunk_size=8192):
                     f.write(chunk)
             
-            logger.info(f"Downloaded file to: {output_path}")
+            logger.info("Downloaded file to: %s", output_path)
             return output_path
             
         except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to download file: {str(e)}")
+            logger.error("Failed to download file: %s", e)
             raise
     
     # ==================== Query Operations ====================
     
     def execute_saved_query(self, query_name: str, 
-                           parameters: Dict = None) -> List[Dict]:
+                           parameters: Dict = None,
+                           deadline: Optional[Deadline] = None,
+                           max_results: int = 1000,
+                           page: Optional[int] = None,
+                           properties: Optional[Sequence[str]] = None) -> List[Dict]:
         """
         Execute a saved query
         
         Args:
             query_name: Name of saved query
             parameters: Query parameters
+            deadline: Time budget for the call (defaults to the ambient deadline)
+            max_results: Maximum results returned (the page size when paging)
+            page: 1-based page of results to return (optional)
+            properties: Custom properties to return with each result (None returns all)
             
         Returns:
             Query results
         """
         self.ensure_authenticated()
         
-        url = urljoin(self.base_url, '/restful/query/execute')
+        path = '/restful/query/execute'
         
         query_data = {
             'queryName': query_name,
             'parameters': parameters or {},
-            'maxResults': 1000
+            'maxResults': max_results
         }
         
+        if page:
+            query_data['page'] = page
+        if properties is not None:
+            query_data['returnProperties'] = list(properties)
+        
         try:
-            response = self.session.post(url, json=query_data)
+            response = self._request('POST', path, json=query_data, deadline=deadline)
             response.raise_for_status()
             
-            results = response.json().get('results', [])
-            logger.info(f"Query '{query_name}' returned {len(results)} results")
+            results = self.codec.decode(response, properties).get('results', [])
+            if self.typed_models:
+                results = models_from(Item, results)
+            logger.info("Query '%s' returned %s results", query_name, len(results))
             return results
             
         except requests.exceptions.RequestException as e:
-            logger.error(f"Query execution failed: {str(e)}")
+            logger.error("Query execution failed: %s", e)
             raise
     
     # ==================== Utility Methods ====================
     
-    def get_server_info(self) -> Dict:
+    def get_server_info(self, deadline: Optional[Deadline] = None) -> Dict:
         """
         Get Teamcenter server information
         
+        Args:
+            deadline: Time budget for the call (defaults to the ambient deadline)
+            
         Returns:
             Server information
         """
-        url = urljoin(self.base_url, '/restful/info')
+        path = '/restful/info'
         
         try:
-            response = self.session.get(url)
+            response = self._request('GET', path, deadline=deadline)
             response.raise_for_status()
-            return response.json()
+            return self.codec.decode(response)
             
         except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to get server info: {str(e)}")
+            logger.error("Failed to get server info: %s", e)
             raise
     
-    def logout(self):
-        """Logout and clean up session"""
+    def logout(self, deadline: Optional[Deadline] = None):
+        """
+        Logout and clean up session
+        
+        Args:
+            deadline: Time budget for the call (defaults to the ambient deadline)
+        """
         if self.token:
-            url = urljoin(self.base_url, '/restful/auth/logout')
+            path = '/restful/auth/logout'
             
-            try:
-                self.session.post(url)
-                logger.info("Successfully logged out")
-            except:
-                pass
+            for target in list(self.endpoint_tokens) or [None]:
+                try:
+                    self._request('POST', path, deadline=deadline, endpoint=target)
+                    logger.info("Successfully logged out")
+                except:
+                    pass
             
             self.token = None
             self.token_expiry = None
-            self.session.close()
\ No newline at end of file
+            self.endpoint_tokens = {}
+            if not self.shares_connections:
+                self.session.close()
+        
+        if self.shares_connections:
+            return
+        if self.hedging is not None:
+            self.hedging.shutdown()
+        if self.pool is not None:
+            self.pool.stop_health_checks()
+        if self.cassette is not None:
+            self.cassette.close()
\ No newline at end of file
@@ -0,0 +1,320 @@
+"""
+Batched Teamcenter SOA (JSON over /services) operations
+
+The request bodies follow the repo's mock server (src/mock), not the
+published service contracts, and have not been run against a real
+Teamcenter web tier. Known differences:
+
+    createItems        extendedAttributes is sent as a plain name -> value
+                       dict, not a list of {objectType, attributes} entries
+    getProperties      'objects' holds bare item IDs or UIDs, not
+                       {uid, type} object references
+    expandPSAllLevels  'parents' holds item IDs; the real operation expands
+                       BOM lines from a prior createBOMWindows call
+
+Porting to a real server means building those inputs (and resolving item
+IDs to object references) in create_items, get_properties and expand_bom.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import requests
+
+from .auth import AuthenticationManager
+from .deadline import Deadline, current_deadline
+from .models import bom_from_dict
+from .rest_client import TeamcenterRESTClient
+
+logger = logging.getLogger(__name__)
+
+# Service operations used by SOAClient
+CREATE_ITEMS = 'Core-2006-03-DataManagement/createItems'
+GET_PROPERTIES = 'Core-2006-03-DataManagement/getProperties'
+EXPAND_BOM = 'Cad-2007-01-StructureManagement/expandPSAllLevels'
+
+
+class SOAError(requests.exceptions.RequestException):
+    """Service exception returned instead of an operation response"""
+
+    def __init__(self, message: str, code: Optional[int] = None, response=None):
+        super().__init__(message, response=response)
+        self.code = code
+
+
+def partial_errors(service_data: Optional[Dict]) -> Dict[str, str]:
+    """Error messages from ServiceData.partialErrors keyed by client or object ID"""
+    errors = {}
+    for error in (service_data or {}).get('partialErrors') or []:
+        key = error.get('clientId') or error.get('uid') or ''
+        messages = [value.get('message', '') for value in error.get('errorValues') or []]
+        errors[key] = '; '.join(message for message in messages if message) or 'Unknown error'
+    return errors
+
+
+def _single(values: Optional[List]) -> Any:
+    """Unwrap one-element dbValues lists"""
+    if not values:
+        return None
+    return values[0] if len(values) == 1 else values
+
+
+class SOAClient:
+    """
+    Client for Teamcenter service operations posted as JSON to /services
+
+    Sends every call through a TeamcenterRESTClient, so it uses the same
+    session, token, connection pool, endpoint pool and codec. Each batched
+    operation does in one round trip per batch what takes one REST call per
+    object: creating items, reading properties of many objects and
+    expanding whole BOMs. Partial errors are returned per object instead of
+    failing the batch.
+
+    The operation bodies target the mock server only; see the module
+    docstring for how they differ from the real service contracts.
+
+    Example:
+        soa = SOAClient(rest_client)
+        created = soa.create_items([{'itemId': 'ECN-001', 'name': 'ECN'}, ...])
+        props = soa.get_properties(item_ids, ['epr_model', 'status'])
+        boms = soa.expand_bom(fleet_ids, levels=-1)
+    """
+
+    def __init__(self, client: TeamcenterRESTClient, soa_path: str = '/services',
+                 batch_size: int = 250, max_workers: int = 4,
+                 auth: Optional[AuthenticationManager] = None):
+        """
+        Initialize SOA client
+
+        Args:
+            client: REST client whose session and pools are shared
+            soa_path: Path of the SOA JSON services (teamcenter.endpoints.soa)
+            batch_size: Objects per service call
+            max_workers: Batches sent concurrently
+            auth: Renews the shared session before calls (optional)
+        """
+        self.client = client
+        self.soa_path = '/' + soa_path.strip('/')
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.auth = auth
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings: Dict, client: TeamcenterRESTClient,
+                      auth: Optional[AuthenticationManager] = None) -> 'SOAClient':
+        """Build from teamcenter.endpoints.soa and the teamcenter.soa section"""
+        teamcenter = settings.get('teamcenter') or {}
+        config = teamcenter.get('soa') or {}
+        return cls(
+            client,
+            soa_path=(teamcenter.get('endpoints') or {}).get('soa', '/services'),
+            batch_size=config.get('batch_size', 250),
+            max_workers=config.get('max_workers', 4),
+            auth=auth
+        )
+
+    def call(self, operation: str, body: Dict, policy: Optional[Dict] = None,
+             deadline: Optional[Deadline] = None,
+             properties: Optional[Sequence[str]] = None) -> Dict:
+        """
+        Invoke one service operation
+
+        Args:
+            operation: '<Service>/<operation>', e.g. CREATE_ITEMS
+            body: Operation input
+            policy: Object property policy (optional)
+            deadline: Time budget (defaults to the ambient deadline)
+            properties: Keep only these entries of 'properties' dicts in
+                the response (None keeps all)
+
+        Returns:
+            Decoded operation response
+
+        Raises:
+            SOAError: If the server answered with a service exception
+        """
+        if self.auth is not None:
+            self.auth.ensure(self.client, deadline=deadline)
+        else:
+            self.client.ensure_authenticated()
+
+        envelope = {
+            'header': {
+                'state': {'stateless': True, 'formatProperties': False},
+                'policy': policy or {}
+            },
+            'body': body
+        }
+        path = f'{self.soa_path}/{operation}'
+        try:
+            response = self.client._request('POST', path, json=envelope, deadline=deadline)
+            response.raise_for_status()
+            data = self.client.codec.decode(response, properties)
+        except requests.exceptions.RequestException as e:
+            logger.error("SOA call %s failed: %s", operation, e)
+            raise
+        finally:
+            with self._lock:
+                self.calls += 1
+
+        if isinstance(data, dict) and '.QName' in data and 'Exception' in data['.QName']:
+            raise SOAError(data.get('message') or data['.QName'], data.get('code'), response)
+        return data
+
+    def _batched(self, operation: str, keys: Sequence[str],
+                 run: Callable[[List[str]], Dict],
+                 deadline: Optional[Deadline]) -> List[Dict]:
+        """Run run(batch) for each batch of keys, max_workers at a time"""
+        deadline = deadline or current_deadline()
+        batches = [list(keys[i:i + self.batch_size])
+                   for i in range(0, len(keys), self.batch_size)]
+        if not batches:
+            return []
+        started = time.perf_counter()
+
+        def guarded(batch: List[str]) -> Dict:
+            if deadline is not None:
+                deadline.check()
+            return run(batch)
+
+        if len(batches) == 1 or self.max_workers <= 1:
+            responses = [guarded(batch) for batch in batches]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches)),
+                                    thread_name_prefix='tc-soa') as executor:
+                futures = [executor.submit(guarded, batch) for batch in batches]
+                try:
+                    responses = [future.result() for future in futures]
+                except BaseException:
+                    for future in futures:
+                        future.cancel()
+                    raise
+
+        logger.info("SOA %s: %d objects in %d calls (%.2fs)",
+                    operation, len(keys), len(batches), time.perf_counter() - started)
+        return responses
+
+    # ==================== Data Management ====================
+
+    def create_items(self, items: Sequence[Dict],
+                     deadline: Optional[Deadline] = None) -> Dict:
+        """
+        Create many items with createItems
+
+        Args:
+            items: Item data as for TeamcenterRESTClient.create_item ('itemId',
+                'name', 'type', 'revisionId', 'description', 'properties')
+            deadline: Time budget (defaults to the ambient deadline)
+
+        Returns:
+            Dictionary with 'created' (item by client ID, which is the item
+            ID when given and unique) and 'failed' (error message by client ID)
+        """
+        deadline = deadline or current_deadline()
+        inputs = {}
+        for position, item in enumerate(items):
+            client_id = item.get('itemId')
+            if not client_id or client_id in inputs:
+                client_id = f'create-{position}'
+            inputs[client_id] = {
+                'clientId': client_id,
+                'itemId': item.get('itemId', ''),
+                'revId': item.get('revisionId', 'A'),
+                'name': item.get('name', item.get('itemId', '')),
+                'type': item.get('type', 'Item'),
+                'description': item.get('description', ''),
+                'extendedAttributes': dict(item.get('properties') or {})
+            }
+
+        def run(batch: List[str]) -> Dict:
+            return self.call(CREATE_ITEMS, {'properties': [inputs[key] for key in batch]},
+                             deadline=deadline)
+
+        created, failed = {}, {}
+        for response in self._batched(CREATE_ITEMS, list(inputs), run, deadline):
+            for output in response.get('output') or []:
+                created[output.get('clientId')] = output.get('item')
+            failed.update(partial_errors(response.get('ServiceData')))
+
+        logger.info("Created %d items, %d failed", len(created), len(failed))
+        return {'created': created, 'failed': failed}
+
+    def get_properties(self, object_ids: Sequence[str], attributes: Sequence[str],
+                       deadline: Optional[Deadline] = None) -> Dict:
+        """
+        Read attributes of many objects with getProperties
+
+        Args:
+            object_ids: Item IDs or UIDs
+            attributes: Attribute or property names, e.g. 'status', 'epr_model'
+            deadline: Time budget (defaults to the ambient deadline)
+
+        Returns:
+            Dictionary with 'objects' (attribute values by object ID as
+            given) and 'failed' (error message by object ID)
+        """
+        deadline = deadline or current_deadline()
+        object_ids = list(dict.fromkeys(object_ids))
+        attributes = list(attributes)
+
+        def run(batch: List[str]) -> Dict:
+            return self.call(GET_PROPERTIES, {'objects': batch, 'attributes': attributes},
+                             deadline=deadline)
+
+        objects, failed = {}, {}
+        for response in self._batched(GET_PROPERTIES, object_ids, run, deadline):
+            service_data = response.get('ServiceData') or {}
+            for uid, model_object in (service_data.get('modelObjects') or {}).items():
+                values = {name: _single(value.get('dbValues'))
+                          for name, value in (model_object.get('props') or {}).items()}
+                for key in (uid, model_object.get('itemId')):
+                    if key:
+                        objects[key] = values
+            failed.update(partial_errors(service_data))
+
+        requested = {object_id: objects[object_id]
+                     for object_id in object_ids if object_id in objects}
+        return {'objects': requested, 'failed': failed}
+
+    # ==================== Structure Management ====================
+
+    def expand_bom(self, root_ids: Sequence[str], levels: int = -1,
+                   properties: Optional[Sequence[str]] = None,
+                   deadline: Optional[Deadline] = None) -> Dict:
+        """
+        Expand the BOMs of many roots with expandPSAllLevels
+
+        Args:
+            root_ids: Root item IDs
+            levels: Levels to expand (-1 for all)
+            properties: Line properties to return (None returns all)
+            deadline: Time budget (defaults to the ambient deadline)
+
+        Returns:
+            Dictionary with 'structures' (get_bom_structure()-shaped result
+            by root ID) and 'failed' (error message by root ID)
+        """
+        deadline = deadline or current_deadline()
+        root_ids = list(dict.fromkeys(root_ids))
+
+        def run(batch: List[str]) -> Dict:
+            body = {'parents': batch, 'levels': levels}
+            if properties is not None:
+                body['attributes'] = list(properties)
+            return self.call(EXPAND_BOM, body, deadline=deadline, properties=properties)
+
+        structures, failed = {}, {}
+        for response in self._batched(EXPAND_BOM, root_ids, run, deadline):
+            for output in response.get('output') or []:
+                structure = {'root': output.get('root'), 'lines': output.get('lines') or []}
+                if self.client.typed_models:
+                    structure = bom_from_dict(structure)
+                structures[output.get('parent')] = structure
+            failed.update(partial_errors(response.get('ServiceData')))
+
+        return {'structures': structures, 'failed': failed}
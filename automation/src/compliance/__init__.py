@@ -0,0 +1,10 @@
+"""
+Equipment document compliance checking
+"""
+
+from .engine import ComplianceEngine, ComplianceState
+
+__all__ = [
+    'ComplianceEngine',
+    'ComplianceState'
+]
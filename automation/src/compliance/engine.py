@@ -0,0 +1,437 @@
+"""
+Fleet-wide compliance checking against epiroc.compliance.required_documents
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ..client.deadline import Deadline, DeadlineExceeded, OperationCancelled, current_deadline
+from ..client.rest_client import TeamcenterRESTClient, connection_pool_size
+
+logger = logging.getLogger(__name__)
+
+EQUIPMENT_QUERY = {'type': 'EPR_MiningEquipment'}
+
+# Document statuses
+VALID = 'valid'
+EXPIRING = 'expiring'
+EXPIRED = 'expired'
+MISSING = 'missing'
+
+
+def _issue_date(value) -> Optional[str]:
+    """ISO date (YYYY-MM-DD) of a date or timestamp string, None if it does not parse"""
+    if not isinstance(value, str):
+        return None
+    try:
+        return date.fromisoformat(value[:10]).isoformat()
+    except ValueError:
+        return None
+
+
+class ComplianceState:
+    """
+    Per-equipment cache of attachment state between runs
+
+    For each equipment item it keeps the item's last modification stamp,
+    when its attachments were last fetched and the latest issue date of
+    each required document type. Equipment whose stamp is unchanged is not
+    fetched again; expiry is re-evaluated from the cached dates on every
+    run.
+
+    This relies on the item's 'modified' stamp moving when a dataset is
+    attached, detached or revised. Whether it does depends on the server's
+    relation handling and site preferences (the mock server always bumps
+    it), so entries also expire after max_age regardless of the stamp,
+    which bounds how long a missed attachment change can go unnoticed.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Load state
+
+        Args:
+            path: JSON state file (None keeps the state in memory only)
+        """
+        self.path = Path(path) if path else None
+        self.equipment: Dict[str, Dict] = {}
+        if self.path and self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.equipment = json.load(f).get('equipment', {})
+
+    def stale(self, equipment_id: str, modified: Optional[str],
+              max_age: Optional[timedelta] = None, now: Optional[datetime] = None) -> bool:
+        """
+        True if the equipment's attachments may have changed since last checked
+
+        Args:
+            equipment_id: Equipment item ID
+            modified: The item's current modification stamp
+            max_age: Re-fetch entries checked longer ago than this (optional)
+            now: Reference time for max_age (defaults to now)
+        """
+        entry = self.equipment.get(equipment_id)
+        if entry is None or modified is None or entry.get('modified') != modified:
+            return True
+        if max_age is None:
+            return False
+        checked = entry.get('checked')
+        if checked is None:
+            return True
+        return datetime.fromisoformat(checked) <= (now or datetime.now()) - max_age
+
+    def save(self):
+        """Write the state to disk atomically"""
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.path.with_suffix(self.path.suffix + '.tmp')
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump({'equipment': self.equipment}, f, separators=(',', ':'))
+        os.replace(temporary, self.path)
+
+
+class ComplianceEngine:
+    """
+    Evaluates document compliance for the whole equipment fleet
+
+    Attachments are pulled concurrently, and only for equipment modified
+    since the previous run. Expiry for every (equipment, document) pair is
+    then computed in one vectorized pass, so a daily run over 10k+ machines
+    costs one paged search plus the fetches for machines that changed.
+
+    Example:
+        engine = ComplianceEngine.from_settings(settings, client)
+        report = engine.run()
+        print(report['compliant'], 'of', report['equipment'], 'compliant')
+    """
+
+    def __init__(self, client: TeamcenterRESTClient, required_documents: Sequence[Dict],
+                 warning_days: int = 30, max_workers: int = 16,
+                 state: Optional[ComplianceState] = None,
+                 equipment_query: Optional[Dict] = None, property_prefix: str = 'epr_',
+                 full_refresh_days: Optional[float] = 7):
+        """
+        Initialize compliance engine
+
+        Args:
+            client: Authenticated REST client
+            required_documents: Entries with 'type', 'validity_days' and
+                optionally 'warning_days'
+            warning_days: Default days before expiry to warn
+            max_workers: Concurrent dataset fetches
+            state: Cache of attachment state (in-memory if omitted)
+            equipment_query: Search criteria selecting the fleet
+            property_prefix: Prefix of custom dataset properties
+            full_refresh_days: Re-fetch attachments of equipment not fetched
+                for this many days even if its stamp is unchanged (None
+                trusts the stamp indefinitely)
+        """
+        if not required_documents:
+            raise ValueError("At least one required document type is needed")
+
+        self.client = client
+        self.types = [document['type'] for document in required_documents]
+        self.validity = np.array([int(document['validity_days'])
+                                  for document in required_documents], dtype='timedelta64[D]')
+        self.warning = np.array([int(document.get('warning_days', warning_days))
+                                 for document in required_documents], dtype='timedelta64[D]')
+        self.max_workers = max_workers
+        self.state = state or ComplianceState()
+        self.equipment_query = dict(equipment_query or EQUIPMENT_QUERY)
+        self.prefix = property_prefix
+        self.max_age = timedelta(days=full_refresh_days) if full_refresh_days is not None else None
+        self._type_index = {doc_type.lower(): i for i, doc_type in enumerate(self.types)}
+
+    @classmethod
+    def from_settings(cls, settings: Dict, client: TeamcenterRESTClient) -> 'ComplianceEngine':
+        """Build an engine from the epiroc.compliance settings"""
+        epiroc = settings.get('epiroc') or {}
+        config = epiroc.get('compliance') or {}
+        return cls(
+            client,
+            config.get('required_documents') or [],
+            warning_days=config.get('warning_days', 30),
+            max_workers=config.get('max_workers', 16),
+            state=ComplianceState(config.get('state_path')),
+            property_prefix=epiroc.get('property_prefix', 'epr_'),
+            full_refresh_days=config.get('full_refresh_days', 7)
+        )
+
+    # ==================== Collection ====================
+
+    def discover_equipment(self, page_size: int = 1000,
+                           deadline: Optional[Deadline] = None) -> List[Dict]:
+        """All equipment items matching the fleet query, with modification stamps"""
+        equipment, page = [], 1
+        while True:
+            results = self.client.search_items(
+                dict(self.equipment_query, page=page, pageSize=page_size), deadline=deadline
+            )
+            equipment.extend(results)
+            if len(results) < page_size:
+                return equipment
+            page += 1
+
+    def document_type(self, dataset: Dict) -> Optional[str]:
+        """Required document type a dataset satisfies, if any"""
+        declared = (dataset.get('properties') or {}).get(f'{self.prefix}document_type')
+        if declared and declared.lower() in self._type_index:
+            return self.types[self._type_index[declared.lower()]]
+        label = f"{dataset.get('name', '')} {dataset.get('fileName', '')}".lower()
+        for key, index in self._type_index.items():
+            if key in label:
+                return self.types[index]
+        return None
+
+    def _issue_dates(self, datasets: List[Dict]) -> Dict[str, str]:
+        """Latest issue date of each required document type"""
+        latest: Dict[str, str] = {}
+        for dataset in datasets:
+            doc_type = self.document_type(dataset)
+            if doc_type is None:
+                continue
+            value = ((dataset.get('properties') or {}).get(f'{self.prefix}issue_date')
+                     or dataset.get('created'))
+            issued = _issue_date(value)
+            if issued is None:
+                if value:
+                    logger.warning("Ignoring %s dataset %s with unreadable issue date %r",
+                                   doc_type, dataset.get('datasetId') or dataset.get('name'), value)
+                continue
+            if issued > latest.get(doc_type, ''):
+                latest[doc_type] = issued
+        return latest
+
+    def refresh(self, equipment: Sequence[Dict], full: bool = False,
+                deadline: Optional[Deadline] = None) -> Dict:
+        """
+        Fetch attachments for equipment that changed since the last run
+
+        Equipment last fetched more than full_refresh_days ago is fetched
+        too, in case an attachment change did not move its stamp.
+
+        Args:
+            equipment: Items from discover_equipment() (need 'itemId', 'modified')
+            full: Fetch every item regardless of the cached state
+            deadline: Time budget (defaults to the ambient deadline)
+
+        Returns:
+            Counts of fetched and skipped items and failures by item ID
+        """
+        deadline = deadline or current_deadline()
+        now = datetime.now()
+        stale = [item for item in equipment
+                 if full or self.state.stale(item['itemId'], item.get('modified'),
+                                             self.max_age, now)]
+        failed = {}
+
+        def fetch(item_id: str) -> List[Dict]:
+            if deadline is not None:
+                deadline.check()
+            return self.client.get_item_datasets(item_id, deadline=deadline)
+
+        if stale:
+            with ThreadPoolExecutor(max_workers=self.max_workers,
+                                    thread_name_prefix='tc-compliance') as executor:
+                futures = {executor.submit(fetch, item['itemId']): item for item in stale}
+                try:
+                    for future in as_completed(futures):
+                        item = futures[future]
+                        try:
+                            datasets = future.result()
+                        except (DeadlineExceeded, OperationCancelled):
+                            raise
+                        except Exception as e:
+                            failed[item['itemId']] = str(e)
+                            continue
+                        self.state.equipment[item['itemId']] = {
+                            'modified': item.get('modified'),
+                            'checked': now.isoformat(timespec='seconds'),
+                            'documents': self._issue_dates(datasets)
+                        }
+                except BaseException:
+                    for future in futures:
+                        future.cancel()
+                    raise
+
+        return {'fetched': len(stale) - len(failed), 'skipped': len(equipment) - len(stale),
+                'failed': failed}
+
+    # ==================== Evaluation ====================
+
+    def evaluate(self, equipment_ids: Sequence[str], today: Optional[date] = None) -> Dict:
+        """
+        Evaluate cached document dates for the given equipment
+
+        Returns:
+            Fleet summary with per-document counts and details of every
+            machine with missing, expired or expiring documents
+        """
+        today = np.datetime64(today or date.today(), 'D')
+        count, kinds = len(equipment_ids), len(self.types)
+
+        issued = np.full((count, kinds), np.datetime64('NaT'), dtype='datetime64[D]')
+        for row, equipment_id in enumerate(equipment_ids):
+            documents = (self.state.equipment.get(equipment_id) or {}).get('documents') or {}
+            for doc_type, issue_date in documents.items():
+                column = self._type_index.get(doc_type.lower())
+                # Dates cached by older versions were stored unchecked
+                if column is not None and _issue_date(issue_date) is not None:
+                    issued[row, column] = np.datetime64(issue_date[:10], 'D')
+
+        expires = issued + self.validity
+        missing = np.isnat(issued)
+        expired = ~missing & (expires < today)
+        expiring = ~missing & ~expired & (expires - today <= self.warning)
+        days_left = np.where(missing, 0, (expires - today).astype('int64'))
+
+        non_compliant = (missing | expired).any(axis=1)
+        attention = np.flatnonzero(non_compliant | expiring.any(axis=1))
+
+        details = []
+        for row in attention:
+            entry = {'equipmentId': equipment_ids[row], 'compliant': not non_compliant[row],
+                     'missing': [], 'expired': [], 'expiring': []}
+            for column in range(kinds):
+                doc_type = self.types[column]
+                if missing[row, column]:
+                    entry['missing'].append(doc_type)
+                elif expired[row, column]:
+                    entry['expired'].append({'type': doc_type,
+                                             'expired_on': str(expires[row, column])})
+                elif expiring[row, column]:
+                    entry['expiring'].append({'type': doc_type,
+                                              'expires_on': str(expires[row, column]),
+                                              'days_left': int(days_left[row, column])})
+            details.append(entry)
+
+        return {
+            'date': str(today),
+            'equipment': count,
+            'compliant': int(count - non_compliant.sum()),
+            'non_compliant': int(non_compliant.sum()),
+            'by_document': {
+                doc_type: {
+                    MISSING: int(missing[:, column].sum()),
+                    EXPIRED: int(expired[:, column].sum()),
+                    EXPIRING: int(expiring[:, column].sum())
+                }
+                for column, doc_type in enumerate(self.types)
+            },
+            'details': details
+        }
+
+    def run(self, equipment_ids: Optional[Sequence[str]] = None, full: bool = False,
+            today: Optional[date] = None, deadline: Optional[Deadline] = None) -> Dict:
+        """
+        Run a compliance check over the fleet (or the given equipment)
+
+        Args:
+            equipment_ids: Items to check (default: every discovered equipment item)
+            full: Re-fetch attachments for every item
+            today: Evaluation date (defaults to today)
+            deadline: Time budget (defaults to the ambient deadline)
+
+        Returns:
+            Summary from evaluate() plus refresh statistics and timing;
+            equipment whose attachments could not be fetched is left out
+            of the evaluation and listed under 'unknown'
+        """
+        deadline = deadline or current_deadline()
+        started = time.perf_counter()
+
+        if equipment_ids is None:
+            equipment = self.discover_equipment(deadline=deadline)
+            # Forget machines that left the fleet
+            present = {item['itemId'] for item in equipment}
+            for equipment_id in list(self.state.equipment):
+                if equipment_id not in present:
+                    del self.state.equipment[equipment_id]
+        else:
+            # Without modification stamps every requested item is re-fetched
+            equipment = [{'itemId': equipment_id} for equipment_id in equipment_ids]
+
+        refresh = self.refresh(equipment, full=full, deadline=deadline)
+        self.state.save()
+
+        # Machines whose attachments could not be fetched are not judged
+        failed = refresh['failed']
+        report = self.evaluate([item['itemId'] for item in equipment
+                                if item['itemId'] not in failed], today=today)
+        report['unknown'] = sorted(failed)
+        report['refresh'] = refresh
+        report['elapsed'] = time.perf_counter() - started
+        logger.info("Compliance: %d/%d compliant, %d unknown, %d fetched, %d unchanged (%.1fs)",
+                    report['compliant'], report['equipment'], len(failed),
+                    refresh['fetched'], refresh['skipped'], report['elapsed'])
+        return report
+
+    def check(self, equipment_id: str, today: Optional[date] = None) -> Dict:
+        """Check a single equipment item; returns its detail entry"""
+        report = self.run([equipment_id], today=today)
+        if equipment_id in report['refresh']['failed']:
+            return {'equipmentId': equipment_id, 'compliant': None,
+                    'error': report['refresh']['failed'][equipment_id]}
+        if report['details']:
+            return report['details'][0]
+        return {'equipmentId': equipment_id, 'compliant': True,
+                'missing': [], 'expired': [], 'expiring': []}
+
+
+def run_compliance_check(settings: Dict, client: TeamcenterRESTClient, **kwargs) -> Dict:
+    """Entry point for the scheduling.jobs.compliance_check job"""
+    return ComplianceEngine.from_settings(settings, client).run(**kwargs)
+
+
+def main():
+    """Run a fleet compliance check from the command line"""
+    from ..utils.config import load_settings
+    from ..utils.log_pipeline import configure_logging
+
+    parser = argparse.ArgumentParser(description='Check fleet document compliance')
+    parser.add_argument('equipment', nargs='*', help='Equipment IDs (default: whole fleet)')
+    parser.add_argument('--settings', help='Path to settings.yaml')
+    parser.add_argument('--environment', help='Settings environment override to apply')
+    parser.add_argument('--full', action='store_true', help='Re-fetch every machine')
+    parser.add_argument('--date', help='Evaluation date (YYYY-MM-DD, default today)')
+    parser.add_argument('--output', help='Write the report as JSON')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    settings = load_settings(args.settings, args.environment)
+    configure_logging(settings)
+    compliance = (settings.get('epiroc') or {}).get('compliance') or {}
+    client = TeamcenterRESTClient(settings['teamcenter']['base_url'],
+                                  os.getenv('TC_USERNAME'), os.getenv('TC_PASSWORD'),
+                                  pool_size=connection_pool_size(
+                                      settings, compliance.get('max_workers', 16)))
+    today = datetime.strptime(args.date, '%Y-%m-%d').date() if args.date else None
+    try:
+        report = run_compliance_check(settings, client, equipment_ids=args.equipment or None,
+                                      full=args.full, today=today)
+    finally:
+        client.logout()
+
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    print(json.dumps({key: report[key] for key in
+                      ('date', 'equipment', 'compliant', 'non_compliant', 'unknown',
+                       'by_document')},
+                     indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,3 @@
+"""
+Integrations between Teamcenter and external systems
+"""
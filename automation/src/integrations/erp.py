@@ -0,0 +1,522 @@
+"""
+Teamcenter to ERP BOM synchronization
+
+Extracts assembly BOMs through TeamcenterRESTClient, fingerprints each
+assembly from its normalized direct lines and pushes only the assemblies
+whose fingerprint changed since the last run, in batches, to a pluggable
+sink. Fingerprints are checkpointed every few delivered batches and at the
+end of a run, so an interrupted run resumes close to where it stopped and a
+routine run over a mostly unchanged fleet only pays for extraction.
+
+The checkpoint also remembers which assemblies each root contained. An
+assembly that was delivered before but no longer appears under its roots
+is looked up on its own: if it lost all its lines an empty assembly is
+pushed, and if the item is gone a record with 'deleted' set is pushed.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+import requests
+
+from ..client.bom_diff import normalize_line
+from ..client.deadline import Deadline, DeadlineExceeded, OperationCancelled, current_deadline
+from ..client.rest_client import TeamcenterRESTClient
+
+logger = logging.getLogger(__name__)
+
+
+# ==================== Sinks ====================
+
+class ERPSink:
+    """
+    Destination for changed assemblies
+
+    Subclasses implement push(); a push that returns normally counts as
+    delivered, and its assemblies are checkpointed.
+    """
+
+    def push(self, assemblies: List[Dict]):
+        """Deliver one batch of assemblies"""
+        raise NotImplementedError
+
+    def close(self):
+        """Release resources held by the sink"""
+
+
+class HTTPSink(ERPSink):
+    """
+    Posts batches as JSON to an ERP integration endpoint
+
+    Example:
+        sink = HTTPSink('https://sap.epiroc.com/api', system='SAP')
+    """
+
+    def __init__(self, endpoint: str, system: str = 'SAP', path: str = '/bom/batches',
+                 timeout: float = 60, headers: Optional[Dict[str, str]] = None,
+                 session: Optional[requests.Session] = None):
+        """
+        Initialize HTTP sink
+
+        Args:
+            endpoint: Base URL of the ERP integration API
+            system: ERP system name sent with every batch
+            path: Path appended to the endpoint
+            timeout: Request timeout in seconds
+            headers: Extra headers, e.g. an API key
+            session: Session to reuse (a new one is created otherwise)
+        """
+        self.url = endpoint.rstrip('/') + path
+        self.system = system
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self.session.headers.update({'Content-Type': 'application/json'})
+        self.session.headers.update(headers or {})
+
+    def push(self, assemblies: List[Dict]):
+        payload = {
+            'system': self.system,
+            'sent': datetime.now().isoformat(),
+            'assemblies': assemblies
+        }
+        response = self.session.post(self.url, data=json.dumps(payload), timeout=self.timeout)
+        response.raise_for_status()
+
+    def close(self):
+        self.session.close()
+
+
+class FileSink(ERPSink):
+    """
+    Writes each batch to its own JSON file, for testing and offline handover
+    """
+
+    def __init__(self, directory: str, prefix: str = 'bom-sync'):
+        """
+        Initialize file sink
+
+        Args:
+            directory: Output directory (created if needed)
+            prefix: File name prefix
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.prefix = prefix
+        self.run = datetime.now().strftime('%Y%m%d-%H%M%S')
+        self.batches = 0
+
+    def push(self, assemblies: List[Dict]):
+        self.batches += 1
+        path = self.directory / f"{self.prefix}-{self.run}-{self.batches:05d}.json"
+        temporary = path.with_suffix('.tmp')
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump({'assemblies': assemblies}, f, separators=(',', ':'))
+        os.replace(temporary, path)
+
+
+def sink_from_settings(settings: Dict) -> ERPSink:
+    """Build the sink configured under integrations.erp"""
+    config = (settings.get('integrations') or {}).get('erp') or {}
+    kind = config.get('sink', 'http')
+    if kind == 'file':
+        return FileSink(config.get('output_directory', './data/erp_outbox'))
+    if kind == 'http':
+        headers = {}
+        if config.get('api_key') and not str(config['api_key']).startswith('${'):
+            headers['Authorization'] = f"Bearer {config['api_key']}"
+        return HTTPSink(config['endpoint'], system=config.get('system', 'SAP'),
+                        timeout=config.get('timeout', 60), headers=headers)
+    raise ValueError(f"Unknown ERP sink: {kind}")
+
+
+# ==================== Checkpoint ====================
+
+class SyncCheckpoint:
+    """
+    Fingerprints of delivered assemblies, persisted as JSON
+
+    Writes go to a temporary file that replaces the checkpoint atomically,
+    so a crash never leaves a truncated checkpoint behind. Besides the
+    fingerprints it keeps the assembly IDs last seen under each root, which
+    is how assemblies that disappeared are found.
+    """
+
+    def __init__(self, path: Optional[str]):
+        """
+        Load a checkpoint
+
+        Args:
+            path: Checkpoint file (None keeps it in memory only)
+        """
+        self.path = Path(path) if path else None
+        self.fingerprints: Dict[str, str] = {}
+        self.members: Dict[str, List[str]] = {}
+        self.last_run: Optional[Dict] = None
+        if self.path and self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.fingerprints = data.get('fingerprints', {})
+            self.members = data.get('members', {})
+            self.last_run = data.get('last_run')
+
+    def changed(self, assembly_id: str, fingerprint: str) -> bool:
+        """True if the assembly differs from what was last delivered"""
+        return self.fingerprints.get(assembly_id) != fingerprint
+
+    def update(self, fingerprints: Dict[str, str], removed: Iterable[str] = ()):
+        """Record delivered fingerprints and deletions (persisted by the next save())"""
+        self.fingerprints.update(fingerprints)
+        for assembly_id in removed:
+            self.fingerprints.pop(assembly_id, None)
+
+    def save(self, last_run: Optional[Dict] = None):
+        """Write the checkpoint to disk"""
+        if last_run is not None:
+            self.last_run = last_run
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.path.with_suffix(self.path.suffix + '.tmp')
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump({'fingerprints': self.fingerprints, 'members': self.members,
+                       'last_run': self.last_run}, f, separators=(',', ':'))
+        os.replace(temporary, self.path)
+
+
+# ==================== Extraction ====================
+
+def assembly_fingerprint(lines: Iterable[Dict]) -> str:
+    """Hash of an assembly's normalized direct lines, independent of line order"""
+    normalized = sorted(
+        json.dumps(normalize_line(line), sort_keys=True, separators=(',', ':'))
+        for line in lines
+    )
+    digest = hashlib.blake2b(digest_size=16)
+    for line in normalized:
+        digest.update(line.encode('utf-8'))
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+def iter_assemblies(structure: Dict) -> Iterator[Dict]:
+    """
+    Yield every assembly in an expanded BOM with its direct lines
+
+    Shared subassemblies appear once per occurrence in an expansion and
+    are yielded each time; callers deduplicate by assembly ID.
+    """
+    root = structure.get('root') or {}
+    stack = [(root.get('itemId'), root.get('revision'), root.get('name'),
+              structure.get('lines') or [])]
+    while stack:
+        assembly_id, revision, name, lines = stack.pop()
+        direct = []
+        for line in lines:
+            direct.append({key: value for key, value in line.items() if key != 'children'})
+            if line.get('children'):
+                stack.append((line['childId'], None, line.get('childName'), line['children']))
+        yield {'assemblyId': assembly_id, 'revision': revision, 'name': name, 'lines': direct}
+
+
+def _erp_line(line: Dict) -> Dict:
+    normalized = normalize_line(line)
+    return {
+        'position': normalized['position'],
+        'componentId': normalized['childId'],
+        'quantity': normalized['quantity'],
+        'uom': line.get('uom', 'each'),
+        'properties': normalized['properties']
+    }
+
+
+def _not_found(error: Exception) -> bool:
+    response = getattr(error, 'response', None)
+    return response is not None and response.status_code == 404
+
+
+class BOMSyncPipeline:
+    """
+    Pushes changed Teamcenter assemblies to an ERP sink
+
+    Root BOMs are expanded concurrently; as each expansion arrives its
+    assemblies are fingerprinted and the changed ones are queued, and a
+    batch is pushed as soon as it is full, so extraction and delivery
+    overlap.
+
+    Example:
+        pipeline = BOMSyncPipeline(client, FileSink('./erp_outbox'),
+                                   SyncCheckpoint('./data/bom_sync.json'))
+        summary = pipeline.run(['ST1030-0001', 'ST1030-0002'])
+    """
+
+    def __init__(self, client: TeamcenterRESTClient, sink: ERPSink,
+                 checkpoint: Optional[SyncCheckpoint] = None, batch_size: int = 50,
+                 max_workers: int = 8, levels: int = -1, checkpoint_every: int = 20):
+        """
+        Initialize pipeline
+
+        Args:
+            client: Authenticated REST client
+            sink: Destination for changed assemblies
+            checkpoint: Fingerprint store (in-memory if omitted)
+            batch_size: Assemblies per push
+            max_workers: Concurrent BOM expansions
+            levels: Expansion depth per root (-1 for all levels)
+            checkpoint_every: Delivered batches between checkpoint writes;
+                after a crash at most this many batches are pushed again
+        """
+        self.client = client
+        self.sink = sink
+        self.checkpoint = checkpoint or SyncCheckpoint(None)
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.levels = levels
+        self.checkpoint_every = checkpoint_every
+
+    @classmethod
+    def from_settings(cls, settings: Dict, client: TeamcenterRESTClient,
+                      sink: Optional[ERPSink] = None) -> 'BOMSyncPipeline':
+        """Build a pipeline from integrations.erp and scheduling.jobs.bom_sync"""
+        config = (settings.get('integrations') or {}).get('erp') or {}
+        job = ((settings.get('scheduling') or {}).get('jobs') or {}).get('bom_sync') or {}
+        return cls(
+            client,
+            sink or sink_from_settings(settings),
+            SyncCheckpoint(config.get('checkpoint_path')),
+            batch_size=config.get('batch_size', 50),
+            max_workers=job.get('max_workers', 8),
+            levels=job.get('levels', -1),
+            checkpoint_every=config.get('checkpoint_every', 20)
+        )
+
+    def discover_roots(self, query: Optional[Dict] = None, page_size: int = 1000,
+                       deadline: Optional[Deadline] = None) -> List[str]:
+        """Item IDs of top-level assemblies to sync (all mining equipment by default)"""
+        query = dict(query or {'type': 'EPR_MiningEquipment'})
+        roots, page = [], 1
+        while True:
+            results = self.client.search_items(dict(query, page=page, pageSize=page_size),
+                                               deadline=deadline)
+            roots.extend(item['itemId'] for item in results)
+            if len(results) < page_size:
+                return roots
+            page += 1
+
+    def run(self, root_ids: Optional[Sequence[str]] = None, full: bool = False,
+            dry_run: bool = False, deadline: Optional[Deadline] = None) -> Dict:
+        """
+        Sync the given root assemblies (or every discovered root)
+
+        Args:
+            root_ids: Root item IDs; discovered with discover_roots() if omitted
+            full: Push every assembly regardless of the checkpoint
+            dry_run: Fingerprint and report without pushing or checkpointing
+            deadline: Time budget (defaults to the ambient deadline)
+
+        Returns:
+            Run summary with counts, failures and timing
+        """
+        deadline = deadline or current_deadline()
+        started = time.perf_counter()
+        if root_ids is None:
+            root_ids = self.discover_roots(deadline=deadline)
+
+        seen = set()
+        members: Dict[str, set] = {}
+        queued: List[Dict] = []
+        summary = {
+            'started': datetime.now().isoformat(),
+            'roots': len(root_ids),
+            'assemblies': 0,
+            'changed': 0,
+            'unchanged': 0,
+            'emptied': 0,
+            'deleted': 0,
+            'pushed': 0,
+            'batches': 0,
+            'failed_roots': {},
+            'failed_batches': 0,
+            'dry_run': dry_run
+        }
+
+        def flush():
+            batch = queued[:]
+            del queued[:]
+            if dry_run or not batch:
+                return
+            try:
+                self.sink.push(batch)
+            except Exception as e:
+                summary['failed_batches'] += 1
+                logger.error("Pushing %d assemblies failed: %s", len(batch), e)
+                return
+            summary['batches'] += 1
+            summary['pushed'] += len(batch)
+            self.checkpoint.update({a['assemblyId']: a['fingerprint'] for a in batch
+                                    if not a.get('deleted')},
+                                   removed=[a['assemblyId'] for a in batch if a.get('deleted')])
+            if summary['batches'] % self.checkpoint_every == 0:
+                self.checkpoint.save()
+
+        def queue(record: Dict):
+            queued.append(record)
+            if len(queued) >= self.batch_size:
+                flush()
+
+        def consider(assembly: Dict):
+            assembly_id = assembly['assemblyId']
+            seen.add(assembly_id)
+            summary['assemblies'] += 1
+
+            fingerprint = assembly_fingerprint(assembly['lines'])
+            if not full and not self.checkpoint.changed(assembly_id, fingerprint):
+                summary['unchanged'] += 1
+                return
+
+            summary['changed'] += 1
+            if not assembly['lines']:
+                summary['emptied'] += 1
+            queue({
+                'assemblyId': assembly_id,
+                'revision': assembly['revision'],
+                'name': assembly['name'],
+                'fingerprint': fingerprint,
+                'lines': sorted((_erp_line(line) for line in assembly['lines']),
+                                key=lambda line: (line['position'] or 0, line['componentId']))
+            })
+
+        def delivered(assembly_id: str) -> bool:
+            return assembly_id in self.checkpoint.fingerprints
+
+        def expand(root_id: str) -> Dict:
+            if deadline is not None:
+                deadline.check()
+            return self.client.get_bom_structure(root_id, levels=self.levels, deadline=deadline)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix='tc-erp-sync') as executor:
+            futures = {executor.submit(expand, root_id): root_id for root_id in root_ids}
+            try:
+                for future in as_completed(futures):
+                    root_id = futures[future]
+                    try:
+                        structure = future.result()
+                    except (DeadlineExceeded, OperationCancelled):
+                        raise
+                    except Exception as e:
+                        if _not_found(e) and root_id in self.checkpoint.members:
+                            # Deleted root: its assemblies are checked below
+                            members[root_id] = set()
+                            continue
+                        summary['failed_roots'][root_id] = str(e)
+                        logger.error("Extracting BOM of %s failed: %s", root_id, e)
+                        continue
+
+                    members[root_id] = set()
+                    for assembly in iter_assemblies(structure):
+                        assembly_id = assembly['assemblyId']
+                        # Assemblies without lines only matter if ERP still has lines for them
+                        if not assembly['lines'] and not delivered(assembly_id):
+                            continue
+                        members[root_id].add(assembly_id)
+                        if assembly_id not in seen:
+                            consider(assembly)
+
+                # Delivered assemblies that no longer appear under their roots
+                # lost all their lines, were deleted, or moved out of the synced
+                # roots; look each up on its own to tell which
+                missing = sorted({assembly_id for root_id in members
+                                  for assembly_id in self.checkpoint.members.get(root_id, ())
+                                  if assembly_id not in seen and delivered(assembly_id)})
+                for assembly_id in missing:
+                    if deadline is not None:
+                        deadline.check()
+                    try:
+                        structure = self.client.get_bom_structure(assembly_id, levels=1,
+                                                                  deadline=deadline)
+                    except (DeadlineExceeded, OperationCancelled):
+                        raise
+                    except Exception as e:
+                        if not _not_found(e):
+                            # Check it again next run
+                            logger.error("Looking up assembly %s failed: %s", assembly_id, e)
+                            for root_id, previous in self.checkpoint.members.items():
+                                if root_id in members and assembly_id in previous:
+                                    members[root_id].add(assembly_id)
+                            continue
+                        summary['deleted'] += 1
+                        queue({'assemblyId': assembly_id, 'deleted': True, 'lines': []})
+                        continue
+                    if not structure.get('lines'):
+                        root = structure.get('root') or {}
+                        consider({'assemblyId': assembly_id, 'revision': root.get('revision'),
+                                  'name': root.get('name'), 'lines': []})
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+        flush()
+
+        summary['elapsed'] = time.perf_counter() - started
+        if not dry_run:
+            if not summary['failed_batches']:
+                self.checkpoint.members.update(
+                    {root_id: sorted(ids) for root_id, ids in members.items()})
+            self.checkpoint.save(last_run={key: value for key, value in summary.items()
+                                           if key != 'failed_roots'})
+        logger.info("BOM sync: %d of %d assemblies changed, %d deleted, %d pushed in "
+                    "%d batches (%.1fs)", summary['changed'], summary['assemblies'],
+                    summary['deleted'], summary['pushed'], summary['batches'],
+                    summary['elapsed'])
+        return summary
+
+
+def run_bom_sync(settings: Dict, client: TeamcenterRESTClient,
+                 root_ids: Optional[Sequence[str]] = None, **kwargs) -> Dict:
+    """Entry point for the scheduling.jobs.bom_sync job"""
+    pipeline = BOMSyncPipeline.from_settings(settings, client)
+    try:
+        return pipeline.run(root_ids, **kwargs)
+    finally:
+        pipeline.sink.close()
+
+
+def main():
+    """Run a BOM sync from the command line"""
+    from ..utils.config import load_settings
+    from ..utils.log_pipeline import configure_logging
+
+    parser = argparse.ArgumentParser(description='Sync Teamcenter BOMs to ERP')
+    parser.add_argument('roots', nargs='*', help='Root assemblies (default: discover)')
+    parser.add_argument('--settings', help='Path to settings.yaml')
+    parser.add_argument('--environment', help='Settings environment override to apply')
+    parser.add_argument('--full', action='store_true', help='Ignore the checkpoint')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Report changed assemblies without pushing')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    settings = load_settings(args.settings, args.environment)
+    configure_logging(settings)
+    client = TeamcenterRESTClient(settings['teamcenter']['base_url'],
+                                  os.getenv('TC_USERNAME'), os.getenv('TC_PASSWORD'))
+    try:
+        summary = run_bom_sync(settings, client, args.roots or None,
+                               full=args.full, dry_run=args.dry_run)
+    finally:
+        client.logout()
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == '__main__':
+    main()
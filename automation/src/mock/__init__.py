@@ -0,0 +1,16 @@
+"""
+Local mock Teamcenter server for development and load testing
+"""
+
+from .datagen import FleetDataGenerator, load_files
+from .server import MockTeamcenterServer, RouteProfile
+from .store import MockDataStore, MockError
+
+__all__ = [
+    'MockTeamcenterServer',
+    'RouteProfile',
+    'MockDataStore',
+    'MockError',
+    'FleetDataGenerator',
+    'load_files'
+]
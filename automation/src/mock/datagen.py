@@ -0,0 +1,576 @@
+"""
+Seeded synthetic fleet, BOM, dataset and task data for the mock server
+
+Every section draws from its own random stream derived from the seed, so a
+given configuration always produces byte-identical output and sections can
+be generated independently and in any order. Records are streamed, which
+keeps memory flat when writing fleets with millions of BOM lines to disk.
+"""
+
+import argparse
+import json
+import logging
+import math
+import random
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Union
+
+from .store import MockDataStore
+
+logger = logging.getLogger(__name__)
+
+MODELS = {
+    'Underground Loader': [('ST14', 'Battery Electric'), ('ST1030', 'Battery Electric'),
+                           ('ST18', 'Diesel'), ('ST7', 'Battery Electric')],
+    'Surface Drill Rig': [('SmartROC D65', 'Diesel'), ('FlexiROC T45', 'Diesel'),
+                          ('PowerROC D55', 'Diesel')],
+    'Rock Breaker': [('BRP 30', 'Electric Hydraulic'), ('BRP 85', 'Electric Hydraulic')],
+    'Bolting Rig': [('Boltec M', 'Battery Electric'), ('Boltec S', 'Diesel')]
+}
+
+FACILITIES = ['Pitt Meadows', 'Orebro', 'Kalgoorlie', 'Sudbury', 'Garland', 'Santiago']
+
+SUBSYSTEMS = ['Drivetrain', 'Hydraulic', 'Electrical', 'Control', 'Structural',
+              'Cabin', 'Cooling', 'Braking', 'Steering', 'Boom']
+
+PART_CLASSES = ['Fastener', 'Seal', 'Bearing', 'Hose', 'Sensor', 'Connector',
+                'Bracket', 'Valve', 'Filter', 'Cable']
+
+SUPPLIERS = ['Epiroc', 'SKF', 'Parker', 'Bosch Rexroth', 'ABB', 'Danfoss', 'Atlas Copco']
+
+PROCESSES = ['ECN_Process', 'Document_Review', 'Quality_Approval', 'Release_Process']
+
+PRIORITIES = [('Low', 0.4), ('Normal', 0.4), ('Medium', 0.15), ('High', 0.05)]
+
+# (dataset type, extension, relation, median bytes, sigma) for non-compliance documents
+GENERAL_DOCUMENTS = [
+    ('UGMASTER', '.prt', 'IMAN_specification', 8 * 1024 * 1024, 1.0),
+    ('DXF', '.dxf', 'IMAN_specification', 900 * 1024, 0.8),
+    ('MSWordX', '.docx', 'IMAN_reference', 250 * 1024, 0.7),
+    ('PDF', '.pdf', 'IMAN_reference', 1200 * 1024, 0.9)
+]
+
+DEFAULT_REQUIRED_DOCUMENTS = [
+    {'type': 'MSHA_Certification', 'validity_days': 365},
+    {'type': 'CE_Declaration', 'validity_days': 730},
+    {'type': 'Electrical_Safety_Test', 'validity_days': 180},
+    {'type': 'Pressure_Vessel_Cert', 'validity_days': 365},
+    {'type': 'Battery_Safety_Report', 'validity_days': 90}
+]
+
+SECTIONS = ('items', 'bom_lines', 'datasets', 'tasks')
+
+# Shared source for materialized dataset content
+_CONTENT_BLOCK = bytes(range(256)) * 4096
+
+
+class FleetDataGenerator:
+    """
+    Deterministic generator for large synthetic Teamcenter data sets
+
+    The fleet is a set of equipment items whose BOMs are ``depth`` levels
+    deep. Each level below the equipment draws its children from a pool of
+    subassemblies (or leaf parts at the last level); ``shared_ratio``
+    shrinks that pool so the same subassembly is reused under many parents,
+    as in a real product line. With a ratio of 0 every BOM is a plain tree.
+
+    Example:
+        generator = FleetDataGenerator(seed=7, equipment_count=5000,
+                                       fanout=8, depth=4)
+        manifest = generator.write_files('./data/fleet')
+
+        server = MockTeamcenterServer()
+        generator.load_into(server)
+    """
+
+    def __init__(self, seed: int = 42, equipment_count: int = 1000,
+                 fanout: int = 8, fanout_jitter: int = 2, depth: int = 3,
+                 shared_ratio: float = 0.5,
+                 equipment_types: Optional[Sequence[str]] = None,
+                 required_documents: Optional[Sequence[Dict]] = None,
+                 document_coverage: float = 0.85,
+                 general_documents: int = 2,
+                 users: int = 10, tasks_per_user: int = 25,
+                 reference_date: Optional[str] = None,
+                 property_prefix: str = 'epr_',
+                 content_limit: int = 0):
+        """
+        Initialize generator
+
+        Args:
+            seed: Seed for every random stream
+            equipment_count: Number of top-level equipment items
+            fanout: Average number of children per assembly
+            fanout_jitter: Maximum deviation from the fanout per assembly
+            depth: BOM levels below the equipment item
+            shared_ratio: Fraction of child slots filled by reused items (0-1)
+            equipment_types: Equipment types to draw from
+            required_documents: Compliance documents with 'type' and 'validity_days'
+            document_coverage: Probability that a required document is present
+            general_documents: Maximum CAD and office documents per equipment
+            users: Number of users owning workflow tasks
+            tasks_per_user: Pending tasks per user
+            reference_date: ISO date the fleet's document ages are relative to
+            property_prefix: Prefix for custom properties
+            content_limit: Bytes of file content materialized per dataset when
+                loading into a store (0 keeps datasets metadata-only)
+        """
+        if equipment_count < 1:
+            raise ValueError("equipment_count must be at least 1")
+        if fanout < 1 or depth < 0:
+            raise ValueError("fanout must be at least 1 and depth non-negative")
+        if not 0 <= shared_ratio < 1:
+            raise ValueError("shared_ratio must be in [0, 1)")
+
+        self.seed = seed
+        self.equipment_count = equipment_count
+        self.fanout = fanout
+        self.fanout_jitter = max(0, min(fanout_jitter, fanout - 1))
+        self.depth = depth
+        self.shared_ratio = shared_ratio
+        self.equipment_types = list(equipment_types or MODELS)
+        self.required_documents = list(required_documents or DEFAULT_REQUIRED_DOCUMENTS)
+        self.document_coverage = document_coverage
+        self.general_documents = general_documents
+        self.users = users
+        self.tasks_per_user = tasks_per_user
+        self.reference_date = datetime.fromisoformat(reference_date or '2025-01-01')
+        self.prefix = property_prefix
+        self.content_limit = content_limit
+        self.level_sizes = self._level_sizes()
+
+    @classmethod
+    def from_settings(cls, settings: Dict, **overrides) -> 'FleetDataGenerator':
+        """
+        Build a generator from settings
+
+        Reads development.data_generator, plus the equipment types,
+        property prefix and required compliance documents from 'epiroc'.
+        """
+        epiroc = settings.get('epiroc') or {}
+        config = dict((settings.get('development') or {}).get('data_generator') or {})
+        config.setdefault('equipment_types', epiroc.get('equipment_types'))
+        config.setdefault('property_prefix', epiroc.get('property_prefix', 'epr_'))
+        config.setdefault('required_documents',
+                          (epiroc.get('compliance') or {}).get('required_documents'))
+        config.update(overrides)
+        return cls(**config)
+
+    # ==================== Shape ====================
+
+    def _rng(self, *section) -> random.Random:
+        """Independent random stream for one section of the output"""
+        return random.Random(':'.join(str(part) for part in (self.seed,) + section))
+
+    def _child_counts(self, level: int, parents: int) -> Iterator[int]:
+        """Number of children of each assembly at a level"""
+        rng = self._rng('fanout', level)
+        for _ in range(parents):
+            yield self.fanout + rng.randint(-self.fanout_jitter, self.fanout_jitter)
+
+    def _level_sizes(self) -> List[int]:
+        """Number of distinct items at each BOM level, equipment first"""
+        sizes = [self.equipment_count]
+        max_children = self.fanout + self.fanout_jitter
+        for level in range(self.depth):
+            if self.shared_ratio == 0:
+                sizes.append(sum(self._child_counts(level, sizes[-1])))
+            else:
+                slots = sizes[-1] * self.fanout
+                sizes.append(max(max_children, math.ceil(slots * (1 - self.shared_ratio))))
+        return sizes
+
+    def item_id(self, level: int, index: int) -> str:
+        """ID of the index-th item at a BOM level"""
+        if level == 0:
+            return f"EQ-{index:06d}"
+        if level == self.depth:
+            return f"PRT-{index:07d}"
+        return f"ASM-{level}-{index:07d}"
+
+    def stored_line_count(self) -> int:
+        """Number of BOM lines stored across all assemblies (expected value)"""
+        if self.shared_ratio == 0:
+            return sum(self.level_sizes[1:])
+        return sum(size * self.fanout for size in self.level_sizes[:-1])
+
+    # ==================== Items ====================
+
+    def iter_items(self) -> Iterator[Dict]:
+        """Yield equipment items followed by subassemblies and parts, level by level"""
+        p = self.prefix
+        rng = self._rng('items', 0)
+        for index in range(self.equipment_count):
+            equipment_type = self.equipment_types[index % len(self.equipment_types)]
+            model, power = rng.choice(MODELS.get(equipment_type) or [('Generic', 'Diesel')])
+            commissioned = self.reference_date - timedelta(days=rng.randint(30, 3650))
+            yield {
+                'itemId': self.item_id(0, index),
+                'name': f"{model} {equipment_type} #{index:06d}",
+                'description': f"{power} {equipment_type.lower()}",
+                'type': 'EPR_MiningEquipment',
+                'properties': {
+                    f'{p}equipment_type': equipment_type,
+                    f'{p}model': model,
+                    f'{p}power_type': power,
+                    f'{p}serial_number': f"{model.replace(' ', '')[:6].upper()}-{index:06d}",
+                    f'{p}facility': rng.choice(FACILITIES),
+                    f'{p}commissioned': commissioned.date().isoformat(),
+                    f'{p}operating_hours': str(rng.randint(0, 40000))
+                }
+            }
+
+        for level in range(1, self.depth + 1):
+            rng = self._rng('items', level)
+            leaf = level == self.depth
+            for index in range(self.level_sizes[level]):
+                if leaf:
+                    part_class = rng.choice(PART_CLASSES)
+                    name = f"{part_class} {index:07d}"
+                    item_type = 'EPR_Component'
+                else:
+                    part_class = rng.choice(SUBSYSTEMS)
+                    name = f"{part_class} Assembly L{level}-{index:07d}"
+                    item_type = 'EPR_Assembly'
+                yield {
+                    'itemId': self.item_id(level, index),
+                    'name': name,
+                    'type': item_type,
+                    'properties': {
+                        f'{p}part_class': part_class,
+                        f'{p}supplier': rng.choice(SUPPLIERS),
+                        f'{p}weight_kg': f"{rng.lognormvariate(1.5 + 2.0 / level, 1.0):.2f}",
+                        f'{p}critical_component': str(rng.random() < 0.15)
+                    }
+                }
+
+    # ==================== BOM Lines ====================
+
+    def _level_lines(self, level: int) -> Iterator[Dict]:
+        """Yield the BOM lines of every assembly at one level"""
+        rng = self._rng('bom', level)
+        pool = self.level_sizes[level + 1]
+        cursor = 0
+        counts = self._child_counts(level, self.level_sizes[level])
+        for parent, count in enumerate(counts):
+            if self.shared_ratio == 0:
+                children = range(cursor, cursor + count)
+                cursor += count
+            else:
+                children = rng.sample(range(pool), count)
+
+            parent_id = self.item_id(level, parent)
+            for position, child in enumerate(children, 1):
+                quantity = 1 if rng.random() < 0.7 else rng.randint(2, 12)
+                yield {
+                    'lineId': f"{parent_id}-{position * 10:04d}",
+                    'parentId': parent_id,
+                    'childId': self.item_id(level + 1, child),
+                    'quantity': quantity,
+                    'uom': 'each',
+                    'findNumber': position * 10,
+                    'properties': {
+                        f'{self.prefix}position_number': str(position),
+                        f'{self.prefix}critical_component': str(rng.random() < 0.1)
+                    }
+                }
+
+    def iter_bom_lines(self) -> Iterator[Dict]:
+        """Yield BOM lines top-down, one level at a time"""
+        for level in range(self.depth):
+            yield from self._level_lines(level)
+
+    def expanded_line_counts(self) -> List[int]:
+        """
+        Lines in the fully expanded BOM of each equipment item
+
+        Shared subassemblies are counted once per occurrence, which is what
+        a multi-level BOM expansion returns.
+        """
+        below = [0] * self.level_sizes[self.depth]
+        for level in range(self.depth - 1, -1, -1):
+            counts = [0] * self.level_sizes[level]
+            for line in self._level_lines(level):
+                parent = int(line['parentId'].rsplit('-', 1)[1])
+                child = int(line['childId'].rsplit('-', 1)[1])
+                counts[parent] += 1 + below[child]
+            below = counts
+        return below
+
+    # ==================== Datasets ====================
+
+    def _content(self, size: int) -> bytes:
+        size = min(size, self.content_limit)
+        if size <= 0:
+            return b''
+        repeats = size // len(_CONTENT_BLOCK) + 1
+        return (_CONTENT_BLOCK * repeats)[:size] if repeats > 1 else _CONTENT_BLOCK[:size]
+
+    def iter_datasets(self) -> Iterator[Dict]:
+        """
+        Yield datasets attached to equipment items
+
+        Compliance documents get 'created' dates spread over up to 1.25x their
+        validity period, so a fleet always contains valid, expiring-soon and
+        expired documents alongside missing ones.
+        """
+        p = self.prefix
+        rng = self._rng('datasets')
+        number = 0
+        for index in range(self.equipment_count):
+            equipment_id = self.item_id(0, index)
+
+            for document in self.required_documents:
+                if rng.random() >= self.document_coverage:
+                    continue
+                validity = int(document.get('validity_days', 365))
+                created = self.reference_date - timedelta(
+                    days=rng.uniform(0, validity * 1.25)
+                )
+                number += 1
+                doc_type = document['type']
+                yield {
+                    'datasetId': f"DS-{number:09d}",
+                    'itemId': equipment_id,
+                    'name': f"{doc_type} {equipment_id}",
+                    'type': 'PDF',
+                    'fileName': f"{doc_type}_{equipment_id}.pdf",
+                    'fileSize': int(rng.lognormvariate(math.log(400 * 1024), 0.6)),
+                    'relationType': 'IMAN_reference',
+                    'created': created.replace(microsecond=0).isoformat(),
+                    'properties': {
+                        f'{p}document_type': doc_type,
+                        f'{p}valid_until': (created + timedelta(days=validity)).date().isoformat()
+                    }
+                }
+
+            for _ in range(rng.randint(0, self.general_documents)):
+                dataset_type, extension, relation, median, sigma = rng.choice(GENERAL_DOCUMENTS)
+                created = self.reference_date - timedelta(days=rng.uniform(0, 1500))
+                number += 1
+                yield {
+                    'datasetId': f"DS-{number:09d}",
+                    'itemId': equipment_id,
+                    'name': f"{equipment_id} {dataset_type} {number}",
+                    'type': dataset_type,
+                    'fileName': f"{equipment_id}_{number}{extension}",
+                    'fileSize': int(rng.lognormvariate(math.log(median), sigma)),
+                    'relationType': relation,
+                    'created': created.replace(microsecond=0).isoformat(),
+                    'properties': {f'{p}document_type': dataset_type}
+                }
+
+    # ==================== Tasks ====================
+
+    def user_names(self) -> List[str]:
+        """Users that own generated tasks"""
+        return [f"user{number:03d}" for number in range(1, self.users + 1)]
+
+    def iter_tasks(self) -> Iterator[Dict]:
+        """Yield pending workflow tasks, tasks_per_user for every user"""
+        rng = self._rng('tasks')
+        priorities, weights = zip(*PRIORITIES)
+        number = 0
+        for user in self.user_names():
+            for _ in range(self.tasks_per_user):
+                number += 1
+                process = rng.choice(PROCESSES)
+                targets = [self.item_id(0, rng.randrange(self.equipment_count))
+                           for _ in range(rng.choice((1, 1, 1, 2, 3)))]
+                created = self.reference_date - timedelta(minutes=rng.randint(0, 14 * 24 * 60))
+                yield {
+                    'taskId': f"TASK-{number:08d}",
+                    'workflowId': f"WF-{number:08d}",
+                    'processName': process,
+                    'name': f"Review {process}",
+                    'description': f"Synthetic {process} task {number}",
+                    'priority': rng.choices(priorities, weights)[0],
+                    'status': 'Pending',
+                    'assignedTo': user,
+                    'created': created.isoformat(),
+                    'targets': targets,
+                    'properties': {'change_description': f"Synthetic change {number}"}
+                }
+
+    # ==================== Output ====================
+
+    def iter_section(self, section: str) -> Iterator[Dict]:
+        """Yield the records of one section by name"""
+        if section not in SECTIONS:
+            raise ValueError(f"Unknown section: {section}")
+        return getattr(self, f"iter_{section}")()
+
+    def config(self) -> Dict:
+        """Generator parameters, recorded in the manifest"""
+        return {
+            'seed': self.seed,
+            'equipment_count': self.equipment_count,
+            'fanout': self.fanout,
+            'fanout_jitter': self.fanout_jitter,
+            'depth': self.depth,
+            'shared_ratio': self.shared_ratio,
+            'equipment_types': self.equipment_types,
+            'required_documents': self.required_documents,
+            'document_coverage': self.document_coverage,
+            'general_documents': self.general_documents,
+            'users': self.users,
+            'tasks_per_user': self.tasks_per_user,
+            'reference_date': self.reference_date.date().isoformat(),
+            'property_prefix': self.prefix
+        }
+
+    def write_files(self, output_dir: Union[str, Path],
+                    sections: Sequence[str] = SECTIONS,
+                    expanded_counts: bool = False) -> Dict:
+        """
+        Write sections as JSON Lines files plus a manifest.json
+
+        Args:
+            output_dir: Target directory (created if needed)
+            sections: Sections to write
+            expanded_counts: Also record expanded BOM line totals (a second
+                pass over the BOM lines)
+
+        Returns:
+            Manifest with record counts per file
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        manifest = {'generator': self.config(), 'files': {}}
+
+        for section in sections:
+            started = time.perf_counter()
+            path = output_dir / f"{section}.jsonl"
+            count = 0
+            with open(path, 'w', encoding='utf-8') as f:
+                for record in self.iter_section(section):
+                    f.write(json.dumps(record, separators=(',', ':')))
+                    f.write('\n')
+                    count += 1
+            manifest['files'][section] = {'path': path.name, 'records': count}
+            logger.info("Wrote %d %s to %s in %.1fs",
+                        count, section, path, time.perf_counter() - started)
+
+        if expanded_counts:
+            counts = self.expanded_line_counts()
+            manifest['expanded_bom_lines'] = {
+                'total': sum(counts),
+                'max_per_equipment': max(counts) if counts else 0
+            }
+
+        with open(output_dir / 'manifest.json', 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        return manifest
+
+    def load_into(self, target, sections: Sequence[str] = SECTIONS) -> Dict[str, int]:
+        """
+        Load generated data into a MockDataStore or MockTeamcenterServer
+
+        Returns:
+            Record counts per section
+        """
+        return load_records(target, {section: self.iter_section(section)
+                                     for section in sections},
+                            content=self._content if self.content_limit else None)
+
+
+def load_records(target, sections: Dict[str, Iterator[Dict]],
+                 content=None) -> Dict[str, int]:
+    """
+    Bulk-load section records into a store or mock server
+
+    Args:
+        target: MockDataStore, or anything with a 'store' attribute
+        sections: Mapping of section name to records, loaded in SECTIONS order
+        content: Optional callable returning file content for a dataset size
+
+    Returns:
+        Record counts per section
+    """
+    store: MockDataStore = getattr(target, 'store', target)
+    counts = {}
+
+    def counted(section, records):
+        counts[section] = 0
+        for record in records:
+            counts[section] += 1
+            if section == 'datasets' and content is not None:
+                record = dict(record, content=content(record.get('fileSize', 0)))
+            yield record
+
+    loaders = {
+        'items': store.load_items,
+        'bom_lines': store.load_bom_lines,
+        'datasets': store.load_datasets,
+        'tasks': store.load_tasks
+    }
+    for section in SECTIONS:
+        if section in sections:
+            started = time.perf_counter()
+            loaders[section](counted(section, sections[section]))
+            logger.info("Loaded %d %s in %.1fs",
+                        counts[section], section, time.perf_counter() - started)
+    return counts
+
+
+def load_files(target, input_dir: Union[str, Path]) -> Dict[str, int]:
+    """
+    Load a directory written by FleetDataGenerator.write_files()
+
+    Returns:
+        Record counts per section
+    """
+    input_dir = Path(input_dir)
+
+    def read(path: Path) -> Iterator[Dict]:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    sections = {section: read(input_dir / f"{section}.jsonl")
+                for section in SECTIONS if (input_dir / f"{section}.jsonl").exists()}
+    return load_records(target, sections)
+
+
+def main():
+    """Generate a synthetic fleet from the command line"""
+    from ..utils.config import load_settings
+
+    parser = argparse.ArgumentParser(description='Generate synthetic Teamcenter fleet data')
+    parser.add_argument('output', help='Output directory for the JSON Lines files')
+    parser.add_argument('--settings', help='Path to settings.yaml')
+    parser.add_argument('--seed', type=int, help='Random seed')
+    parser.add_argument('--equipment', type=int, dest='equipment_count',
+                        help='Number of equipment items')
+    parser.add_argument('--fanout', type=int, help='Average children per assembly')
+    parser.add_argument('--depth', type=int, help='BOM levels below the equipment')
+    parser.add_argument('--shared-ratio', type=float, dest='shared_ratio',
+                        help='Fraction of reused subassemblies (0-1)')
+    parser.add_argument('--users', type=int, help='Users owning workflow tasks')
+    parser.add_argument('--tasks-per-user', type=int, dest='tasks_per_user',
+                        help='Pending tasks per user')
+    parser.add_argument('--sections', nargs='+', choices=SECTIONS, default=list(SECTIONS),
+                        help='Sections to write')
+    parser.add_argument('--expanded-counts', action='store_true',
+                        help='Record expanded BOM line totals in the manifest')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    overrides = {key: value for key, value in vars(args).items()
+                 if key in ('seed', 'equipment_count', 'fanout', 'depth', 'shared_ratio',
+                            'users', 'tasks_per_user') and value is not None}
+    generator = FleetDataGenerator.from_settings(load_settings(args.settings), **overrides)
+    logger.info("Level sizes: %s, ~%d stored BOM lines",
+                generator.level_sizes, generator.stored_line_count())
+
+    manifest = generator.write_files(args.output, args.sections, args.expanded_counts)
+    print(json.dumps(manifest['files'], indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,692 @@
+"""
+Localhost mock Teamcenter server with latency and failure injection
+"""
+
+import argparse
+import email
+import gzip
+import hashlib
+import json
+import logging
+import math
+import random
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from .store import MockDataStore, MockError
+
+logger = logging.getLogger(__name__)
+
+
+class RouteProfile:
+    """
+    Latency and failure behaviour for one mock route
+
+    Supported latency distributions:
+        fixed       - always mean_ms
+        uniform     - between min_ms and max_ms
+        normal      - mean_ms +/- stddev_ms, clipped at min_ms
+        lognormal   - long-tailed with the given mean_ms and stddev_ms
+        exponential - mean_ms on average
+    """
+
+    DISTRIBUTIONS = ('fixed', 'uniform', 'normal', 'lognormal', 'exponential')
+
+    def __init__(self, latency: str = 'fixed', mean_ms: float = 0.0,
+                 stddev_ms: float = 0.0, min_ms: float = 0.0,
+                 max_ms: Optional[float] = None, error_rate: float = 0.0,
+                 error_status: int = 500, throttle_rate: float = 0.0,
+                 retry_after: float = 1.0, padding_bytes: int = 0):
+        """
+        Initialize route profile
+
+        Args:
+            latency: Latency distribution name
+            mean_ms: Mean latency in milliseconds
+            stddev_ms: Standard deviation in milliseconds
+            min_ms: Minimum latency in milliseconds
+            max_ms: Maximum latency in milliseconds (optional)
+            error_rate: Fraction of requests failing with error_status
+            error_status: HTTP status returned for injected errors
+            throttle_rate: Fraction of requests rejected with 429
+            retry_after: Retry-After seconds sent with 429 responses
+            padding_bytes: Filler bytes added to JSON object responses
+        """
+        if latency not in self.DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {latency}")
+
+        self.latency = latency
+        self.mean_ms = mean_ms
+        self.stddev_ms = stddev_ms
+        self.min_ms = min_ms
+        self.max_ms = max_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.padding_bytes = padding_bytes
+
+    @classmethod
+    def from_dict(cls, data: Dict, base: Optional['RouteProfile'] = None) -> 'RouteProfile':
+        """Build a profile from a settings mapping, inheriting unset values from base"""
+        values = dict(vars(base)) if base is not None else {}
+        values.update(data or {})
+        return cls(**values)
+
+    def sample_latency(self, rng: random.Random) -> float:
+        """Draw one latency in seconds"""
+        if self.latency == 'fixed':
+            value = self.mean_ms
+        elif self.latency == 'uniform':
+            value = rng.uniform(self.min_ms, self.max_ms if self.max_ms is not None else self.mean_ms * 2)
+        elif self.latency == 'normal':
+            value = rng.gauss(self.mean_ms, self.stddev_ms)
+        elif self.latency == 'lognormal':
+            if self.mean_ms <= 0:
+                value = 0.0
+            else:
+                sigma2 = math.log(1 + (self.stddev_ms / self.mean_ms) ** 2)
+                mu = math.log(self.mean_ms) - sigma2 / 2
+                value = rng.lognormvariate(mu, math.sqrt(sigma2))
+        else:
+            value = rng.expovariate(1.0 / self.mean_ms) if self.mean_ms > 0 else 0.0
+
+        value = max(self.min_ms, value)
+        if self.max_ms is not None:
+            value = min(self.max_ms, value)
+        return value / 1000.0
+
+
+# (method, path pattern, route name, handler)
+ROUTES = [
+    ('POST', r'/restful/auth/login', 'auth.login', '_login'),
+    ('POST', r'/restful/auth/logout', 'auth.logout', '_logout'),
+    ('POST', r'/restful/items/search', 'items.search', '_search_items'),
+    ('POST', r'/restful/items', 'items.create', '_create_item'),
+    ('GET', r'/restful/items/(?P<item_id>[^/]+)', 'items.get', '_get_item'),
+    ('GET', r'/restful/items/(?P<item_id>[^/]+)/datasets', 'items.datasets', '_item_datasets'),
+    ('PUT', r'/restful/items/(?P<item_id>[^/]+)', 'items.update', '_update_item'),
+    ('DELETE', r'/restful/items/(?P<item_id>[^/]+)', 'items.delete', '_delete_item'),
+    ('GET', r'/restful/bom/(?P<item_id>[^/]+)/structure', 'bom.structure', '_bom_structure'),
+    ('POST', r'/restful/bom/(?P<item_id>[^/]+)/lines', 'bom.add_line', '_add_bom_line'),
+    ('PUT', r'/restful/bom/(?P<item_id>[^/]+)/lines/(?P<line_id>[^/]+)', 'bom.update_line',
+     '_update_bom_line'),
+    ('DELETE', r'/restful/bom/(?P<item_id>[^/]+)/lines/(?P<line_id>[^/]+)', 'bom.remove_line',
+     '_remove_bom_line'),
+    ('GET', r'/restful/bom/(?P<item_id>[^/]+)/where-used', 'bom.where_used', '_where_used'),
+    ('POST', r'/restful/workflows/start', 'workflows.start', '_start_workflow'),
+    ('GET', r'/restful/workflows/my-tasks', 'workflows.my_tasks', '_my_tasks'),
+    ('POST', r'/restful/workflows/tasks/(?P<task_id>[^/]+)/complete', 'workflows.complete_task',
+     '_complete_task'),
+    ('POST', r'/restful/documents/upload', 'documents.upload', '_upload'),
+    ('GET', r'/restful/documents/(?P<dataset_id>[^/]+)/download', 'documents.download',
+     '_download'),
+    ('POST', r'/restful/query/execute', 'query.execute', '_execute_query'),
+    ('GET', r'/restful/info', 'info', '_info'),
+    ('POST', r'/erp/bom/batches', 'erp.bom_batches', '_erp_bom_batches'),
+    ('POST', r'/services/Core-2006-03-DataManagement/createItems', 'soa.create_items',
+     '_soa_create_items'),
+    ('POST', r'/services/Core-2006-03-DataManagement/getProperties', 'soa.get_properties',
+     '_soa_get_properties'),
+    ('POST', r'/services/Cad-2007-01-StructureManagement/expandPSAllLevels', 'soa.expand_bom',
+     '_soa_expand_bom'),
+]
+
+PUBLIC_ROUTES = {'auth.login', 'info', 'erp.bom_batches'}
+
+# Routes that return an ETag and honour If-None-Match
+CONDITIONAL_ROUTES = {'workflows.my_tasks'}
+
+
+class MockRequest:
+    """Parsed request passed to route handlers"""
+
+    def __init__(self, method: str, path: str, params: Dict, headers, body: bytes,
+                 match: Dict[str, str], user: Optional[str], token: Optional[str]):
+        self.method = method
+        self.path = path
+        self.params = params
+        self.headers = headers
+        self.body = body
+        self.match = match
+        self.user = user
+        self.token = token
+
+    def json(self) -> Any:
+        return json.loads(self.body) if self.body else {}
+
+
+class MockTeamcenterServer:
+    """
+    In-process HTTP stand-in for the Teamcenter REST API
+
+    Implements every /restful route used by TeamcenterRESTClient on top of
+    a MockDataStore, with configurable per-route latency distributions,
+    error rates, 429 throttling and payload padding.
+
+    Example:
+        with MockTeamcenterServer(profiles={'*': RouteProfile('lognormal', 20, 10)}) as server:
+            client = TeamcenterRESTClient(server.base_url, 'demo', 'demo')
+            client.get_item('BUCKET-10T')
+    """
+
+    def __init__(self, store: Optional[MockDataStore] = None,
+                 profiles: Optional[Dict[str, RouteProfile]] = None,
+                 host: str = '127.0.0.1', port: int = 0, seed: Optional[int] = None,
+                 rate_limit_per_second: Optional[float] = None,
+                 rate_limit_burst: Optional[int] = None, require_auth: bool = True,
+                 compress_responses: bool = False, compress_min_bytes: int = 1024):
+        """
+        Initialize mock server
+
+        Args:
+            store: Data store to serve (defaults to an empty store)
+            profiles: Route profiles keyed by route name, '*' for the default
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+            seed: Seed for latency and failure injection
+            rate_limit_per_second: Server-wide request rate before 429s (optional)
+            rate_limit_burst: Burst size for the rate limit
+            require_auth: Reject requests without a valid session token
+            compress_responses: Gzip responses of compress_min_bytes or more
+                for clients that accept gzip
+            compress_min_bytes: Smallest response body that is compressed
+        """
+        self.store = store if store is not None else MockDataStore()
+        self.profiles = dict(profiles or {})
+        self.host = host
+        self.port = port
+        self.require_auth = require_auth
+        self.compress_responses = compress_responses
+        self.compress_min_bytes = compress_min_bytes
+        self.rate_limit_per_second = rate_limit_per_second
+        self.rate_limit_burst = rate_limit_burst or max(1, int(rate_limit_per_second or 1))
+
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self.erp_batches: List[Dict] = []
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._bucket_tokens = float(self.rate_limit_burst)
+        self._bucket_updated = time.monotonic()
+        self._bucket_lock = threading.Lock()
+        self._routes = [(method, re.compile(f'^{pattern}$'), name, getattr(self, handler))
+                        for method, pattern, name, handler in ROUTES]
+        self._httpd = None
+        self._thread = None
+
+    @classmethod
+    def from_settings(cls, settings: Dict, store: Optional[MockDataStore] = None,
+                      **overrides) -> 'MockTeamcenterServer':
+        """
+        Build a mock server from the development.mock_server settings section
+
+        Args:
+            settings: Settings loaded with load_settings()
+            store: Data store to serve (defaults to a store with sample data)
+            **overrides: Constructor arguments taking precedence over settings
+        """
+        config = (settings.get('development') or {}).get('mock_server') or {}
+        routes = config.get('routes') or {}
+
+        default = RouteProfile.from_dict(routes.get('*') or {})
+        profiles = {'*': default}
+        for name, data in routes.items():
+            if name != '*':
+                profiles[name] = RouteProfile.from_dict(data, base=default)
+
+        if store is None:
+            store = MockDataStore(
+                property_prefix=(settings.get('epiroc') or {}).get('property_prefix', 'epr_')
+            )
+            if config.get('sample_data', True):
+                store.load_sample_data()
+
+        kwargs = {
+            'store': store,
+            'profiles': profiles,
+            'host': config.get('host', '127.0.0.1'),
+            'port': config.get('port', 0),
+            'seed': config.get('seed'),
+            'rate_limit_per_second': config.get('rate_limit_per_second'),
+            'rate_limit_burst': config.get('rate_limit_burst'),
+            'compress_responses': config.get('compress_responses', False),
+            'compress_min_bytes': config.get('compress_min_bytes', 1024)
+        }
+        kwargs.update(overrides)
+        return cls(**kwargs)
+
+    @property
+    def base_url(self) -> str:
+        """Base URL clients should use"""
+        return f"http://{self.host}:{self.port}/tc"
+
+    def profile_for(self, route: str) -> RouteProfile:
+        """Return the effective profile for a route"""
+        return self.profiles.get(route) or self.profiles.get('*') or RouteProfile()
+
+    # ==================== Lifecycle ====================
+
+    def start(self) -> 'MockTeamcenterServer':
+        """Start serving in a background thread"""
+        server = self
+
+        class Handler(_MockHandler):
+            mock = server
+
+        self._httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever,
+                                        name='tc-mock-server', daemon=True)
+        self._thread.start()
+        logger.info("Mock Teamcenter server listening on %s", self.base_url)
+        return self
+
+    def stop(self):
+        """Stop serving"""
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._thread.join()
+            self._httpd = None
+            logger.info("Mock Teamcenter server stopped")
+
+    def serve_forever(self):
+        """Start the server and block until interrupted"""
+        self.start()
+        try:
+            self._thread.join()
+        except KeyboardInterrupt:
+            self.stop()
+
+    def __enter__(self) -> 'MockTeamcenterServer':
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    # ==================== Dispatch ====================
+
+    def _random(self) -> float:
+        with self._rng_lock:
+            return self._rng.random()
+
+    def _latency(self, profile: RouteProfile) -> float:
+        with self._rng_lock:
+            return profile.sample_latency(self._rng)
+
+    def _take_rate_token(self) -> bool:
+        if not self.rate_limit_per_second:
+            return True
+        with self._bucket_lock:
+            now = time.monotonic()
+            self._bucket_tokens = min(
+                self.rate_limit_burst,
+                self._bucket_tokens + (now - self._bucket_updated) * self.rate_limit_per_second
+            )
+            self._bucket_updated = now
+            if self._bucket_tokens < 1:
+                return False
+            self._bucket_tokens -= 1
+            return True
+
+    def _count(self, route: str, outcome: str):
+        with self._bucket_lock:
+            counters = self.stats.setdefault(route, {})
+            counters[outcome] = counters.get(outcome, 0) + 1
+
+    def handle(self, method: str, target: str, headers, body: bytes) -> Tuple[int, Dict, Any]:
+        """
+        Route one request through failure injection and the data store
+
+        Returns:
+            Tuple of (status, extra headers, payload)
+        """
+        parts = urlsplit(target)
+        path = parts.path
+        if path.startswith('/tc/'):
+            path = path[3:]
+        params = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+
+        for route_method, pattern, name, handler in self._routes:
+            match = pattern.match(path)
+            if match and route_method == method:
+                break
+        else:
+            return 404, {}, _error('ROUTE_NOT_FOUND', f"No route for {method} {path}")
+
+        profile = self.profile_for(name)
+        self._count(name, 'requests')
+
+        if not self._take_rate_token() or self._random() < profile.throttle_rate:
+            self._count(name, 'throttled')
+            return 429, {'Retry-After': str(profile.retry_after)}, \
+                _error('RATE_LIMIT_EXCEEDED', 'Too many requests')
+
+        delay = self._latency(profile)
+        if delay > 0:
+            time.sleep(delay)
+
+        if self._random() < profile.error_rate:
+            self._count(name, 'injected_errors')
+            return profile.error_status, {}, _error('INJECTED_FAILURE', 'Injected server error')
+
+        authorization = headers.get('Authorization') or ''
+        token = authorization[7:] if authorization.startswith('Bearer ') else None
+        user = self.store.user_for(token)
+        if self.require_auth and name not in PUBLIC_ROUTES and user is None:
+            self._count(name, 'unauthorized')
+            return 401, {}, _error('AUTH_FAILED', 'Invalid or missing token')
+
+        request = MockRequest(method, path, params, headers, body,
+                              {key: unquote(value) for key, value in match.groupdict().items()},
+                              user or 'anonymous', token)
+        try:
+            status, payload = handler(request)
+        except MockError as e:
+            self._count(name, 'errors')
+            return e.status, {}, _error(e.code, e.message)
+        except (ValueError, KeyError) as e:
+            self._count(name, 'errors')
+            return 400, {}, _error('BAD_REQUEST', str(e))
+
+        extra_headers = {}
+        if name in CONDITIONAL_ROUTES and status == 200:
+            etag = '"' + hashlib.blake2b(json.dumps(payload, sort_keys=True).encode('utf-8'),
+                                         digest_size=12).hexdigest() + '"'
+            if headers.get('If-None-Match') == etag:
+                self._count(name, 'not_modified')
+                return 304, {'ETag': etag}, b''
+            extra_headers['ETag'] = etag
+
+        if profile.padding_bytes and isinstance(payload, dict):
+            payload = dict(payload, _padding='x' * profile.padding_bytes)
+        return status, extra_headers, payload
+
+    # ==================== Route Handlers ====================
+
+    def _login(self, request: MockRequest):
+        data = request.json()
+        username = data.get('username')
+        if not username or not data.get('password'):
+            raise MockError(401, 'AUTH_FAILED', 'Username and password are required')
+        token = self.store.login(username)
+        return 200, {'token': token, 'user': username, 'expiresIn': 3600}
+
+    def _logout(self, request: MockRequest):
+        self.store.logout(request.token)
+        return 200, {'success': True}
+
+    def _search_items(self, request: MockRequest):
+        return 200, self.store.search_items(request.json())
+
+    def _create_item(self, request: MockRequest):
+        return 201, self.store.create_item(request.json())
+
+    def _get_item(self, request: MockRequest):
+        return 200, self.store.get_item(request.match['item_id'], _property_list(request))
+
+    def _update_item(self, request: MockRequest):
+        return 200, self.store.update_item(request.match['item_id'], request.json())
+
+    def _delete_item(self, request: MockRequest):
+        self.store.delete_item(request.match['item_id'])
+        return 200, {'success': True}
+
+    def _bom_structure(self, request: MockRequest):
+        levels = int(request.params.get('levels', -1))
+        include = request.params.get('includeProperties', 'true').lower() != 'false'
+        return 200, self.store.bom_structure(request.match['item_id'], levels, include,
+                                             _property_list(request))
+
+    def _add_bom_line(self, request: MockRequest):
+        return 201, self.store.add_bom_line(request.match['item_id'], request.json())
+
+    def _update_bom_line(self, request: MockRequest):
+        return 200, self.store.update_bom_line(request.match['item_id'],
+                                               request.match['line_id'], request.json())
+
+    def _remove_bom_line(self, request: MockRequest):
+        self.store.remove_bom_line(request.match['item_id'], request.match['line_id'])
+        return 200, {'success': True}
+
+    def _where_used(self, request: MockRequest):
+        return 200, self.store.where_used(request.match['item_id'])
+
+    def _start_workflow(self, request: MockRequest):
+        return 201, self.store.start_workflow(request.json(), request.user)
+
+    def _my_tasks(self, request: MockRequest):
+        return 200, {'tasks': self.store.my_tasks(request.user)}
+
+    def _complete_task(self, request: MockRequest):
+        return 200, self.store.complete_task(request.match['task_id'], request.json())
+
+    def _upload(self, request: MockRequest):
+        content_type = request.headers.get('Content-Type', '')
+        message = email.message_from_bytes(
+            f'Content-Type: {content_type}\r\n\r\n'.encode() + request.body
+        )
+        fields, file_name, content = {}, 'upload.bin', b''
+        for part in message.walk():
+            if part.is_multipart():
+                continue
+            name = part.get_param('name', header='content-disposition')
+            if part.get_filename():
+                file_name = part.get_filename()
+                content = part.get_payload(decode=True) or b''
+            elif name:
+                fields[name] = (part.get_payload(decode=True) or b'').decode()
+
+        dataset = self.store.add_dataset(
+            fields.get('itemId'), file_name, content,
+            dataset_type=fields.get('datasetType', 'Text'),
+            relation_type=fields.get('relationType', 'IMAN_specification'),
+            name=fields.get('datasetName')
+        )
+        return 201, dataset
+
+    def _item_datasets(self, request: MockRequest):
+        return 200, {'datasets': self.store.item_datasets_for(request.match['item_id'])}
+
+    def _download(self, request: MockRequest):
+        return 200, self.store.get_dataset_content(request.match['dataset_id'])
+
+    def _execute_query(self, request: MockRequest):
+        data = request.json()
+        return 200, self.store.execute_query(data.get('queryName'), data.get('parameters') or {},
+                                             int(data.get('maxResults', 1000)),
+                                             int(data.get('page') or 1),
+                                             data.get('returnProperties'))
+
+    def _soa_create_items(self, request: MockRequest):
+        output, errors = [], []
+        for data in _soa_body(request).get('properties') or []:
+            client_id = data.get('clientId') or data.get('itemId')
+            try:
+                item = self.store.create_item({
+                    'itemId': data.get('itemId') or None,
+                    'name': data.get('name'),
+                    'type': data.get('type', 'Item'),
+                    'revisionId': data.get('revId', 'A'),
+                    'description': data.get('description', ''),
+                    'properties': data.get('extendedAttributes') or {}
+                })
+            except MockError as e:
+                errors.append(_partial_error(client_id, e))
+                continue
+            output.append({'clientId': client_id, 'item': item,
+                           'itemRev': {'uid': item['uid'], 'revisionId': item['revisionId']}})
+        return 200, {'output': output,
+                     'ServiceData': {'created': [entry['item']['uid'] for entry in output],
+                                     'partialErrors': errors}}
+
+    def _soa_get_properties(self, request: MockRequest):
+        body = _soa_body(request)
+        attributes = body.get('attributes') or []
+        with self.store.lock:
+            by_uid = {item['uid']: item for item in self.store.items.values()}
+            model_objects, errors = {}, []
+            for object_id in body.get('objects') or []:
+                item = self.store.items.get(object_id) or by_uid.get(object_id)
+                if item is None:
+                    errors.append(_partial_error(object_id, MockError(
+                        404, 'ITEM_NOT_FOUND', f"Object '{object_id}' not found")))
+                    continue
+                props = {}
+                for name in attributes:
+                    value = (item[name] if name in item and name != 'properties'
+                             else item['properties'].get(name))
+                    if value is not None:
+                        props[name] = {'dbValues': [value], 'uiValues': [str(value)]}
+                model_objects[item['uid']] = {'uid': item['uid'], 'itemId': item['itemId'],
+                                              'type': item['type'], 'props': props}
+        return 200, {'ServiceData': {'plain': list(model_objects),
+                                     'modelObjects': model_objects,
+                                     'partialErrors': errors}}
+
+    def _soa_expand_bom(self, request: MockRequest):
+        body = _soa_body(request)
+        levels = int(body.get('levels', -1))
+        attributes = body.get('attributes')
+        output, errors = [], []
+        for parent in body.get('parents') or []:
+            try:
+                structure = self.store.bom_structure(parent, levels, attributes != [],
+                                                     attributes)
+            except MockError as e:
+                errors.append(_partial_error(parent, e))
+                continue
+            output.append({'parent': parent, 'root': structure['root'],
+                           'lines': structure['lines']})
+        return 200, {'output': output, 'ServiceData': {'partialErrors': errors}}
+
+    def _info(self, request: MockRequest):
+        return 200, {
+            'server': 'Mock Teamcenter',
+            'version': '14.0-mock',
+            'items': len(self.store.items),
+            'timestamp': time.time()
+        }
+
+
+    def _erp_bom_batches(self, request: MockRequest):
+        # Stand-in ERP receiver for the BOM sync HTTP sink ({base_url}/erp)
+        batch = request.json()
+        with self._bucket_lock:
+            self.erp_batches.append(batch)
+        return 202, {'accepted': len(batch.get('assemblies') or [])}
+
+
+def _soa_body(request: MockRequest) -> Dict:
+    """Body of an SOA JSON envelope"""
+    return request.json().get('body') or {}
+
+
+def _partial_error(key: str, error: MockError) -> Dict:
+    return {'clientId': key,
+            'errorValues': [{'code': error.status, 'level': 3, 'message': error.message}]}
+
+
+def _property_list(request: MockRequest) -> Optional[List[str]]:
+    """Names from a 'properties' query parameter (None when absent)"""
+    value = request.params.get('properties')
+    if value is None:
+        return None
+    return [name for name in value.split(',') if name]
+
+
+def _error(code: str, message: str) -> Dict:
+    return {'success': False, 'error': {'code': code, 'message': message}}
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    """HTTP adapter between http.server and MockTeamcenterServer"""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    mock: MockTeamcenterServer = None
+
+    def _dispatch(self):
+        started = time.monotonic()
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        if body and self.headers.get('Content-Encoding') in ('gzip', 'deflate'):
+            try:
+                body = zlib.decompress(body, 47)
+            except zlib.error:
+                body = b''
+
+        status, headers, payload = self.mock.handle(self.command, self.path, self.headers, body)
+
+        if isinstance(payload, bytes):
+            data = payload
+            content_type = 'application/octet-stream'
+        else:
+            data = json.dumps(payload).encode('utf-8')
+            content_type = 'application/json'
+
+        encoding = None
+        accepted = [part.split(';')[0].strip()
+                    for part in (self.headers.get('Accept-Encoding') or '').split(',')]
+        if self.mock.compress_responses and len(data) >= self.mock.compress_min_bytes \
+                and 'gzip' in accepted:
+            data = gzip.compress(data, compresslevel=6, mtime=0)
+            encoding = 'gzip'
+
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('X-TC-Response-Time', str(int((time.monotonic() - started) * 1000)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _dispatch
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def main():
+    """Run the mock server from the command line"""
+    from ..utils.config import load_settings
+    from .datagen import FleetDataGenerator, load_files
+
+    parser = argparse.ArgumentParser(description='Run a local mock Teamcenter server')
+    parser.add_argument('--settings', help='Path to settings.yaml')
+    parser.add_argument('--environment', help='Settings environment override to apply')
+    parser.add_argument('--host', help='Interface to bind')
+    parser.add_argument('--port', type=int, default=8765, help='Port to bind')
+    parser.add_argument('--data', help='Directory of generated fleet data to load')
+    parser.add_argument('--fleet', type=int, metavar='N',
+                        help='Generate a synthetic fleet of N equipment items')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    overrides = {'port': args.port}
+    if args.host:
+        overrides['host'] = args.host
+
+    settings = load_settings(args.settings, args.environment)
+    server = MockTeamcenterServer.from_settings(settings, **overrides)
+    if args.data:
+        load_files(server, args.data)
+    if args.fleet:
+        FleetDataGenerator.from_settings(settings, equipment_count=args.fleet).load_into(server)
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,619 @@
+"""
+In-memory Teamcenter data model backing the mock server
+"""
+
+import fnmatch
+import itertools
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+
+class MockError(Exception):
+    """Error raised by the mock data store, mapped to an HTTP error response"""
+
+    def __init__(self, status: int, code: str, message: str):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+
+
+def _now() -> str:
+    return datetime.now().isoformat()
+
+
+def _with_properties(record: Dict, names: Optional[Iterable[str]]) -> Dict:
+    """Copy of record with its properties limited to names (None keeps all)"""
+    record = dict(record)
+    properties = record.get('properties')
+    if isinstance(properties, dict):
+        record['properties'] = (dict(properties) if names is None else
+                                {name: properties[name] for name in names if name in properties})
+    return record
+
+
+def _matches(value, pattern) -> bool:
+    """Case-insensitive wildcard match used by search and saved queries"""
+    if pattern is None:
+        return True
+    if value is None:
+        return False
+    return fnmatch.fnmatchcase(str(value).lower(), str(pattern).lower())
+
+
+class MockDataStore:
+    """
+    Thread-safe in-memory model of items, BOMs, workflows and datasets
+
+    The shapes returned by the store mirror what TeamcenterRESTClient
+    consumes, so the same automation code runs against the mock and the
+    real server.
+    """
+
+    def __init__(self, property_prefix: str = 'epr_'):
+        """
+        Initialize an empty store
+
+        Args:
+            property_prefix: Prefix used for custom properties in saved queries
+        """
+        self.property_prefix = property_prefix
+        self.items: Dict[str, Dict] = {}
+        self.bom_lines: Dict[str, List[Dict]] = defaultdict(list)
+        self.where_used_index: Dict[str, set] = defaultdict(set)
+        self.workflows: Dict[str, Dict] = {}
+        self.tasks: Dict[str, Dict] = {}
+        self.datasets: Dict[str, Dict] = {}
+        self.dataset_content: Dict[str, bytes] = {}
+        self.item_datasets: Dict[str, List[str]] = defaultdict(list)
+        self.sessions: Dict[str, str] = {}
+        self.lock = threading.RLock()
+        self._ids = itertools.count(1)
+
+    def _next_id(self, prefix: str) -> str:
+        return f"{prefix}-{next(self._ids):08d}"
+
+    # ==================== Sessions ====================
+
+    def login(self, username: str) -> str:
+        """Open a session and return its token"""
+        with self.lock:
+            token = self._next_id('TOKEN')
+            self.sessions[token] = username
+            return token
+
+    def logout(self, token: str):
+        """Close a session"""
+        with self.lock:
+            self.sessions.pop(token, None)
+
+    def user_for(self, token: Optional[str]) -> Optional[str]:
+        """Return the user owning a session token"""
+        return self.sessions.get(token) if token else None
+
+    # ==================== Items ====================
+
+    def _require_item(self, item_id: str) -> Dict:
+        item = self.items.get(item_id)
+        if item is None:
+            raise MockError(404, 'ITEM_NOT_FOUND', f"Item with ID '{item_id}' not found")
+        return item
+
+    def create_item(self, data: Dict) -> Dict:
+        """Create an item; fails with 409 if the ID is taken"""
+        with self.lock:
+            item_id = data.get('itemId') or self._next_id('ITEM')
+            if item_id in self.items:
+                raise MockError(409, 'DUPLICATE_ITEM', f"Item '{item_id}' already exists")
+
+            timestamp = _now()
+            item = {
+                'itemId': item_id,
+                'uid': self._next_id('UID'),
+                'name': data.get('name', item_id),
+                'description': data.get('description', ''),
+                'type': data.get('type', 'Item'),
+                'revisionId': data.get('revisionId', 'A'),
+                'status': data.get('status', 'In Work'),
+                'created': timestamp,
+                'modified': timestamp,
+                'properties': dict(data.get('properties') or {})
+            }
+            self.items[item_id] = item
+            return dict(item)
+
+    def get_item(self, item_id: str, properties: Optional[List[str]] = None) -> Dict:
+        """Return an item with a summary of its relations"""
+        with self.lock:
+            item = _with_properties(self._require_item(item_id), properties)
+            item['relations'] = {
+                'documents': len(self.item_datasets.get(item_id, ())),
+                'children': len(self.bom_lines.get(item_id, ())),
+                'parents': len(self.where_used_index.get(item_id, ()))
+            }
+            return item
+
+    def update_item(self, item_id: str, updates: Dict) -> Dict:
+        """Update item attributes; properties are merged"""
+        with self.lock:
+            item = self._require_item(item_id)
+            for key, value in updates.items():
+                if key == 'properties':
+                    item['properties'].update(value or {})
+                elif key not in ('itemId', 'uid', 'created'):
+                    item[key] = value
+            item['modified'] = _now()
+            return dict(item)
+
+    def delete_item(self, item_id: str):
+        """Delete an item together with its BOM lines and attachments"""
+        with self.lock:
+            self._require_item(item_id)
+            del self.items[item_id]
+            for line in self.bom_lines.pop(item_id, []):
+                self.where_used_index[line['childId']].discard(item_id)
+            for dataset_id in self.item_datasets.pop(item_id, []):
+                self.datasets.pop(dataset_id, None)
+                self.dataset_content.pop(dataset_id, None)
+
+    def search_items(self, query: Dict) -> Dict:
+        """
+        Search items
+
+        Supported criteria: 'query' (free text over ID, name and description),
+        'itemId' and 'name' (wildcards), 'itemIds' (exact IDs), 'type' or
+        'types', 'properties' (wildcard per property), 'maxResults' or
+        'pageSize' and 'page'. 'returnProperties' limits the properties
+        returned with each item.
+        """
+        text = (query.get('query') or '').lower().split()
+        types = query.get('types') or ([query['type']] if query.get('type') else None)
+        properties = query.get('properties') or {}
+        page_size = int(query.get('maxResults') or query.get('pageSize') or 1000)
+        page = max(1, int(query.get('page') or 1))
+
+        with self.lock:
+            candidates = self.items.values()
+            if query.get('itemIds') is not None:
+                candidates = [self.items[item_id] for item_id in dict.fromkeys(query['itemIds'])
+                              if item_id in self.items]
+
+            matches = []
+            for item in candidates:
+                if types and item['type'] not in types:
+                    continue
+                if not _matches(item['itemId'], query.get('itemId')):
+                    continue
+                if not _matches(item['name'], query.get('name')):
+                    continue
+                if text:
+                    haystack = f"{item['itemId']} {item['name']} {item['description']}".lower()
+                    if not all(term in haystack for term in text):
+                        continue
+                if not all(_matches(item['properties'].get(key), pattern)
+                           for key, pattern in properties.items()):
+                    continue
+                matches.append(item)
+
+            start = (page - 1) * page_size
+            returned = query.get('returnProperties')
+            results = [_with_properties(item, returned)
+                       for item in matches[start:start + page_size]]
+            return {'totalResults': len(matches), 'results': results}
+
+    # ==================== BOMs ====================
+
+    def _expand(self, parent_id: str, level: int, levels: int,
+                include_properties: bool, path: frozenset,
+                properties: Optional[List[str]] = None) -> List[Dict]:
+        lines = []
+        for line in self.bom_lines.get(parent_id, ()):
+            child = self.items.get(line['childId'], {})
+            entry = {
+                'lineId': line['lineId'],
+                'level': level,
+                'parentId': parent_id,
+                'childId': line['childId'],
+                'childName': child.get('name'),
+                'quantity': line['quantity'],
+                'uom': line.get('uom', 'each'),
+                'findNumber': line.get('findNumber')
+            }
+            if include_properties:
+                entry['properties'] = _with_properties(line, properties)['properties']
+            if (levels < 0 or level < levels) and line['childId'] not in path:
+                children = self._expand(line['childId'], level + 1, levels,
+                                        include_properties, path | {line['childId']},
+                                        properties)
+                if children:
+                    entry['children'] = children
+            lines.append(entry)
+        return lines
+
+    def bom_structure(self, item_id: str, levels: int = -1,
+                      include_properties: bool = True,
+                      properties: Optional[List[str]] = None) -> Dict:
+        """Expand the BOM of an item to the requested depth"""
+        with self.lock:
+            root = self._require_item(item_id)
+            return {
+                'root': {
+                    'itemId': root['itemId'],
+                    'revision': root['revisionId'],
+                    'name': root['name']
+                },
+                'lines': self._expand(item_id, 1, levels, include_properties,
+                                      frozenset([item_id]), properties)
+            }
+
+    def add_bom_line(self, parent_id: str, data: Dict) -> Dict:
+        """Attach a child item to a parent's BOM"""
+        with self.lock:
+            self._require_item(parent_id)
+            child_id = data.get('childId')
+            self._require_item(child_id)
+
+            line = {
+                'lineId': self._next_id('LINE'),
+                'parentId': parent_id,
+                'childId': child_id,
+                'quantity': data.get('quantity', 1),
+                'uom': data.get('uom', 'each'),
+                'findNumber': data.get('findNumber'),
+                'properties': dict(data.get('properties') or {})
+            }
+            self.bom_lines[parent_id].append(line)
+            self.where_used_index[child_id].add(parent_id)
+            self.items[parent_id]['modified'] = _now()
+            return dict(line)
+
+    def _require_line(self, parent_id: str, line_id: str) -> Dict:
+        for line in self.bom_lines.get(parent_id, ()):
+            if line['lineId'] == line_id:
+                return line
+        raise MockError(404, 'BOM_LINE_NOT_FOUND',
+                        f"BOM line '{line_id}' not found under '{parent_id}'")
+
+    def update_bom_line(self, parent_id: str, line_id: str, updates: Dict) -> Dict:
+        """Update quantity or properties of a BOM line"""
+        with self.lock:
+            line = self._require_line(parent_id, line_id)
+            for key, value in updates.items():
+                if key == 'properties':
+                    line['properties'].update(value or {})
+                elif key not in ('lineId', 'parentId', 'childId'):
+                    line[key] = value
+            self.items[parent_id]['modified'] = _now()
+            return dict(line)
+
+    def remove_bom_line(self, parent_id: str, line_id: str):
+        """Remove a BOM line"""
+        with self.lock:
+            line = self._require_line(parent_id, line_id)
+            self.bom_lines[parent_id].remove(line)
+            if not any(l['childId'] == line['childId'] for l in self.bom_lines[parent_id]):
+                self.where_used_index[line['childId']].discard(parent_id)
+            self.items[parent_id]['modified'] = _now()
+
+    def where_used(self, item_id: str) -> Dict:
+        """Return the direct parents of an item"""
+        with self.lock:
+            item = self._require_item(item_id)
+            parents = []
+            for parent_id in sorted(self.where_used_index.get(item_id, ())):
+                parent = self.items.get(parent_id)
+                if parent is None:
+                    continue
+                quantity = sum(line['quantity'] for line in self.bom_lines[parent_id]
+                               if line['childId'] == item_id)
+                parents.append({
+                    'itemId': parent_id,
+                    'name': parent['name'],
+                    'quantity': quantity,
+                    'revision': parent['revisionId']
+                })
+            return {
+                'item': {'itemId': item_id, 'name': item['name']},
+                'parents': parents
+            }
+
+    # ==================== Workflows ====================
+
+    def start_workflow(self, data: Dict, username: str) -> Dict:
+        """Start a workflow and assign its first task to the caller"""
+        with self.lock:
+            targets = data.get('targets') or []
+            for target in targets:
+                self._require_item(target)
+
+            workflow_id = self._next_id('WF')
+            task = {
+                'taskId': self._next_id('TASK'),
+                'workflowId': workflow_id,
+                'name': f"Review {data.get('processName', 'Workflow')}",
+                'description': (data.get('properties') or {}).get('change_description', ''),
+                'priority': (data.get('properties') or {}).get('priority', 'Normal'),
+                'status': 'Pending',
+                'assignedTo': username,
+                'created': _now(),
+                'targets': [
+                    {'itemId': target, 'name': self.items[target]['name']}
+                    for target in targets
+                ],
+                'properties': dict(data.get('properties') or {}),
+                'actions': ['Approve', 'Reject', 'Request Info']
+            }
+            workflow = {
+                'workflowId': workflow_id,
+                'processName': data.get('processName'),
+                'status': 'Active',
+                'targets': list(targets),
+                'properties': dict(data.get('properties') or {}),
+                'started': _now(),
+                'currentTask': {
+                    'taskId': task['taskId'],
+                    'name': task['name'],
+                    'assignedTo': [username]
+                }
+            }
+            self.workflows[workflow_id] = workflow
+            self.tasks[task['taskId']] = task
+            return dict(workflow)
+
+    def my_tasks(self, username: str) -> List[Dict]:
+        """Return pending tasks assigned to a user"""
+        with self.lock:
+            return [dict(task) for task in self.tasks.values()
+                    if task['assignedTo'] == username and task['status'] == 'Pending']
+
+    def complete_task(self, task_id: str, data: Dict) -> Dict:
+        """Complete a pending task; completing twice is a conflict"""
+        with self.lock:
+            task = self.tasks.get(task_id)
+            if task is None:
+                raise MockError(404, 'TASK_NOT_FOUND', f"Task '{task_id}' not found")
+            if task['status'] != 'Pending':
+                raise MockError(409, 'WORKFLOW_ERROR', f"Task '{task_id}' is already {task['status']}")
+
+            task['status'] = 'Completed'
+            task['decision'] = data.get('decision')
+            task['comments'] = data.get('comments', '')
+            task['completed'] = _now()
+
+            workflow = self.workflows.get(task['workflowId'])
+            if workflow is not None:
+                workflow['status'] = 'Completed'
+            return {
+                'taskId': task_id,
+                'workflowId': task['workflowId'],
+                'status': task['status'],
+                'decision': task['decision']
+            }
+
+    # ==================== Documents ====================
+
+    def add_dataset(self, item_id: str, file_name: str, content: bytes,
+                    dataset_type: str = 'Text', relation_type: str = 'IMAN_specification',
+                    name: Optional[str] = None, created: Optional[str] = None,
+                    properties: Optional[Dict] = None) -> Dict:
+        """Attach a dataset to an item"""
+        with self.lock:
+            item = self._require_item(item_id)
+            dataset_id = self._next_id('DS')
+            dataset = {
+                'datasetId': dataset_id,
+                'itemId': item_id,
+                'name': name or file_name,
+                'type': dataset_type,
+                'fileName': file_name,
+                'fileSize': len(content),
+                'relationType': relation_type,
+                'created': created or _now(),
+                'properties': dict(properties or {})
+            }
+            self.datasets[dataset_id] = dataset
+            self.dataset_content[dataset_id] = content
+            self.item_datasets[item_id].append(dataset_id)
+            item['modified'] = _now()
+            return dict(dataset)
+
+    def item_datasets_for(self, item_id: str) -> List[Dict]:
+        """Return metadata of the datasets attached to an item"""
+        with self.lock:
+            self._require_item(item_id)
+            return [dict(self.datasets[dataset_id])
+                    for dataset_id in self.item_datasets.get(item_id, ())]
+
+    def get_dataset_content(self, dataset_id: str) -> bytes:
+        """Return the file content of a dataset"""
+        with self.lock:
+            if dataset_id not in self.dataset_content:
+                raise MockError(404, 'DATASET_NOT_FOUND', f"Dataset '{dataset_id}' not found")
+            return self.dataset_content[dataset_id]
+
+    # ==================== Queries ====================
+
+    def execute_query(self, query_name: str, parameters: Dict,
+                      max_results: int = 1000, page: int = 1,
+                      properties: Optional[List[str]] = None) -> Dict:
+        """
+        Execute a saved query
+
+        Parameters are matched with wildcards against item attributes
+        ('Item ID', 'Name', 'Type', 'status') or properties; bare names such
+        as 'equipment_type' also match the prefixed custom property. Results
+        are returned in pages of max_results, with their properties
+        limited to properties when given.
+        """
+        attributes = {'item id': 'itemId', 'itemid': 'itemId', 'name': 'name',
+                      'type': 'type', 'status': 'status', 'description': 'description'}
+
+        def value_for(item: Dict, key: str):
+            attribute = attributes.get(key.lower())
+            if attribute:
+                return item.get(attribute)
+            props = item['properties']
+            if key in props:
+                return props[key]
+            return props.get(f"{self.property_prefix}{key}")
+
+        skip = (max(1, page) - 1) * max_results
+        with self.lock:
+            results = []
+            for item in self.items.values():
+                if all(_matches(value_for(item, key), pattern)
+                       for key, pattern in (parameters or {}).items()):
+                    if skip:
+                        skip -= 1
+                        continue
+                    results.append(_with_properties(item, properties))
+                    if len(results) >= max_results:
+                        break
+            return {
+                'queryName': query_name,
+                'resultCount': len(results),
+                'results': results
+            }
+
+    # ==================== Bulk Loading ====================
+
+    def load_items(self, items: Iterable[Dict]):
+        """Bulk-create items, skipping IDs that already exist"""
+        with self.lock:
+            for data in items:
+                if data.get('itemId') not in self.items:
+                    self.create_item(data)
+
+    def load_bom_lines(self, lines: Iterable[Dict]):
+        """
+        Bulk-append BOM lines without per-line validation
+
+        Each line needs 'parentId' and 'childId'; both items are expected to
+        exist already. Used by the synthetic data generator for large loads.
+        """
+        with self.lock:
+            for data in lines:
+                parent_id = data['parentId']
+                line = {
+                    'lineId': data.get('lineId') or self._next_id('LINE'),
+                    'parentId': parent_id,
+                    'childId': data['childId'],
+                    'quantity': data.get('quantity', 1),
+                    'uom': data.get('uom', 'each'),
+                    'findNumber': data.get('findNumber'),
+                    'properties': dict(data.get('properties') or {})
+                }
+                self.bom_lines[parent_id].append(line)
+                self.where_used_index[line['childId']].add(parent_id)
+
+    def load_datasets(self, datasets: Iterable[Dict]):
+        """
+        Bulk-attach dataset records
+
+        Records use the dataset shape returned by add_dataset(); 'content' is
+        optional, so large fleets can carry realistic file sizes as metadata.
+        """
+        timestamp = _now()
+        with self.lock:
+            for data in datasets:
+                dataset_id = data.get('datasetId') or self._next_id('DS')
+                content = data.get('content') or b''
+                dataset = {
+                    'datasetId': dataset_id,
+                    'itemId': data['itemId'],
+                    'name': data.get('name') or data['fileName'],
+                    'type': data.get('type', 'Text'),
+                    'fileName': data['fileName'],
+                    'fileSize': data.get('fileSize', len(content)),
+                    'relationType': data.get('relationType', 'IMAN_specification'),
+                    'created': data.get('created') or _now(),
+                    'properties': dict(data.get('properties') or {})
+                }
+                self.datasets[dataset_id] = dataset
+                self.dataset_content[dataset_id] = content
+                self.item_datasets[dataset['itemId']].append(dataset_id)
+                if dataset['itemId'] in self.items:
+                    self.items[dataset['itemId']]['modified'] = timestamp
+
+    def load_tasks(self, tasks: Iterable[Dict]):
+        """
+        Bulk-create workflow tasks, each with its own single-task workflow
+
+        Records use the task shape returned by my_tasks(); targets may be
+        given as item IDs.
+        """
+        with self.lock:
+            for data in tasks:
+                task_id = data.get('taskId') or self._next_id('TASK')
+                workflow_id = data.get('workflowId') or self._next_id('WF')
+                targets = [
+                    target if isinstance(target, dict)
+                    else {'itemId': target, 'name': self.items.get(target, {}).get('name')}
+                    for target in data.get('targets') or []
+                ]
+                task = {
+                    'taskId': task_id,
+                    'workflowId': workflow_id,
+                    'name': data.get('name') or f"Review {data.get('processName', 'Workflow')}",
+                    'description': data.get('description', ''),
+                    'priority': data.get('priority', 'Normal'),
+                    'status': data.get('status', 'Pending'),
+                    'assignedTo': data['assignedTo'],
+                    'created': data.get('created') or _now(),
+                    'targets': targets,
+                    'properties': dict(data.get('properties') or {}),
+                    'actions': ['Approve', 'Reject', 'Request Info']
+                }
+                self.tasks[task_id] = task
+                self.workflows[workflow_id] = {
+                    'workflowId': workflow_id,
+                    'processName': data.get('processName'),
+                    'status': 'Active' if task['status'] == 'Pending' else 'Completed',
+                    'targets': [target['itemId'] for target in targets],
+                    'properties': dict(task['properties']),
+                    'started': task['created'],
+                    'currentTask': {
+                        'taskId': task_id,
+                        'name': task['name'],
+                        'assignedTo': [task['assignedTo']]
+                    }
+                }
+
+    def load_sample_data(self, loader_id: str = 'SCOOPTRAM-ST1030-DEMO'):
+        """Populate the store with the ST1030 loader used in the examples"""
+        components = [
+            ('BATTERY-PACK-650V', 'Battery Pack System 650V', 1, True),
+            ('ELECTRIC-MOTOR-200KW', 'Electric Drive Motor 200kW', 2, True),
+            ('HYDRAULIC-SYSTEM-ST1030', 'Hydraulic System Assembly', 1, True),
+            ('CONTROL-SYSTEM-V3', 'Epiroc Control System V3', 1, True),
+            ('BUCKET-10T', '10-Tonne Bucket Assembly', 1, False),
+            ('CABIN-ROPS-FOPS', 'ROPS/FOPS Certified Cabin', 1, True),
+            ('CHARGING-INTERFACE', 'Fast Charging Interface', 1, False)
+        ]
+
+        with self.lock:
+            self.load_items([{
+                'itemId': loader_id,
+                'name': 'Scooptram ST1030 Battery-Electric Loader',
+                'type': 'EPR_MiningEquipment',
+                'properties': {
+                    'epr_equipment_type': 'Underground Loader',
+                    'epr_model': 'ST1030',
+                    'epr_power_type': 'Battery Electric',
+                    'epr_facility': 'Pitt Meadows'
+                }
+            }])
+            self.load_items({'itemId': item_id, 'name': name, 'type': 'EPR_Component'}
+                            for item_id, name, _, _ in components)
+            if not self.bom_lines.get(loader_id):
+                for position, (item_id, _, quantity, critical) in enumerate(components, 1):
+                    self.add_bom_line(loader_id, {
+                        'childId': item_id,
+                        'quantity': quantity,
+                        'properties': {
+                            'epr_critical_component': str(critical),
+                            'epr_position_number': str(position)
+                        }
+                    })
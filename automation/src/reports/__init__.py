@@ -0,0 +1,23 @@
+"""
+Equipment and fleet reporting
+"""
+
+from .equipment import EquipmentReporter, run_report_generation
+from .export import (
+    export_rows,
+    iter_bom_lines,
+    iter_saved_query,
+    iter_search
+)
+from .snapshot import BOMSnapshot, write_snapshot
+
+__all__ = [
+    'EquipmentReporter',
+    'run_report_generation',
+    'export_rows',
+    'iter_bom_lines',
+    'iter_saved_query',
+    'iter_search',
+    'BOMSnapshot',
+    'write_snapshot'
+]
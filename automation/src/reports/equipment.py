@@ -0,0 +1,342 @@
+"""
+Equipment reports for single machines and whole fleets
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from ..client.codec import Codec
+from ..client.deadline import Deadline, DeadlineExceeded, OperationCancelled, current_deadline
+from ..client.rest_client import TeamcenterRESTClient, connection_pool_size
+from ..compliance.engine import EQUIPMENT_QUERY
+from .export import DEFAULT_CHUNK_SIZE, WRITERS, export_rows, resolve_format
+
+logger = logging.getLogger(__name__)
+
+# Calls made for every report
+CALLS = ('item', 'bom', 'where_used')
+
+# Custom properties (without prefix) a report reads from the item and its BOM lines
+ITEM_PROPERTIES = ('equipment_type', 'model', 'power_type', 'facility')
+LINE_PROPERTIES = ('critical_component',)
+
+
+def build_report(equipment_id: str, equipment: Dict, bom: Dict, where_used: List[Dict],
+                 prefix: str = 'epr_') -> Dict:
+    """Assemble the report for one machine from its item, BOM and where-used data"""
+    properties = equipment.get('properties', {})
+    lines = bom.get('lines', [])
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'equipment': {
+            'id': equipment_id,
+            'name': equipment.get('name'),
+            'type': properties.get(f'{prefix}equipment_type'),
+            'model': properties.get(f'{prefix}model'),
+            'power_type': properties.get(f'{prefix}power_type'),
+            'facility': properties.get(f'{prefix}facility')
+        },
+        'bom_summary': {
+            'total_components': len(lines),
+            'critical_components': sum(
+                1 for line in lines
+                if line.get('properties', {}).get(f'{prefix}critical_component') == 'True'
+            )
+        },
+        'usage': {
+            'used_in_count': len(where_used),
+            'parent_assemblies': [parent.get('itemId') for parent in where_used]
+        }
+    }
+
+
+def report_row(report: Dict) -> Dict:
+    """Flatten a report into one row of the consolidated fleet dataset"""
+    equipment = report['equipment']
+    return {
+        'equipment_id': equipment['id'],
+        'name': equipment['name'],
+        'type': equipment['type'],
+        'model': equipment['model'],
+        'power_type': equipment['power_type'],
+        'facility': equipment['facility'],
+        'total_components': report['bom_summary']['total_components'],
+        'critical_components': report['bom_summary']['critical_components'],
+        'used_in_count': report['usage']['used_in_count'],
+        'parent_assemblies': ';'.join(report['usage']['parent_assemblies'])
+    }
+
+
+class EquipmentReporter:
+    """
+    Builds equipment reports with the per-machine calls issued concurrently
+
+    A single report issues get_item, get_bom_structure and get_where_used
+    at once. Fleet mode keeps a bounded window of machines in flight on one
+    shared pool; as soon as a machine's three calls have returned its row
+    is aggregated and the next machine is started, so fetching and
+    aggregation overlap and memory stays proportional to the window.
+
+    Example:
+        reporter = EquipmentReporter(client, max_workers=24)
+        dataset = reporter.fleet_report(equipment_ids)
+        print(dataset['summary'])
+    """
+
+    def __init__(self, client: TeamcenterRESTClient, max_workers: int = 16,
+                 levels: int = 2, property_prefix: str = 'epr_'):
+        """
+        Initialize reporter
+
+        Args:
+            client: Authenticated REST client
+            max_workers: Concurrent requests
+            levels: BOM levels expanded per machine
+            property_prefix: Prefix of custom properties
+        """
+        self.client = client
+        self.max_workers = max_workers
+        self.levels = levels
+        self.prefix = property_prefix
+        # Only the properties build_report() reads are fetched
+        self.item_properties = [f'{property_prefix}{name}' for name in ITEM_PROPERTIES]
+        self.line_properties = [f'{property_prefix}{name}' for name in LINE_PROPERTIES]
+
+    def _submit(self, executor: ThreadPoolExecutor, equipment_id: str,
+                deadline: Optional[Deadline]) -> Dict[str, object]:
+        def call(kind: str):
+            if deadline is not None:
+                deadline.check()
+            if kind == 'item':
+                return self.client.get_item(equipment_id, deadline=deadline,
+                                            properties=self.item_properties)
+            if kind == 'bom':
+                return self.client.get_bom_structure(equipment_id, levels=self.levels,
+                                                     deadline=deadline,
+                                                     properties=self.line_properties)
+            return self.client.get_where_used(equipment_id, deadline=deadline)
+
+        return {kind: executor.submit(call, kind) for kind in CALLS}
+
+    def report(self, equipment_id: str, deadline: Optional[Deadline] = None) -> Dict:
+        """Report for one machine, with its three calls made concurrently"""
+        deadline = deadline or current_deadline()
+        with ThreadPoolExecutor(max_workers=len(CALLS),
+                                thread_name_prefix='tc-report') as executor:
+            futures = self._submit(executor, equipment_id, deadline)
+            try:
+                results = {kind: future.result() for kind, future in futures.items()}
+            except BaseException:
+                for future in futures.values():
+                    future.cancel()
+                raise
+        return build_report(equipment_id, results['item'], results['bom'],
+                            results['where_used'], self.prefix)
+
+    def fleet_report(self, equipment_ids: Iterable[str],
+                     deadline: Optional[Deadline] = None,
+                     on_report: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """
+        Reports for many machines, consolidated into one dataset
+
+        Args:
+            equipment_ids: Machines to report on
+            deadline: Time budget (defaults to the ambient deadline)
+            on_report: Called with each machine's full report as it completes
+
+        Returns:
+            Dataset with 'rows' (one flat row per machine, in input order),
+            'failed' (errors by equipment ID), 'summary' and timing
+        """
+        deadline = deadline or current_deadline()
+        started = time.perf_counter()
+        pending_ids = iter(dict.fromkeys(equipment_ids))
+        order: Dict[str, int] = {}
+        rows: Dict[str, Dict] = {}
+        failed: Dict[str, str] = {}
+        partial: Dict[str, Dict] = {}
+        owners = {}
+
+        by_type, by_facility = Counter(), Counter()
+        totals = {'components': 0, 'critical_components': 0}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix='tc-fleet-report') as executor:
+
+            def start_next() -> bool:
+                equipment_id = next(pending_ids, None)
+                if equipment_id is None:
+                    return False
+                order[equipment_id] = len(order)
+                partial[equipment_id] = {}
+                for kind, future in self._submit(executor, equipment_id, deadline).items():
+                    owners[future] = (equipment_id, kind)
+                return True
+
+            # Keep one machine in flight per worker
+            for _ in range(self.max_workers):
+                if not start_next():
+                    break
+
+            try:
+                while owners:
+                    done, _ = wait(owners, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        equipment_id, kind = owners.pop(future)
+                        results = partial.get(equipment_id)
+                        try:
+                            result = future.result()
+                        except (DeadlineExceeded, OperationCancelled):
+                            raise
+                        except Exception as e:
+                            if results is not None:
+                                failed[equipment_id] = f"{kind}: {e}"
+                                del partial[equipment_id]
+                                start_next()
+                            continue
+                        if results is None:
+                            continue  # another call for this machine already failed
+
+                        results[kind] = result
+                        if len(results) < len(CALLS):
+                            continue
+
+                        del partial[equipment_id]
+                        report = build_report(equipment_id, results['item'], results['bom'],
+                                              results['where_used'], self.prefix)
+                        row = report_row(report)
+                        rows[equipment_id] = row
+                        by_type[row['type'] or 'Unknown'] += 1
+                        by_facility[row['facility'] or 'Unknown'] += 1
+                        totals['components'] += row['total_components']
+                        totals['critical_components'] += row['critical_components']
+                        if on_report is not None:
+                            on_report(report)
+                        start_next()
+            except BaseException:
+                for future in owners:
+                    future.cancel()
+                raise
+
+        elapsed = time.perf_counter() - started
+        logger.info("Fleet report: %d machines, %d failed in %.1fs",
+                    len(rows), len(failed), elapsed)
+        return {
+            'generated': datetime.now().isoformat(),
+            'rows': sorted(rows.values(), key=lambda row: order[row['equipment_id']]),
+            'failed': failed,
+            'summary': {
+                'equipment': len(rows),
+                'failed': len(failed),
+                'by_type': dict(by_type),
+                'by_facility': dict(by_facility),
+                'total_components': totals['components'],
+                'critical_components': totals['critical_components']
+            },
+            'elapsed': elapsed
+        }
+
+    def discover_equipment(self, query: Optional[Dict] = None, page_size: int = 1000,
+                           deadline: Optional[Deadline] = None) -> List[str]:
+        """IDs of all equipment matching the query (all mining equipment by default)"""
+        query = dict(query or EQUIPMENT_QUERY)
+        equipment_ids, page = [], 1
+        while True:
+            results = self.client.search_items(dict(query, page=page, pageSize=page_size),
+                                               deadline=deadline, properties=[])
+            equipment_ids.extend(item['itemId'] for item in results)
+            if len(results) < page_size:
+                return equipment_ids
+            page += 1
+
+
+def run_report_generation(settings: Dict, client: TeamcenterRESTClient,
+                          equipment_ids: Optional[Sequence[str]] = None,
+                          output_path: Optional[str] = None) -> Dict:
+    """
+    Entry point for the scheduling.jobs.report_generation job
+
+    Writes the consolidated fleet dataset as JSON under
+    automation.reporting.output_directory (or to output_path), and the
+    machine rows in every exportable format of automation.reporting.formats
+    next to it.
+    """
+    reporting = (settings.get('automation') or {}).get('reporting') or {}
+    job = ((settings.get('scheduling') or {}).get('jobs') or {}).get('report_generation') or {}
+    reporter = EquipmentReporter(
+        client,
+        max_workers=job.get('max_workers', 16),
+        levels=job.get('levels', 2),
+        property_prefix=(settings.get('epiroc') or {}).get('property_prefix', 'epr_')
+    )
+
+    if equipment_ids is None:
+        equipment_ids = reporter.discover_equipment()
+    dataset = reporter.fleet_report(equipment_ids)
+
+    path = Path(output_path) if output_path else (
+        Path(reporting.get('output_directory', './reports'))
+        / f"fleet-report-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(dataset, indent=2))
+    dataset['path'] = str(path)
+
+    dataset['exports'] = []
+    for name in reporting.get('formats') or []:
+        try:
+            fmt = resolve_format(name)
+        except ValueError:
+            logger.debug("Report format '%s' has no tabular export", name)
+            continue
+        try:
+            summary = export_rows(dataset['rows'], path.with_suffix(WRITERS[fmt].suffix), fmt,
+                                  reporting.get('chunk_size', DEFAULT_CHUNK_SIZE), flatten=False)
+        except ImportError as e:
+            logger.warning("Skipping %s export: %s", name, e)
+            continue
+        dataset['exports'].append(summary['path'])
+    return dataset
+
+
+def main():
+    """Generate a fleet report from the command line"""
+    from ..utils.config import load_settings
+    from ..utils.log_pipeline import configure_logging
+
+    parser = argparse.ArgumentParser(description='Generate equipment reports')
+    parser.add_argument('equipment', nargs='*', help='Equipment IDs (default: whole fleet)')
+    parser.add_argument('--settings', help='Path to settings.yaml')
+    parser.add_argument('--environment', help='Settings environment override to apply')
+    parser.add_argument('--output', help='Output file')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    settings = load_settings(args.settings, args.environment)
+    configure_logging(settings)
+    job = ((settings.get('scheduling') or {}).get('jobs') or {}).get('report_generation') or {}
+    client = TeamcenterRESTClient(settings['teamcenter']['base_url'],
+                                  os.getenv('TC_USERNAME'), os.getenv('TC_PASSWORD'),
+                                  pool_size=connection_pool_size(settings,
+                                                                 job.get('max_workers', 16)),
+                                  codec=Codec.from_settings(settings))
+    try:
+        dataset = run_report_generation(settings, client, args.equipment or None, args.output)
+    finally:
+        client.logout()
+    print(json.dumps(dataset['summary'], indent=2))
+    print(f"Report written to {dataset['path']}")
+
+
+if __name__ == '__main__':
+    main()
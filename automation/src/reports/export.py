@@ -0,0 +1,490 @@
+"""
+Streaming export of search, saved-query and BOM results
+
+Results are consumed page by page and written in bounded chunks, so a
+multi-million row catalog or a fully flattened fleet BOM is never held in
+memory at once. CSV needs only the standard library; Parquet and Arrow
+need pyarrow and XLSX needs xlsxwriter, which are imported on first use.
+"""
+
+import argparse
+import csv
+import json
+import logging
+import os
+import time
+from collections import deque
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from ..client.codec import Codec
+from ..client.deadline import Deadline, current_deadline
+from ..client.models import json_default
+from ..client.rest_client import TeamcenterRESTClient
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 10000
+DEFAULT_PAGE_SIZE = 1000
+
+# Rows per worksheet, including the header
+XLSX_MAX_ROWS = 1048576
+
+
+# ==================== Sources ====================
+
+def _pages(fetch: Callable[[int], List[Dict]], page_size: int) -> Iterator[List[Dict]]:
+    """Yield pages from fetch(page), requesting the next page while the caller writes"""
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix='tc-export') as executor:
+        future = executor.submit(fetch, 1)
+        page = 1
+        while future is not None:
+            results = future.result()
+            if len(results) >= page_size:
+                page += 1
+                future = executor.submit(fetch, page)
+            else:
+                future = None
+            yield results
+
+
+def iter_search(client: TeamcenterRESTClient, query: Dict,
+                page_size: int = DEFAULT_PAGE_SIZE,
+                deadline: Optional[Deadline] = None,
+                properties: Optional[Sequence[str]] = None) -> Iterator[Dict]:
+    """Stream every item matching a search, one page in memory at a time"""
+    deadline = deadline or current_deadline()
+
+    def fetch(page: int) -> List[Dict]:
+        return client.search_items(dict(query, page=page, pageSize=page_size),
+                                   deadline=deadline, properties=properties)
+
+    for results in _pages(fetch, page_size):
+        yield from results
+
+
+def iter_saved_query(client: TeamcenterRESTClient, query_name: str,
+                     parameters: Optional[Dict] = None,
+                     page_size: int = DEFAULT_PAGE_SIZE,
+                     deadline: Optional[Deadline] = None,
+                     properties: Optional[Sequence[str]] = None) -> Iterator[Dict]:
+    """Stream every result of a saved query, one page in memory at a time"""
+    deadline = deadline or current_deadline()
+
+    def fetch(page: int) -> List[Dict]:
+        return client.execute_saved_query(query_name, parameters, deadline=deadline,
+                                          max_results=page_size, page=page,
+                                          properties=properties)
+
+    for results in _pages(fetch, page_size):
+        yield from results
+
+
+def flatten_bom(structure: Dict, root_id: Optional[str] = None) -> Iterator[Dict]:
+    """
+    Flatten a nested get_bom_structure() result depth-first
+
+    Each line keeps its 'level' and 'parentId' and gains 'rootId'; nested
+    'children' are emitted as lines of their own.
+    """
+    root_id = root_id or (structure.get('root') or {}).get('itemId')
+    stack = [iter(structure.get('lines', []))]
+    while stack:
+        line = next(stack[-1], None)
+        if line is None:
+            stack.pop()
+            continue
+        row = {'rootId': root_id}
+        row.update((key, value) for key, value in line.items() if key != 'children')
+        yield row
+        if line.get('children'):
+            stack.append(iter(line['children']))
+
+
+def iter_bom_lines(client: TeamcenterRESTClient, root_ids: Iterable[str],
+                   levels: int = -1, max_workers: int = 4,
+                   deadline: Optional[Deadline] = None,
+                   properties: Optional[Sequence[str]] = None) -> Iterator[Dict]:
+    """
+    Stream the flattened BOM lines of many roots
+
+    Structures are fetched concurrently, at most max_workers ahead of the
+    consumer, and yielded in root order. properties limits the line
+    properties fetched (None fetches all).
+    """
+    deadline = deadline or current_deadline()
+    roots = iter(root_ids)
+
+    def fetch(root_id: str) -> Dict:
+        return client.get_bom_structure(root_id, levels=levels, deadline=deadline,
+                                        properties=properties)
+
+    with ThreadPoolExecutor(max_workers=max_workers,
+                            thread_name_prefix='tc-export-bom') as executor:
+        window = deque()
+        try:
+            for root_id in islice(roots, max_workers):
+                window.append((root_id, executor.submit(fetch, root_id)))
+            while window:
+                root_id, future = window.popleft()
+                structure = future.result()
+                next_root = next(roots, None)
+                if next_root is not None:
+                    window.append((next_root, executor.submit(fetch, next_root)))
+                yield from flatten_bom(structure, root_id)
+        finally:
+            for _, future in window:
+                future.cancel()
+
+
+# ==================== Rows ====================
+
+def flatten_record(record: Dict) -> Dict:
+    """
+    Turn an API record into a flat row of scalar cells
+
+    Entries of 'properties' become columns of their own; other nested
+    values are stored as JSON text.
+    """
+    row = {}
+    for key, value in record.items():
+        if key == 'properties' and isinstance(value, Mapping):
+            for name, prop in value.items():
+                row[name] = prop if _is_scalar(prop) else json.dumps(prop, default=json_default)
+        elif _is_scalar(value):
+            row[key] = value
+        else:
+            row[key] = json.dumps(value, default=json_default)
+    return row
+
+
+def _is_scalar(value) -> bool:
+    return value is None or isinstance(value, (str, int, float, bool))
+
+
+def chunked(rows: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    """Group rows into lists of at most size rows"""
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# ==================== Writers ====================
+
+class ChunkWriter:
+    """
+    Base class for chunked writers
+
+    Columns are fixed by the constructor or by the first chunk written, in
+    first-seen order. Keys that first appear in later chunks are dropped,
+    since CSV headers and columnar schemas cannot grow after writing starts.
+    """
+
+    suffix = ''
+
+    def __init__(self, path: str, columns: Optional[Sequence[str]] = None):
+        self.path = Path(path)
+        self.columns = list(columns) if columns else None
+        self.rows = 0
+        self.chunks = 0
+        self._opened = False
+        # Extra keys are expected when the caller chose the columns
+        self._dropped = None if columns else set()
+
+    def _start(self, chunk: List[Dict]):
+        if self.columns is None:
+            self.columns = list(dict.fromkeys(key for row in chunk for key in row))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._open(chunk)
+        self._opened = True
+
+    def write(self, chunk: List[Dict]):
+        """Write one chunk of flat rows"""
+        if not chunk:
+            return
+        if not self._opened:
+            self._start(chunk)
+        if self._dropped is not None:
+            self._check_columns(chunk)
+        self._write(chunk)
+        self.rows += len(chunk)
+        self.chunks += 1
+
+    def _check_columns(self, chunk: List[Dict]):
+        extra = {key for row in chunk for key in row} - set(self.columns) - self._dropped
+        if extra:
+            self._dropped |= extra
+            logger.warning("%s: dropping columns not in the first chunk: %s",
+                           self.path.name, sorted(extra))
+
+    def close(self):
+        """Finish the file; an empty export still produces a valid file"""
+        if not self._opened:
+            self._start([])
+        self._close()
+
+    def _open(self, chunk: List[Dict]):
+        raise NotImplementedError
+
+    def _write(self, chunk: List[Dict]):
+        raise NotImplementedError
+
+    def _close(self):
+        raise NotImplementedError
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class CSVChunkWriter(ChunkWriter):
+    """CSV with a header row"""
+
+    suffix = '.csv'
+
+    def _open(self, chunk: List[Dict]):
+        self._file = open(self.path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._file, fieldnames=self.columns,
+                                      extrasaction='ignore')
+        self._writer.writeheader()
+
+    def _write(self, chunk: List[Dict]):
+        self._writer.writerows(chunk)
+
+    def _close(self):
+        self._file.close()
+
+
+class ParquetChunkWriter(ChunkWriter):
+    """Parquet file with one row group per chunk"""
+
+    suffix = '.parquet'
+
+    def _schema(self, chunk: List[Dict]):
+        import pyarrow as pa
+
+        sample = pa.Table.from_pylist([{c: row.get(c) for c in self.columns} for row in chunk])
+        fields = []
+        for name, field in zip(self.columns, sample.schema):
+            if pa.types.is_null(field.type):
+                # Empty in the first chunk: keep as text
+                field = pa.field(name, pa.string())
+            elif pa.types.is_integer(field.type):
+                # Later chunks may hold fractional values (e.g. quantities)
+                field = pa.field(name, pa.float64())
+            fields.append(field)
+        return pa.schema(fields)
+
+    def _table(self, chunk: List[Dict]):
+        import pyarrow as pa
+
+        arrays = []
+        for field in self.schema:
+            values = [row.get(field.name) for row in chunk]
+            if pa.types.is_string(field.type):
+                values = [None if value is None else str(value) for value in values]
+            arrays.append(pa.array(values, type=field.type))
+        return pa.Table.from_arrays(arrays, schema=self.schema)
+
+    def _open(self, chunk: List[Dict]):
+        import pyarrow.parquet as pq
+        self.schema = self._schema(chunk)
+        self._writer = pq.ParquetWriter(self.path, self.schema)
+
+    def _write(self, chunk: List[Dict]):
+        self._writer.write_table(self._table(chunk))
+
+    def _close(self):
+        self._writer.close()
+
+
+class ArrowChunkWriter(ParquetChunkWriter):
+    """Arrow IPC (Feather v2) file with one record batch per chunk"""
+
+    suffix = '.arrow'
+
+    def _open(self, chunk: List[Dict]):
+        import pyarrow as pa
+        self.schema = self._schema(chunk)
+        self._sink = pa.OSFile(str(self.path), 'wb')
+        self._writer = pa.ipc.new_file(self._sink, self.schema)
+
+    def _write(self, chunk: List[Dict]):
+        self._writer.write_table(self._table(chunk))
+
+    def _close(self):
+        self._writer.close()
+        self._sink.close()
+
+
+class XLSXChunkWriter(ChunkWriter):
+    """
+    Excel workbook written in xlsxwriter's constant-memory mode
+
+    Rows are flushed as they are written; a new worksheet is started when
+    one reaches Excel's row limit.
+    """
+
+    suffix = '.xlsx'
+
+    def _open(self, chunk: List[Dict]):
+        import xlsxwriter
+
+        self._workbook = xlsxwriter.Workbook(str(self.path), {'constant_memory': True,
+                                                              'strings_to_numbers': False,
+                                                              'strings_to_urls': False})
+        self._header = self._workbook.add_format({'bold': True})
+        self._sheet = None
+        self._sheet_rows = 0
+        self._sheets = 0
+
+    def _new_sheet(self):
+        self._sheets += 1
+        self._sheet = self._workbook.add_worksheet(f"Data{self._sheets}" if self._sheets > 1
+                                                   else 'Data')
+        self._sheet.write_row(0, 0, self.columns, self._header)
+        self._sheet_rows = 1
+
+    def _write(self, chunk: List[Dict]):
+        for row in chunk:
+            if self._sheet is None or self._sheet_rows >= XLSX_MAX_ROWS:
+                self._new_sheet()
+            self._sheet.write_row(self._sheet_rows, 0,
+                                  [row.get(column) for column in self.columns])
+            self._sheet_rows += 1
+
+    def _close(self):
+        if self._sheet is None:
+            self._new_sheet()
+        self._workbook.close()
+
+
+WRITERS = {
+    'csv': CSVChunkWriter,
+    'parquet': ParquetChunkWriter,
+    'arrow': ArrowChunkWriter,
+    'xlsx': XLSXChunkWriter
+}
+
+FORMAT_ALIASES = {
+    'excel': 'xlsx',
+    'feather': 'arrow',
+    'ipc': 'arrow'
+}
+
+
+def resolve_format(fmt: Optional[str] = None, path: Optional[str] = None) -> str:
+    """Export format from a name (or alias) or from the file suffix"""
+    if fmt is None and path is not None:
+        fmt = Path(path).suffix.lstrip('.')
+    fmt = FORMAT_ALIASES.get((fmt or '').lower(), (fmt or '').lower())
+    if fmt not in WRITERS:
+        raise ValueError(f"Unsupported export format '{fmt}' "
+                         f"(supported: {', '.join(sorted(WRITERS))})")
+    return fmt
+
+
+def export_rows(records: Iterable[Dict], path: str, fmt: Optional[str] = None,
+                chunk_size: int = DEFAULT_CHUNK_SIZE,
+                columns: Optional[Sequence[str]] = None,
+                flatten: bool = True) -> Dict:
+    """
+    Stream records into a file, one chunk at a time
+
+    Args:
+        records: Items, query results or BOM lines (any iterable, typically
+            one of the iter_* sources)
+        path: Output file
+        fmt: 'csv', 'parquet', 'arrow' or 'xlsx' ('excel'); defaults to the
+            file suffix
+        chunk_size: Rows buffered per write
+        columns: Column order (defaults to the keys of the first chunk)
+        flatten: Expand 'properties' into columns with flatten_record()
+
+    Returns:
+        Summary with 'path', 'format', 'rows', 'chunks' and 'elapsed'
+    """
+    fmt = resolve_format(fmt, path)
+    started = time.perf_counter()
+    rows = (flatten_record(record) for record in records) if flatten else records
+
+    with WRITERS[fmt](path, columns) as writer:
+        for chunk in chunked(rows, chunk_size):
+            writer.write(chunk)
+            logger.debug("%s: %d rows written", writer.path.name, writer.rows)
+
+    elapsed = time.perf_counter() - started
+    logger.info("Exported %d rows to %s in %.1fs", writer.rows, path, elapsed)
+    return {
+        'path': str(path),
+        'format': fmt,
+        'rows': writer.rows,
+        'chunks': writer.chunks,
+        'elapsed': elapsed
+    }
+
+
+def main():
+    """Export search, saved-query or BOM results from the command line"""
+    from ..utils.config import load_settings
+    from ..utils.log_pipeline import configure_logging
+
+    parser = argparse.ArgumentParser(description='Export Teamcenter data')
+    parser.add_argument('source', choices=['search', 'query', 'bom'])
+    parser.add_argument('arguments', nargs='*',
+                        help='search: JSON criteria; query: query name; '
+                             'bom: root item IDs (default: whole fleet)')
+    parser.add_argument('--param', action='append', default=[], metavar='KEY=VALUE',
+                        help='Saved query parameter')
+    parser.add_argument('--levels', type=int, default=-1, help='BOM levels to expand')
+    parser.add_argument('--properties', help='Comma-separated properties to export '
+                                             '(default: all)')
+    parser.add_argument('--output', required=True, help='Output file')
+    parser.add_argument('--format', help='csv, parquet, arrow or xlsx (default: from suffix)')
+    parser.add_argument('--settings', help='Path to settings.yaml')
+    parser.add_argument('--environment', help='Settings environment override to apply')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    settings = load_settings(args.settings, args.environment)
+    configure_logging(settings)
+    reporting = (settings.get('automation') or {}).get('reporting') or {}
+    chunk_size = reporting.get('chunk_size', DEFAULT_CHUNK_SIZE)
+    page_size = reporting.get('page_size', DEFAULT_PAGE_SIZE)
+    properties = args.properties.split(',') if args.properties is not None else None
+
+    client = TeamcenterRESTClient(settings['teamcenter']['base_url'],
+                                  os.getenv('TC_USERNAME'), os.getenv('TC_PASSWORD'),
+                                  codec=Codec.from_settings(settings))
+    try:
+        if args.source == 'search':
+            query = json.loads(args.arguments[0]) if args.arguments else {}
+            records = iter_search(client, query, page_size, properties=properties)
+        elif args.source == 'query':
+            if not args.arguments:
+                parser.error('query needs a saved query name')
+            parameters = dict(param.split('=', 1) for param in args.param)
+            records = iter_saved_query(client, args.arguments[0], parameters, page_size,
+                                       properties=properties)
+        else:
+            from .equipment import EquipmentReporter
+            roots = args.arguments or EquipmentReporter(client).discover_equipment()
+            records = iter_bom_lines(client, roots, levels=args.levels, properties=properties)
+        summary = export_rows(records, args.output, args.format, chunk_size)
+    finally:
+        client.logout()
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,511 @@
+"""
+Memory-mapped columnar snapshots of expanded BOMs
+
+A snapshot stores the lines of one or more expanded structures in a single
+binary file:
+
+    header      magic, format version and a JSON table of contents
+    nodes       fixed-width record per line (parent, root, level and string
+                references for line ID, child ID, child name, UOM, find number)
+    quantity    float64 per line
+    children    CSR child offsets (int64, lines + 1) and child line indices
+    roots       root string reference, first line and line count per root
+    properties  one int32 string-reference column per property name
+    strings     sorted, deduplicated UTF-8 string table with int64 offsets
+
+Lines are stored depth-first in the order flatten_bom() emits them, so each
+root's lines are one contiguous range. BOMSnapshot opens the file with mmap
+and exposes every section as a read-only NumPy view without copying, so
+opening is constant-time and worker processes reading the same snapshot
+share one copy in the page cache.
+
+Example:
+    write_snapshot('fleet.tcbom', iter_bom_lines(client, fleet_ids))
+    with BOMSnapshot('fleet.tcbom') as snapshot:
+        critical = snapshot.property('epr_critical_component') == snapshot.string_index('True')
+        print(int(critical.sum()), 'critical lines')
+"""
+
+import argparse
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'TCBOMSNP'
+FORMAT_VERSION = 1
+
+# Magic, format version, table of contents length
+HEADER = struct.Struct('<8sII')
+
+# Sections start on cache-line boundaries
+ALIGNMENT = 64
+
+# Reference used for missing strings
+NO_STRING = -1
+
+NODE_DTYPE = np.dtype([
+    ('parent', '<i4'),       # line index of the parent line, -1 under the root
+    ('root', '<i4'),         # root number (row of the roots section)
+    ('level', '<i4'),
+    ('line_id', '<i4'),      # string references
+    ('child_id', '<i4'),
+    ('child_name', '<i4'),
+    ('uom', '<i4'),
+    ('find_number', '<i4')
+])
+
+ROOT_DTYPE = np.dtype([
+    ('root_id', '<i4'),
+    ('first', '<i8'),
+    ('count', '<i8')
+])
+
+# Line fields stored as string references, by flatten_bom() key
+STRING_FIELDS = {'lineId': 'line_id', 'childId': 'child_id', 'childName': 'child_name',
+                 'uom': 'uom', 'findNumber': 'find_number'}
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+# ==================== Writing ====================
+
+class SnapshotWriter:
+    """
+    Collects flattened BOM lines and writes them as a snapshot
+
+    Lines must arrive depth-first with each root's lines together, as
+    flatten_bom() and iter_bom_lines() produce them.
+    """
+
+    def __init__(self, properties: Optional[Sequence[str]] = None):
+        """
+        Initialize writer
+
+        Args:
+            properties: Property columns to store (None stores every
+                property seen)
+        """
+        self.fixed_properties = list(properties) if properties is not None else None
+        self._strings: Dict[str, int] = {}
+        self._columns = {name: array('i') for name in NODE_DTYPE.names}
+        self._parent = self._columns['parent']
+        self._root = self._columns['root']
+        self._level = self._columns['level']
+        self._string_columns = [(key, self._columns[field])
+                                for key, field in STRING_FIELDS.items()]
+        self._quantity = array('d')
+        self._properties: Dict[str, array] = {
+            name: array('i') for name in (self.fixed_properties or [])
+        }
+        self._roots: List[List] = []
+        self._stack: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._quantity)
+
+    def _ref(self, value) -> int:
+        if value is None:
+            return NO_STRING
+        if type(value) is not str:
+            value = str(value)
+        strings = self._strings
+        return strings.setdefault(value, len(strings))
+
+    def add_line(self, line: Dict):
+        """Append one flattened line ('rootId', 'level', 'childId', ...)"""
+        ref = self._ref
+        index = len(self._quantity)
+        root_ref = ref(line.get('rootId'))
+        roots = self._roots
+        if not roots or roots[-1][0] != root_ref:
+            roots.append([root_ref, index, 0])
+            self._stack = []
+        roots[-1][2] += 1
+
+        stack = self._stack
+        level = int(line.get('level') or 1)
+        del stack[level - 1:]
+        parent = stack[-1] if stack else -1
+        stack.append(index)
+
+        self._parent.append(parent)
+        self._root.append(len(roots) - 1)
+        self._level.append(level)
+        for key, column in self._string_columns:
+            column.append(ref(line.get(key)))
+        quantity = line.get('quantity')
+        self._quantity.append(float(quantity) if quantity not in (None, '') else float('nan'))
+
+        properties = line.get('properties') or {}
+        if self.fixed_properties is None:
+            for name in properties:
+                if name not in self._properties:
+                    self._properties[name] = array('i', [NO_STRING]) * index
+        for name, column in self._properties.items():
+            column.append(ref(properties.get(name)))
+
+    def add_structure(self, structure: Dict, root_id: Optional[str] = None):
+        """Append every line of a get_bom_structure() result"""
+        from .export import flatten_bom
+        for line in flatten_bom(structure, root_id):
+            self.add_line(line)
+
+    def write(self, path: str) -> Dict:
+        """
+        Write the snapshot atomically
+
+        Returns:
+            Summary with line, root, string and property counts and size
+        """
+        count = len(self._quantity)
+
+        # Sorted string table, so readers can look strings up by bisection
+        ordered = sorted(self._strings, key=lambda value: value.encode('utf-8'))
+        remap = np.empty(len(ordered) + 1, dtype='<i4')
+        remap[-1] = NO_STRING  # index -1 keeps missing strings missing
+        for new, value in enumerate(ordered):
+            remap[self._strings[value]] = new
+        encoded = [value.encode('utf-8') for value in ordered]
+        string_offsets = np.zeros(len(encoded) + 1, dtype='<i8')
+        np.cumsum([len(data) for data in encoded], out=string_offsets[1:])
+        string_data = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+
+        nodes = np.empty(count, dtype=NODE_DTYPE)
+        for name in NODE_DTYPE.names:
+            column = np.frombuffer(self._columns[name], dtype=np.int32)
+            nodes[name] = remap[column] if name in STRING_FIELDS.values() else column
+
+        parents = nodes['parent']
+        child_offsets = np.zeros(count + 1, dtype='<i8')
+        np.cumsum(np.bincount(parents[parents >= 0], minlength=count), out=child_offsets[1:])
+        order = np.argsort(parents, kind='stable')
+        child_index = order[np.count_nonzero(parents < 0):].astype('<i4')
+
+        roots = np.empty(len(self._roots), dtype=ROOT_DTYPE)
+        for number, (root_ref, first, lines) in enumerate(self._roots):
+            roots[number] = (remap[root_ref], first, lines)
+
+        names = list(self._properties)
+        properties = np.empty((len(names), count), dtype='<i4')
+        for row, name in enumerate(names):
+            properties[row] = remap[np.frombuffer(self._properties[name], dtype=np.int32)]
+
+        sections = {
+            'nodes': nodes,
+            'quantity': np.frombuffer(self._quantity, dtype='<f8'),
+            'child_offsets': child_offsets,
+            'child_index': child_index,
+            'roots': roots,
+            'properties': properties,
+            'string_offsets': string_offsets,
+            'string_data': string_data
+        }
+        return _write_sections(path, sections, {
+            'lines': count,
+            'roots': len(roots),
+            'strings': len(ordered),
+            'property_names': names,
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S')
+        })
+
+
+def _write_sections(path: str, sections: Dict[str, np.ndarray], meta: Dict) -> Dict:
+    """Lay out sections after the header and write via a temporary file"""
+    def table(header_size: int) -> Dict:
+        offset, entries = _align(header_size), {}
+        for name, data in sections.items():
+            entries[name] = {
+                'offset': offset,
+                'dtype': data.dtype.descr if data.dtype.names else data.dtype.str,
+                'shape': list(data.shape)
+            }
+            offset = _align(offset + data.nbytes)
+        return dict(meta, version=FORMAT_VERSION, sections=entries, size=offset)
+
+    # Offsets depend on the table's own length; two passes settle it
+    toc = table(HEADER.size)
+    encoded = json.dumps(toc, separators=(',', ':')).encode('utf-8')
+    toc = table(HEADER.size + len(encoded) + 32)
+    encoded = json.dumps(toc, separators=(',', ':')).encode('utf-8')
+    if HEADER.size + len(encoded) > toc['sections']['nodes']['offset']:
+        raise RuntimeError("Snapshot table of contents does not fit its header")
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(path.name + '.tmp')
+    with open(temporary, 'wb') as handle:
+        handle.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(encoded)))
+        handle.write(encoded)
+        for name, data in sections.items():
+            handle.seek(toc['sections'][name]['offset'])
+            handle.write(np.ascontiguousarray(data).tobytes())
+        handle.truncate(toc['size'])
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(temporary, path)
+
+    return {'path': str(path), 'lines': meta['lines'], 'roots': meta['roots'],
+            'strings': meta['strings'], 'properties': len(meta['property_names']),
+            'bytes': toc['size']}
+
+
+def write_snapshot(path: str, lines: Iterable[Dict],
+                   properties: Optional[Sequence[str]] = None) -> Dict:
+    """
+    Write flattened BOM lines (e.g. from iter_bom_lines()) as a snapshot
+
+    Args:
+        path: Output file
+        lines: Depth-first flattened lines with 'rootId' and 'level'
+        properties: Property columns to store (None stores every property)
+
+    Returns:
+        Summary of the written snapshot
+    """
+    started = time.perf_counter()
+    writer = SnapshotWriter(properties)
+    for line in lines:
+        writer.add_line(line)
+    summary = writer.write(path)
+    summary['elapsed'] = time.perf_counter() - started
+    logger.info("Wrote BOM snapshot %s: %d lines, %d roots, %d bytes in %.2fs",
+                path, summary['lines'], summary['roots'], summary['bytes'],
+                summary['elapsed'])
+    return summary
+
+
+# ==================== Reading ====================
+
+class BOMSnapshot:
+    """
+    Read-only view of a snapshot file
+
+    Sections are NumPy arrays backed directly by the memory map: nodes,
+    quantity, child_offsets, child_index, roots and one column per
+    property (via property()). String references are resolved with
+    string() and looked up with string_index().
+    """
+
+    def __init__(self, path: str):
+        self.path = str(path)
+        self._file = open(self.path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Empty snapshot file: {self.path}")
+
+        magic, version, toc_length = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Not a BOM snapshot: {self.path}")
+        if version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported snapshot version {version}: {self.path}")
+        self.toc = json.loads(self._map[HEADER.size:HEADER.size + toc_length])
+
+        self.nodes = self._section('nodes')
+        self.quantity = self._section('quantity')
+        self.child_offsets = self._section('child_offsets')
+        self.child_index = self._section('child_index')
+        self.roots = self._section('roots')
+        self._properties = self._section('properties')
+        self._string_offsets = self._section('string_offsets')
+        self._strings_base = self.toc['sections']['string_data']['offset']
+        self.property_names: List[str] = self.toc['property_names']
+        self._property_rows = {name: row for row, name in enumerate(self.property_names)}
+        self._root_numbers: Optional[Dict[str, int]] = None
+
+    def _section(self, name: str) -> np.ndarray:
+        entry = self.toc['sections'][name]
+        dtype = entry['dtype']
+        dtype = np.dtype([tuple(field) for field in dtype]) if isinstance(dtype, list) \
+            else np.dtype(dtype)
+        shape = tuple(entry['shape'])
+        count = int(np.prod(shape)) if shape else 1
+        return np.frombuffer(self._map, dtype=dtype, count=count,
+                             offset=entry['offset']).reshape(shape)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    # ==================== Strings ====================
+
+    def string(self, ref: int) -> Optional[str]:
+        """String for a reference (None for missing)"""
+        if ref < 0:
+            return None
+        start, end = self._string_offsets[ref], self._string_offsets[ref + 1]
+        return self._map[self._strings_base + start:self._strings_base + end].decode('utf-8')
+
+    def strings(self, refs: Iterable[int]) -> List[Optional[str]]:
+        """Strings for many references"""
+        return [self.string(int(ref)) for ref in refs]
+
+    def string_index(self, value: str) -> int:
+        """Reference of a string, or -1 if the snapshot does not contain it"""
+        target = value.encode('utf-8')
+        base = self._strings_base
+        low, high = 0, len(self._string_offsets) - 1
+        while low < high:
+            middle = (low + high) // 2
+            start, end = self._string_offsets[middle], self._string_offsets[middle + 1]
+            if self._map[base + start:base + end] < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(self._string_offsets) - 1:
+            start, end = self._string_offsets[low], self._string_offsets[low + 1]
+            if self._map[base + start:base + end] == target:
+                return low
+        return NO_STRING
+
+    # ==================== Structure ====================
+
+    def property(self, name: str) -> np.ndarray:
+        """String-reference column of a property (-1 where a line lacks it)"""
+        row = self._property_rows.get(name)
+        if row is None:
+            raise KeyError(f"Snapshot has no property '{name}'")
+        return self._properties[row]
+
+    def children(self, line: int) -> np.ndarray:
+        """Line indices of a line's direct children"""
+        return self.child_index[self.child_offsets[line]:self.child_offsets[line + 1]]
+
+    def root_ids(self) -> List[str]:
+        """IDs of the stored roots, in order"""
+        return self.strings(self.roots['root_id'])
+
+    def root_range(self, root_id: str) -> slice:
+        """Line range of one root's structure"""
+        if self._root_numbers is None:
+            self._root_numbers = {root: number for number, root in enumerate(self.root_ids())}
+        root = self.roots[self._root_numbers[root_id]]
+        return slice(int(root['first']), int(root['first'] + root['count']))
+
+    def line(self, index: int) -> Dict:
+        """One line as a flatten_bom()-style dict"""
+        node = self.nodes[index]
+        parent = int(node['parent'])
+        root_id = self.string(int(self.roots[node['root']]['root_id']))
+        row = {
+            'rootId': root_id,
+            'lineId': self.string(int(node['line_id'])),
+            'level': int(node['level']),
+            'parentId': (self.string(int(self.nodes[parent]['child_id'])) if parent >= 0
+                         else root_id),
+            'childId': self.string(int(node['child_id'])),
+            'childName': self.string(int(node['child_name'])),
+            'quantity': float(self.quantity[index]),
+            'uom': self.string(int(node['uom'])),
+            'findNumber': self.string(int(node['find_number']))
+        }
+        properties = {}
+        for name, column in zip(self.property_names, self._properties[:, index]):
+            if column >= 0:
+                properties[name] = self.string(int(column))
+        row['properties'] = properties
+        return row
+
+    def lines(self, root_id: Optional[str] = None) -> Iterator[Dict]:
+        """Materialize lines (of one root, or all) as flatten_bom()-style dicts"""
+        span = self.root_range(root_id) if root_id is not None else range(len(self))
+        if isinstance(span, slice):
+            span = range(span.start, span.stop)
+        for index in span:
+            yield self.line(index)
+
+    # ==================== Lifecycle ====================
+
+    def close(self):
+        """Release the mapping (arrays obtained from it must no longer be used)"""
+        for name in ('nodes', 'quantity', 'child_offsets', 'child_index', 'roots',
+                     '_properties', '_string_offsets'):
+            self.__dict__.pop(name, None)
+        try:
+            self._map.close()
+        except (BufferError, AttributeError):
+            # Views handed out are still alive; the map closes when they go
+            pass
+        self._file.close()
+
+    def __enter__(self) -> 'BOMSnapshot':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"BOMSnapshot('{self.path}', lines={len(self.nodes)}, roots={len(self.roots)})"
+
+
+def main():
+    """Create or inspect BOM snapshots"""
+    from ..client.codec import Codec
+    from ..client.rest_client import TeamcenterRESTClient
+    from ..utils.config import load_settings
+    from ..utils.log_pipeline import configure_logging
+    from .equipment import EquipmentReporter
+    from .export import iter_bom_lines
+
+    parser = argparse.ArgumentParser(description='Create or inspect BOM snapshots')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    create = subparsers.add_parser('create', help='Expand BOMs into a snapshot')
+    create.add_argument('roots', nargs='*', help='Root item IDs (default: whole fleet)')
+    create.add_argument('--output', required=True, help='Snapshot file')
+    create.add_argument('--levels', type=int, default=-1, help='BOM levels to expand')
+    create.add_argument('--properties', help='Comma-separated line properties to keep '
+                                             '(default: all)')
+    create.add_argument('--settings', help='Path to settings.yaml')
+    create.add_argument('--environment', help='Settings environment override to apply')
+    info = subparsers.add_parser('info', help='Describe a snapshot')
+    info.add_argument('path')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    if args.command == 'info':
+        started = time.perf_counter()
+        with BOMSnapshot(args.path) as snapshot:
+            opened = time.perf_counter() - started
+            print(json.dumps({
+                'lines': len(snapshot),
+                'roots': len(snapshot.roots),
+                'strings': snapshot.toc['strings'],
+                'properties': snapshot.property_names,
+                'created': snapshot.toc['created'],
+                'open_ms': round(opened * 1000, 3)
+            }, indent=2))
+        return
+
+    settings = load_settings(args.settings, args.environment)
+    configure_logging(settings)
+    properties = args.properties.split(',') if args.properties is not None else None
+    client = TeamcenterRESTClient(settings['teamcenter']['base_url'],
+                                  os.getenv('TC_USERNAME'), os.getenv('TC_PASSWORD'),
+                                  codec=Codec.from_settings(settings))
+    try:
+        roots = args.roots or EquipmentReporter(client).discover_equipment()
+        lines = iter_bom_lines(client, roots, levels=args.levels, properties=properties)
+        summary = write_snapshot(args.output, lines, properties)
+    finally:
+        client.logout()
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == '__main__':
+    main()
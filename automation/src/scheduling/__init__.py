@@ -0,0 +1,12 @@
+"""
+In-process scheduling of the configured automation jobs
+"""
+
+from .cron import CronSchedule
+from .scheduler import JOBS, JobScheduler
+
+__all__ = [
+    'CronSchedule',
+    'JOBS',
+    'JobScheduler'
+]
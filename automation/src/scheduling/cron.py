@@ -0,0 +1,107 @@
+"""
+Cron expression parsing for scheduling.jobs entries
+"""
+
+from datetime import datetime, timedelta
+from typing import List, Set
+
+MONTH_NAMES = {name: number for number, name in enumerate(
+    ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'], 1)}
+DAY_NAMES = {name: number for number, name in enumerate(
+    ['sun', 'mon', 'tue', 'wed', 'thu', 'fri', 'sat'])}
+
+# Limit for next_after(); covers leap days and rare day/month combinations
+SEARCH_DAYS = 366 * 8
+
+
+def _parse_field(field: str, low: int, high: int, names: dict = None) -> Set[int]:
+    """Values of one cron field: '*', 'a', 'a-b', '*/n', 'a-b/n' and lists"""
+    values = set()
+    for part in field.lower().split(','):
+        part, _, step = part.partition('/')
+        step = int(step) if step else 1
+        if step < 1:
+            raise ValueError(f"Invalid step in cron field '{field}'")
+        if part == '*':
+            start, end = low, high
+        else:
+            first, _, last = part.partition('-')
+            start = _value(first, names)
+            end = _value(last, names) if last else (high if step > 1 else start)
+        if not low <= start <= end <= high:
+            raise ValueError(f"Cron field '{field}' out of range {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+def _value(token: str, names: dict = None) -> int:
+    if names and token in names:
+        return names[token]
+    return int(token)
+
+
+class CronSchedule:
+    """
+    Standard five-field cron expression (minute hour day month weekday)
+
+    Supports '*', ranges, steps, lists and month/day names. As in cron,
+    when both day of month and day of week are restricted a day matching
+    either one fires. Times are naive local datetimes.
+
+    Example:
+        CronSchedule('0 17 * * 5').next_after(datetime.now())  # next Friday 17:00
+    """
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: '{expression}'")
+        self.expression = expression
+        self.minutes = sorted(_parse_field(fields[0], 0, 59))
+        self.hours = sorted(_parse_field(fields[1], 0, 23))
+        self.days = _parse_field(fields[2], 1, 31)
+        self.months = _parse_field(fields[3], 1, 12, MONTH_NAMES)
+        # 7 is Sunday as well as 0
+        self.weekdays = {day % 7 for day in _parse_field(fields[4], 0, 7, DAY_NAMES)}
+        self._any_day = fields[2] == '*'
+        self._any_weekday = fields[4] == '*'
+
+    def _day_matches(self, moment: datetime) -> bool:
+        if moment.month not in self.months:
+            return False
+        day = moment.day in self.days
+        weekday = (moment.isoweekday() % 7) in self.weekdays
+        if self._any_day or self._any_weekday:
+            return day and weekday
+        return day or weekday
+
+    def matches(self, moment: datetime) -> bool:
+        """Whether the schedule fires in the minute of moment"""
+        return (self._day_matches(moment) and moment.hour in self.hours
+                and moment.minute in self.minutes)
+
+    def next_after(self, moment: datetime) -> datetime:
+        """First firing time strictly after moment"""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        for _ in range(SEARCH_DAYS):
+            if self._day_matches(candidate):
+                for hour in self.hours:
+                    if hour < candidate.hour:
+                        continue
+                    for minute in self.minutes:
+                        if hour == candidate.hour and minute < candidate.minute:
+                            continue
+                        return candidate.replace(hour=hour, minute=minute)
+            candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+        raise ValueError(f"Cron expression never fires: '{self.expression}'")
+
+    def upcoming(self, moment: datetime, count: int = 5) -> List[datetime]:
+        """The next count firing times after moment"""
+        times = []
+        for _ in range(count):
+            moment = self.next_after(moment)
+            times.append(moment)
+        return times
+
+    def __repr__(self) -> str:
+        return f"CronSchedule('{self.expression}')"
@@ -0,0 +1,400 @@
+"""
+Long-lived scheduler running the configured jobs on one warm client
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Optional, Sequence
+
+from ..client.auth import AuthenticationManager
+from ..client.codec import Codec
+from ..client.rest_client import TeamcenterRESTClient, connection_pool_size
+from ..utils.metrics import LatencyWindow
+from .cron import CronSchedule
+
+logger = logging.getLogger(__name__)
+
+# Re-authenticate when the token has less than this left
+TOKEN_REFRESH_MARGIN = timedelta(minutes=5)
+
+
+def _compliance_check(settings: Dict, client: TeamcenterRESTClient) -> Dict:
+    from ..compliance.engine import run_compliance_check
+    return run_compliance_check(settings, client)
+
+
+def _bom_sync(settings: Dict, client: TeamcenterRESTClient) -> Dict:
+    from ..integrations.erp import run_bom_sync
+    return run_bom_sync(settings, client)
+
+
+def _report_generation(settings: Dict, client: TeamcenterRESTClient) -> Dict:
+    from ..reports.equipment import run_report_generation
+    return run_report_generation(settings, client)
+
+
+# Entry points of the scheduling.jobs entries
+JOBS: Dict[str, Callable[[Dict, TeamcenterRESTClient], Dict]] = {
+    'compliance_check': _compliance_check,
+    'bom_sync': _bom_sync,
+    'report_generation': _report_generation
+}
+
+
+def job_workers(settings: Dict, name: str) -> int:
+    """Concurrent requests a scheduled job makes, from its own settings"""
+    if name == 'compliance_check':
+        compliance = (settings.get('epiroc') or {}).get('compliance') or {}
+        return compliance.get('max_workers', 16)
+    job = ((settings.get('scheduling') or {}).get('jobs') or {}).get(name) or {}
+    return job.get('max_workers', 8 if name == 'bom_sync' else 16)
+
+
+def scheduler_pool_size(settings: Dict, extra_jobs: Sequence[str] = ()) -> int:
+    """
+    Connections for the shared client, enough for every enabled job at once
+
+    Args:
+        settings: Loaded settings
+        extra_jobs: Jobs run on demand even if disabled
+    """
+    jobs = ((settings.get('scheduling') or {}).get('jobs') or {})
+    names = {name for name, job in jobs.items() if job.get('enabled', True) and name in JOBS}
+    names.update(name for name in extra_jobs if name in JOBS)
+    return connection_pool_size(settings, sum(job_workers(settings, name) for name in names))
+
+
+class ScheduledJob:
+    """A job, its schedule and its run statistics"""
+
+    def __init__(self, name: str, func: Callable[[Dict, TeamcenterRESTClient], Dict],
+                 schedule: CronSchedule, jitter: float = 0.0):
+        self.name = name
+        self.func = func
+        self.schedule = schedule
+        self.jitter = jitter
+        self.next_run: Optional[datetime] = None
+        self.running = False
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.last_started: Optional[datetime] = None
+        self.last_duration: Optional[float] = None
+        self.last_status: Optional[str] = None
+        self.last_error: Optional[str] = None
+        self.durations = LatencyWindow(size=100)
+
+    def stats(self) -> Dict:
+        return {
+            'schedule': self.schedule.expression,
+            'next_run': self.next_run.isoformat() if self.next_run else None,
+            'running': self.running,
+            'runs': self.runs,
+            'failures': self.failures,
+            'skipped': self.skipped,
+            'last_started': self.last_started.isoformat() if self.last_started else None,
+            'last_duration': self.last_duration,
+            'last_status': self.last_status,
+            'last_error': self.last_error,
+            'p50_duration': self.durations.percentile(50),
+            'p95_duration': self.durations.percentile(95)
+        }
+
+
+class JobScheduler:
+    """
+    Runs cron-scheduled jobs in one process on a shared worker pool
+
+    All jobs share one authenticated client, so its connection pool stays
+    warm between runs. The token is refreshed in the background before it
+    expires, rather than logging in for every job. A job whose previous
+    run is still going is skipped rather than started twice. Every firing
+    is delayed by a random jitter so jobs due at the same minute do not hit
+    the server together, and each run's duration and outcome is recorded
+    in memory and, if history_path is set, appended to a JSON-lines file.
+
+    Example:
+        scheduler = JobScheduler.from_settings(settings, client, username, password)
+        scheduler.serve_forever()
+    """
+
+    def __init__(self, settings: Dict, client: TeamcenterRESTClient, max_workers: int = 4,
+                 jitter: float = 60.0, history_path: Optional[str] = None,
+                 username: Optional[str] = None, password: Optional[str] = None):
+        """
+        Initialize scheduler
+
+        Args:
+            settings: Settings passed to every job
+            client: Authenticated client shared by all jobs
+            max_workers: Jobs that may run at the same time
+            jitter: Maximum random start delay in seconds (per-job override
+                with the job's 'jitter' setting)
+            history_path: JSON-lines file recording every run (optional)
+            username: Username for re-authenticating the shared client
+            password: Password for re-authenticating the shared client
+        """
+        self.settings = settings
+        self.client = client
+        self.max_workers = max_workers
+        self.jitter = jitter
+        self.history_path = Path(history_path) if history_path else None
+        self._auth = (AuthenticationManager(username, password, TOKEN_REFRESH_MARGIN)
+                      if username and password else None)
+        self.jobs: Dict[str, ScheduledJob] = {}
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._rng = random.Random()
+
+    @classmethod
+    def from_settings(cls, settings: Dict, client: TeamcenterRESTClient,
+                      username: Optional[str] = None,
+                      password: Optional[str] = None) -> 'JobScheduler':
+        """Create a scheduler with every enabled job of scheduling.jobs"""
+        scheduling = settings.get('scheduling') or {}
+        scheduler = cls(
+            settings, client,
+            max_workers=scheduling.get('max_workers', 4),
+            jitter=scheduling.get('jitter_seconds', 60.0),
+            history_path=scheduling.get('history_path'),
+            username=username,
+            password=password
+        )
+        for name, job in (scheduling.get('jobs') or {}).items():
+            if not job.get('enabled', True):
+                continue
+            if name not in JOBS:
+                logger.warning("No entry point for scheduled job '%s'", name)
+                continue
+            scheduler.register(name, JOBS[name], job['schedule'], job.get('jitter'))
+        return scheduler
+
+    def register(self, name: str, func: Callable[[Dict, TeamcenterRESTClient], Dict],
+                 schedule: str, jitter: Optional[float] = None) -> ScheduledJob:
+        """
+        Add a job
+
+        Args:
+            name: Job name
+            func: Called as func(settings, client); its result is logged
+            schedule: Cron expression
+            jitter: Maximum start delay in seconds (defaults to the scheduler's)
+        """
+        job = ScheduledJob(name, func, CronSchedule(schedule),
+                           self.jitter if jitter is None else jitter)
+        with self._lock:
+            self.jobs[name] = job
+            self._plan(job, datetime.now())
+        self._wake.set()
+        return job
+
+    def _plan(self, job: ScheduledJob, after: datetime):
+        delay = self._rng.uniform(0, job.jitter) if job.jitter else 0.0
+        job.next_run = job.schedule.next_after(after) + timedelta(seconds=delay)
+
+    # ==================== Running ====================
+
+    def _ensure_client(self):
+        """Refresh the shared client's token before it expires"""
+        if self._auth is not None:
+            self._auth.ensure(self.client)
+
+    def run_now(self, name: str) -> bool:
+        """
+        Start a job immediately on the worker pool
+
+        Returns:
+            False if the job is already running
+        """
+        with self._lock:
+            job = self.jobs[name]
+            if job.running:
+                job.skipped += 1
+                logger.warning("Job %s is still running; skipping this run", name)
+                return False
+            job.running = True
+        self._executor_or_start().submit(self._execute, job)
+        return True
+
+    def _executor_or_start(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix='tc-job')
+            return self._executor
+
+    def _execute(self, job: ScheduledJob):
+        started = datetime.now()
+        start = time.perf_counter()
+        record = {'job': job.name, 'started': started.isoformat()}
+        logger.info("Job %s started", job.name)
+        try:
+            self._ensure_client()
+            result = job.func(self.settings, self.client)
+            record['status'] = 'succeeded'
+            if isinstance(result, dict):
+                record['summary'] = {key: value for key, value in result.items()
+                                     if isinstance(value, (int, float, str, bool))}
+        except Exception as e:
+            record['status'] = 'failed'
+            record['error'] = str(e)
+            logger.exception("Job %s failed: %s", job.name, e)
+        duration = time.perf_counter() - start
+        record['duration'] = duration
+
+        with self._lock:
+            job.running = False
+            job.runs += 1
+            job.failures += record['status'] == 'failed'
+            job.last_started = started
+            job.last_duration = duration
+            job.last_status = record['status']
+            job.last_error = record.get('error')
+            job.durations.record(duration)
+        logger.info("Job %s %s in %.1fs", job.name, record['status'], duration)
+        self._record(record)
+
+    def _record(self, record: Dict):
+        if self.history_path is None:
+            return
+        try:
+            self.history_path.parent.mkdir(parents=True, exist_ok=True)
+            with self._lock, open(self.history_path, 'a') as f:
+                f.write(json.dumps(record, default=str) + '\n')
+        except OSError as e:
+            logger.warning("Could not record job history: %s", e)
+
+    def _loop(self):
+        while not self._stopping.is_set():
+            try:
+                # Keeps the token fresh for long-running jobs too
+                self._ensure_client()
+            except Exception as e:
+                logger.error("Scheduler session refresh failed: %s", e)
+
+            now = datetime.now()
+            due = []
+            with self._lock:
+                for job in self.jobs.values():
+                    if job.next_run is not None and job.next_run <= now:
+                        due.append(job.name)
+                        self._plan(job, now)
+                upcoming = [job.next_run for job in self.jobs.values() if job.next_run]
+            for name in due:
+                self.run_now(name)
+
+            timeout = (min(upcoming) - datetime.now()).total_seconds() if upcoming else None
+            # Wake at least once a minute so clock changes are picked up
+            self._wake.wait(min(max(timeout, 0), 60) if timeout is not None else 60)
+            self._wake.clear()
+
+    def start(self) -> 'JobScheduler':
+        """Start scheduling in a background thread"""
+        if self._thread is not None:
+            return self
+        self._stopping.clear()
+        self._executor_or_start()
+        self._thread = threading.Thread(target=self._loop, name='tc-scheduler', daemon=True)
+        self._thread.start()
+        for name, job in self.jobs.items():
+            logger.info("Job %s: '%s', next run %s", name, job.schedule.expression, job.next_run)
+        return self
+
+    def stop(self, wait: bool = True):
+        """Stop scheduling; running jobs finish when wait is True"""
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def serve_forever(self):
+        """Start the scheduler and block until interrupted"""
+        self.start()
+        try:
+            while not self._stopping.wait(1):
+                pass
+        except KeyboardInterrupt:
+            logger.info("Stopping scheduler; waiting for running jobs")
+        finally:
+            self.stop()
+
+    def __enter__(self) -> 'JobScheduler':
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    def stats(self) -> Dict[str, Dict]:
+        """Schedule and run statistics of every job"""
+        with self._lock:
+            return {name: job.stats() for name, job in self.jobs.items()}
+
+
+def main():
+    """Run the job scheduler from the command line"""
+    from ..utils.config import load_settings
+    from ..utils.log_pipeline import configure_logging
+
+    parser = argparse.ArgumentParser(description='Run scheduled automation jobs')
+    parser.add_argument('--settings', help='Path to settings.yaml')
+    parser.add_argument('--environment', help='Settings environment override to apply')
+    parser.add_argument('--list', action='store_true', help='Show upcoming runs and exit')
+    parser.add_argument('--run', metavar='JOB', help='Run one job now and exit')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    settings = load_settings(args.settings, args.environment)
+    configure_logging(settings)
+    if args.list:
+        now = datetime.now()
+        for name, job in ((settings.get('scheduling') or {}).get('jobs') or {}).items():
+            state = 'enabled' if job.get('enabled', True) else 'disabled'
+            runs = ', '.join(t.strftime('%a %Y-%m-%d %H:%M')
+                             for t in CronSchedule(job['schedule']).upcoming(now, 3))
+            print(f"{name:<20} {job['schedule']:<15} {state:<9} {runs}")
+        return
+
+    username, password = os.getenv('TC_USERNAME'), os.getenv('TC_PASSWORD')
+    client = TeamcenterRESTClient(settings['teamcenter']['base_url'], username, password,
+                                  pool_size=scheduler_pool_size(settings,
+                                                                [args.run] if args.run else ()),
+                                  codec=Codec.from_settings(settings))
+    scheduler = JobScheduler.from_settings(settings, client, username, password)
+    try:
+        if args.run:
+            if args.run not in JOBS:
+                parser.error(f"Unknown job '{args.run}'")
+            if args.run not in scheduler.jobs:
+                job = settings['scheduling']['jobs'].get(args.run, {})
+                scheduler.register(args.run, JOBS[args.run], job.get('schedule', '0 0 * * *'))
+            scheduler.run_now(args.run)
+            scheduler.stop(wait=True)
+            print(json.dumps(scheduler.stats()[args.run], indent=2))
+        else:
+            scheduler.serve_forever()
+    finally:
+        client.logout()
+
+
+if __name__ == '__main__':
+    main()
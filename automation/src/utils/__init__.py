@@ -0,0 +1,3 @@
+"""
+Utility helpers for the Teamcenter automation framework
+"""
@@ -0,0 +1,81 @@
+"""
+Settings loading for the Teamcenter automation framework
+"""
+
+import copy
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import yaml
+
+DEFAULT_SETTINGS_PATH = Path(__file__).resolve().parents[2] / 'config' / 'settings.yaml'
+
+_ENV_PATTERN = re.compile(r'\$\{([A-Za-z_][A-Za-z0-9_]*)\}')
+
+
+def _merge(base: Dict, overrides: Dict) -> Dict:
+    """Recursively merge overrides into a copy of base"""
+    merged = copy.deepcopy(base)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+
+def _expand(value: Any) -> Any:
+    """Expand ${VAR} references from the environment, leaving unknown ones as-is"""
+    if isinstance(value, str):
+        return _ENV_PATTERN.sub(lambda m: os.environ.get(m.group(1), m.group(0)), value)
+    if isinstance(value, dict):
+        return {key: _expand(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_expand(item) for item in value]
+    return value
+
+
+def load_settings(path: Optional[str] = None,
+                  environment: Optional[str] = None) -> Dict:
+    """
+    Load settings.yaml with environment-specific overrides applied
+
+    Args:
+        path: Settings file (defaults to automation/config/settings.yaml)
+        environment: Override section to apply (defaults to $ENVIRONMENT)
+
+    Returns:
+        Settings dictionary
+    """
+    settings_path = Path(path) if path else DEFAULT_SETTINGS_PATH
+    with open(settings_path, 'r') as f:
+        settings = yaml.safe_load(f) or {}
+
+    environments = settings.pop('environments', {}) or {}
+    environment = environment or os.getenv('ENVIRONMENT')
+    if environment and environment in environments:
+        settings = _merge(settings, environments[environment])
+
+    return _expand(settings)
+
+
+def get_setting(settings: Dict, dotted_key: str, default: Any = None) -> Any:
+    """
+    Look up a nested setting such as 'development.mock_api'
+
+    Args:
+        settings: Settings dictionary
+        dotted_key: Dot-separated key path
+        default: Value returned when the key is missing
+
+    Returns:
+        Setting value
+    """
+    value = settings
+    for part in dotted_key.split('.'):
+        if not isinstance(value, dict) or part not in value:
+            return default
+        value = value[part]
+    return value
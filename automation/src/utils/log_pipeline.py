@@ -0,0 +1,349 @@
+"""
+Queue-based logging pipeline configured from the logging section of settings.yaml
+
+Loggers only put records on an in-memory queue; a background listener
+thread formats them and writes them to the console and a size-rotated
+file, either as text or as one JSON object per line. Messages logged with
+%-style arguments (``logger.info("Added %s to BOM of %s", child, parent)``)
+are formatted in the listener, not in the worker threads.
+
+Repeated per-item success messages are sampled: for each message template
+only the first sampling.per_interval records per interval are kept, and
+the rest are reported as one summary line. Records at WARNING and above
+are never sampled or dropped; when the queue is full, lower records are
+dropped and counted instead of blocking workers.
+
+Example:
+    settings = load_settings()
+    pipeline = configure_logging(settings)
+    ...
+    pipeline.stop()  # flushes the queue (also done at exit)
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+DEFAULT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Attributes every LogRecord has; anything else came in through extra=
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {
+    'message', 'asctime', 'taskName'
+}
+
+# Argument types that can be formatted later without changing the message
+_IMMUTABLE = (str, int, float, bool, type(None), bytes)
+
+_ANSI_COLORS = {
+    logging.DEBUG: '\033[36m',
+    logging.INFO: '\033[32m',
+    logging.WARNING: '\033[33m',
+    logging.ERROR: '\033[31m',
+    logging.CRITICAL: '\033[1;31m'
+}
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per record with timestamp, level, logger, message and extras"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'timestamp': datetime.fromtimestamp(record.created, timezone.utc)
+                                 .isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class ColorFormatter(logging.Formatter):
+    """Text formatter coloring the level name for terminals"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        color = _ANSI_COLORS.get(record.levelno)
+        if color:
+            text = text.replace(record.levelname, f'{color}{record.levelname}\033[0m', 1)
+        return text
+
+
+class SuccessSampler:
+    """
+    Limits repeated low-severity messages per message template
+
+    Records below WARNING from loggers under one of the prefixes are
+    grouped by (logger, template). Up to per_interval of each group pass
+    per interval; the rest are counted and summarized when the interval
+    ends. Logging with extra={'sampled': False} bypasses sampling.
+    """
+
+    def __init__(self, per_interval: int = 50, interval_seconds: float = 60.0,
+                 loggers: Optional[Sequence[str]] = None):
+        self.per_interval = per_interval
+        self.interval_seconds = interval_seconds
+        self.prefixes = tuple(loggers) if loggers else None
+        self.suppressed = 0
+        self._counts: Dict[tuple, int] = {}
+        self._window_start = time.monotonic()
+        self._window_end = self._window_start + interval_seconds
+        self._lock = threading.Lock()
+
+    def _applies(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not getattr(record, 'sampled', True):
+            return False
+        if self.prefixes is None:
+            return True
+        return any(record.name == prefix or record.name.startswith(prefix + '.')
+                   for prefix in self.prefixes)
+
+    def allow(self, record: logging.LogRecord) -> bool:
+        """Whether the record passes; counts it either way"""
+        if not self._applies(record):
+            return True
+        template = record.msg if isinstance(record.msg, str) else str(record.msg)
+        key = (record.name, template)
+        with self._lock:
+            count = self._counts.get(key, 0) + 1
+            self._counts[key] = count
+            if count > self.per_interval:
+                self.suppressed += 1
+                return False
+        return True
+
+    def due(self, force: bool = False) -> List[logging.LogRecord]:
+        """Summary records for groups that exceeded the limit, once the interval ends"""
+        now = time.monotonic()
+        if not force and now < self._window_end:
+            return []
+        with self._lock:
+            if not force and now < self._window_end:
+                return []
+            counts, self._counts = self._counts, {}
+            elapsed = now - self._window_start
+            self._window_start, self._window_end = now, now + self.interval_seconds
+
+        summaries = []
+        for (name, template), count in counts.items():
+            if count > self.per_interval:
+                summaries.append(logging.getLogger(name).makeRecord(
+                    name, logging.INFO, '(sampling)', 0,
+                    "%d more like '%s' in the last %.0fs",
+                    (count - self.per_interval, template, elapsed),
+                    None, extra={'suppressed': count - self.per_interval,
+                                 'template': str(template)}))
+        return summaries
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that never blocks workers for low-severity records
+
+    Unlike QueueHandler, records keep their message arguments so they are
+    formatted by the listener; arguments that could change before then
+    (lists, dicts, objects) are formatted here. Below WARNING, records are
+    dropped when the queue is full; WARNING and above wait for room.
+    """
+
+    def __init__(self, log_queue: queue.Queue, sampler: Optional[SuccessSampler] = None):
+        super().__init__(log_queue)
+        self.sampler = sampler
+        self.dropped = 0
+        self._dropped_reported = 0
+        self._lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(record.__dict__)
+        if record.args and not (isinstance(record.args, tuple)
+                                and all(isinstance(arg, _IMMUTABLE) for arg in record.args)):
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            # Tracebacks keep whole frames alive; render them while they are current
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def put(self, record: logging.LogRecord):
+        if record.levelno >= logging.WARNING:
+            self.queue.put(record)
+        else:
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                with self._lock:
+                    self.dropped += 1
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            if self.sampler is not None:
+                for summary in self.sampler.due():
+                    self.put(summary)
+                if not self.sampler.allow(record):
+                    return
+            self.put(self.prepare(record))
+            self.report_dropped()
+        except Exception:
+            self.handleError(record)
+
+    def report_dropped(self, force: bool = False):
+        """Log how many records were dropped since the last report"""
+        if self.dropped == self._dropped_reported:
+            return
+        with self._lock:
+            missing = self.dropped - self._dropped_reported
+            if not missing or (not force and self.queue.qsize() > self.queue.maxsize // 2):
+                return
+            self._dropped_reported = self.dropped
+        self.put(logging.makeLogRecord({
+            'name': __name__, 'levelno': logging.WARNING, 'levelname': 'WARNING',
+            'msg': "Dropped %d log records below WARNING while the log queue was full",
+            'args': (missing,), 'dropped': missing
+        }))
+
+    def flush_summaries(self):
+        """Emit pending sampling summaries and drop counts now"""
+        if self.sampler is not None:
+            for summary in self.sampler.due(force=True):
+                self.put(summary)
+        self.report_dropped(force=True)
+
+
+class _Listener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self):
+        # Wait for room instead of failing when the queue is full at shutdown
+        self.queue.put(self._sentinel)
+
+
+class LoggingPipeline:
+    """Root queue handler plus the listener thread writing to the real handlers"""
+
+    def __init__(self, handler: LazyQueueHandler, listener: _Listener,
+                 targets: List[logging.Handler]):
+        self.handler = handler
+        self.listener = listener
+        self.targets = targets
+        self._stopped = False
+
+    def stats(self) -> Dict:
+        """Dropped, sampled-away and pending record counts"""
+        return {
+            'dropped': self.handler.dropped,
+            'suppressed': self.handler.sampler.suppressed if self.handler.sampler else 0,
+            'pending': self.handler.queue.qsize()
+        }
+
+    def stop(self):
+        """Flush summaries and queued records, then detach from the root logger"""
+        if self._stopped:
+            return
+        self._stopped = True
+        self.handler.flush_summaries()
+        logging.getLogger().removeHandler(self.handler)
+        self.listener.stop()
+        for target in self.targets:
+            target.close()
+
+    def __enter__(self) -> 'LoggingPipeline':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+_active: Optional[LoggingPipeline] = None
+
+
+def _formatter(config: Dict, fmt: str, colored: bool = False) -> logging.Formatter:
+    if config.get('json'):
+        return JSONFormatter()
+    if colored:
+        return ColorFormatter(fmt)
+    return logging.Formatter(fmt)
+
+
+def configure_logging(settings: Dict, level: Optional[str] = None) -> LoggingPipeline:
+    """
+    Route the root logger through a queue to the handlers in settings['logging']
+
+    Replaces the root logger's handlers (e.g. from basicConfig) and any
+    pipeline configured earlier.
+
+    Args:
+        settings: Loaded settings
+        level: Overrides logging.level
+
+    Returns:
+        The running pipeline
+    """
+    global _active
+    config = settings.get('logging') or {}
+    fmt = config.get('format', DEFAULT_FORMAT)
+
+    targets: List[logging.Handler] = []
+    console = config.get('console') or {}
+    if console.get('enabled', True):
+        handler = logging.StreamHandler(sys.stderr)
+        colored = console.get('colored', False) and sys.stderr.isatty()
+        handler.setFormatter(_formatter(console, fmt, colored))
+        targets.append(handler)
+
+    file_config = config.get('file') or {}
+    if file_config.get('enabled', False):
+        path = Path(file_config.get('path', './logs/automation.log'))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        handler = logging.handlers.RotatingFileHandler(
+            path,
+            maxBytes=int(float(file_config.get('max_size_mb', 10)) * 1024 * 1024),
+            backupCount=file_config.get('backup_count', 5),
+            encoding='utf-8',
+            delay=True
+        )
+        handler.setFormatter(_formatter(file_config, fmt))
+        targets.append(handler)
+
+    sampling = config.get('sampling') or {}
+    sampler = None
+    if sampling.get('enabled', True):
+        sampler = SuccessSampler(per_interval=sampling.get('per_interval', 50),
+                                 interval_seconds=sampling.get('interval_seconds', 60),
+                                 loggers=sampling.get('loggers'))
+
+    log_queue = queue.Queue(maxsize=(config.get('queue') or {}).get('max_records', 10000))
+    queue_handler = LazyQueueHandler(log_queue, sampler)
+    listener = _Listener(log_queue, *targets, respect_handler_level=True)
+
+    if _active is not None:
+        _active.stop()
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+        existing.close()
+    root.addHandler(queue_handler)
+    root.setLevel((level or config.get('level', 'INFO')).upper())
+    listener.start()
+
+    _active = LoggingPipeline(queue_handler, listener, targets)
+    return _active
+
+
+@atexit.register
+def _stop_active():
+    if _active is not None:
+        _active.stop()
@@ -0,0 +1,162 @@
+"""
+Latency metrics helpers
+"""
+
+import math
+import threading
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+
+def percentile(samples: Iterable[float], pct: float) -> Optional[float]:
+    """
+    Compute a percentile using the nearest-rank method
+
+    Args:
+        samples: Sample values
+        pct: Percentile between 0 and 100
+
+    Returns:
+        Percentile value, or None if there are no samples
+    """
+    ordered = sorted(samples)
+    if not ordered:
+        return None
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class LatencyWindow:
+    """
+    Thread-safe sliding window of the most recent latency samples
+    """
+
+    def __init__(self, size: int = 1000):
+        """
+        Initialize the window
+
+        Args:
+            size: Maximum number of samples retained
+        """
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        """Record one latency sample in seconds"""
+        with self._lock:
+            self._samples.append(seconds)
+
+    def snapshot(self) -> List[float]:
+        """Return a copy of the retained samples"""
+        with self._lock:
+            return list(self._samples)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Return the given percentile of the retained samples"""
+        return percentile(self.snapshot(), pct)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._samples)
+
+
+class LatencyHistogram:
+    """
+    Log-linear latency histogram with bounded relative error
+
+    Values are bucketed by power of two, with ``sub_buckets`` linear
+    buckets inside each power, so memory stays small at any sample count
+    and histograms from separate threads or processes can be merged.
+    Percentiles are reported at the upper edge of their bucket (relative
+    error below 1 / sub_buckets).
+    """
+
+    def __init__(self, sub_buckets: int = 128, unit: float = 1e-6):
+        """
+        Initialize the histogram
+
+        Args:
+            sub_buckets: Linear buckets per power of two (precision)
+            unit: Smallest resolved value in seconds (default 1 microsecond)
+        """
+        self.sub_buckets = sub_buckets
+        self.unit = unit
+        self.counts: Dict[int, int] = {}
+        self.total = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def _index(self, seconds: float) -> int:
+        units = max(seconds / self.unit, 1.0)
+        mantissa, exponent = math.frexp(units)
+        return (exponent - 1) * self.sub_buckets + int((mantissa * 2 - 1) * self.sub_buckets)
+
+    def _upper_bound(self, index: int) -> float:
+        exponent, sub = divmod(index, self.sub_buckets)
+        return (1 + (sub + 1) / self.sub_buckets) * (2 ** exponent) * self.unit
+
+    def record(self, seconds: float, count: int = 1):
+        """Record a latency sample in seconds"""
+        index = self._index(seconds)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.total += count
+        self.sum += seconds * count
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def merge(self, other: 'LatencyHistogram'):
+        """Add the samples of another histogram with the same precision"""
+        if (other.sub_buckets, other.unit) != (self.sub_buckets, self.unit):
+            raise ValueError("Cannot merge histograms with different precision")
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total += other.total
+        self.sum += other.sum
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Return the given percentile in seconds, or None if empty"""
+        if not self.total:
+            return None
+        rank = max(1, math.ceil(pct / 100.0 * self.total))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self._upper_bound(index), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> Optional[float]:
+        """Mean latency in seconds"""
+        return self.sum / self.total if self.total else None
+
+    def to_dict(self) -> Dict:
+        """Serializable form, e.g. for passing between processes"""
+        return {
+            'sub_buckets': self.sub_buckets,
+            'unit': self.unit,
+            'counts': {str(index): count for index, count in self.counts.items()},
+            'total': self.total,
+            'sum': self.sum,
+            'min': self.min,
+            'max': self.max
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'LatencyHistogram':
+        """Rebuild a histogram produced by to_dict()"""
+        histogram = cls(data['sub_buckets'], data['unit'])
+        histogram.counts = {int(index): count for index, count in data['counts'].items()}
+        histogram.total = data['total']
+        histogram.sum = data['sum']
+        histogram.min = data['min']
+        histogram.max = data['max']
+        return histogram
+
+    def __len__(self) -> int:
+        return self.total
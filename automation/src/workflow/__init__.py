@@ -0,0 +1,15 @@
+"""
+Workflow task automation
+"""
+
+from .bulk import BulkWorkflowRunner, chunk_targets, eligible_for_auto_approval
+from .watcher import PollSchedule, TaskWatcher, diff_tasks
+
+__all__ = [
+    'BulkWorkflowRunner',
+    'chunk_targets',
+    'eligible_for_auto_approval',
+    'PollSchedule',
+    'TaskWatcher',
+    'diff_tasks'
+]
@@ -0,0 +1,369 @@
+"""
+Bulk workflow operations: concurrent workflow starts and task completions
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import requests
+
+from ..client.deadline import Deadline, DeadlineExceeded, OperationCancelled, current_deadline
+from ..client.rest_client import TeamcenterRESTClient
+
+logger = logging.getLogger(__name__)
+
+# Entry outcomes
+STARTED = 'started'
+COMPLETED = 'completed'
+ALREADY_COMPLETED = 'already_completed'
+SKIPPED = 'skipped'
+FAILED = 'failed'
+
+# Impact ranks compared against automation.workflow.auto_approve_threshold
+IMPACT_RANKS = {'low': 1, 'normal': 2, 'medium': 2, 'high': 3, 'critical': 4}
+THRESHOLD_RANKS = {'none': 0, 'low': 1, 'medium': 2, 'high': 3}
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    response = getattr(error, 'response', None)
+    return response.status_code if response is not None else None
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, 'response', None)
+    try:
+        return float(response.headers.get('Retry-After'))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def task_impact(task: Dict) -> Optional[str]:
+    """Impact of a task from its 'impact_level' property, else its priority"""
+    properties = task.get('properties') or {}
+    impact = properties.get('impact_level') or task.get('priority')
+    return impact.lower() if isinstance(impact, str) else None
+
+
+def eligible_for_auto_approval(task: Dict, threshold: str) -> bool:
+    """
+    Whether a task may be approved automatically under the threshold
+
+    Tasks are eligible when their impact ranks at or below the threshold
+    ('low', 'medium', 'high'; 'none' disables auto-approval). Tasks with
+    an unknown impact or a safety impact are never eligible.
+    """
+    limit = THRESHOLD_RANKS.get((threshold or 'none').lower(), 0)
+    rank = IMPACT_RANKS.get(task_impact(task))
+    if not limit or rank is None:
+        return False
+    if str((task.get('properties') or {}).get('safety_impact', '')).lower() == 'yes':
+        return False
+    return rank <= limit
+
+
+def chunk_targets(process_name: str, targets: Sequence[str], chunk_size: int = 1,
+                  properties: Optional[Dict] = None) -> List[Dict]:
+    """
+    Group targets into workflow start entries of at most chunk_size targets
+
+    Args:
+        process_name: Workflow process template
+        targets: Target item IDs (duplicates are ignored)
+        chunk_size: Targets per workflow, as allowed by the process template
+        properties: Properties shared by every workflow
+
+    Returns:
+        Entries for BulkWorkflowRunner.start_workflows()
+    """
+    unique = list(dict.fromkeys(targets))
+    return [{'processName': process_name,
+             'targets': unique[i:i + chunk_size],
+             'properties': dict(properties or {})}
+            for i in range(0, len(unique), max(1, chunk_size))]
+
+
+class BulkWorkflowRunner:
+    """
+    Starts workflows and completes tasks in bulk with per-entry results
+
+    Entries run concurrently up to max_workers. Completions are retried on
+    throttling, server errors and connection failures: the server refuses
+    to complete a task that is no longer pending (409), so a retry whose
+    earlier attempt already landed, or a rerun of the whole batch, can
+    never approve a task twice. Pending tasks are also checked up front so
+    reruns skip finished entries without a call.
+
+    Starting a workflow is not idempotent, so starts are retried only when
+    the server certainly did not process them (429 or a connect timeout).
+    Other failures are reported with 'uncertain' set when the workflow may
+    have started anyway.
+
+    Example:
+        runner = BulkWorkflowRunner.from_settings(settings, client)
+        entries = chunk_targets('EPR_ECN_Process', ecn_items, chunk_size=10,
+                                properties={'impact_level': 'Low'})
+        started = runner.start_workflows(entries)
+        approved = runner.auto_approve()
+    """
+
+    def __init__(self, client: TeamcenterRESTClient, max_workers: int = 8,
+                 max_retries: int = 3, backoff: float = 0.5,
+                 auto_approve_threshold: str = 'none'):
+        """
+        Initialize bulk runner
+
+        Args:
+            client: Authenticated REST client
+            max_workers: Concurrent workflow or task calls
+            max_retries: Retries per entry after the first attempt
+            backoff: Initial retry delay in seconds, doubled per retry
+            auto_approve_threshold: Highest impact approved by auto_approve()
+        """
+        self.client = client
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.auto_approve_threshold = auto_approve_threshold
+
+    @classmethod
+    def from_settings(cls, settings: Dict, client: TeamcenterRESTClient) -> 'BulkWorkflowRunner':
+        """Create a runner from automation.workflow settings"""
+        workflow = (settings.get('automation') or {}).get('workflow') or {}
+        bulk = workflow.get('bulk') or {}
+        return cls(
+            client,
+            max_workers=bulk.get('max_workers', 8),
+            max_retries=bulk.get('max_retries', 3),
+            backoff=bulk.get('backoff', 0.5),
+            auto_approve_threshold=workflow.get('auto_approve_threshold', 'none')
+        )
+
+    def _wait(self, attempt: int, error: Exception, deadline: Optional[Deadline]) -> bool:
+        """Sleep before a retry; False if the deadline does not allow one"""
+        delay = _retry_after(error) or self.backoff * (2 ** (attempt - 1))
+        if deadline is not None:
+            return deadline.wait(delay)
+        time.sleep(delay)
+        return True
+
+    def _run(self, work, entries: Sequence, deadline: Optional[Deadline]) -> List[Dict]:
+        if not entries:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(entries)),
+                                thread_name_prefix='tc-workflow') as executor:
+            futures = [executor.submit(work, index, entry) for index, entry in enumerate(entries)]
+            try:
+                return [future.result() for future in futures]
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+    @staticmethod
+    def _summary(results: List[Dict], started: float) -> Dict:
+        counts = {}
+        for result in results:
+            counts[result['status']] = counts.get(result['status'], 0) + 1
+        return {'results': results, 'counts': counts,
+                'failed': counts.get(FAILED, 0), 'elapsed': time.perf_counter() - started}
+
+    # ==================== Workflows ====================
+
+    def start_workflows(self, entries: Sequence[Dict],
+                        deadline: Optional[Deadline] = None) -> Dict:
+        """
+        Start many workflows concurrently
+
+        Args:
+            entries: Dicts with 'processName', 'targets' and 'properties'
+                (see chunk_targets())
+            deadline: Time budget (defaults to the ambient deadline)
+
+        Returns:
+            Summary with one result per entry ('index', 'targets', 'status',
+            'workflowId', 'attempts', 'error', 'uncertain'), counts and timing
+        """
+        deadline = deadline or current_deadline()
+        started = time.perf_counter()
+
+        def start(index: int, entry: Dict) -> Dict:
+            result = {'index': index, 'targets': list(entry['targets']), 'status': None,
+                      'workflowId': None, 'attempts': 0, 'error': None, 'uncertain': False}
+            while True:
+                result['attempts'] += 1
+                try:
+                    if deadline is not None:
+                        deadline.check()
+                    workflow = self.client.start_workflow(entry['processName'], entry['targets'],
+                                                          entry.get('properties'),
+                                                          deadline=deadline)
+                    result['status'] = STARTED
+                    result['workflowId'] = workflow.get('workflowId')
+                    return result
+                except (DeadlineExceeded, OperationCancelled):
+                    raise
+                except Exception as e:
+                    status = _status_code(e)
+                    safe = status == 429 or isinstance(e, requests.exceptions.ConnectTimeout)
+                    if (safe and result['attempts'] <= self.max_retries
+                            and self._wait(result['attempts'], e, deadline)):
+                        continue
+                    result['status'] = FAILED
+                    result['error'] = str(e)
+                    result['uncertain'] = not safe and (status is None or status >= 500)
+                    return result
+
+        summary = self._summary(self._run(start, entries, deadline), started)
+        logger.info("Started %d/%d workflows in %.1fs",
+                    summary['counts'].get(STARTED, 0), len(entries), summary['elapsed'])
+        return summary
+
+    # ==================== Tasks ====================
+
+    def complete_tasks(self, decisions: Iterable[Dict], verify_pending: bool = True,
+                       deadline: Optional[Deadline] = None) -> Dict:
+        """
+        Complete many tasks concurrently
+
+        Args:
+            decisions: Dicts with 'taskId', 'decision' and optional 'comments'
+                (duplicate task IDs are completed once)
+            verify_pending: Skip tasks missing from the current user's
+                pending tasks without calling the server
+            deadline: Time budget (defaults to the ambient deadline)
+
+        Returns:
+            Summary with one result per task ('taskId', 'decision', 'status',
+            'attempts', 'error'), counts and timing. A task found already
+            completed is reported as 'already_completed', not as a failure.
+        """
+        deadline = deadline or current_deadline()
+        started = time.perf_counter()
+        entries = list({entry['taskId']: entry for entry in decisions}.values())
+
+        pending = None
+        if verify_pending and entries:
+            pending = {task['taskId'] for task in self.client.get_my_tasks(deadline=deadline)}
+
+        def complete(index: int, entry: Dict) -> Dict:
+            result = {'taskId': entry['taskId'], 'decision': entry['decision'], 'status': None,
+                      'attempts': 0, 'error': None}
+            if pending is not None and entry['taskId'] not in pending:
+                result['status'] = SKIPPED
+                result['error'] = 'Task is not pending'
+                return result
+
+            while True:
+                result['attempts'] += 1
+                try:
+                    if deadline is not None:
+                        deadline.check()
+                    self.client.complete_task(entry['taskId'], entry['decision'],
+                                              entry.get('comments', ''), deadline=deadline)
+                    result['status'] = COMPLETED
+                    return result
+                except (DeadlineExceeded, OperationCancelled):
+                    raise
+                except Exception as e:
+                    status = _status_code(e)
+                    if status == 409:
+                        # Completed by an earlier attempt or by someone else
+                        result['status'] = ALREADY_COMPLETED
+                        return result
+                    transient = status is None or status == 429 or status >= 500
+                    if (transient and result['attempts'] <= self.max_retries
+                            and self._wait(result['attempts'], e, deadline)):
+                        continue
+                    result['status'] = FAILED
+                    result['error'] = str(e)
+                    return result
+
+        summary = self._summary(self._run(complete, entries, deadline), started)
+        logger.info("Completed %d/%d tasks in %.1fs",
+                    summary['counts'].get(COMPLETED, 0), len(entries), summary['elapsed'])
+        return summary
+
+    def auto_approve(self, threshold: Optional[str] = None,
+                     tasks: Optional[Sequence[Dict]] = None,
+                     comments: str = 'Auto-approved: impact within threshold',
+                     dry_run: bool = False,
+                     deadline: Optional[Deadline] = None) -> Dict:
+        """
+        Approve every pending task whose impact is within the threshold
+
+        Args:
+            threshold: Highest impact approved (defaults to the configured
+                auto_approve_threshold)
+            tasks: Tasks to consider (defaults to the current user's tasks)
+            comments: Completion comment
+            dry_run: Only report the tasks that would be approved
+            deadline: Time budget (defaults to the ambient deadline)
+
+        Returns:
+            complete_tasks() summary plus 'eligible' task IDs and 'threshold'
+        """
+        deadline = deadline or current_deadline()
+        threshold = threshold or self.auto_approve_threshold
+        fetched = tasks is None
+        if fetched:
+            tasks = self.client.get_my_tasks(deadline=deadline)
+        eligible = [task['taskId'] for task in tasks
+                    if eligible_for_auto_approval(task, threshold)]
+        logger.info("%d/%d tasks within auto-approve threshold '%s'",
+                    len(eligible), len(tasks), threshold)
+
+        if dry_run:
+            summary = {'results': [], 'counts': {}, 'failed': 0, 'elapsed': 0.0}
+        else:
+            # A task list fetched just now needs no second pending check
+            summary = self.complete_tasks(
+                [{'taskId': task_id, 'decision': 'Approve', 'comments': comments}
+                 for task_id in eligible],
+                verify_pending=not fetched, deadline=deadline
+            )
+        summary['eligible'] = eligible
+        summary['threshold'] = threshold
+        return summary
+
+
+def main():
+    """Approve low-impact tasks or complete tasks from a JSON file"""
+    from ..utils.config import load_settings
+    from ..utils.log_pipeline import configure_logging
+
+    parser = argparse.ArgumentParser(description='Bulk workflow task operations')
+    parser.add_argument('--decisions', help='JSON file of {taskId, decision, comments} entries '
+                                            '(default: auto-approve within the threshold)')
+    parser.add_argument('--threshold', help='Override automation.workflow.auto_approve_threshold')
+    parser.add_argument('--dry-run', action='store_true', help='Only list eligible tasks')
+    parser.add_argument('--settings', help='Path to settings.yaml')
+    parser.add_argument('--environment', help='Settings environment override to apply')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    settings = load_settings(args.settings, args.environment)
+    configure_logging(settings)
+    client = TeamcenterRESTClient(settings['teamcenter']['base_url'],
+                                  os.getenv('TC_USERNAME'), os.getenv('TC_PASSWORD'))
+    runner = BulkWorkflowRunner.from_settings(settings, client)
+    try:
+        if args.decisions:
+            with open(args.decisions) as f:
+                summary = runner.complete_tasks(json.load(f))
+        else:
+            summary = runner.auto_approve(args.threshold, dry_run=args.dry_run)
+    finally:
+        client.logout()
+    print(json.dumps({key: value for key, value in summary.items() if key != 'results'},
+                     indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,454 @@
+"""
+Workflow task watcher: adaptive polling with delta delivery
+"""
+
+import argparse
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+
+import requests
+
+from ..client.auth import TOKEN_LIFETIME, AuthenticationManager
+from ..client.rest_client import TeamcenterRESTClient
+
+logger = logging.getLogger(__name__)
+
+
+def diff_tasks(previous: Dict[str, Dict],
+               tasks: Iterable[Dict]) -> Tuple[Dict[str, Dict], Dict[str, List[Dict]]]:
+    """
+    Compare a task list with the previous snapshot
+
+    Args:
+        previous: Previous snapshot keyed by task ID
+        tasks: Current task list
+
+    Returns:
+        Tuple of (new snapshot, {'added', 'changed', 'removed'} task lists)
+    """
+    snapshot = {task['taskId']: task for task in tasks}
+    added, changed = [], []
+    for task_id, task in snapshot.items():
+        before = previous.get(task_id)
+        if before is None:
+            added.append(task)
+        elif before != task:
+            changed.append(task)
+    removed = [task for task_id, task in previous.items() if task_id not in snapshot]
+    return snapshot, {'added': added, 'changed': changed, 'removed': removed}
+
+
+class PollSchedule:
+    """
+    Adaptive poll interval for one task queue
+
+    The interval drops to min_interval whenever the queue changes and grows
+    by the backoff factor on every idle or failed poll, up to max_interval.
+    Each delay is jittered so many queues do not poll in lockstep.
+    """
+
+    def __init__(self, min_interval: float = 2.0, max_interval: float = 60.0,
+                 backoff: float = 2.0, jitter: float = 0.1,
+                 rng: Optional[random.Random] = None):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.jitter = jitter
+        self.interval = min_interval
+        self._rng = rng or random.Random()
+
+    def next_delay(self, changed: bool) -> float:
+        """Delay before the next poll, given whether the last one saw changes"""
+        if changed:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.max_interval, self.interval * self.backoff)
+        return self.interval * (1 + self.jitter * (2 * self._rng.random() - 1))
+
+
+class _WatchedQueue:
+    """Polling state of one user's task queue"""
+
+    def __init__(self, name: str, client: TeamcenterRESTClient, schedule: PollSchedule,
+                 owned: bool, auth: Optional[AuthenticationManager] = None):
+        self.name = name
+        self.client = client
+        self.schedule = schedule
+        self.owned = owned
+        self.auth = auth
+        self.etag = None
+        self.snapshot: Optional[Dict[str, Dict]] = None
+        self.polls = 0
+        self.not_modified = 0
+        self.deltas = 0
+        self.failures = 0
+        self.last_error = None
+
+
+class TaskWatcher:
+    """
+    Watches the workflow task queues of many users and delivers changes
+
+    Each queue is polled with a conditional request, so an unchanged list
+    costs a 304 instead of a download and a re-parse. Polls back off while
+    a queue is idle and return to the minimum interval as soon as it
+    changes. Results are diffed against the previous snapshot and only
+    added, changed and removed tasks reach subscribers, either as callbacks
+    or through the deltas() async iterator. All queues share one worker
+    pool and, via TeamcenterRESTClient.for_user(), one connection pool;
+    size the client's pool_size to at least max_workers.
+
+    The first poll of a queue delivers its current tasks as 'added' with
+    'initial' set. Queues added with credentials keep their session alive:
+    the token is renewed before it expires, and a poll rejected with 401
+    logs in again and is retried once.
+
+    Example:
+        watcher = TaskWatcher(client, max_workers=16)
+        for username in dashboard_users:
+            watcher.add_user(username, service_password)
+        watcher.subscribe(lambda delta: print(delta['user'], len(delta['added'])))
+        with watcher:
+            ...
+    """
+
+    def __init__(self, client: Optional[TeamcenterRESTClient] = None, max_workers: int = 8,
+                 min_interval: float = 2.0, max_interval: float = 60.0,
+                 backoff: float = 2.0, jitter: float = 0.1,
+                 refresh_margin: timedelta = timedelta(minutes=5)):
+        """
+        Initialize task watcher
+
+        Args:
+            client: Client whose connection pool is shared by add_user()
+            max_workers: Concurrent polls across all queues
+            min_interval: Poll interval in seconds while a queue is changing
+            max_interval: Longest interval for an idle queue
+            backoff: Interval growth factor per idle or failed poll
+            jitter: Relative random spread of each interval
+            refresh_margin: How long before expiry a watched user's token
+                is renewed
+        """
+        self.client = client
+        self.max_workers = max_workers
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.jitter = jitter
+        self.refresh_margin = refresh_margin
+
+        self._queues: Dict[str, _WatchedQueue] = {}
+        self._subscribers: Dict[int, Tuple[Callable[[Dict], None], Optional[frozenset]]] = {}
+        self._subscriber_ids = itertools.count()
+        self._heap: List[Tuple[float, int, str]] = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    @classmethod
+    def from_settings(cls, settings: Dict,
+                      client: Optional[TeamcenterRESTClient] = None) -> 'TaskWatcher':
+        """
+        Create a watcher from automation.workflow.task_watcher settings
+
+        Tokens are renewed after teamcenter.auth.token_refresh_minutes.
+        """
+        config = ((settings.get('automation') or {}).get('workflow') or {}).get('task_watcher') or {}
+        auth = (settings.get('teamcenter') or {}).get('auth') or {}
+        refresh_after = timedelta(minutes=auth.get('token_refresh_minutes', 55))
+        return cls(
+            client,
+            max_workers=config.get('max_workers', 8),
+            min_interval=config.get('min_interval', 2.0),
+            max_interval=config.get('max_interval', 60.0),
+            backoff=config.get('backoff', 2.0),
+            jitter=config.get('jitter', 0.1),
+            refresh_margin=max(TOKEN_LIFETIME - refresh_after, timedelta(0))
+        )
+
+    # ==================== Queues ====================
+
+    def add_user(self, username: str, password: str) -> str:
+        """Log a user in over the shared connection pool and watch their queue"""
+        if self.client is None:
+            raise ValueError("add_user() needs the watcher's shared client")
+        auth = AuthenticationManager(username, password, self.refresh_margin)
+        return self._add(username, self.client.for_user(username, password), owned=True,
+                         auth=auth)
+
+    def add_client(self, client: TeamcenterRESTClient, name: Optional[str] = None,
+                   auth: Optional[AuthenticationManager] = None) -> str:
+        """
+        Watch the queue of an already authenticated client
+
+        Args:
+            client: Authenticated client
+            name: Queue name (default: derived from the client)
+            auth: Keeps the client logged in (optional; without it the
+                queue stops working when the token expires)
+        """
+        return self._add(name or f"client-{id(client):x}", client, owned=False, auth=auth)
+
+    def _add(self, name: str, client: TeamcenterRESTClient, owned: bool,
+             auth: Optional[AuthenticationManager] = None) -> str:
+        schedule = PollSchedule(self.min_interval, self.max_interval, self.backoff, self.jitter)
+        with self._condition:
+            if name in self._queues:
+                raise ValueError(f"Already watching '{name}'")
+            self._queues[name] = _WatchedQueue(name, client, schedule, owned, auth)
+            self._schedule(name, 0)
+        return name
+
+    def remove_user(self, name: str):
+        """Stop watching a queue (and log out clients created by add_user)"""
+        with self._condition:
+            queue = self._queues.pop(name, None)
+        if queue is not None and queue.owned:
+            queue.client.logout()
+
+    def _schedule(self, name: str, delay: float):
+        heapq.heappush(self._heap, (time.monotonic() + delay, next(self._sequence), name))
+        self._condition.notify()
+
+    # ==================== Subscribers ====================
+
+    def subscribe(self, callback: Callable[[Dict], None],
+                  users: Optional[Iterable[str]] = None) -> Callable[[], None]:
+        """
+        Register a callback for deltas
+
+        Callbacks run on poller threads and should return quickly.
+
+        Args:
+            callback: Called with each delta dict ('user', 'added', 'changed',
+                'removed', 'initial', 'total', 'timestamp')
+            users: Only deliver deltas of these queues (default: all)
+
+        Returns:
+            Function that unsubscribes the callback
+        """
+        key = next(self._subscriber_ids)
+        with self._condition:
+            self._subscribers[key] = (callback, frozenset(users) if users is not None else None)
+
+        def unsubscribe():
+            with self._condition:
+                self._subscribers.pop(key, None)
+
+        return unsubscribe
+
+    async def deltas(self, users: Optional[Iterable[str]] = None) -> AsyncIterator[Dict]:
+        """
+        Async iterator over deltas
+
+        Example:
+            async for delta in watcher.deltas():
+                await push_to_dashboard(delta)
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        unsubscribe = self.subscribe(
+            lambda delta: loop.call_soon_threadsafe(queue.put_nowait, delta), users
+        )
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            unsubscribe()
+
+    def _deliver(self, delta: Dict):
+        with self._condition:
+            subscribers = list(self._subscribers.values())
+        for callback, users in subscribers:
+            if users is not None and delta['user'] not in users:
+                continue
+            try:
+                callback(delta)
+            except Exception as e:
+                logger.error("Task delta subscriber failed: %s", e)
+
+    # ==================== Polling ====================
+
+    def poll(self, name: str) -> Optional[Dict]:
+        """
+        Poll one queue now and deliver its delta
+
+        Returns:
+            The delta, or None if the queue is unchanged
+        """
+        queue = self._queues[name]
+        queue.polls += 1
+        tasks, queue.etag = self._fetch(queue)
+        if tasks is None:
+            queue.not_modified += 1
+            return None
+
+        initial = queue.snapshot is None
+        queue.snapshot, changes = diff_tasks(queue.snapshot or {}, tasks)
+        if not initial and not any(changes.values()):
+            return None
+
+        queue.deltas += 1
+        delta = dict(changes, user=name, initial=initial, total=len(queue.snapshot),
+                     timestamp=datetime.now().isoformat())
+        self._deliver(delta)
+        return delta
+
+    def _fetch(self, queue: _WatchedQueue) -> Tuple[Optional[List[Dict]], Optional[str]]:
+        """Conditional task request, renewing the queue's session if it has credentials"""
+        if queue.auth is None:
+            return queue.client.get_my_tasks_if_changed(queue.etag)
+        queue.auth.ensure(queue.client)
+        try:
+            return queue.client.get_my_tasks_if_changed(queue.etag)
+        except requests.exceptions.HTTPError as e:
+            if e.response is None or e.response.status_code != 401:
+                raise
+            logger.info("Session of %s was rejected; logging in again", queue.name)
+            queue.auth.login(queue.client)
+            return queue.client.get_my_tasks_if_changed(queue.etag)
+
+    def _poll_and_reschedule(self, name: str):
+        queue = self._queues.get(name)
+        if queue is None:
+            return
+        try:
+            changed = self.poll(name) is not None
+            queue.last_error = None
+        except Exception as e:
+            queue.failures += 1
+            queue.last_error = str(e)
+            logger.warning("Task poll for %s failed: %s", name, e)
+            changed = False
+
+        with self._condition:
+            if self._running and name in self._queues:
+                self._schedule(name, queue.schedule.next_delay(changed))
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._running:
+                    now = time.monotonic()
+                    if self._heap and self._heap[0][0] <= now:
+                        break
+                    timeout = self._heap[0][0] - now if self._heap else None
+                    self._condition.wait(timeout)
+                if not self._running:
+                    return
+                _, _, name = heapq.heappop(self._heap)
+            if name in self._queues:
+                self._executor.submit(self._poll_and_reschedule, name)
+
+    def start(self) -> 'TaskWatcher':
+        """Start polling in the background"""
+        with self._condition:
+            if self._running:
+                return self
+            self._running = True
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix='tc-task-watch')
+            self._thread = threading.Thread(target=self._run, name='tc-task-scheduler',
+                                            daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop polling; queues and snapshots are kept for a later start()"""
+        with self._condition:
+            if not self._running:
+                return
+            self._running = False
+            self._condition.notify_all()
+        self._thread.join()
+        self._executor.shutdown(wait=True)
+        self._thread = self._executor = None
+        with self._condition:
+            # Due times are stale once stopped; poll everything on restart
+            self._heap = []
+            for name in self._queues:
+                self._schedule(name, 0)
+
+    def close(self):
+        """Stop polling and log out the clients created by add_user()"""
+        self.stop()
+        for name in list(self._queues):
+            self.remove_user(name)
+
+    def __enter__(self) -> 'TaskWatcher':
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def stats(self) -> Dict[str, Dict]:
+        """Per-queue poll counters and current interval"""
+        return {name: {
+            'polls': queue.polls,
+            'not_modified': queue.not_modified,
+            'deltas': queue.deltas,
+            'failures': queue.failures,
+            'tasks': len(queue.snapshot or {}),
+            'interval': queue.schedule.interval,
+            'last_error': queue.last_error
+        } for name, queue in list(self._queues.items())}
+
+
+def main():
+    """Print task deltas for one or more users until interrupted"""
+    from ..utils.config import load_settings
+    from ..utils.log_pipeline import configure_logging
+
+    parser = argparse.ArgumentParser(description='Watch workflow task queues')
+    parser.add_argument('users', nargs='*',
+                        help='Users to watch with TC_PASSWORD (default: TC_USERNAME)')
+    parser.add_argument('--settings', help='Path to settings.yaml')
+    parser.add_argument('--environment', help='Settings environment override to apply')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    settings = load_settings(args.settings, args.environment)
+    configure_logging(settings)
+    client = TeamcenterRESTClient(settings['teamcenter']['base_url'],
+                                  os.getenv('TC_USERNAME'), os.getenv('TC_PASSWORD'))
+    watcher = TaskWatcher.from_settings(settings, client)
+    if args.users:
+        for username in args.users:
+            watcher.add_user(username, os.getenv('TC_PASSWORD'))
+    else:
+        watcher.add_client(client, os.getenv('TC_USERNAME'),
+                           AuthenticationManager.from_settings(settings))
+
+    watcher.subscribe(lambda delta: print(json.dumps(
+        {key: delta[key] if key in ('user', 'initial', 'total', 'timestamp')
+         else [task['taskId'] for task in delta[key]]
+         for key in ('user', 'initial', 'added', 'changed', 'removed', 'total', 'timestamp')}
+    ), flush=True))
+    try:
+        with watcher:
+            while True:
+                time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        client.logout()
+
+
+if __name__ == '__main__':
+    main()
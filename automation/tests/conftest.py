@@ -0,0 +1,52 @@
+"""
+Shared fixtures: an in-process mock Teamcenter server and clients bound to it
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.client.rest_client import TeamcenterRESTClient  # noqa: E402
+from src.mock import FleetDataGenerator, MockTeamcenterServer  # noqa: E402
+
+
+@pytest.fixture
+def server():
+    """Mock server with the sample loader BOM"""
+    server = MockTeamcenterServer(seed=1)
+    server.store.load_sample_data()
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def fleet_server():
+    """Mock server with a small seeded synthetic fleet"""
+    server = MockTeamcenterServer(seed=1)
+    FleetDataGenerator(seed=1, equipment_count=3).load_into(server)
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def client(server):
+    client = TeamcenterRESTClient(server.base_url, 'demo', 'demo')
+    yield client
+    client.logout()
+
+
+@pytest.fixture
+def fleet_client(fleet_server):
+    client = TeamcenterRESTClient(fleet_server.base_url, 'demo', 'demo')
+    yield client
+    client.logout()
+
+
+@pytest.fixture
+def fleet_ids(fleet_server):
+    return sorted(item_id for item_id in fleet_server.store.items if item_id.startswith('EQ-'))
@@ -0,0 +1,112 @@
+"""
+BOM diffing and reconciliation against the mock server
+"""
+
+import pytest
+
+from src.client.bom_diff import (ADD, POSITION_PROPERTY, REMOVE, UPDATE, BOMReconciler,
+                                 diff_lines, format_operations)
+
+ROOT = 'SCOOPTRAM-ST1030-DEMO'
+
+
+def _line(line_id, child_id, position, quantity=1, **properties):
+    properties[POSITION_PROPERTY] = str(position)
+    return {'lineId': line_id, 'childId': child_id, 'quantity': quantity,
+            'properties': properties}
+
+
+def _ops(operations):
+    return sorted((operation['op'], operation['childId'], operation['position'])
+                  for operation in operations)
+
+
+def test_unchanged_lines_need_no_operations():
+    current = [_line('L1', 'A', 1), _line('L2', 'B', 2, quantity=3)]
+    assert diff_lines(current, [{'childId': 'A'}, {'childId': 'B', 'quantity': 3}]) == []
+
+
+def test_add_remove_and_update():
+    current = [_line('L1', 'A', 1), _line('L2', 'B', 2), _line('L3', 'C', 3, epr_note='x')]
+    target = [{'childId': 'A', 'position': 1, 'quantity': 2},
+              {'childId': 'C', 'position': 3, 'properties': {'epr_note': 'y'}},
+              {'childId': 'D', 'position': 4}]
+
+    operations = diff_lines(current, target)
+
+    assert _ops(operations) == [(ADD, 'D', 4), (REMOVE, 'B', 2), (UPDATE, 'A', 1),
+                                (UPDATE, 'C', 3)]
+    by_child = {operation['childId']: operation for operation in operations}
+    assert by_child['A']['changes'] == {'quantity': 2.0}
+    assert by_child['A']['lineId'] == 'L1'
+    assert by_child['C']['changes'] == {'properties': {'epr_note': 'y'}}
+    assert by_child['B']['lineId'] == 'L2'
+
+
+def test_move_is_one_update():
+    operations = diff_lines([_line('L1', 'A', 1)], [{'childId': 'A', 'position': 5}])
+
+    assert _ops(operations) == [(UPDATE, 'A', 5)]
+    assert operations[0]['changes'] == {'properties': {POSITION_PROPERTY: '5'}}
+    assert 'position 1 -> 5' in format_operations('P', operations)
+
+
+def test_duplicates():
+    current = [_line('L1', 'A', 1), _line('L2', 'A', 1)]
+    operations = diff_lines(current, [{'childId': 'A', 'position': 1}])
+    assert [(operation['op'], operation['lineId']) for operation in operations] == \
+        [(REMOVE, 'L2')]
+
+    with pytest.raises(ValueError, match='Duplicate target line'):
+        diff_lines([], [{'childId': 'A', 'position': 1}, {'childId': 'A', 'position': 1}])
+
+
+def test_lines_without_position():
+    current = [{'lineId': 'L1', 'childId': 'A', 'quantity': 1},
+               {'lineId': 'L2', 'childId': 'C', 'quantity': 1}]
+    operations = diff_lines(current, [{'childId': 'B', 'quantity': 1},
+                                      {'childId': 'C', 'position': 2}])
+
+    assert _ops(operations) == [(ADD, 'B', 1), (REMOVE, 'A', None), (UPDATE, 'C', 2)]
+    diff = format_operations('P', operations)
+    assert diff.splitlines()[0] == 'BOM P: 1 to add, 1 to update, 1 to remove'
+    assert '  -     -  A  (L1)' in diff
+    assert 'position - -> 2' in diff
+
+
+def test_reconcile_against_mock(client, server):
+    lines = client.get_bom_structure(ROOT, levels=1)['lines']
+    target = [{'childId': line['childId'], 'quantity': line['quantity'],
+               'position': int(line['properties'][POSITION_PROPERTY])} for line in lines]
+    target[0]['quantity'] = 4
+    del target[-1]
+    target.append({'childId': 'BUCKET-10T', 'position': 99})
+    reconciler = BOMReconciler(client)
+
+    dry_run = reconciler.reconcile(ROOT, target, dry_run=True)
+    assert (dry_run['added'], dry_run['updated'], dry_run['removed']) == (1, 1, 1)
+    assert dry_run['outcomes'] == []
+    assert len(client.get_bom_structure(ROOT, levels=1)['lines']) == len(lines)
+
+    result = reconciler.reconcile(ROOT, target)
+    assert result['failed'] == 0
+    assert reconciler.reconcile(ROOT, target, dry_run=True)['operations'] == []
+
+    after = client.get_bom_structure(ROOT, levels=1)['lines']
+    assert sorted(line['childId'] for line in after) == \
+        sorted(spec['childId'] for spec in target)
+    assert after[0]['quantity'] == 4
+
+
+def test_reconcile_position_less_bom(client, server):
+    # Lines added without a position property, e.g. by hand in the rich client
+    client.add_bom_line(ROOT, 'BUCKET-10T', 1, {})
+    target = [{'childId': line['childId'], 'quantity': line['quantity'],
+               'position': int(line['properties'][POSITION_PROPERTY])}
+              for line in client.get_bom_structure(ROOT, levels=1)['lines']
+              if POSITION_PROPERTY in line['properties']]
+
+    result = BOMReconciler(client).reconcile(ROOT, target, dry_run=True)
+
+    assert result['removed'] == 1
+    assert '-     -  BUCKET-10T' in result['diff']
@@ -0,0 +1,94 @@
+"""
+Bulk workflow runs: reruns never double-approve, starts are retried only when safe
+"""
+
+import requests
+
+from src.mock import RouteProfile
+from src.workflow.bulk import (ALREADY_COMPLETED, COMPLETED, FAILED, SKIPPED, STARTED,
+                               BulkWorkflowRunner, chunk_targets)
+
+TARGETS = ['BUCKET-10T', 'CABIN-ROPS-FOPS', 'CHARGING-INTERFACE']
+
+
+def _runner(client, **kwargs):
+    return BulkWorkflowRunner(client, max_workers=4, backoff=0.01, **kwargs)
+
+
+def _start(client, runner):
+    summary = runner.start_workflows(chunk_targets('EPR_ECN_Process', TARGETS,
+                                                   properties={'impact_level': 'Low'}))
+    assert summary['counts'] == {STARTED: len(TARGETS)}
+    return [task['taskId'] for task in client.get_my_tasks()]
+
+
+def test_rerun_never_double_approves(client, server):
+    runner = _runner(client)
+    decisions = [{'taskId': task_id, 'decision': 'Approve'}
+                 for task_id in _start(client, runner)]
+
+    first = runner.complete_tasks(decisions)
+    assert first['counts'] == {COMPLETED: len(TARGETS)}
+
+    # A rerun skips finished tasks without calling the server
+    calls = server.stats['workflows.complete_task']['requests']
+    rerun = runner.complete_tasks(decisions)
+    assert rerun['counts'] == {SKIPPED: len(TARGETS)}
+    assert server.stats['workflows.complete_task']['requests'] == calls
+
+    # Without the pending check the server's 409 is reported, not retried
+    unverified = runner.complete_tasks(decisions, verify_pending=False)
+    assert unverified['counts'] == {ALREADY_COMPLETED: len(TARGETS)}
+    assert all(result['attempts'] == 1 for result in unverified['results'])
+    assert server.stats['workflows.complete_task']['requests'] == calls + len(TARGETS)
+
+
+def test_retry_after_lost_response_is_already_completed(client, server):
+    runner = _runner(client)
+    task_id = _start(client, runner)[0]
+    complete_task = client.complete_task
+    attempts = []
+
+    def lost_response(*args, **kwargs):
+        attempts.append(args)
+        result = complete_task(*args, **kwargs)
+        if len(attempts) == 1:
+            raise requests.exceptions.ConnectionError('Connection reset by peer')
+        return result
+
+    client.complete_task = lost_response
+    summary = runner.complete_tasks([{'taskId': task_id, 'decision': 'Approve'}])
+
+    result = summary['results'][0]
+    assert (result['status'], result['attempts']) == (ALREADY_COMPLETED, 2)
+    assert server.store.tasks[task_id]['decision'] == 'Approve'
+
+
+def test_start_server_error_is_not_retried(client, server):
+    server.profiles['workflows.start'] = RouteProfile(error_rate=1.0, error_status=503)
+    summary = _runner(client).start_workflows([{'processName': 'EPR_ECN_Process',
+                                                'targets': TARGETS[:1], 'properties': {}}])
+
+    result = summary['results'][0]
+    assert (result['status'], result['attempts'], result['uncertain']) == (FAILED, 1, True)
+    assert server.stats['workflows.start']['requests'] == 1
+
+
+def test_start_throttled_is_retried(client, server):
+    server.profiles['workflows.start'] = RouteProfile(throttle_rate=1.0, retry_after=0.01)
+    start_workflow = client.start_workflow
+
+    def throttled_once(*args, **kwargs):
+        try:
+            return start_workflow(*args, **kwargs)
+        finally:
+            server.profiles.pop('workflows.start', None)
+
+    client.start_workflow = throttled_once
+    summary = _runner(client).start_workflows([{'processName': 'EPR_ECN_Process',
+                                                'targets': TARGETS[:1], 'properties': {}}])
+
+    result = summary['results'][0]
+    assert (result['status'], result['attempts'], result['uncertain']) == (STARTED, 2, False)
+    assert server.stats['workflows.start']['throttled'] == 1
+    assert len(client.get_my_tasks()) == 1
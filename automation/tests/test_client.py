@@ -0,0 +1,73 @@
+"""
+TeamcenterRESTClient basics against the mock server
+"""
+
+import pytest
+import requests
+
+from src.client.rest_client import TeamcenterRESTClient, connection_pool_size
+
+
+def test_authentication(server):
+    client = TeamcenterRESTClient(server.base_url)
+    client.authenticate('demo', 'demo')
+    assert client.token
+    assert client.get_item('BUCKET-10T')['itemId'] == 'BUCKET-10T'
+
+
+def test_bom_structure(client):
+    structure = client.get_bom_structure('SCOOPTRAM-ST1030-DEMO')
+    assert structure['root']['itemId'] == 'SCOOPTRAM-ST1030-DEMO'
+    assert any(line['childId'] == 'BUCKET-10T' for line in structure['lines'])
+
+
+def test_missing_item_raises(client):
+    with pytest.raises(requests.exceptions.HTTPError):
+        client.get_item('NO-SUCH-ITEM')
+
+
+def test_update_and_remove_generated_bom_lines(fleet_server, fleet_ids):
+    client = TeamcenterRESTClient(fleet_server.base_url, 'demo', 'demo')
+    line = client.get_bom_structure(fleet_ids[0], levels=1)['lines'][0]
+    assert '/' not in line['lineId']
+
+    client.update_bom_line(fleet_ids[0], line['lineId'], {'quantity': 7})
+    lines = client.get_bom_structure(fleet_ids[0], levels=1)['lines']
+    assert next(l for l in lines if l['lineId'] == line['lineId'])['quantity'] == 7
+
+    assert client.remove_bom_line(fleet_ids[0], line['lineId'])
+    lines = client.get_bom_structure(fleet_ids[0], levels=1)['lines']
+    assert line['lineId'] not in {l['lineId'] for l in lines}
+
+
+def test_line_ids_with_slash_are_encoded(server, client):
+    parent = 'SCOOPTRAM-ST1030-DEMO'
+    line = client.get_bom_structure(parent, levels=1)['lines'][0]
+    store_lines = server.store.bom_lines[parent]
+    stored = next(l for l in store_lines if l['lineId'] == line['lineId'])
+    stored['lineId'] = 'LEGACY/0010'
+    assert client.update_bom_line(parent, 'LEGACY/0010', {'quantity': 3})['quantity'] == 3
+    assert client.remove_bom_line(parent, 'LEGACY/0010')
+
+
+def test_item_ids_with_slashes(client, server):
+    item_id = 'LEGACY/PUMP 1'
+    client.create_item({'itemId': item_id, 'name': 'Legacy pump', 'type': 'EPR_Component'})
+    client.add_bom_line('SCOOPTRAM-ST1030-DEMO', item_id, 1, {})
+    server.store.add_dataset(item_id, 'manual.pdf', b'%PDF')
+
+    assert client.get_item(item_id)['itemId'] == item_id
+    assert client.update_item(item_id, {'name': 'Renamed'})['name'] == 'Renamed'
+    assert client.get_bom_structure(item_id)['root']['itemId'] == item_id
+    assert [parent['itemId'] for parent in client.get_where_used(item_id)] == \
+        ['SCOOPTRAM-ST1030-DEMO']
+    dataset = client.get_item_datasets(item_id)[0]
+    assert dataset['fileName'] == 'manual.pdf'
+    assert client.delete_item(item_id)
+
+
+def test_connection_pool_size_covers_workers():
+    settings = {'teamcenter': {'connection': {'pool_size': 12}}}
+    assert connection_pool_size(settings) == 12
+    assert connection_pool_size(settings, 16) == 16
+    assert connection_pool_size({}, 4) == 10
@@ -0,0 +1,117 @@
+"""
+Codec projection, backends and request compression, alone and against the mock server
+"""
+
+import gzip
+import json
+
+import pytest
+import requests
+
+from src.client.codec import Codec, available_json_backends, project
+from src.client.rest_client import TeamcenterRESTClient
+
+PAYLOAD = {
+    'itemId': 'EQ-1',
+    'properties': {'epr_model': 'ST14', 'epr_facility': 'Kiruna', 'epr_notes': 'x' * 50},
+    'lines': [
+        {'lineId': 'EQ-1-0010', 'properties': {'epr_critical_component': 'True',
+                                               'epr_supplier': 'Acme'},
+         'children': [{'lineId': 'EQ-1-0010-0010',
+                       'properties': {'epr_critical_component': 'False'}}]},
+        {'lineId': 'EQ-1-0020', 'properties': {}}
+    ]
+}
+
+
+def _response(payload) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response._content = json.dumps(payload).encode('utf-8')
+    return response
+
+
+def _property_dicts(value):
+    if isinstance(value, dict):
+        if 'properties' in value:
+            yield value['properties']
+        for key, child in value.items():
+            if key != 'properties':
+                yield from _property_dicts(child)
+    elif isinstance(value, list):
+        for child in value:
+            yield from _property_dicts(child)
+
+
+def test_project_keeps_named_properties_at_every_depth():
+    projected = project(json.loads(json.dumps(PAYLOAD)), ['epr_model', 'epr_critical_component'])
+
+    assert projected['properties'] == {'epr_model': 'ST14'}
+    assert projected['lines'][0]['properties'] == {'epr_critical_component': 'True'}
+    assert projected['lines'][0]['children'][0]['properties'] == {
+        'epr_critical_component': 'False'}
+    assert projected['lines'][0]['lineId'] == 'EQ-1-0010'
+    assert projected['itemId'] == 'EQ-1'
+
+
+@pytest.mark.parametrize('backend', available_json_backends())
+def test_decode_projects_with_every_backend(backend):
+    codec = Codec(json_backend=backend)
+    names = ['epr_facility', 'epr_critical_component']
+
+    decoded = codec.decode(_response(PAYLOAD), names)
+
+    assert codec.json_backend == backend
+    assert decoded == project(json.loads(json.dumps(PAYLOAD)), names)
+    assert all(set(properties) <= set(names) for properties in _property_dicts(decoded))
+    assert codec.decode(_response(PAYLOAD)) == PAYLOAD
+    assert codec.stats()['decode']['calls'] == 2
+
+
+@pytest.mark.parametrize('backend', available_json_backends())
+def test_decode_rejects_invalid_json(backend):
+    response = requests.Response()
+    response.status_code = 200
+    response._content = b'{"itemId": '
+
+    with pytest.raises(requests.exceptions.JSONDecodeError):
+        Codec(json_backend=backend).decode(response, ['epr_model'])
+
+
+def test_encode_compresses_only_large_bodies():
+    codec = Codec(compress_requests=True, compress_min_bytes=1024)
+
+    small, small_headers = codec.encode({'itemId': 'EQ-1'})
+    large, large_headers = codec.encode(PAYLOAD | {'padding': 'y' * 4096})
+
+    assert 'Content-Encoding' not in small_headers
+    assert json.loads(small) == {'itemId': 'EQ-1'}
+    assert large_headers['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(large))['padding'] == 'y' * 4096
+    assert len(large) < 4096
+
+
+@pytest.mark.parametrize('backend', available_json_backends())
+def test_client_requests_only_projected_properties(fleet_server, fleet_ids, backend):
+    client = TeamcenterRESTClient(fleet_server.base_url, 'demo', 'demo',
+                                  codec=Codec(json_backend=backend, compress_requests=True,
+                                              compress_min_bytes=0))
+    try:
+        item = client.get_item(fleet_ids[0], properties=['epr_model'])
+        bom = client.get_bom_structure(fleet_ids[0], levels=2,
+                                       properties=['epr_critical_component'])
+        bare = client.get_bom_structure(fleet_ids[0], levels=2, properties=[])
+        full = client.get_item(fleet_ids[0])
+        created = client.create_item({'itemId': 'CODEC-1', 'name': 'Codec test',
+                                      'type': 'EPR_Component'})
+    finally:
+        client.logout()
+
+    assert set(item['properties']) == {'epr_model'}
+    assert len(full['properties']) > 1
+    assert bom['lines']
+    assert all(set(properties) <= {'epr_critical_component'}
+               for properties in _property_dicts(bom['lines']))
+    assert any(properties for properties in _property_dicts(bom['lines']))
+    assert not any(properties for properties in _property_dicts(bare['lines']))
+    assert created['itemId'] == 'CODEC-1'
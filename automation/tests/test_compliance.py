@@ -0,0 +1,89 @@
+"""
+Compliance state: stamp-based skipping and the forced refresh age
+"""
+
+from datetime import datetime, timedelta
+
+from src.compliance.engine import ComplianceEngine, ComplianceState
+from src.mock import RouteProfile
+
+DOCUMENTS = [{'type': 'MSHA_Certification', 'validity_days': 365},
+             {'type': 'CE_Declaration', 'validity_days': 730}]
+
+
+def test_stale_by_stamp_and_age():
+    now = datetime(2026, 6, 1, 12, 0)
+    state = ComplianceState()
+    assert state.stale('EQ-1', 'm1')
+    state.equipment['EQ-1'] = {'modified': 'm1', 'checked': '2026-05-28T12:00:00'}
+    assert not state.stale('EQ-1', 'm1')
+    assert state.stale('EQ-1', 'm2')
+    assert state.stale('EQ-1', None)
+    assert not state.stale('EQ-1', 'm1', timedelta(days=7), now)
+    assert state.stale('EQ-1', 'm1', timedelta(days=3), now)
+    # Entries from before checked times were recorded are refreshed once
+    state.equipment['EQ-2'] = {'modified': 'm1'}
+    assert state.stale('EQ-2', 'm1', timedelta(days=7), now)
+
+
+def test_unstamped_attachment_found_by_forced_refresh(fleet_client, fleet_server, fleet_ids):
+    engine = ComplianceEngine(fleet_client, DOCUMENTS, full_refresh_days=7)
+    first = engine.run()
+    assert first['refresh']['fetched'] == len(fleet_ids)
+    assert engine.run()['refresh']['skipped'] == len(fleet_ids)
+
+    # A server that does not bump 'modified' when a document is attached
+    equipment_id = fleet_ids[0]
+    stamp = fleet_server.store.items[equipment_id]['modified']
+    fleet_server.store.add_dataset(equipment_id, 'msha_certification.pdf', b'%PDF',
+                                   properties={'epr_document_type': 'MSHA_Certification',
+                                               'epr_issue_date': '2099-01-01'})
+    fleet_server.store.items[equipment_id]['modified'] = stamp
+    assert engine.run()['refresh']['fetched'] == 0
+    assert engine.state.equipment[equipment_id]['documents'].get('MSHA_Certification') != \
+        '2099-01-01'
+
+    week_ago = (datetime.now() - timedelta(days=8)).isoformat(timespec='seconds')
+    engine.state.equipment[equipment_id]['checked'] = week_ago
+    refresh = engine.run()['refresh']
+    assert refresh['fetched'] == 1
+    assert engine.state.equipment[equipment_id]['documents']['MSHA_Certification'] == \
+        '2099-01-01'
+
+
+def test_malformed_issue_date_is_skipped(fleet_client, fleet_server, fleet_ids, caplog):
+    equipment_id = fleet_ids[0]
+    fleet_server.store.add_dataset(equipment_id, 'ce_declaration.pdf', b'%PDF',
+                                   properties={'epr_document_type': 'CE_Declaration',
+                                               'epr_issue_date': '15/03/2024'})
+    engine = ComplianceEngine(fleet_client, DOCUMENTS)
+
+    report = engine.run()
+
+    assert report['equipment'] == len(fleet_ids)
+    assert engine.state.equipment[equipment_id]['documents'].get('CE_Declaration') != \
+        '15/03/2024'
+    assert '15/03/2024' in caplog.text
+
+    # A bad date cached before issue dates were validated counts as missing
+    engine.state.equipment[equipment_id]['documents']['CE_Declaration'] = '15/03/2024'
+    entry = engine.evaluate([equipment_id])['details'][0]
+    assert 'CE_Declaration' in entry['missing']
+
+
+def test_failed_fetch_is_unknown_not_missing(fleet_client, fleet_server, fleet_ids):
+    fleet_server.profiles['items.datasets'] = RouteProfile(error_rate=1.0, error_status=503)
+    engine = ComplianceEngine(fleet_client, DOCUMENTS)
+
+    report = engine.run()
+
+    assert report['unknown'] == fleet_ids
+    assert report['equipment'] == 0
+    assert report['non_compliant'] == 0
+    assert report['details'] == []
+    assert engine.check(fleet_ids[0])['compliant'] is None
+
+    del fleet_server.profiles['items.datasets']
+    report = engine.run()
+    assert report['unknown'] == []
+    assert report['equipment'] == len(fleet_ids)
@@ -0,0 +1,48 @@
+"""
+Cron schedule parsing and next firing times
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.scheduling.cron import CronSchedule
+
+
+@pytest.mark.parametrize('expression, moment, expected', [
+    ('0 8 * * *', datetime(2026, 3, 10, 7, 59), datetime(2026, 3, 10, 8, 0)),
+    ('0 8 * * *', datetime(2026, 3, 10, 8, 0), datetime(2026, 3, 11, 8, 0)),
+    ('0 8 * * *', datetime(2026, 3, 10, 8, 0, 30), datetime(2026, 3, 11, 8, 0)),
+    ('*/15 * * * *', datetime(2026, 3, 10, 9, 7), datetime(2026, 3, 10, 9, 15)),
+    ('0 */4 * * *', datetime(2026, 3, 10, 21, 5), datetime(2026, 3, 11, 0, 0)),
+    ('0 17 * * 5', datetime(2026, 3, 10, 12, 0), datetime(2026, 3, 13, 17, 0)),
+    ('0 17 * * FRI', datetime(2026, 3, 13, 17, 0), datetime(2026, 3, 20, 17, 0)),
+    ('30 6 * * 0', datetime(2026, 3, 10, 0, 0), datetime(2026, 3, 15, 6, 30)),
+    ('30 6 * * 7', datetime(2026, 3, 10, 0, 0), datetime(2026, 3, 15, 6, 30)),
+    ('0 0 1 * *', datetime(2026, 12, 15, 0, 0), datetime(2027, 1, 1, 0, 0)),
+    ('0 0 31 * *', datetime(2026, 4, 1, 0, 0), datetime(2026, 5, 31, 0, 0)),
+    ('0 12 29 FEB *', datetime(2026, 3, 1), datetime(2028, 2, 29, 12, 0)),
+    ('0 9 1-7 * 1-5', datetime(2026, 3, 10, 0, 0), datetime(2026, 3, 10, 9, 0)),
+    ('0 9 1 * MON', datetime(2026, 3, 10, 10, 0), datetime(2026, 3, 16, 9, 0)),
+])
+def test_next_after(expression, moment, expected):
+    assert CronSchedule(expression).next_after(moment) == expected
+
+
+def test_next_after_matches_brute_force():
+    moment = datetime(2026, 1, 1)
+    for expression in ('5,35 9-17/2 * * MON-FRI', '0 0 1,15 * 3', '*/20 3 * JAN,JUL *'):
+        schedule = CronSchedule(expression)
+        minute = moment.replace(second=0) + timedelta(minutes=1)
+        expected = []
+        while len(expected) < 20:
+            if schedule.matches(minute):
+                expected.append(minute)
+            minute += timedelta(minutes=1)
+        assert schedule.upcoming(moment, 20) == expected
+
+
+@pytest.mark.parametrize('expression', ['* * * *', '60 * * * *', '0 0 30 2 *', '0 0 * * 8'])
+def test_invalid_or_impossible_expressions(expression):
+    with pytest.raises(ValueError):
+        CronSchedule(expression).next_after(datetime(2026, 1, 1))
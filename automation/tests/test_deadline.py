@@ -0,0 +1,78 @@
+"""
+Deadline nesting, cancellation and propagation into client calls
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.client.deadline import Deadline, DeadlineExceeded, OperationCancelled, current_deadline
+from src.mock import RouteProfile
+
+
+def test_nested_deadline_never_outlives_parent():
+    with Deadline(0.5) as outer:
+        inner = Deadline(10.0)
+        assert inner.parent is outer
+        assert inner.expires_at == outer.expires_at
+        assert Deadline(0.1).expires_at < outer.expires_at
+
+
+def test_ambient_deadline_is_restored():
+    assert current_deadline() is None
+    with Deadline(1.0) as outer:
+        with Deadline(0.5) as inner:
+            assert current_deadline() is inner
+        assert current_deadline() is outer
+    assert current_deadline() is None
+
+
+def test_cancelling_parent_cancels_children():
+    parent = Deadline()
+    child = Deadline(parent=parent)
+    parent.cancel()
+    assert child.cancelled
+    with pytest.raises(OperationCancelled):
+        child.check()
+
+
+def test_wait_wakes_on_cancel():
+    deadline = Deadline(5.0)
+    threading.Timer(0.05, deadline.cancel).start()
+    started = time.monotonic()
+    assert deadline.wait(2.0) is False
+    assert time.monotonic() - started < 1.0
+
+
+def test_request_timeout_is_bounded_by_budget():
+    deadline = Deadline(0.2)
+    assert deadline.request_timeout(30) <= 0.2
+    assert Deadline().request_timeout(30) == 30
+
+
+def test_expired_deadline_fails_client_call(server, client):
+    server.profiles['items.get'] = RouteProfile('fixed', 300)
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        with Deadline(0.1):
+            client.get_item('BUCKET-10T')
+    assert time.monotonic() - started < 0.3
+
+
+def test_cancelled_deadline_fails_fast(client):
+    deadline = Deadline(5.0)
+    deadline.cancel()
+    with pytest.raises(OperationCancelled):
+        client.get_item('BUCKET-10T', deadline=deadline)
+
+
+def test_wait_wakes_when_parent_is_cancelled():
+    parent = Deadline(5.0)
+    child = Deadline(parent=parent)
+    grandchild = Deadline(1.0, parent=child)
+    threading.Timer(0.05, parent.cancel).start()
+    started = time.monotonic()
+    assert grandchild.wait(1.0) is False
+    assert time.monotonic() - started < 0.5
+    assert Deadline(parent=parent).wait(1.0) is False
@@ -0,0 +1,103 @@
+"""
+Endpoint pool: ejection, backoff, readmission and selection
+"""
+
+import socket
+
+import pytest
+import requests
+
+from src.client.endpoints import EndpointPool
+
+
+class FakeResponse:
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+
+
+def respond(status_code: int):
+    return lambda base_url: FakeResponse(status_code)
+
+
+def refuse(base_url):
+    raise requests.exceptions.ConnectionError(f"{base_url} refused")
+
+
+def test_ejected_after_consecutive_failures():
+    pool = EndpointPool(['http://a', 'http://b'], failure_threshold=3)
+    a = pool.get('http://a')
+    pool.dispatch(a, respond(503))
+    pool.dispatch(a, respond(503))
+    pool.dispatch(a, respond(200))
+    assert a.healthy and a.consecutive_failures == 0
+
+    for _ in range(3):
+        pool.dispatch(a, respond(500))
+    assert not a.healthy and a.ejections == 1
+    assert {pool.select().url for _ in range(10)} == {'http://b'}
+
+
+def test_connection_errors_count_and_ejection_backs_off(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr('src.client.endpoints.time.monotonic', lambda: clock[0])
+    pool = EndpointPool(['http://a', 'http://b'], failure_threshold=2,
+                        ejection_seconds=10, max_ejection_seconds=25)
+    a = pool.get('http://a')
+    for _ in range(2):
+        with pytest.raises(requests.exceptions.ConnectionError):
+            pool.dispatch(a, refuse)
+    assert a.ejected_until == 1010
+
+    # Failures during the ejection do not extend it
+    with pytest.raises(requests.exceptions.ConnectionError):
+        pool.dispatch(a, refuse)
+    assert a.ejected_until == 1010
+
+    # Trial request after the period fails: ejected again for twice as long
+    clock[0] = 1011
+    assert a.available
+    with pytest.raises(requests.exceptions.ConnectionError):
+        pool.dispatch(a, refuse)
+    assert a.ejected_until == 1031
+
+    clock[0] = 1032
+    with pytest.raises(requests.exceptions.ConnectionError):
+        pool.dispatch(a, refuse)
+    assert a.ejected_until == 1032 + 25
+
+    clock[0] = 1100
+    pool.dispatch(a, respond(200))
+    assert a.healthy and a.ejections == 0
+
+
+def test_all_ejected_fails_open_to_first_due():
+    pool = EndpointPool(['http://a', 'http://b'], failure_threshold=1, ejection_seconds=60)
+    pool.dispatch(pool.get('http://b'), respond(502))
+    pool.dispatch(pool.get('http://a'), respond(502))
+    assert pool.select().url == 'http://b'
+
+
+def test_least_outstanding_and_weighted_round_robin():
+    pool = EndpointPool(['http://a', 'http://b'])
+    pool.get('http://a').outstanding = 2
+    assert pool.select().url == 'http://b'
+    assert pool.select(exclude=['http://b']).url == 'http://a'
+
+    weighted = EndpointPool({'http://a': 3, 'http://b': 1}, strategy='weighted_round_robin')
+    picks = [weighted.select().url for _ in range(8)]
+    assert picks.count('http://a') == 6 and picks.count('http://b') == 2
+
+
+def test_health_check_ejects_dead_node(server):
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        dead_url = f"http://127.0.0.1:{probe.getsockname()[1]}/tc"
+    pool = EndpointPool([server.base_url, dead_url], failure_threshold=2,
+                        health_check_timeout=1)
+    session = requests.Session()
+    pool.check_health(session)
+    pool.check_health(session)
+    stats = {entry['url']: entry for entry in pool.stats()}
+    assert stats[server.base_url.rstrip('/')]['healthy']
+    assert not stats[dead_url]['healthy']
+    assert pool.select().url == server.base_url.rstrip('/')
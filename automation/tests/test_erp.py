@@ -0,0 +1,87 @@
+"""
+ERP BOM sync: incremental pushes, emptied and deleted assemblies, checkpointing
+"""
+
+import json
+
+from src.integrations.erp import BOMSyncPipeline, ERPSink, FileSink, SyncCheckpoint
+
+
+class RecordingSink(ERPSink):
+    def __init__(self):
+        self.batches = []
+
+    def push(self, assemblies):
+        self.batches.append(assemblies)
+
+    @property
+    def assemblies(self):
+        return {a['assemblyId']: a for batch in self.batches for a in batch}
+
+
+class CountingCheckpoint(SyncCheckpoint):
+    saves = 0
+
+    def save(self, last_run=None):
+        self.saves += 1
+        super().save(last_run)
+
+
+def subassemblies(client, root_id):
+    lines = client.get_bom_structure(root_id, levels=2)['lines']
+    return [line for line in lines if line.get('children')]
+
+
+def test_second_run_pushes_nothing(fleet_client, fleet_ids, tmp_path):
+    client = fleet_client
+    checkpoint = tmp_path / 'checkpoint.json'
+    first = BOMSyncPipeline(client, FileSink(tmp_path / 'out'),
+                            SyncCheckpoint(checkpoint)).run(fleet_ids)
+    assert first['pushed'] == first['assemblies'] > 0
+
+    second = BOMSyncPipeline(client, RecordingSink(), SyncCheckpoint(checkpoint)).run(fleet_ids)
+    assert second['pushed'] == 0 and second['unchanged'] == first['assemblies']
+    saved = json.loads(checkpoint.read_text())
+    assert set(saved['members']) == set(fleet_ids)
+
+
+def test_emptied_and_deleted_assemblies_are_pushed(fleet_client, fleet_server, fleet_ids,
+                                                   tmp_path):
+    client = fleet_client
+    store = fleet_server.store
+    checkpoint = tmp_path / 'checkpoint.json'
+    BOMSyncPipeline(client, RecordingSink(), SyncCheckpoint(checkpoint)).run(fleet_ids)
+
+    root = fleet_ids[0]
+    emptied, deleted = [line['childId'] for line in subassemblies(client, root)][:2]
+    for line in list(store.bom_lines[emptied]):
+        store.remove_bom_line(emptied, line['lineId'])
+    for parent_id in list(store.where_used_index[deleted]):
+        for line in [l for l in store.bom_lines[parent_id] if l['childId'] == deleted]:
+            store.remove_bom_line(parent_id, line['lineId'])
+    store.delete_item(deleted)
+
+    sink = RecordingSink()
+    summary = BOMSyncPipeline(client, sink, SyncCheckpoint(checkpoint)).run(fleet_ids)
+    pushed = sink.assemblies
+    assert pushed[emptied]['lines'] == [] and not pushed[emptied].get('deleted')
+    assert pushed[deleted] == {'assemblyId': deleted, 'deleted': True, 'lines': []}
+    assert summary['emptied'] >= 1 and summary['deleted'] == 1
+
+    saved = SyncCheckpoint(checkpoint)
+    assert deleted not in saved.fingerprints
+    assert emptied in saved.fingerprints
+
+    # Both are settled: nothing further to push
+    sink = RecordingSink()
+    summary = BOMSyncPipeline(client, sink, SyncCheckpoint(checkpoint)).run(fleet_ids)
+    assert summary['pushed'] == 0
+
+
+def test_checkpoint_written_every_n_batches(fleet_client, fleet_ids, tmp_path):
+    client = fleet_client
+    checkpoint = CountingCheckpoint(tmp_path / 'checkpoint.json')
+    summary = BOMSyncPipeline(client, RecordingSink(), checkpoint, batch_size=2,
+                              checkpoint_every=5).run(fleet_ids)
+    assert summary['batches'] > 5
+    assert checkpoint.saves == summary['batches'] // 5 + 1
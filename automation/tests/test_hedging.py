@@ -0,0 +1,103 @@
+"""
+Hedged reads: token budget, queue time and the live client path
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.client.deadline import Deadline, DeadlineExceeded
+from src.client.hedging import HedgingPolicy
+from src.client.rest_client import TeamcenterRESTClient
+from src.mock.server import RouteProfile
+
+
+class FakeResponse:
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def slow_send(seconds: float):
+    def send(base_url):
+        time.sleep(seconds)
+        return FakeResponse(base_url)
+    return send
+
+
+def test_hedges_stay_within_budget():
+    policy = HedgingPolicy(initial_delay=0.005, min_samples=10**6, budget_ratio=0.25,
+                           max_tokens=1)
+    for _ in range(20):
+        policy.execute(slow_send(0.02), 'http://primary')
+    stats = policy.stats()
+    assert stats['requests'] == 20
+    assert stats['hedges_sent'] == 5
+    policy.shutdown()
+
+
+def test_no_hedge_below_delay():
+    policy = HedgingPolicy(initial_delay=1.0, min_samples=10**6, budget_ratio=1)
+    for _ in range(5):
+        assert policy.execute(slow_send(0.001), 'http://primary').base_url == 'http://primary'
+    assert policy.stats()['hedges_sent'] == 0
+    policy.shutdown()
+
+
+def test_queue_time_does_not_trigger_hedges():
+    policy = HedgingPolicy(initial_delay=0.2, min_samples=10**6, budget_ratio=1,
+                           max_tokens=10, max_workers=2)
+    policy._tokens = 10
+    # The third caller waits ~0.15 s for a worker; only its own 0.15 s counts
+    callers = [threading.Thread(target=policy.execute, args=(slow_send(0.15), 'http://p'))
+               for _ in range(3)]
+    for caller in callers:
+        caller.start()
+    for caller in callers:
+        caller.join()
+    assert policy.stats()['hedges_sent'] == 0
+    assert max(policy.latencies.snapshot()) < 0.2
+    policy.shutdown()
+
+
+def test_client_hedges_slow_reads(server):
+    server.profiles['items.get'] = RouteProfile('fixed', 200)
+    policy = HedgingPolicy(initial_delay=0.02, min_samples=10**6, budget_ratio=1)
+    policy._tokens = 1
+    client = TeamcenterRESTClient(server.base_url, 'demo', 'demo', hedging=policy)
+    assert client.get_item('BUCKET-10T')['itemId'] == 'BUCKET-10T'
+    assert policy.stats()['hedges_sent'] == 1
+    client.logout()
+
+
+def test_queue_wait_is_bounded_by_deadline():
+    policy = HedgingPolicy(initial_delay=1.0, min_samples=10**6, max_workers=1)
+    busy = threading.Thread(target=policy.execute, args=(slow_send(0.5), 'http://p'))
+    busy.start()
+    time.sleep(0.02)
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        policy.execute(slow_send(0.01), 'http://p', deadline=Deadline(0.1))
+    assert time.monotonic() - started < 0.3
+    busy.join()
+    policy.shutdown()
+
+
+def test_client_charges_queue_time_to_deadline(server):
+    server.profiles['items.get'] = RouteProfile('fixed', 300)
+    policy = HedgingPolicy(initial_delay=5.0, min_samples=10**6, max_workers=1)
+    client = TeamcenterRESTClient(server.base_url, 'demo', 'demo', hedging=policy)
+    busy = threading.Thread(target=client.get_item, args=('BUCKET-10T',))
+    busy.start()
+    time.sleep(0.05)
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        client.get_item('BUCKET-10T', deadline=Deadline(0.4))
+    # Queued ~0.25 s behind the busy worker, then only the rest of the budget
+    assert time.monotonic() - started < 0.55
+    busy.join()
+    client.logout()
@@ -0,0 +1,97 @@
+"""
+Logging pipeline: success sampling, drop accounting and end-to-end output
+"""
+
+import json
+import logging
+import queue
+
+from src.utils.log_pipeline import LazyQueueHandler, SuccessSampler, configure_logging
+
+
+def make_record(msg, *args, level=logging.INFO, name='src.client.bom_builder', **extra):
+    record = logging.getLogger(name).makeRecord(name, level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_sampler_limits_per_template_and_summarizes():
+    sampler = SuccessSampler(per_interval=2, interval_seconds=60)
+    allowed = [sampler.allow(make_record("Added %s to BOM of %s", f'P-{n}', 'ASM'))
+               for n in range(5)]
+    assert allowed == [True, True, False, False, False]
+    assert sampler.allow(make_record("Created item: %s", 'P-1'))
+    assert sampler.suppressed == 3
+
+    assert sampler.due() == []
+    summaries = sampler.due(force=True)
+    assert len(summaries) == 1
+    assert summaries[0].suppressed == 3
+    assert "3 more like 'Added %s to BOM of %s'" in summaries[0].getMessage()
+
+    # A new interval starts from zero
+    assert sampler.allow(make_record("Added %s to BOM of %s", 'P-9', 'ASM'))
+
+
+def test_sampler_exemptions():
+    sampler = SuccessSampler(per_interval=1, loggers=['src.client'])
+    for _ in range(3):
+        assert sampler.allow(make_record("Endpoint %s ejected", 'a', level=logging.WARNING))
+        assert sampler.allow(make_record("Job %s started", 'x', name='src.scheduling.scheduler'))
+        assert sampler.allow(make_record("Audit %s", 'x', sampled=False))
+    assert sampler.suppressed == 0
+
+
+def test_full_queue_drops_and_reports_low_severity_records():
+    log_queue = queue.Queue(maxsize=2)
+    handler = LazyQueueHandler(log_queue)
+    for n in range(5):
+        handler.emit(make_record("Added %s", n))
+    assert handler.dropped == 3 and log_queue.qsize() == 2
+
+    while not log_queue.empty():
+        log_queue.get_nowait()
+    handler.report_dropped(force=True)
+    report = log_queue.get_nowait()
+    assert report.levelno == logging.WARNING and report.dropped == 3
+    handler.report_dropped(force=True)
+    assert log_queue.empty()
+
+
+def test_mutable_arguments_are_formatted_when_queued():
+    log_queue = queue.Queue()
+    handler = LazyQueueHandler(log_queue)
+    lines = ['A']
+    handler.emit(make_record("Lines: %s", lines))
+    handler.emit(make_record("Item %s x%d", 'A', 2))
+    lines.append('B')
+    first, second = log_queue.get_nowait(), log_queue.get_nowait()
+    assert first.getMessage() == "Lines: ['A']" and first.args is None
+    assert second.args == ('A', 2)
+
+
+def test_configure_logging_writes_sampled_json(tmp_path):
+    path = tmp_path / 'automation.log'
+    settings = {'logging': {
+        'level': 'INFO',
+        'console': {'enabled': False},
+        'file': {'enabled': True, 'path': str(path), 'json': True},
+        'sampling': {'per_interval': 3, 'interval_seconds': 60}
+    }}
+    pipeline = configure_logging(settings)
+    try:
+        logger = logging.getLogger('src.client.bom_builder')
+        for n in range(10):
+            logger.info("Added %s to BOM of %s", f'P-{n}', 'ASM')
+        logger.warning("Endpoint %s ejected", 'http://a')
+        assert pipeline.stats()['suppressed'] == 7
+    finally:
+        pipeline.stop()
+        logging.getLogger().handlers.clear()
+
+    entries = [json.loads(line) for line in path.read_text().splitlines()]
+    messages = [entry['message'] for entry in entries]
+    assert messages[:3] == [f'Added P-{n} to BOM of ASM' for n in range(3)]
+    assert 'Endpoint http://a ejected' in messages
+    summary = next(entry for entry in entries if 'suppressed' in entry)
+    assert summary['suppressed'] == 7
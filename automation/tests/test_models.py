@@ -0,0 +1,88 @@
+"""
+Typed result models behave as read-only mappings for dict-style consumers
+"""
+
+import csv
+import json
+from collections.abc import Mapping
+
+import pytest
+
+from src.client.models import BOMLine, Item, PropertyMap, json_default
+from src.client.rest_client import TeamcenterRESTClient
+from src.integrations.erp import BOMSyncPipeline, FileSink
+from src.reports.export import export_rows, flatten_bom, iter_bom_lines, iter_search
+from src.reports.snapshot import BOMSnapshot, write_snapshot
+
+ITEM = {'itemId': 'PUMP-1', 'name': 'Pump', 'type': 'EPR_Component', 'status': 'Released',
+        'properties': {'epr_model': 'X1'}, 'owner': 'demo'}
+
+
+@pytest.fixture
+def typed_client(fleet_server):
+    client = TeamcenterRESTClient(fleet_server.base_url, 'demo', 'demo', typed_models=True)
+    yield client
+    client.logout()
+
+
+def test_model_is_mapping():
+    item = Item.from_dict(ITEM)
+    assert isinstance(item, Mapping)
+    assert item['itemId'] == 'PUMP-1'
+    assert item['owner'] == 'demo'
+    assert dict(item.items())['properties'] == {'epr_model': 'X1'}
+    assert set(item) == set(Item.from_dict(ITEM).to_dict())
+    assert len(item) == len(item.to_dict())
+    assert 'owner' in item and 'missing' not in item
+    assert item == ITEM | {key: None for key in ('uid', 'revisionId', 'description',
+                                                 'created', 'modified')}
+
+
+def test_bom_line_children_and_json():
+    line = BOMLine.from_dict({'lineId': 'L1', 'childId': 'A', 'properties': {},
+                              'children': [{'lineId': 'L2', 'childId': 'B'}]})
+    assert 'children' in line and len(line) == len(line.to_dict())
+    decoded = json.loads(json.dumps({'lines': [line]}, default=json_default))
+    assert decoded['lines'][0]['children'][0]['childId'] == 'B'
+    assert isinstance(PropertyMap({'a': 1}), Mapping)
+
+
+def test_bom_structure_is_json_serializable(typed_client, fleet_ids):
+    structure = typed_client.get_bom_structure(fleet_ids[0])
+    assert isinstance(structure['lines'][0], BOMLine)
+    text = json.dumps(structure, default=json_default)
+    assert json.loads(text)['lines'][0]['childId'] == structure['lines'][0]['childId']
+
+
+def test_export_with_typed_models(typed_client, tmp_path):
+    summary = export_rows(iter_search(typed_client, {'type': 'EPR_Component'}),
+                          tmp_path / 'parts.csv')
+    with open(tmp_path / 'parts.csv', newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert summary['rows'] == len(rows) > 0
+    assert rows[0]['itemId']
+
+
+def test_snapshot_with_typed_models(typed_client, fleet_server, fleet_ids, tmp_path):
+    plain = TeamcenterRESTClient(fleet_server.base_url, 'demo', 'demo')
+    expected = list(flatten_bom(plain.get_bom_structure(fleet_ids[0]), fleet_ids[0]))
+    write_snapshot(tmp_path / 'fleet.tcbom', iter_bom_lines(typed_client, fleet_ids[:1]))
+    with BOMSnapshot(tmp_path / 'fleet.tcbom') as snapshot:
+        lines = list(snapshot.lines())
+    assert [line['childId'] for line in lines] == [line['childId'] for line in expected]
+    assert lines[0]['properties'] == {key: str(value) for key, value
+                                      in expected[0]['properties'].items()}
+
+
+def test_erp_sync_with_typed_models(typed_client, fleet_server, fleet_ids, tmp_path):
+    plain = TeamcenterRESTClient(fleet_server.base_url, 'demo', 'demo')
+    typed = BOMSyncPipeline(typed_client, FileSink(tmp_path / 'typed')).run(fleet_ids)
+    dicts = BOMSyncPipeline(plain, FileSink(tmp_path / 'dicts')).run(fleet_ids)
+    assert not typed['failed_roots'] and typed['failed_batches'] == 0
+    assert typed['pushed'] == dicts['pushed'] > 0
+
+    def assemblies(directory):
+        return sorted((assembly for path in sorted(directory.glob('*.json'))
+                       for assembly in json.loads(path.read_text())['assemblies']),
+                      key=lambda assembly: assembly['assemblyId'])
+    assert assemblies(tmp_path / 'typed') == assemblies(tmp_path / 'dicts')
@@ -0,0 +1,98 @@
+"""
+Durable work queue: crash recovery, lease expiry and progress
+"""
+
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from src.batch.queue import DONE, FAILED, LEASED, WorkQueue
+
+AUTOMATION_DIR = Path(__file__).resolve().parents[1]
+
+CRASHING_RUN = """
+import os
+from src.batch.queue import WorkQueue
+
+queue = WorkQueue({path!r}, 'import')
+queue.enqueue((f'ITEM-{{n:03d}}', {{'n': n}}) for n in range(100))
+calls = []
+
+def work(payload):
+    calls.append(payload)
+    if len(calls) > 90:
+        os._exit(3)
+    return payload['n']
+
+queue.process(work, max_workers=1, batch_size=10)
+"""
+
+
+def test_resume_after_crash_reclaims_dead_leases(tmp_path):
+    path = tmp_path / 'queue.db'
+    crashed = subprocess.run([sys.executable, '-c', CRASHING_RUN.format(path=str(path))],
+                             cwd=AUTOMATION_DIR, timeout=60)
+    assert crashed.returncode == 3
+
+    with WorkQueue(path, 'import') as queue:
+        before = queue.progress()
+        assert (before['done'], before['leased']) == (90, 10)
+
+        started = time.monotonic()
+        summary = queue.process(lambda payload: payload['n'], max_workers=2, batch_size=10)
+        assert time.monotonic() - started < 10
+        assert (summary['done'], summary['leased'], summary['failed']) == (100, 0, 0)
+        assert summary['eta_seconds'] in (None, 0)
+        assert sorted(result for _, result, _ in queue.results(DONE)) == list(range(100))
+
+
+def test_expired_lease_fails_after_max_attempts(tmp_path):
+    with WorkQueue(tmp_path / 'queue.db', 'poison', max_attempts=2) as queue:
+        queue.enqueue([('A', 1)])
+        assert queue.lease('other-host:1-a-0', lease_seconds=0) == [('A', 1)]
+        time.sleep(0.01)
+        assert queue.lease('other-host:1-a-0', lease_seconds=0) == [('A', 1)]
+        time.sleep(0.01)
+        assert queue.lease('other-host:1-a-0') == []
+        assert queue.counts() == {FAILED: 1}
+        assert queue.results(FAILED) == [('A', None, 'lease expired')]
+
+
+def test_progress_eta_excludes_live_leases(tmp_path):
+    with WorkQueue(tmp_path / 'queue.db', 'eta') as queue:
+        queue.enqueue((str(n), n) for n in range(4))
+        leased = queue.lease('other-host:1-a-0', limit=2)
+        queue.commit(done=[(leased[0][0], None)])
+        progress = queue.progress()
+        assert (progress['done'], progress['leased'], progress['pending']) == (1, 1, 2)
+        assert progress['expired_leases'] == 0
+        assert progress['eta_seconds'] == 2 / progress['throughput']
+
+
+def test_live_foreign_leases_are_kept(tmp_path):
+    with WorkQueue(tmp_path / 'queue.db', 'shared') as queue:
+        queue.enqueue([('A', 1), ('B', 2)])
+        queue.lease('other-host:1-a-0', limit=1, lease_seconds=0.5)
+        summary = queue.process(lambda payload: payload, max_workers=1)
+        # The other process's lease expired while we waited and was redone here
+        assert summary['done'] == 2 and queue.counts().get(LEASED) is None
+
+
+def test_from_settings_tunes_process(tmp_path):
+    settings = {'database': {'sqlite': {'path': str(tmp_path / 'queue.db')}},
+                'automation': {'batch': {'size': 7, 'parallel_workers': 2,
+                                         'lease_seconds': 60}}}
+    with WorkQueue.from_settings(settings, 'tuned') as queue:
+        assert (queue.batch_size, queue.max_workers, queue.lease_seconds) == (7, 2, 60)
+        queue.enqueue((f'ITEM-{n:02d}', n) for n in range(20))
+        leases = []
+        lease = queue.lease
+
+        def recording_lease(owner, limit, lease_seconds):
+            leases.append((limit, lease_seconds))
+            return lease(owner, limit, lease_seconds)
+
+        queue.lease = recording_lease
+        assert queue.process(lambda n: n)['done'] == 20
+        assert set(leases) == {(7, 60)}
@@ -0,0 +1,25 @@
+"""
+Scheduler connection pool sizing
+"""
+
+from src.scheduling.scheduler import job_workers, scheduler_pool_size
+from src.utils.config import load_settings
+
+
+def test_pool_covers_every_enabled_job():
+    settings = load_settings()
+    jobs = settings['scheduling']['jobs']
+    enabled = [name for name, job in jobs.items() if job.get('enabled', True)]
+
+    assert job_workers(settings, 'compliance_check') == \
+        settings['epiroc']['compliance']['max_workers']
+    assert scheduler_pool_size(settings) == sum(job_workers(settings, name)
+                                                for name in enabled)
+    assert scheduler_pool_size(settings, ['bom_sync']) == \
+        scheduler_pool_size(settings) + jobs['bom_sync']['max_workers']
+
+
+def test_pool_never_below_connection_setting():
+    settings = {'teamcenter': {'connection': {'pool_size': 64}},
+                'scheduling': {'jobs': {'bom_sync': {'max_workers': 8}}}}
+    assert scheduler_pool_size(settings) == 64
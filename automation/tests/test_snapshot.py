@@ -0,0 +1,109 @@
+"""
+BOM snapshots round-trip the flattened lines fetched from the mock server
+"""
+
+import math
+
+import pytest
+
+from src.reports.export import flatten_bom, iter_bom_lines
+from src.reports.snapshot import BOMSnapshot, write_snapshot
+
+KEYS = ('rootId', 'lineId', 'level', 'parentId', 'childId', 'childName', 'uom', 'findNumber')
+
+
+def _text(value):
+    return None if value is None else str(value)
+
+
+def _expected(line, properties=None):
+    """A flatten_bom() line as the snapshot returns it: strings and a float quantity"""
+    row = {key: _text(line.get(key)) for key in KEYS}
+    row['level'] = int(line.get('level') or 1)
+    row['quantity'] = float(line['quantity']) if line.get('quantity') not in (None, '') \
+        else float('nan')
+    row['properties'] = {name: _text(value)
+                         for name, value in (line.get('properties') or {}).items()
+                         if properties is None or name in properties}
+    return row
+
+
+def _comparable(row):
+    # NaN never equals itself
+    return dict(row, quantity=None if math.isnan(row['quantity']) else row['quantity'])
+
+
+@pytest.fixture
+def structures(fleet_client, fleet_ids):
+    return {root_id: fleet_client.get_bom_structure(root_id) for root_id in fleet_ids}
+
+
+def test_snapshot_round_trip(fleet_client, fleet_ids, structures, tmp_path):
+    path = tmp_path / 'fleet.tcbom'
+    expected = [_expected(line) for root_id in fleet_ids
+                for line in flatten_bom(structures[root_id], root_id)]
+
+    summary = write_snapshot(path, iter_bom_lines(fleet_client, fleet_ids))
+
+    assert summary['lines'] == len(expected)
+    assert summary['roots'] == len(fleet_ids)
+    with BOMSnapshot(path) as snapshot:
+        assert len(snapshot) == len(expected)
+        assert snapshot.root_ids() == fleet_ids
+        assert [_comparable(row) for row in snapshot.lines()] == \
+            [_comparable(row) for row in expected]
+
+        root_id = fleet_ids[-1]
+        assert [_comparable(row) for row in snapshot.lines(root_id)] == \
+            [_comparable(_expected(line)) for line in flatten_bom(structures[root_id], root_id)]
+
+
+def test_snapshot_children_match_structure(fleet_client, fleet_ids, structures, tmp_path):
+    path = tmp_path / 'fleet.tcbom'
+    write_snapshot(path, iter_bom_lines(fleet_client, fleet_ids))
+
+    with BOMSnapshot(path) as snapshot:
+        for root_id in fleet_ids:
+            span = snapshot.root_range(root_id)
+            top = [index for index in range(span.start, span.stop)
+                   if snapshot.nodes['parent'][index] < 0]
+            assert snapshot.strings(snapshot.nodes['line_id'][top]) == \
+                [line['lineId'] for line in structures[root_id]['lines']]
+            for index in range(span.start, span.stop):
+                children = snapshot.children(index)
+                assert all(snapshot.nodes['parent'][child] == index for child in children)
+                assert all(span.start <= child < span.stop for child in children)
+        assert snapshot.string_index(fleet_ids[0]) >= 0
+        assert snapshot.string(snapshot.string_index(fleet_ids[0])) == fleet_ids[0]
+        assert snapshot.string_index('NOT-IN-SNAPSHOT') == -1
+
+
+def test_snapshot_fixed_property_columns(fleet_client, fleet_ids, structures, tmp_path):
+    path = tmp_path / 'fleet.tcbom'
+    names = ['epr_critical_component', 'epr_not_a_property']
+    write_snapshot(path, iter_bom_lines(fleet_client, fleet_ids), properties=names)
+
+    expected = [_expected(line, names) for root_id in fleet_ids
+                for line in flatten_bom(structures[root_id], root_id)]
+    with BOMSnapshot(path) as snapshot:
+        assert snapshot.property_names == names
+        assert (snapshot.property('epr_not_a_property') == -1).all()
+        critical = snapshot.property('epr_critical_component') == snapshot.string_index('True')
+        assert int(critical.sum()) == sum(
+            1 for row in expected if row['properties'].get('epr_critical_component') == 'True')
+        assert [row['properties'] for row in snapshot.lines()] == \
+            [row['properties'] for row in expected]
+        with pytest.raises(KeyError):
+            snapshot.property('epr_model')
+
+
+def test_snapshot_rejects_other_files(tmp_path):
+    empty = tmp_path / 'empty.tcbom'
+    empty.write_bytes(b'')
+    other = tmp_path / 'other.tcbom'
+    other.write_bytes(b'NOTASNAPSHOT' * 4)
+
+    with pytest.raises(ValueError, match='Empty'):
+        BOMSnapshot(empty)
+    with pytest.raises(ValueError, match='Not a BOM snapshot'):
+        BOMSnapshot(other)
@@ -0,0 +1,45 @@
+"""
+Task watcher deltas and session renewal
+"""
+
+from datetime import datetime, timedelta
+
+from src.workflow.watcher import TaskWatcher
+
+
+def test_initial_poll_delivers_tasks(client):
+    watcher = TaskWatcher(client)
+    watcher.add_user('demo', 'demo')
+    deltas = []
+    watcher.subscribe(deltas.append)
+    delta = watcher.poll('demo')
+    assert delta['initial'] and deltas == [delta]
+    assert watcher.poll('demo') is None
+    watcher.close()
+
+
+def test_expiring_token_is_renewed_before_poll(client):
+    watcher = TaskWatcher(client)
+    watcher.add_user('demo', 'demo')
+    queue = watcher._queues['demo']
+    old_token = queue.client.token
+    queue.client.token_expiry = datetime.now() + timedelta(minutes=1)
+
+    watcher.poll('demo')
+    assert queue.auth.refreshes == 1
+    assert queue.client.token != old_token
+    assert queue.client.token_expiry > datetime.now() + timedelta(minutes=30)
+    watcher.close()
+
+
+def test_rejected_session_logs_in_again(client):
+    watcher = TaskWatcher(client)
+    watcher.add_user('demo', 'demo')
+    queue = watcher._queues['demo']
+    queue.client.token = 'revoked'
+    queue.client.session.headers['Authorization'] = 'Bearer revoked'
+
+    watcher._poll_and_reschedule('demo')
+    assert watcher.stats()['demo']['failures'] == 0
+    assert queue.client.token != 'revoked'
+    watcher.close()
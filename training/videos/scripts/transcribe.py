@@ -6,23 +6,66 @@ Extracts and processes video content for analysis
 
 import json
 import argparse
+import os
+import shutil
 import requests
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
 import re
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Union
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+SOURCES_FILE = "training/videos/raw/sources.json"
+
+# Patterns used by process_transcript, compiled once per process
+TIMESTAMP_PATTERN = re.compile(r'\[(\d{1,2}:\d{2}(?::\d{2})?)\]')
+COMMAND_PATTERN = re.compile(r'[`$]([^`$\n]+)[`$]')
+FEATURE_KEYWORDS = ['feature', 'function', 'capability', 'tool', 'module']
+FEATURE_PATTERNS = [re.compile(rf'{keyword}[:\s]+([^.\n]+)', re.IGNORECASE)
+                    for keyword in FEATURE_KEYWORDS]
+
+# Long transcripts are scanned in blocks of about this many characters
+STREAM_BLOCK_CHARS = 1 << 20
+
+
+def _safe_cut(buffer: str) -> int:
+    """
+    Start of the last complete line with text other than whitespace and colons
+
+    Matches starting before this point end within that line at the latest
+    (only the whitespace/colon run after a feature keyword crosses lines),
+    so they can be taken from the current block.
+    """
+    end = buffer.rfind('\n') + 1
+    while end > 0:
+        start = buffer.rfind('\n', 0, end - 1) + 1
+        if buffer[start:end].replace(':', '').strip():
+            return start
+        end = start
+    return 0
+
+
+def _write_json_atomic(path: Path, data: Dict):
+    """Write JSON via a temporary file so readers never see a partial file"""
+    temporary = path.with_name(path.name + '.tmp')
+    with open(temporary, 'w') as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+
 class VideoTranscriber:
     """Handles video transcription and content extraction"""
     
-    def __init__(self, output_dir: str = "transcripts"):
+    def __init__(self, output_dir: str = "transcripts", sources_file: str = SOURCES_FILE):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.sources_file = Path(sources_file)
         
     def fetch_video_metadata(self, url: str) -> Dict:
         """Fetch video metadata from URL"""
@@ -100,8 +143,13 @@ class VideoTranscriber:
 """
         return transcript
     
-    def process_transcript(self, transcript: str) -> Dict:
-        """Process transcript to extract key information"""
+    def process_transcript(self, transcript: Union[str, Iterable[str]]) -> Dict:
+        """
+        Process transcript to extract key information
+
+        Accepts the transcript text or an iterable of chunks (such as an open
+        file), which is scanned block by block without loading it whole.
+        """
         sections = {
             'timestamps': [],
             'commands': [],
@@ -109,33 +157,54 @@ class VideoTranscriber:
             'workflows': [],
             'tips': []
         }
-        
-        # Extract timestamps (format: [HH:MM:SS] or [MM:SS])
-        timestamp_pattern = r'\[(\d{1,2}:\d{2}(?::\d{2})?)\]'
-        sections['timestamps'] = re.findall(timestamp_pattern, transcript)
-        
-        # Extract commands (format: `command` or $command)
-        command_pattern = r'[`$]([^`$\n]+)[`$]'
-        sections['commands'] = re.findall(command_pattern, transcript)
-        
-        # Extract feature mentions
-        feature_keywords = ['feature', 'function', 'capability', 'tool', 'module']
-        for keyword in feature_keywords:
-            pattern = rf'{keyword}[:\s]+([^.\n]+)'
-            matches = re.findall(pattern, transcript, re.IGNORECASE)
+
+        # Timestamps ([HH:MM:SS] or [MM:SS]), commands (`command` or $command)
+        # and feature mentions, in the order findall would return them
+        patterns = [TIMESTAMP_PATTERN, COMMAND_PATTERN] + FEATURE_PATTERNS
+        found = [[] for _ in patterns]
+        resume = [0] * len(patterns)
+
+        def scan(buffer: str, cut: int):
+            for index, pattern in enumerate(patterns):
+                for match in pattern.finditer(buffer, resume[index]):
+                    if match.start() >= cut:
+                        break
+                    found[index].append(match.group(1))
+                    resume[index] = match.end()
+                resume[index] = max(resume[index] - cut, 0)
+
+        chunks = [transcript] if isinstance(transcript, str) else transcript
+        buffer = ''
+        for chunk in chunks:
+            buffer += chunk
+            if len(buffer) >= STREAM_BLOCK_CHARS:
+                cut = _safe_cut(buffer)
+                scan(buffer, cut)
+                buffer = buffer[cut:]
+        scan(buffer, len(buffer))
+
+        sections['timestamps'] = found[0]
+        sections['commands'] = found[1]
+        for matches in found[2:]:
             sections['features'].extend(matches)
-        
+
         return sections
     
     def generate_markdown(self, url: str, metadata: Dict, transcript: str, sections: Dict) -> str:
         """Generate formatted markdown document"""
-        template = f"""# Teamcenter Training Video Transcript
+        head, tail = self._markdown_parts(url, metadata, bool(transcript), sections)
+        return head + transcript + tail
+
+    def _markdown_parts(self, url: str, metadata: Dict, transcribed: bool,
+                        sections: Dict) -> tuple:
+        """Markdown before and after the full transcript"""
+        head = f"""# Teamcenter Training Video Transcript
 
 ## Video Information
 - **URL**: {url}
 - **Platform**: {metadata.get('platform', 'Unknown')}
 - **Date Accessed**: {datetime.now().strftime('%Y-%m-%d')}
-- **Transcription Status**: {'Complete' if transcript else 'Pending'}
+- **Transcription Status**: {'Complete' if transcribed else 'Pending'}
 
 ## Summary
 [To be added after transcription]
@@ -150,7 +219,8 @@ class VideoTranscriber:
 {self._format_features(sections.get('features', []))}
 
 ## Full Transcript
-{transcript}
+"""
+        tail = """
 
 ## Epiroc Applications
 [To be analyzed after transcription]
@@ -171,7 +241,7 @@ class VideoTranscriber:
 ---
 *Generated by Teamcenter Video Transcription Tool*
 """
-        return template
+        return head, tail
     
     def _format_timestamps(self, timestamps: List[str]) -> str:
         """Format timestamps list"""
@@ -191,22 +261,52 @@ class VideoTranscriber:
             return "- No features extracted yet"
         return '\n'.join(f"- {feature.strip()}" for feature in features[:10])
     
-    def save_transcript(self, url: str, content: str) -> Path:
-        """Save transcript to file"""
-        # Generate filename from URL
-        safe_name = re.sub(r'[^\w\-_]', '_', url.split('/')[-1])
+    def _transcript_path(self, url: str, name: Optional[str] = None) -> Path:
+        """Output path from the entry name or the URL"""
+        safe_name = re.sub(r'[^\w\-_]', '_', name or url.split('/')[-1])
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"{safe_name}_{timestamp}.md"
-        
-        filepath = self.output_dir / filename
+        return self.output_dir / f"{safe_name}_{timestamp}.md"
+
+    def save_transcript(self, url: str, content: str, name: Optional[str] = None) -> Path:
+        """Save transcript to file"""
+        filepath = self._transcript_path(url, name)
         filepath.write_text(content)
         logger.info(f"Transcript saved to: {filepath}")
         
         return filepath
+
+    def transcribe(self, url: str, name: Optional[str] = None,
+                   transcript_file: Optional[Path] = None) -> Path:
+        """
+        Create the transcript document for one video
+
+        With transcript_file (a raw transcript on disk) the transcript is
+        streamed twice, once to extract sections and once into the output,
+        so long transcripts are never held in memory.
+        """
+        metadata = self.fetch_video_metadata(url)
+
+        if transcript_file is None:
+            transcript = self.extract_transcript(url)
+            sections = self.process_transcript(transcript)
+            content = self.generate_markdown(url, metadata, transcript, sections)
+            return self.save_transcript(url, content, name)
+
+        with open(transcript_file, 'r', encoding='utf-8') as f:
+            sections = self.process_transcript(f)
+        head, tail = self._markdown_parts(url, metadata, True, sections)
+        filepath = self._transcript_path(url, name)
+        with open(filepath, 'w', encoding='utf-8') as out, \
+                open(transcript_file, 'r', encoding='utf-8') as f:
+            out.write(head)
+            shutil.copyfileobj(f, out)
+            out.write(tail)
+        logger.info(f"Transcript saved to: {filepath}")
+        return filepath
     
     def update_sources(self, url: str, transcript_path: Path):
         """Update sources.json with processing status"""
-        sources_file = Path("training/videos/raw/sources.json")
+        sources_file = self.sources_file
         if sources_file.exists():
             with open(sources_file, 'r') as f:
                 data = json.load(f)
@@ -219,26 +319,170 @@ class VideoTranscriber:
                     video['processed_date'] = datetime.now().isoformat()
                     break
             
-            # Update metadata
-            data['metadata']['last_updated'] = datetime.now().isoformat()
-            data['metadata']['processed'] = sum(1 for v in data['videos'] if v.get('status') == 'transcribed')
-            data['metadata']['pending'] = sum(1 for v in data['videos'] if v.get('status') == 'pending')
-            
-            with open(sources_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            _update_counts(data)
+            _write_json_atomic(sources_file, data)
             
             logger.info("Updated sources.json")
 
+
+def _update_counts(data: Dict):
+    """Refresh the metadata counts of a sources.json document"""
+    videos = data.get('videos', [])
+    metadata = data.setdefault('metadata', {})
+    metadata['last_updated'] = datetime.now().isoformat()
+    metadata['total_videos'] = len(videos)
+    metadata['processed'] = sum(1 for v in videos if v.get('status') == 'transcribed')
+    metadata['pending'] = sum(1 for v in videos if v.get('status') == 'pending')
+
+
+def _video_key(video: Dict) -> str:
+    return video.get('id') or video.get('url')
+
+
+class SourcesJournal:
+    """
+    Append-only record of batch results next to sources.json
+
+    Each finished video appends one JSON line, flushed to disk, so a batch
+    never rewrites sources.json per video and an interrupted batch loses
+    nothing. compact() applies the journal to sources.json in one atomic
+    write and removes it; a journal left by a crashed batch is picked up
+    by the next one.
+    """
+
+    def __init__(self, sources_file: Path):
+        self.sources_file = Path(sources_file)
+        self.path = self.sources_file.with_name(self.sources_file.stem + '.journal.jsonl')
+
+    def records(self) -> List[Dict]:
+        """Journaled results, ignoring a torn last line"""
+        if not self.path.exists():
+            return []
+        records = []
+        with open(self.path, 'r') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    logger.warning(f"Ignoring incomplete journal line in {self.path}")
+        return records
+
+    def append(self, record: Dict):
+        """Durably record one result"""
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def compact(self) -> Dict:
+        """Apply the journal to sources.json atomically and remove it"""
+        records = {record['key']: record for record in self.records()}
+        with open(self.sources_file, 'r') as f:
+            data = json.load(f)
+        if records:
+            for video in data.get('videos', []):
+                record = records.get(_video_key(video))
+                if record is None:
+                    continue
+                video['status'] = record['status']
+                video['processed_date'] = record['processed_date']
+                if record.get('transcript_path'):
+                    video['transcript_path'] = record['transcript_path']
+                if record.get('error'):
+                    video['error'] = record['error']
+                else:
+                    video.pop('error', None)
+            _update_counts(data)
+            _write_json_atomic(self.sources_file, data)
+        if self.path.exists():
+            self.path.unlink()
+        logger.info(f"Compacted {len(records)} journaled results into {self.sources_file}")
+        return data['metadata']
+
+
+def _transcribe_entry(output_dir: str, sources_dir: str, video: Dict) -> Dict:
+    """Process one sources.json entry in a worker process"""
+    record = {'key': _video_key(video), 'url': video.get('url'),
+              'processed_date': datetime.now().isoformat()}
+    try:
+        transcript_file = video.get('transcript_file')
+        if transcript_file:
+            transcript_file = Path(sources_dir) / transcript_file
+        transcriber = VideoTranscriber(output_dir=output_dir)
+        filepath = transcriber.transcribe(video['url'], name=video.get('id'),
+                                          transcript_file=transcript_file)
+        record.update(status='transcribed', transcript_path=str(filepath))
+    except Exception as e:
+        record.update(status='failed', error=str(e))
+    return record
+
+
+def run_batch(sources_file: str, output_dir: str, workers: Optional[int] = None,
+              retry_failed: bool = False) -> Dict:
+    """
+    Transcribe every pending video in sources.json across a process pool
+
+    Entries with a transcript_file (path relative to sources.json) are
+    processed from that file; others get the manual transcription template.
+
+    Returns:
+        Updated sources.json metadata counts
+    """
+    sources_file = Path(sources_file)
+    journal = SourcesJournal(sources_file)
+    if journal.path.exists():
+        logger.info(f"Resuming from {journal.path}")
+    done = {record['key'] for record in journal.records()}
+
+    with open(sources_file, 'r') as f:
+        videos = json.load(f).get('videos', [])
+    wanted = {'pending', 'failed'} if retry_failed else {'pending'}
+    todo = [video for video in videos
+            if video.get('status', 'pending') in wanted and video.get('url')
+            and _video_key(video) not in done]
+    logger.info(f"{len(todo)} videos to transcribe with {workers or os.cpu_count()} workers")
+
+    failed = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_transcribe_entry, output_dir,
+                                       str(sources_file.parent), video)
+                       for video in todo]
+            for count, future in enumerate(as_completed(futures), 1):
+                record = future.result()
+                journal.append(record)
+                if record['status'] == 'failed':
+                    failed += 1
+                    logger.error(f"Failed to transcribe {record['url']}: {record['error']}")
+                if count % 100 == 0 or count == len(futures):
+                    logger.info(f"{count}/{len(futures)} videos processed, {failed} failed")
+    finally:
+        metadata = journal.compact()
+    return metadata
+
 def main():
     parser = argparse.ArgumentParser(description='Transcribe Teamcenter training videos')
-    parser.add_argument('--url', required=True, help='Video URL to transcribe')
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument('--url', help='Video URL to transcribe')
+    mode.add_argument('--batch', action='store_true',
+                      help='Transcribe every pending video in sources.json')
     parser.add_argument('--output', default='training/videos/transcripts', help='Output directory')
     parser.add_argument('--update-sources', action='store_true', help='Update sources.json')
+    parser.add_argument('--sources', default=SOURCES_FILE, help='Path to sources.json')
+    parser.add_argument('--workers', type=int, help='Worker processes for --batch (default: CPUs)')
+    parser.add_argument('--retry-failed', action='store_true',
+                        help='With --batch, also retry videos that failed before')
     
     args = parser.parse_args()
+
+    if args.batch:
+        counts = run_batch(args.sources, args.output, args.workers, args.retry_failed)
+        logger.info(f"Batch complete: {counts.get('processed')} transcribed, "
+                    f"{counts.get('pending')} pending")
+        return
     
     # Initialize transcriber
-    transcriber = VideoTranscriber(output_dir=args.output)
+    transcriber = VideoTranscriber(output_dir=args.output, sources_file=args.sources)
     
     logger.info(f"Processing video: {args.url}")
     